@@ -231,6 +231,21 @@ def get_current_user_dep(
         )
 
 
+def get_current_superuser_dep(
+    user: User = Depends(get_current_user_dep)
+):
+    """
+    Dépendance réservant une route aux administrateurs (is_superuser).
+    """
+    if not user.is_superuser:
+        logger.warning("[AUTH] Utilisateur id=%s non administrateur", user.id)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Accès réservé aux administrateurs"
+        )
+    return user
+
+
 @router.get("/users/me", response_model=UserResponse)
 def get_current_user(
     user: User = Depends(get_current_user_dep)
@@ -1,32 +1,183 @@
 """
 Définition des routes API
 """
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
+from fastapi import APIRouter, HTTPException, Depends, Header, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from pydantic import ValidationError
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 from app.database.connection import get_db
-from app.models.schemas import AnalyzeRequest, AnalyzeResponse, BiomarkerAnalysis
+from app.api.custom_auth_routes import get_current_superuser_dep
+from app.models.schemas import (
+    AnalyzeRequest,
+    AnalyzeResponse,
+    BatchAnalyzeItem,
+    BatchAnalyzeItemResult,
+    BatchAnalyzeRequest,
+    BatchAnalyzeResponse,
+    BiomarkerAnalysis,
+    JobStatusResponse,
+    JobSubmitResponse,
+)
+from app.models.auth import User
 from app.models.base import Biomarker
 from app.services.analyzer import BiomarkerAnalyzer
+from app.services.biomarker_catalog import get_biomarker_catalog, refresh_biomarker_catalog
 from app.services.pdf_generator import generate_pdf_report
-from app.services.gemini_service import get_gemini_service
+from app.services.gemini_service import get_gemini_executor, get_gemini_resilience
+from app.services.pdf_extraction import get_pdf_extraction_pipeline
+from app.services.pdf_analysis import (
+    BilanAnalysis,
+    BilanFile,
+    analyze_image_bytes,
+    analyze_pdf_bytes,
+    analyze_pdf_files,
+    stream_pdf_analysis,
+)
+from app.services.jobs import JobQueueFullError, get_job_manager, get_job_store
+from app.services.job_queue import get_job_queue
+from app.config import JOBS_BACKEND, UPLOAD_MAX_MB
+from app.services.extraction_cache import get_extraction_cache
+from app.services.cassettes import get_cassette_store
+from app.services.extraction_prompt import get_prompt_context_cache
+from app.services.extractors import get_extractor_stats
+from app.services.key_pool import get_api_key_pool
+from app.services.model_router import get_model_router
+from app.services.idempotency import StoredResponse, get_idempotency_store
+from app.services.pdf_extraction import ExtractionResult, validate_pdf_bytes
+from app.services.upload import (
+    FILES_UPLOAD_OPENAPI,
+    PDF_UPLOAD_OPENAPI,
+    UploadedFile,
+    read_uploads,
+    receive_image_uploads,
+    receive_pdf_upload,
+    receive_pdf_uploads,
+)
 from datetime import datetime
+import hashlib
+import json
 
 router = APIRouter()
 
+# Nombre maximal de bilans acceptés dans un lot
+BATCH_MAX_ITEMS = 1000
 
-@router.post("/analyze", response_model=AnalyzeResponse)
-async def analyze_blood_test(
-    data: AnalyzeRequest,
-    db: Session = Depends(get_db)
+
+def _build_analyze_response(
+    results: List[BiomarkerAnalysis], summary: Dict[str, int]
 ) -> AnalyzeResponse:
+    """
+    Construire la réponse d'analyse à partir des résultats de l'analyseur
+
+    Partagé par l'analyse unitaire et l'analyse par lot pour garantir
+    des réponses identiques.
+
+    Args:
+        results: Liste des analyses de biomarqueurs
+        summary: Résumé des statuts
+
+    Returns:
+        Réponse d'analyse complète
+    """
+    # Construire le message de réponse
+    total_count = len(results)
+    unknown_count = summary.get("inconnu", 0)
+
+    if unknown_count == total_count:
+        message = "Aucun biomarqueur reconnu. Vérifiez les noms des biomarqueurs."
+    elif unknown_count > 0:
+        message = f"Analyse complétée. {unknown_count} biomarqueur(s) non reconnu(s)."
+    else:
+        message = f"Analyse complétée avec succès ! {total_count} biomarqueur(s) analysé(s)."
+
+    return AnalyzeResponse(
+        status="success",
+        message=message,
+        results=results,
+        summary=summary
+    )
+
+
+def _extraction_headers(extraction: ExtractionResult) -> Dict[str, str]:
+    """En-têtes X-Extraction-* décrivant l'extraction d'un PDF"""
+    headers = {
+        "X-Extraction-Source": extraction.source,
+        "X-Extraction-Input": extraction.input_mode,
+        "X-Extraction-Input-Bytes": str(extraction.input_bytes),
+        "X-Extraction-Latency-Ms": str(extraction.latency_ms),
+        "X-Extraction-Coalesced": "true" if extraction.coalesced else "false",
+    }
+    if extraction.prompt_version is not None:
+        headers["X-Extraction-Prompt-Version"] = extraction.prompt_version
+    if extraction.model is not None:
+        headers["X-Extraction-Model"] = extraction.model
+        headers["X-Extraction-Escalated"] = "true" if extraction.escalated else "false"
+    return headers
+
+
+def _bilan_headers(analysis: BilanAnalysis) -> Dict[str, str]:
+    """En-têtes X-Bilan-* décrivant l'extraction d'un bilan en plusieurs PDF"""
+    latencies = [e.latency_ms for e in analysis.extractions if e is not None]
+    return {
+        "X-Bilan-Files": str(len(analysis.extractions)),
+        "X-Bilan-Skipped": str(len(analysis.skipped)),
+        "X-Bilan-Conflicts": ",".join(analysis.conflicts),
+        "X-Bilan-Latency-Ms": str(analysis.latency_ms),
+        "X-Bilan-Slowest-Ms": str(max(latencies, default=0.0)),
+    }
+
+
+async def _run_idempotent(
+    scope: str,
+    key: str,
+    fingerprint: str,
+    uploads: List[UploadedFile],
+    produce: Callable[[List[bytes]], Awaitable[StoredResponse]],
+) -> Response:
+    """
+    Exécuter une analyse avec Idempotency-Key, en ne lisant les fichiers que si elle est exécutée
+
+    Le traitement peut survivre à la requête (client déconnecté) : il lit
+    puis ferme lui-même les fichiers. S'il n'est pas exécuté (réponse
+    rejouée, clé en cours de traitement ou en conflit), ils sont fermés ici.
+
+    Args:
+        scope: Endpoint concerné
+        key: Valeur de l'en-tête Idempotency-Key
+        fingerprint: Empreinte des fichiers reçus
+        uploads: Fichiers reçus (non encore lus)
+        produce: Fabrique de la réponse à partir du contenu des fichiers
+
+    Returns:
+        Réponse HTTP (éventuellement rejouée)
+    """
+    claimed = False
+
+    async def run() -> StoredResponse:
+        nonlocal claimed
+        claimed = True
+        return await produce(await read_uploads(uploads))
+
+    try:
+        return await get_idempotency_store().run(scope, key, fingerprint, run)
+    finally:
+        if not claimed:
+            for upload in uploads:
+                upload.close()
+
+
+@router.post("/analyze", response_model=AnalyzeResponse)
+async def analyze_blood_test(data: AnalyzeRequest) -> AnalyzeResponse:
     """
     Endpoint pour analyser un bilan sanguin
     
+    Les plages de référence proviennent du catalogue en mémoire :
+    aucune session de base de données n'est ouverte.
+
     Args:
         data: Données du bilan sanguin avec dictionnaire de biomarqueurs
-        db: Session de base de données
         
     Returns:
         Résultats de l'analyse avec comparaisons et explications
@@ -48,29 +199,9 @@ async def analyze_blood_test(
                 detail="Aucun biomarqueur fourni pour l'analyse"
             )
         
-        # Créer l'analyseur
-        analyzer = BiomarkerAnalyzer(db)
-        
-        # Analyser les biomarqueurs
-        results, summary = analyzer.analyze(data.biomarkers)
-        
-        # Construire le message de réponse
-        total_count = len(results)
-        unknown_count = summary.get("inconnu", 0)
-        
-        if unknown_count == total_count:
-            message = "Aucun biomarqueur reconnu. Vérifiez les noms des biomarqueurs."
-        elif unknown_count > 0:
-            message = f"Analyse complétée. {unknown_count} biomarqueur(s) non reconnu(s)."
-        else:
-            message = f"Analyse complétée avec succès ! {total_count} biomarqueur(s) analysé(s)."
-        
-        return AnalyzeResponse(
-            status="success",
-            message=message,
-            results=results,
-            summary=summary
-        )
+        # Créer l'analyseur et analyser les biomarqueurs
+        results, summary = BiomarkerAnalyzer().analyze(data.biomarkers)
+        return _build_analyze_response(results, summary)
         
     except HTTPException:
         raise
@@ -81,115 +212,470 @@ async def analyze_blood_test(
         )
 
 
-@router.post("/analyze-pdf", response_model=AnalyzeResponse)
+def _validate_batch_items(items: List[BatchAnalyzeItem]) -> Tuple[Dict[int, str], Dict[int, Dict[str, float]]]:
+    """
+    Valider chaque bilan d'un lot indépendamment
+
+    Returns:
+        (erreur par position, biomarqueurs valides par position)
+    """
+    errors: Dict[int, str] = {}
+    valid: Dict[int, Dict[str, float]] = {}
+    for index, item in enumerate(items):
+        try:
+            request = AnalyzeRequest(biomarkers=item.biomarkers)
+        except ValidationError as e:
+            errors[index] = f"Données invalides : {e.error_count()} erreur(s) de validation"
+            continue
+        if not request.biomarkers:
+            errors[index] = "Aucun biomarqueur fourni pour l'analyse"
+            continue
+        valid[index] = request.biomarkers
+    return errors, valid
+
+
+@router.post("/analyze/batch", response_model=BatchAnalyzeResponse)
+async def analyze_blood_test_batch(data: BatchAnalyzeRequest) -> BatchAnalyzeResponse:
+    """
+    Endpoint pour analyser plusieurs bilans sanguins en un seul appel
+
+    Le catalogue de référence est résolu une seule fois pour tout le lot et
+    les statuts sont calculés en une passe vectorisée. Chaque bilan est
+    validé indépendamment : une erreur sur un bilan est rapportée dans son
+    résultat sans faire échouer le lot.
+
+    Args:
+        data: Lot de bilans, chacun avec un identifiant fourni par l'appelant
+
+    Returns:
+        Résultats par bilan, dans l'ordre de la requête
+    """
+    if not data.items:
+        raise HTTPException(
+            status_code=400,
+            detail="Aucun bilan fourni pour l'analyse"
+        )
+
+    if len(data.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lot trop volumineux ({len(data.items)} bilans). Maximum : {BATCH_MAX_ITEMS}"
+        )
+
+    try:
+        catalog = get_biomarker_catalog()
+        analyzer = BiomarkerAnalyzer(catalog)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors du chargement du catalogue : {str(e)}"
+        )
+
+    errors, valid = _validate_batch_items(data.items)
+
+    # Classer toutes les valeurs valides du lot en une passe vectorisée
+    try:
+        analyses = dict(zip(valid.keys(), analyzer.analyze_batch(list(valid.values()))))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de l'analyse du lot : {str(e)}"
+        )
+
+    item_results = []
+    for index, item in enumerate(data.items):
+        if index in errors:
+            item_results.append(BatchAnalyzeItemResult(
+                id=item.id,
+                status="error",
+                error=errors[index]
+            ))
+        else:
+            item_results.append(BatchAnalyzeItemResult(
+                id=item.id,
+                status="success",
+                result=_build_analyze_response(*analyses[index])
+            ))
+
+    failed = sum(1 for r in item_results if r.status == "error")
+    succeeded = len(item_results) - failed
+
+    return BatchAnalyzeResponse(
+        status="success" if failed == 0 else "partial",
+        message=f"{succeeded} bilan(s) analysé(s), {failed} en erreur.",
+        catalog_version=catalog.version,
+        succeeded=succeeded,
+        failed=failed,
+        results=item_results
+    )
+
+
+@router.post("/analyze-pdf", response_model=AnalyzeResponse, openapi_extra=PDF_UPLOAD_OPENAPI)
 async def analyze_pdf_blood_test(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ) -> AnalyzeResponse:
     """
     Endpoint pour analyser un bilan sanguin à partir d'un PDF
     
+    Le fichier (champ `file` du formulaire multipart) est lu en flux : un
+    fichier qui n'est pas un PDF ou qui dépasse la taille maximale est
+    refusé dès les premiers morceaux reçus.
+
+    La source de l'extraction, la taille du contenu envoyé à Gemini et la
+    latence d'extraction sont renvoyées dans les en-têtes X-Extraction-*.
+    Avec un en-tête Idempotency-Key, une relance du même PDF rejoue la
+    première réponse au lieu de relancer l'extraction.
+
     Args:
-        file: Fichier PDF uploadé contenant le bilan sanguin
-        db: Session de base de données
+        request: Requête multipart contenant le fichier PDF du bilan sanguin
+        idempotency_key: Clé d'idempotence fournie par le client (optionnelle)
         
     Returns:
         Résultats de l'analyse avec comparaisons et explications
         
     Raises:
-        HTTPException: Si le fichier n'est pas un PDF ou en cas d'erreur
+        HTTPException: Si le fichier n'est pas un PDF, est trop volumineux (413) ou en cas d'erreur
     """
     print(f"\n[ROUTES] ===== DÉBUT ANALYZE-PDF =====")
-    print(f"[ROUTES] Fichier reçu: {file.filename}")
-    print(f"[ROUTES] Content-Type: {file.content_type}")
     
     try:
-        # Vérifier que c'est bien un PDF
-        if file.content_type != "application/pdf":
-            print(f"[ROUTES] ❌ Mauvais type de fichier: {file.content_type}")
-            raise HTTPException(
-                status_code=400,
-                detail="Le fichier doit être un PDF"
-            )
-        
-        print("[ROUTES] ✅ Type de fichier validé")
-        
-        # Lire le contenu du PDF
-        print("[ROUTES] Lecture du contenu du PDF...")
-        pdf_bytes = await file.read()
-        print(f"[ROUTES] ✅ PDF lu: {len(pdf_bytes)} bytes")
-        
-        # Obtenir le service Gemini
-        print("[ROUTES] Obtention du service Gemini...")
-        try:
-            gemini_service = get_gemini_service()
-            print("[ROUTES] ✅ Service Gemini obtenu")
-        except Exception as e:
-            print(f"[ROUTES] ❌ Erreur lors de l'obtention du service: {e}")
-            raise
-        
-        # Valider le PDF
-        print("[ROUTES] Validation du PDF...")
-        await gemini_service.validate_pdf(pdf_bytes, max_size_mb=10)
-        print("[ROUTES] ✅ PDF validé")
+        # Lire le PDF en flux (signature, taille maximale et SHA-256 en une passe)
+        upload = await receive_pdf_upload(request)
+        pdf_sha256 = upload.sha256
+        print(f"[ROUTES] ✅ PDF reçu: {upload.filename} ({upload.size} bytes)")
+
+        if idempotency_key is not None:
+            async def produce(contents: List[bytes]) -> StoredResponse:
+                analysis = await analyze_pdf_bytes(contents[0], sha256=pdf_sha256)
+                return StoredResponse(
+                    status_code=200,
+                    body=analysis.response.model_dump_json().encode("utf-8"),
+                    media_type="application/json",
+                    headers=_extraction_headers(analysis.extraction)
+                )
+
+            return await _run_idempotent("analyze-pdf", idempotency_key, pdf_sha256, [upload], produce)
+
+        # Valider, extraire puis analyser
+        pdf_bytes, = await read_uploads([upload])
+        analysis = await analyze_pdf_bytes(pdf_bytes, sha256=pdf_sha256)
+        response.headers.update(_extraction_headers(analysis.extraction))
         
-        # Extraire les biomarqueurs avec Gemini
-        print("[ROUTES] Extraction des biomarqueurs...")
-        biomarkers_data = await gemini_service.extract_biomarkers_from_pdf(pdf_bytes)
-        print(f"[ROUTES] ✅ Biomarqueurs extraits: {biomarkers_data}")
+        return analysis.response
         
-        # Vérifier que des données ont été extraites
-        if not biomarkers_data:
-            raise HTTPException(
-                status_code=400,
-                detail="Aucun biomarqueur n'a pu être extrait du PDF. "
-                       "Assurez-vous que le PDF contient un bilan sanguin valide."
-            )
-        
-        # Créer l'analyseur
-        analyzer = BiomarkerAnalyzer(db)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de l'analyse du PDF : {str(e)}"
+        )
+
+
+@router.post("/analyze-images", response_model=AnalyzeResponse, openapi_extra=FILES_UPLOAD_OPENAPI)
+async def analyze_image_blood_test(
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+) -> AnalyzeResponse:
+    """
+    Endpoint pour analyser un bilan sanguin photographié
+
+    Les photos (champ `files` répété, une par page, JPEG/PNG/WebP ; les
+    photos HEIC sont à convertir en JPEG) sont lues en flux, puis réduites,
+    passées en niveaux de gris et recadrées sur la feuille avant d'être
+    envoyées ensemble à Gemini en un seul appel.
+
+    Args:
+        request: Requête multipart contenant les photos du bilan
+        idempotency_key: Clé d'idempotence fournie par le client (optionnelle)
         
-        # Analyser les biomarqueurs extraits
-        results, summary = analyzer.analyze(biomarkers_data)
+    Returns:
+        Résultats de l'analyse avec comparaisons et explications
         
-        # Construire le message de réponse
-        total_count = len(results)
-        unknown_count = summary.get("inconnu", 0)
-        extracted_count = len(biomarkers_data)
+    Raises:
+        HTTPException: Si un fichier n'est pas une image supportée, est trop volumineux (413) ou en cas d'erreur
+    """
+    print("\n[ROUTES] ===== DÉBUT ANALYZE-IMAGES =====")
+
+    try:
+        uploads = await receive_image_uploads(request)
+        print(f"[ROUTES] ✅ {len(uploads)} photo(s) reçue(s): {sum(upload.size for upload in uploads)} bytes")
+
+        if idempotency_key is not None:
+            uploads_sha256 = hashlib.sha256("".join(upload.sha256 for upload in uploads).encode()).hexdigest()
+
+            async def produce(images: List[bytes]) -> StoredResponse:
+                analysis = await analyze_image_bytes(images)
+                return StoredResponse(
+                    status_code=200,
+                    body=analysis.response.model_dump_json().encode("utf-8"),
+                    media_type="application/json",
+                    headers=_extraction_headers(analysis.extraction)
+                )
+
+            return await _run_idempotent("analyze-images", idempotency_key, uploads_sha256, uploads, produce)
+
+        images = await read_uploads(uploads)
+        analysis = await analyze_image_bytes(images)
+        response.headers.update(_extraction_headers(analysis.extraction))
         
-        if unknown_count == total_count:
-            message = (
-                f"{extracted_count} biomarqueur(s) extrait(s) du PDF, "
-                f"mais aucun n'est reconnu dans notre base. "
-                f"Vérifiez le format du document."
-            )
-        elif unknown_count > 0:
-            message = (
-                f"Analyse complétée ! {extracted_count} biomarqueur(s) extrait(s) du PDF. "
-                f"{unknown_count} non reconnu(s) dans notre base."
-            )
-        else:
-            message = (
-                f"Analyse complétée avec succès ! "
-                f"{extracted_count} biomarqueur(s) extrait(s) et analysé(s)."
-            )
+        return analysis.response
         
-        return AnalyzeResponse(
-            status="success",
-            message=message,
-            results=results,
-            summary=summary
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de l'analyse des photos : {str(e)}"
         )
+
+
+@router.post("/analyze-pdfs", response_model=AnalyzeResponse, openapi_extra=FILES_UPLOAD_OPENAPI)
+async def analyze_pdf_bilan(
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+) -> AnalyzeResponse:
+    """
+    Endpoint pour analyser un bilan sanguin réparti sur plusieurs PDF
+
+    Les fichiers (champ `files` répété, un PDF par fichier) sont extraits en
+    parallèle, puis leurs biomarqueurs sont fusionnés et analysés en une
+    seule fois. En cas de valeurs différentes pour un même biomarqueur, la
+    lecture locale de la couche texte l'emporte sur Gemini, puis le premier
+    fichier envoyé. Les fichiers sans biomarqueur sont ignorés.
+
+    Args:
+        request: Requête multipart contenant les PDF du bilan
+        idempotency_key: Clé d'idempotence fournie par le client (optionnelle)
+        
+    Returns:
+        Résultats de l'analyse avec comparaisons et explications
+
+    Raises:
+        HTTPException: Si un fichier n'est pas un PDF, est trop volumineux (413) ou en cas d'erreur
+    """
+    print("\n[ROUTES] ===== DÉBUT ANALYZE-PDFS =====")
+
+    try:
+        uploads = await receive_pdf_uploads(request)
+        print(f"[ROUTES] ✅ {len(uploads)} PDF reçu(s): {sum(upload.size for upload in uploads)} bytes")
+
+        def bilan_files(contents: List[bytes]) -> List[BilanFile]:
+            return [
+                BilanFile(filename=upload.filename, pdf_bytes=pdf_bytes, sha256=upload.sha256)
+                for upload, pdf_bytes in zip(uploads, contents)
+            ]
+
+        if idempotency_key is not None:
+            uploads_sha256 = hashlib.sha256("".join(upload.sha256 for upload in uploads).encode()).hexdigest()
+
+            async def produce(contents: List[bytes]) -> StoredResponse:
+                analysis = await analyze_pdf_files(bilan_files(contents))
+                return StoredResponse(
+                    status_code=200,
+                    body=analysis.response.model_dump_json().encode("utf-8"),
+                    media_type="application/json",
+                    headers=_bilan_headers(analysis)
+                )
+
+            return await _run_idempotent("analyze-pdfs", idempotency_key, uploads_sha256, uploads, produce)
+
+        analysis = await analyze_pdf_files(bilan_files(await read_uploads(uploads)))
+        response.headers.update(_bilan_headers(analysis))
+
+        return analysis.response
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Erreur lors de l'analyse du PDF : {str(e)}"
+            detail=f"Erreur lors de l'analyse des PDF : {str(e)}"
         )
 
 
+@router.post("/analyze-pdf/stream", openapi_extra=PDF_UPLOAD_OPENAPI)
+async def stream_analyze_pdf_blood_test(request: Request):
+    """
+    Variante en flux (server-sent events) de l'analyse d'un bilan PDF
+
+    Chaque biomarqueur est analysé et envoyé (événement `biomarker`, au format
+    BiomarkerAnalysis) dès sa lecture dans la réponse de Gemini, sans attendre
+    la fin de l'extraction. Le flux se termine par un événement `summary`
+    (même contenu que /api/analyze-pdf, plus les détails de l'extraction) ou
+    par un événement `error` ({status_code, detail}).
+
+    Args:
+        request: Requête multipart contenant le fichier PDF du bilan sanguin
+
+    Returns:
+        Flux text/event-stream
+
+    Raises:
+        HTTPException: Si le fichier n'est pas un PDF ou est trop volumineux (413)
+    """
+    upload = await receive_pdf_upload(request)
+    pdf_bytes, = await read_uploads([upload])
+    pdf_sha256 = upload.sha256
+    print(f"[ROUTES] Analyse PDF en flux: {upload.filename} ({upload.size} bytes)")
+
+    # Erreurs de validation renvoyées avec leur code HTTP, avant l'ouverture du flux
+    validate_pdf_bytes(pdf_bytes, max_size_mb=UPLOAD_MAX_MB)
+
+    async def event_stream():
+        seq = 0
+        try:
+            async for event_type, data in stream_pdf_analysis(pdf_bytes, sha256=pdf_sha256):
+                seq += 1
+                yield f"id: {seq}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n"
+        except HTTPException as e:
+            error = {"status_code": e.status_code, "detail": e.detail}
+            yield f"id: {seq + 1}\nevent: error\ndata: {json.dumps(error)}\n\n"
+        except Exception as e:
+            error = {"status_code": 500, "detail": f"Erreur lors de l'analyse du PDF : {str(e)}"}
+            yield f"id: {seq + 1}\nevent: error\ndata: {json.dumps(error)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+@router.post(
+    "/analyze-pdf/jobs",
+    response_model=JobSubmitResponse,
+    status_code=202,
+    openapi_extra=PDF_UPLOAD_OPENAPI
+)
+async def submit_analyze_pdf_job(request: Request) -> JobSubmitResponse:
+    """
+    Soumettre l'analyse d'un PDF en tâche de fond
+
+    Rend la main immédiatement avec l'identifiant du job. L'avancement
+    (validated, extracted, analyzed) et le résultat se consultent via
+    GET /api/jobs/{job_id} ou le flux SSE GET /api/jobs/{job_id}/events.
+
+    Args:
+        request: Requête multipart contenant le fichier PDF du bilan sanguin
+
+    Returns:
+        Identifiant du job et URLs de suivi
+
+    Raises:
+        HTTPException: Si le fichier n'est pas un PDF, est trop volumineux (413)
+                       ou si trop de jobs sont en attente
+    """
+    upload = await receive_pdf_upload(request)
+    pdf_sha256 = upload.sha256
+    print(f"[ROUTES] Job d'analyse PDF: {upload.filename} ({upload.size} bytes)")
+
+    if JOBS_BACKEND == "database":
+        # Traité par les processus `python -m app.worker` (insertion en base hors boucle)
+        pdf_bytes, = await read_uploads([upload])
+        job = await run_in_threadpool(get_job_queue().enqueue, "analyze_pdf", pdf_bytes)
+        return JobSubmitResponse(
+            job_id=job.id,
+            status=job.status,
+            status_url=f"/api/jobs/{job.id}",
+            events_url=f"/api/jobs/{job.id}/events"
+        )
+
+    # Jusqu'à son lancement, le job ne conserve que le fichier reçu (sur disque au-delà du seuil)
+    async def work(report):
+        pdf_bytes, = await read_uploads([upload])
+        analysis = await analyze_pdf_bytes(pdf_bytes, on_stage=report, sha256=pdf_sha256)
+        return analysis.response.model_dump()
+
+    try:
+        job = get_job_manager().submit(work, kind="analyze_pdf")
+    except JobQueueFullError as e:
+        upload.close()
+        raise HTTPException(
+            status_code=503,
+            detail=f"Service surchargé, réessayez plus tard ({e})"
+        )
+
+    return JobSubmitResponse(
+        job_id=job.id,
+        status=job.status,
+        status_url=f"/api/jobs/{job.id}",
+        events_url=f"/api/jobs/{job.id}/events"
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str) -> JobStatusResponse:
+    """
+    Consulter l'état d'un job d'analyse
+
+    Args:
+        job_id: Identifiant du job
+
+    Returns:
+        Statut, étapes franchies et résultat (si terminé)
+
+    Raises:
+        HTTPException: Si le job est inconnu ou expiré
+    """
+    job = await run_in_threadpool(get_job_store().get, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Job introuvable ou expiré"
+        )
+    return JobStatusResponse(**job.to_dict())
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Suivre un job d'analyse en direct (server-sent events)
+
+    Chaque événement est émis avec son type (`status` ou `stage`) et son
+    contenu JSON ; le flux se termine quand le job réussit ou échoue.
+
+    Args:
+        job_id: Identifiant du job
+
+    Returns:
+        Flux text/event-stream
+
+    Raises:
+        HTTPException: Si le job est inconnu ou expiré
+    """
+    store = get_job_store()
+    if await run_in_threadpool(store.get, job_id) is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Job introuvable ou expiré"
+        )
+
+    async def event_stream():
+        async for event in store.events(job_id):
+            if event is None:
+                # Battement de cœur : garde la connexion ouverte derrière les proxies
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @router.get("/biomarkers")
 async def get_biomarkers(db: Session = Depends(get_db)):
     """
@@ -230,17 +716,59 @@ async def get_biomarkers(db: Session = Depends(get_db)):
         )
 
 
+@router.post("/biomarkers/refresh")
+async def refresh_biomarkers_catalog(
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_current_superuser_dep),
+):
+    """
+    Recharger le catalogue de référence en mémoire depuis la base de données
+
+    À appeler après une modification de la table `biomarkers` pour que
+    les analyses utilisent les nouvelles plages sans redémarrage. Réservé
+    aux administrateurs ; des demandes simultanées partagent un seul
+    rechargement.
+
+    Args:
+        db: Session de base de données
+        admin: Administrateur authentifié
+
+    Returns:
+        Version et taille du nouveau catalogue
+    """
+    try:
+        catalog = await run_in_threadpool(refresh_biomarker_catalog, db)
+
+        return {
+            "status": "success",
+            "version": catalog.version,
+            "count": len(catalog),
+            "loaded_at": catalog.loaded_at.isoformat()
+        }
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors du rechargement du catalogue : {str(e)}"
+        )
+
+
 @router.post("/export-pdf")
 async def export_pdf(
     data: AnalyzeResponse,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """
     Générer et télécharger un rapport PDF des résultats d'analyse
     
+    Avec un en-tête Idempotency-Key, une relance avec les mêmes résultats
+    rejoue le PDF déjà généré.
+
     Args:
         data: Résultats de l'analyse (AnalyzeResponse)
         db: Session de base de données
+        idempotency_key: Clé d'idempotence fournie par le client (optionnelle)
         
     Returns:
         Fichier PDF téléchargeable
@@ -266,6 +794,20 @@ async def export_pdf(
             "summary": data.summary
         }
         
+        if idempotency_key is not None:
+            async def produce() -> StoredResponse:
+                pdf_buffer = await run_in_threadpool(generate_pdf_report, results_dict)
+                filename = f"gula_analyse_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+                return StoredResponse(
+                    status_code=200,
+                    body=pdf_buffer.getvalue(),
+                    media_type="application/pdf",
+                    headers={"Content-Disposition": f"attachment; filename={filename}"}
+                )
+
+            fingerprint = hashlib.sha256(data.model_dump_json().encode("utf-8")).hexdigest()
+            return await get_idempotency_store().run("export-pdf", idempotency_key, fingerprint, produce)
+
         # Générer le PDF
         pdf_buffer = generate_pdf_report(results_dict)
         
@@ -281,9 +823,42 @@ async def export_pdf(
             }
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Erreur lors de la génération du PDF : {str(e)}"
         )
 
+
+@router.get("/metrics")
+async def get_metrics(admin: User = Depends(get_current_superuser_dep)):
+    """
+    Compteurs internes du service (observabilité)
+
+    Réservé aux administrateurs : les statistiques exposent l'empreinte et
+    le quota des clés API, l'état des disjoncteurs et la configuration.
+
+    Args:
+        admin: Administrateur authentifié
+
+    Returns:
+        Statistiques par composant
+    """
+    # La file persistante agrège ses compteurs en base : hors boucle
+    jobs = await run_in_threadpool(get_job_store().stats)
+    return {
+        "status": "success",
+        "extraction_cache": get_extraction_cache().stats(),
+        "gemini_calls": get_gemini_executor().stats(),
+        "gemini_resilience": get_gemini_resilience().stats(),
+        "gemini_keys": get_api_key_pool().stats(),
+        "prompt_cache": get_prompt_context_cache().stats(),
+        "gemini_cassettes": get_cassette_store().stats(),
+        "model_routing": get_model_router().stats(),
+        "extraction_backend": get_extractor_stats(),
+        "pdf_extraction": get_pdf_extraction_pipeline().stats(),
+        "jobs": jobs,
+        "idempotency": get_idempotency_store().stats()
+    }
@@ -2,6 +2,7 @@
 Configuration de l'application
 """
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv, dotenv_values
 
@@ -76,3 +77,118 @@ if GEMINI_API_KEY:
 else:
     print("[CONFIG] ⚠️ GEMINI_API_KEY est None ou vide!")
 
+# Pool de clés API : GEMINI_API_KEY puis les clés de GEMINI_API_KEYS (séparées par des virgules)
+GEMINI_API_KEYS = list(dict.fromkeys(
+    key.strip() for key in [GEMINI_API_KEY or "", *os.getenv("GEMINI_API_KEYS", "").split(",")] if key.strip()
+))
+if len(GEMINI_API_KEYS) > 1:
+    print(f"[CONFIG] Pool de {len(GEMINI_API_KEYS)} clés Gemini")
+GEMINI_KEY_RPM = int(os.getenv("GEMINI_KEY_RPM", 0))  # requêtes/minute par clé et par modèle (0 = illimité)
+GEMINI_KEY_TPM = int(os.getenv("GEMINI_KEY_TPM", 0))  # jetons/minute par clé et par modèle (0 = illimité)
+GEMINI_KEY_EJECT_SECONDS = float(os.getenv("GEMINI_KEY_EJECT_SECONDS", 60))  # après un 429, doublé à chaque récidive
+GEMINI_KEY_EJECT_MAX_SECONDS = float(os.getenv("GEMINI_KEY_EJECT_MAX_SECONDS", 600))
+
+
+# Cache des extractions Gemini (clé : SHA-256 du PDF + modèle + version du prompt)
+EXTRACTION_CACHE_SIZE = int(os.getenv("EXTRACTION_CACHE_SIZE", 256))  # entrées en mémoire
+EXTRACTION_CACHE_TTL = int(os.getenv("EXTRACTION_CACHE_TTL", 7 * 24 * 3600))  # 7 jours
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR") or None  # niveau disque désactivé si vide
+EXTRACTION_CACHE_MAX_DISK_MB = int(os.getenv("EXTRACTION_CACHE_MAX_DISK_MB", 100))
+
+# Appels Gemini : exécutés hors de la boucle d'événements, concurrence bornée
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", 4))  # appels simultanés
+GEMINI_MAX_QUEUE = int(os.getenv("GEMINI_MAX_QUEUE", 32))  # appels en attente au-delà -> 503
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", 60))  # attente + appel -> 504
+
+# Résilience des appels Gemini : relances, duplicata au p95, budget global, disjoncteur
+GEMINI_RETRY_MAX_ATTEMPTS = int(os.getenv("GEMINI_RETRY_MAX_ATTEMPTS", 3))
+GEMINI_RETRY_BACKOFF = float(os.getenv("GEMINI_RETRY_BACKOFF", 0.5))  # délai avant la 1re relance (s), doublé ensuite
+GEMINI_RETRY_BACKOFF_MAX = float(os.getenv("GEMINI_RETRY_BACKOFF_MAX", 8))
+GEMINI_DEADLINE_SECONDS = float(os.getenv("GEMINI_DEADLINE_SECONDS", 55))  # toutes tentatives comprises (< timeout du frontend)
+GEMINI_HEDGE_PERCENTILE = float(os.getenv("GEMINI_HEDGE_PERCENTILE", 0.95))  # 0 = pas de duplicata
+GEMINI_HEDGE_MIN_DELAY = float(os.getenv("GEMINI_HEDGE_MIN_DELAY", 2))  # s
+GEMINI_HEDGE_INITIAL_DELAY = float(os.getenv("GEMINI_HEDGE_INITIAL_DELAY", 20))  # s, avant assez de mesures
+GEMINI_BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", 5))  # échecs consécutifs (0 = désactivé)
+GEMINI_BREAKER_RESET_SECONDS = float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", 30))
+
+# Extraction locale depuis la couche texte du PDF (avant tout appel Gemini)
+LOCAL_EXTRACTION_ENABLED = os.getenv("LOCAL_EXTRACTION_ENABLED", "True").lower() == "true"
+LOCAL_EXTRACTION_MIN_MARKERS = int(os.getenv("LOCAL_EXTRACTION_MIN_MARKERS", 3))
+LOCAL_EXTRACTION_MIN_COVERAGE = float(os.getenv("LOCAL_EXTRACTION_MIN_COVERAGE", 0.8))
+
+# Moteur d'extraction de repli : "gemini", "local" (couche texte seule, sans
+# réseau) ou "stub" (réponses simulées, pour les tests de charge hors ligne ;
+# jamais servies par le cache des extractions)
+EXTRACTION_BACKEND = os.getenv("EXTRACTION_BACKEND", "gemini").lower()
+STUB_FIXTURES_FILE = os.getenv("STUB_FIXTURES_FILE") or None  # JSON {sha256: {biomarqueur: valeur}, "*": défaut}
+STUB_LATENCY = os.getenv("STUB_LATENCY", "lognormal:1500,0.4")  # fixed:MS | uniform:MIN,MAX | lognormal:MEDIANE,SIGMA
+STUB_ERROR_RATE = float(os.getenv("STUB_ERROR_RATE", 0))  # part des appels en échec (503)
+STUB_SEED = int(os.getenv("STUB_SEED")) if os.getenv("STUB_SEED") else None
+
+# Contenu envoyé à Gemini : "auto" = couche texte des pages de résultats si
+# elle existe (PDF complet sinon), "pdf" = toujours le PDF complet
+GEMINI_INPUT_MODE = os.getenv("GEMINI_INPUT_MODE", "auto").lower()
+GEMINI_TEXT_MIN_CHARS = int(os.getenv("GEMINI_TEXT_MIN_CHARS", 200))  # en dessous : PDF image
+
+# Sortie JSON contrainte par un schéma (response_schema) plutôt que du texte libre
+GEMINI_STRUCTURED_OUTPUT = os.getenv("GEMINI_STRUCTURED_OUTPUT", "True").lower() == "true"
+
+# Prompt d'extraction enregistré comme contexte en cache côté Gemini : activé
+# seulement si le prompt atteint le minimum de jetons du modèle (vérifié au démarrage)
+GEMINI_CONTEXT_CACHE = os.getenv("GEMINI_CONTEXT_CACHE", "False").lower() == "true"
+GEMINI_CONTEXT_CACHE_TTL = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", 3600))  # durée de vie côté Gemini (s)
+GEMINI_CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("GEMINI_CONTEXT_CACHE_MIN_TOKENS", 4096))  # minimum CachedContent
+
+# Enregistrement / rejeu des échanges avec Gemini (cassettes) : "off", "record" ou "replay"
+GEMINI_CASSETTE_MODE = os.getenv("GEMINI_CASSETTE_MODE", "off").lower()
+GEMINI_CASSETTE_DIR = os.getenv("GEMINI_CASSETTE_DIR") or str(Path(__file__).resolve().parent.parent / "cassettes")
+GEMINI_CASSETTE_TIME_SCALE = float(os.getenv("GEMINI_CASSETTE_TIME_SCALE", 1.0))  # latences rejouées (0 = immédiat)
+
+# Jobs d'analyse asynchrones (POST /api/analyze-pdf/jobs)
+JOBS_MAX_WORKERS = int(os.getenv("JOBS_MAX_WORKERS", 2))  # analyses simultanées
+JOBS_MAX_PENDING = int(os.getenv("JOBS_MAX_PENDING", 100))  # jobs en attente ou en cours
+JOBS_RESULT_TTL = int(os.getenv("JOBS_RESULT_TTL", 3600))  # conservation des jobs terminés (s)
+JOBS_MAX_RETAINED = int(os.getenv("JOBS_MAX_RETAINED", 1000))  # jobs terminés conservés au maximum
+
+# Stockage des jobs : "memory" (pool de workers dans le processus API) ou
+# "database" (table analysis_jobs, consommée par `python -m app.worker`)
+JOBS_BACKEND = os.getenv("JOBS_BACKEND", "memory").lower()
+JOBS_VISIBILITY_TIMEOUT = int(os.getenv("JOBS_VISIBILITY_TIMEOUT", 300))  # > GEMINI_TIMEOUT_SECONDS
+JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", 3))  # au-delà : dead-letter
+JOBS_RETRY_BACKOFF = float(os.getenv("JOBS_RETRY_BACKOFF", 5))  # délai avant la 1re relance (s), doublé ensuite
+JOBS_RETRY_BACKOFF_MAX = float(os.getenv("JOBS_RETRY_BACKOFF_MAX", 300))
+JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", 1.0))  # attente d'un worker sans job (s)
+
+# En-tête Idempotency-Key (POST /api/analyze-pdf et /api/export-pdf)
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", 24 * 3600))  # conservation des réponses (s)
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", 1000))
+IDEMPOTENCY_MAX_MB = int(os.getenv("IDEMPOTENCY_MAX_MB", 64))  # taille cumulée des réponses conservées
+
+# Upload des PDF : lecture en flux, refus (413) dès que la taille maximale est dépassée
+UPLOAD_MAX_MB = int(os.getenv("UPLOAD_MAX_MB", 10))
+UPLOAD_SPOOL_THRESHOLD_KB = int(os.getenv("UPLOAD_SPOOL_THRESHOLD_KB", 1024))  # au-delà : fichier temporaire sur disque
+BILAN_MAX_FILES = int(os.getenv("BILAN_MAX_FILES", 10))  # PDF d'un même bilan (POST /api/analyze-pdfs)
+
+# Modèle Gemini : résolu au démarrage (jamais pendant une requête) et mémorisé
+GEMINI_MODEL = os.getenv("GEMINI_MODEL") or None  # modèle imposé : aucun listing
+GEMINI_MODEL_CACHE_FILE = os.getenv("GEMINI_MODEL_CACHE_FILE") or os.path.join(
+    tempfile.gettempdir(), "gula_gemini_model.json"
+)
+GEMINI_MODEL_CACHE_TTL = int(os.getenv("GEMINI_MODEL_CACHE_TTL", 24 * 3600))  # au-delà : nouveau listing
+
+# Routage des extractions : petits textes vers un modèle rapide, escalade vers
+# le modèle principal si le premier passage échoue ou couvre trop peu le document.
+# Désactivé tant que GEMINI_FAST_MODEL n'est pas défini (modèle à choisir parmi
+# ceux proposés à la clé, voir model_selection)
+GEMINI_ROUTING_ENABLED = os.getenv("GEMINI_ROUTING_ENABLED", "True").lower() == "true"
+GEMINI_FAST_MODEL = os.getenv("GEMINI_FAST_MODEL") or None
+GEMINI_ROUTING_MAX_TEXT_KB = int(os.getenv("GEMINI_ROUTING_MAX_TEXT_KB", 16))  # au-delà : modèle principal
+GEMINI_ROUTING_MIN_MARKERS = int(os.getenv("GEMINI_ROUTING_MIN_MARKERS", 3))
+GEMINI_ROUTING_MIN_COVERAGE = float(os.getenv("GEMINI_ROUTING_MIN_COVERAGE", 0.6))  # biomarqueurs / lignes détectées
+
+# Photos de bilans (POST /api/analyze-images) : réduites, en niveaux de gris et
+# recadrées sur la feuille avant l'envoi à Gemini
+IMAGE_UPLOAD_MAX_MB = int(os.getenv("IMAGE_UPLOAD_MAX_MB", 15))  # par photo
+IMAGE_MAX_FILES = int(os.getenv("IMAGE_MAX_FILES", 10))  # pages par bilan
+IMAGE_MAX_SIDE = int(os.getenv("IMAGE_MAX_SIDE", 1600))  # plus grand côté après réduction (px)
+IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", 70))
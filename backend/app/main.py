@@ -13,6 +13,8 @@ from app.database.connection import engine, SessionLocal
 from app.models import base
 from app.database.seed import seed_biomarkers
 from app.database.migrations import run_migrations
+from app.services.biomarker_catalog import refresh_biomarker_catalog
+from app.services.extractors import init_biomarker_extractor
 
 # Créer les tables au démarrage
 base.Base.metadata.create_all(bind=engine)
@@ -20,10 +22,11 @@ base.Base.metadata.create_all(bind=engine)
 # Exécuter les migrations pour mettre à jour le schéma si nécessaire
 run_migrations()
 
-# Initialiser les données de référence
+# Initialiser les données de référence puis compiler le catalogue en mémoire
 db = SessionLocal()
 try:
     seed_biomarkers(db)
+    refresh_biomarker_catalog(db)
 finally:
     db.close()
 
@@ -50,11 +53,37 @@ app.add_middleware(
         "DNT",
         "Cache-Control",
         "X-Requested-With",
+        "Idempotency-Key",
+    ],
+    expose_headers=[
+        "Content-Length",
+        "Content-Range",
+        "X-Extraction-Source",
+        "X-Extraction-Input",
+        "X-Extraction-Input-Bytes",
+        "X-Extraction-Latency-Ms",
+        "X-Extraction-Coalesced",
+        "X-Extraction-Prompt-Version",
+        "X-Extraction-Model",
+        "X-Extraction-Escalated",
+        "X-Bilan-Files",
+        "X-Bilan-Skipped",
+        "X-Bilan-Conflicts",
+        "X-Bilan-Latency-Ms",
+        "X-Bilan-Slowest-Ms",
+        "Retry-After",
+        "Idempotent-Replayed",
     ],
-    expose_headers=["Content-Length", "Content-Range"],
     max_age=600,
 )
 
+
+@app.on_event("startup")
+async def warm_up_extractor():
+    """Préparer le moteur d'extraction au démarrage (modèle Gemini choisi avant la première requête)"""
+    init_biomarker_extractor()
+
+
 # Inclure les routes
 app.include_router(router, prefix="/api")
 app.include_router(custom_auth_router, prefix="/auth", tags=["auth"])
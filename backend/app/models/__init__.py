@@ -3,5 +3,6 @@ Module pour les modèles de données
 """
 from app.models.base import Base, Biomarker, BloodTestResult
 from app.models.auth import User, OAuthAccount
+from app.models.jobs import AnalysisJobRecord
 
-__all__ = ["Base", "Biomarker", "BloodTestResult", "User", "OAuthAccount"]
+__all__ = ["Base", "Biomarker", "BloodTestResult", "User", "OAuthAccount", "AnalysisJobRecord"]
@@ -0,0 +1,44 @@
+"""
+Modèle SQLAlchemy de la file de jobs d'analyse (consommée par `python -m app.worker`)
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, Text, JSON, Index
+from app.models.base import Base
+
+
+class AnalysisJobRecord(Base):
+    """
+    Job d'analyse persistant
+
+    Un job "queued" devient disponible à `available_at` ; un worker le
+    réserve ("running") jusqu'à `locked_until` (délai de visibilité). Passé
+    ce délai sans fin de traitement, il peut être repris par un autre worker.
+    """
+    __tablename__ = "analysis_jobs"
+
+    id = Column(String(32), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, succeeded, failed, dead
+    stage = Column(String(50), nullable=True)  # dernière étape franchie
+    payload = Column(LargeBinary, nullable=True)  # contenu à traiter, effacé à la fin du job
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = Column(String(100), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    events = Column(JSON, nullable=False, default=list)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    error_status = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Recherche des jobs à réserver par les workers
+        Index("ix_analysis_jobs_status_available", "status", "available_at"),
+    )
+
+    def __repr__(self):
+        return f"<AnalysisJobRecord(id='{self.id}', status='{self.status}', attempts={self.attempts})>"
@@ -76,6 +76,87 @@ class AnalyzeResponse(BaseModel):
         }
 
 
+# ============= Schémas pour l'analyse par lot =============
+
+class BatchAnalyzeItem(BaseModel):
+    """Schéma pour un bilan d'un lot, identifié par l'appelant"""
+    id: str = Field(..., description="Identifiant du bilan fourni par l'appelant")
+    # Validé individuellement comme un AnalyzeRequest, pour qu'un bilan
+    # invalide ne fasse pas échouer tout le lot
+    biomarkers: Dict[str, Any] = Field(..., description="Dictionnaire des biomarqueurs et leurs valeurs")
+
+
+class BatchAnalyzeRequest(BaseModel):
+    """Schéma pour la requête d'analyse par lot"""
+    items: List[BatchAnalyzeItem] = Field(..., description="Liste des bilans à analyser")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {"id": "bilan-001", "biomarkers": {"hemoglobine": 13.2, "vitamine_d": 18}},
+                    {"id": "bilan-002", "biomarkers": {"glucose": 0.95}}
+                ]
+            }
+        }
+
+
+class BatchAnalyzeItemResult(BaseModel):
+    """Schéma pour le résultat d'un bilan du lot"""
+    id: str = Field(..., description="Identifiant du bilan fourni par l'appelant")
+    status: str = Field(..., description="Statut du bilan: success ou error")
+    result: Optional[AnalyzeResponse] = Field(None, description="Résultat de l'analyse si succès")
+    error: Optional[str] = Field(None, description="Message d'erreur si échec")
+
+
+class BatchAnalyzeResponse(BaseModel):
+    """Schéma pour la réponse d'analyse par lot"""
+    status: str = Field(..., description="Statut de la réponse")
+    message: str = Field(..., description="Message descriptif")
+    catalog_version: str = Field(..., description="Version du catalogue de référence utilisé")
+    succeeded: int = Field(..., description="Nombre de bilans analysés avec succès")
+    failed: int = Field(..., description="Nombre de bilans en erreur")
+    results: List[BatchAnalyzeItemResult] = Field(..., description="Résultats par bilan, dans l'ordre de la requête")
+
+
+# ============= Schémas pour les jobs d'analyse asynchrones =============
+
+class JobEvent(BaseModel):
+    """Schéma pour un événement de job (changement de statut ou étape franchie)"""
+    seq: int = Field(..., description="Numéro d'ordre de l'événement")
+    type: str = Field(..., description="Type d'événement: status ou stage")
+    at: datetime = Field(..., description="Date de l'événement")
+    status: Optional[str] = Field(None, description="Nouveau statut: queued, running, succeeded, failed, dead")
+    stage: Optional[str] = Field(None, description="Étape franchie: validated, extracted, analyzed")
+    detail: Optional[Dict[str, Any]] = Field(None, description="Détails de l'étape")
+    error: Optional[str] = Field(None, description="Message d'erreur si échec")
+    error_status: Optional[int] = Field(None, description="Code HTTP équivalent de l'erreur")
+    attempt: Optional[int] = Field(None, description="Numéro de tentative (file persistante)")
+    retry_in_seconds: Optional[float] = Field(None, description="Délai avant nouvelle tentative")
+
+
+class JobSubmitResponse(BaseModel):
+    """Schéma pour la réponse de soumission d'un job"""
+    job_id: str = Field(..., description="Identifiant du job")
+    status: str = Field(..., description="Statut du job")
+    status_url: str = Field(..., description="URL de consultation du job")
+    events_url: str = Field(..., description="URL du flux d'événements (SSE)")
+
+
+class JobStatusResponse(BaseModel):
+    """Schéma pour l'état d'un job"""
+    job_id: str = Field(..., description="Identifiant du job")
+    status: str = Field(..., description="Statut: queued, running, succeeded, failed, dead")
+    stage: Optional[str] = Field(None, description="Dernière étape franchie")
+    created_at: datetime = Field(..., description="Date de soumission")
+    updated_at: datetime = Field(..., description="Date du dernier événement")
+    finished_at: Optional[datetime] = Field(None, description="Date de fin")
+    events: List[JobEvent] = Field(..., description="Historique des événements")
+    result: Optional[AnalyzeResponse] = Field(None, description="Résultat de l'analyse si succès")
+    error: Optional[str] = Field(None, description="Message d'erreur si échec")
+    error_status: Optional[int] = Field(None, description="Code HTTP équivalent de l'erreur")
+
+
 # ============= Schémas pour le profil utilisateur =============
 
 class UserProfileBase(BaseModel):
@@ -1,17 +1,25 @@
 """
 Service d'analyse des biomarqueurs
 """
-from typing import Dict, List, Tuple
-from sqlalchemy.orm import Session
-from app.models.base import Biomarker
+from typing import Dict, List, Optional, Sequence, Tuple
 from app.models.schemas import BiomarkerAnalysis
+from app.services.biomarker_catalog import (
+    BiomarkerCatalog,
+    BiomarkerReference,
+    get_biomarker_catalog,
+)
+from app.services.vectorized_analyzer import STATUS_LABELS, get_status_engine
 
 
 class BiomarkerAnalyzer:
     """Classe pour analyser les biomarqueurs"""
     
-    def __init__(self, db: Session):
-        self.db = db
+    def __init__(self, catalog: Optional[BiomarkerCatalog] = None):
+        """
+        Args:
+            catalog: Catalogue de référence (si None, utilise le catalogue partagé)
+        """
+        self.catalog = catalog if catalog is not None else get_biomarker_catalog()
     
     def analyze(self, biomarkers_data: Dict[str, float]) -> Tuple[List[BiomarkerAnalysis], Dict[str, int]]:
         """
@@ -29,16 +37,11 @@ class BiomarkerAnalyzer:
         summary = {"normal": 0, "bas": 0, "haut": 0, "inconnu": 0}
         
         for biomarker_name, value in biomarkers_data.items():
-            # Normaliser le nom (minuscules, espaces en underscores)
-            normalized_name = biomarker_name.lower().strip().replace(" ", "_")
-            
-            # Rechercher le biomarqueur dans la base
-            biomarker_ref = self.db.query(Biomarker).filter(
-                Biomarker.name == normalized_name
-            ).first()
+            # Rechercher le biomarqueur dans le catalogue (nom normalisé)
+            biomarker_ref = self.catalog.lookup(biomarker_name)
             
             if not biomarker_ref:
-                # Biomarqueur non trouvé dans la base
+                # Biomarqueur non trouvé dans le catalogue
                 results.append(self._create_unknown_analysis(biomarker_name, value))
                 summary["inconnu"] += 1
                 continue
@@ -46,26 +49,79 @@ class BiomarkerAnalyzer:
             # Déterminer le statut
             status = self._determine_status(value, biomarker_ref.min_value, biomarker_ref.max_value)
             
-            # Choisir le conseil approprié
-            advice = self._get_advice(status, biomarker_ref)
-            
-            # Créer l'analyse
-            analysis = BiomarkerAnalysis(
-                biomarker=biomarker_ref.display_name,
-                value=value,
-                unit=biomarker_ref.unit,
-                status=status,
-                min_value=biomarker_ref.min_value,
-                max_value=biomarker_ref.max_value,
-                explanation=biomarker_ref.explanation,
-                advice=advice
-            )
-            
-            results.append(analysis)
+            results.append(self._create_analysis(biomarker_ref, value, status))
             summary[status] += 1
         
         return results, summary
     
+    def analyze_batch(
+        self, bilans: Sequence[Dict[str, float]]
+    ) -> List[Tuple[List[BiomarkerAnalysis], Dict[str, int]]]:
+        """
+        Analyser plusieurs bilans en une passe vectorisée
+
+        Les statuts de toutes les valeurs du lot sont calculés en une seule
+        fois par le moteur NumPy ; les résultats sont identiques à ceux
+        d'appels successifs à `analyze`.
+
+        Args:
+            bilans: Liste de dictionnaires {nom_biomarqueur: valeur}
+
+        Returns:
+            Liste de tuples (analyses, résumé), dans l'ordre des bilans
+        """
+        engine = get_status_engine(self.catalog)
+        values, columns, rows = engine.encode(bilans)
+        codes = engine.classify(values, columns)
+
+        outputs = []
+        position = 0
+        for bilan in bilans:
+            results = []
+            summary = {"normal": 0, "bas": 0, "haut": 0, "inconnu": 0}
+
+            for biomarker_name, value in bilan.items():
+                status = STATUS_LABELS[codes[position]]
+                column = columns[position]
+                position += 1
+
+                if column < 0:
+                    results.append(self._create_unknown_analysis(biomarker_name, value))
+                else:
+                    biomarker_ref = self.catalog.get(engine.names[column])
+                    results.append(self._create_analysis(biomarker_ref, value, status))
+                summary[status] += 1
+
+            outputs.append((results, summary))
+
+        return outputs
+
+    @classmethod
+    def _create_analysis(
+        cls, biomarker_ref: BiomarkerReference, value: float, status: str
+    ) -> BiomarkerAnalysis:
+        """
+        Créer l'analyse d'un biomarqueur connu
+
+        Args:
+            biomarker_ref: Référence du biomarqueur dans le catalogue
+            value: Valeur mesurée
+            status: Statut déterminé ("bas", "normal" ou "haut")
+
+        Returns:
+            BiomarkerAnalysis avec plages, explication et conseil
+        """
+        return BiomarkerAnalysis(
+            biomarker=biomarker_ref.display_name,
+            value=value,
+            unit=biomarker_ref.unit,
+            status=status,
+            min_value=biomarker_ref.min_value,
+            max_value=biomarker_ref.max_value,
+            explanation=biomarker_ref.explanation,
+            advice=cls._get_advice(status, biomarker_ref)
+        )
+
     @staticmethod
     def _determine_status(value: float, min_value: float, max_value: float) -> str:
         """
@@ -87,13 +143,13 @@ class BiomarkerAnalyzer:
             return "normal"
     
     @staticmethod
-    def _get_advice(status: str, biomarker: Biomarker) -> str:
+    def _get_advice(status: str, biomarker: BiomarkerReference) -> str:
         """
         Récupérer le conseil approprié selon le statut
         
         Args:
             status: Statut du biomarqueur
-            biomarker: Objet Biomarker de référence
+            biomarker: Référence du biomarqueur dans le catalogue
             
         Returns:
             Conseil personnalisé
@@ -0,0 +1,208 @@
+"""
+Catalogue de référence des biomarqueurs compilé en mémoire
+
+Le catalogue est chargé une seule fois par processus depuis la table
+`biomarkers`, puis partagé en lecture seule par toutes les requêtes :
+l'analyse d'un bilan ne fait alors plus aucune requête SQL.
+"""
+import hashlib
+import threading
+from dataclasses import dataclass, fields
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional
+
+from sqlalchemy.orm import Session
+
+from app.database.connection import SessionLocal
+from app.models.base import Biomarker
+from app.database.seed import BIOMARKER_ALIASES
+from app.services.name_resolver import BiomarkerNameResolver, NameResolution
+
+
+def normalize_biomarker_name(name: str) -> str:
+    """
+    Normaliser un nom de biomarqueur (minuscules, espaces en underscores)
+
+    Args:
+        name: Nom brut du biomarqueur
+
+    Returns:
+        Nom normalisé, tel que stocké dans la colonne `biomarkers.name`
+    """
+    return name.lower().strip().replace(" ", "_")
+
+
+@dataclass(frozen=True)
+class BiomarkerReference:
+    """Valeurs de référence d'un biomarqueur (copie immuable d'une ligne `biomarkers`)"""
+    name: str
+    display_name: str
+    unit: str
+    min_value: float
+    max_value: float
+    explanation: str
+    description: Optional[str] = None
+    category: Optional[str] = None
+    advice_low: Optional[str] = None
+    advice_high: Optional[str] = None
+    advice_normal: Optional[str] = None
+
+    @classmethod
+    def from_model(cls, biomarker: Biomarker) -> "BiomarkerReference":
+        """Construire une référence à partir d'un objet SQLAlchemy Biomarker"""
+        return cls(**{f.name: getattr(biomarker, f.name) for f in fields(cls)})
+
+
+class BiomarkerCatalog:
+    """
+    Catalogue immuable des biomarqueurs de référence (nom → plages, unité, textes)
+
+    Chaque instance porte un tampon de version calculé à partir de son contenu :
+    deux catalogues chargés depuis les mêmes données ont la même version.
+    Les noms bruts sont résolus par un index de noms (synonymes, accents,
+    recherche approchée) compilé avec le catalogue.
+    """
+
+    def __init__(self, references: Iterable[BiomarkerReference], loaded_at: Optional[datetime] = None):
+        by_name = {ref.name: ref for ref in references}
+        self._by_name: Mapping[str, BiomarkerReference] = MappingProxyType(by_name)
+        self.loaded_at = loaded_at or datetime.utcnow()
+        self.version = self._compute_version(by_name.values())
+        self.resolver = BiomarkerNameResolver(
+            (ref.name, [ref.display_name] + BIOMARKER_ALIASES.get(ref.name, []))
+            for ref in by_name.values()
+        )
+
+    @classmethod
+    def from_session(cls, db: Session) -> "BiomarkerCatalog":
+        """
+        Charger le catalogue depuis la base de données
+
+        Args:
+            db: Session de base de données
+
+        Returns:
+            Catalogue compilé
+        """
+        return cls(BiomarkerReference.from_model(bm) for bm in db.query(Biomarker).all())
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "BiomarkerCatalog":
+        """
+        Construire le catalogue à partir de dictionnaires (ex: données du seed)
+
+        Args:
+            records: Dictionnaires ayant les champs de la table `biomarkers`
+
+        Returns:
+            Catalogue compilé
+        """
+        names = [f.name for f in fields(BiomarkerReference)]
+        return cls(
+            BiomarkerReference(**{name: record.get(name) for name in names})
+            for record in records
+        )
+
+    @staticmethod
+    def _compute_version(references: Iterable[BiomarkerReference]) -> str:
+        """Calculer un tampon de version stable à partir du contenu du catalogue"""
+        digest = hashlib.sha256()
+        for ref in sorted(references, key=lambda r: r.name):
+            digest.update(repr(tuple(getattr(ref, f.name) for f in fields(ref))).encode("utf-8"))
+        return digest.hexdigest()[:12]
+
+    def get(self, name: str) -> Optional[BiomarkerReference]:
+        """Récupérer une référence par son nom exact (déjà normalisé)"""
+        return self._by_name.get(name)
+
+    def resolve(self, raw_name: str) -> Optional[NameResolution]:
+        """Résoudre un nom brut (accents, synonymes, fautes) vers un nom du catalogue"""
+        return self.resolver.resolve(raw_name)
+
+    def lookup(self, raw_name: str) -> Optional[BiomarkerReference]:
+        """Récupérer une référence à partir d'un nom brut (résolu via l'index de noms)"""
+        reference = self._by_name.get(normalize_biomarker_name(raw_name))
+        if reference is not None:
+            return reference
+        resolution = self.resolver.resolve(raw_name)
+        if resolution is None:
+            return None
+        return self._by_name.get(resolution.canonical)
+
+    @property
+    def names(self) -> List[str]:
+        """Noms normalisés des biomarqueurs connus"""
+        return list(self._by_name.keys())
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._by_name
+
+    def __iter__(self) -> Iterator[BiomarkerReference]:
+        return iter(self._by_name.values())
+
+    def __repr__(self) -> str:
+        return f"<BiomarkerCatalog(version='{self.version}', size={len(self)})>"
+
+
+# Instance partagée du catalogue (chargée à la demande, une fois par processus)
+_catalog: Optional[BiomarkerCatalog] = None
+_catalog_lock = threading.RLock()
+_catalog_loads = 0  # rechargements terminés
+
+
+def refresh_biomarker_catalog(db: Optional[Session] = None) -> BiomarkerCatalog:
+    """
+    Recharger explicitement le catalogue depuis la base de données
+
+    Des appels simultanés partagent un seul rechargement : un appel qui a
+    attendu le verrou pendant un rechargement renvoie le catalogue obtenu.
+
+    Args:
+        db: Session à utiliser (si None, une session dédiée est ouverte puis fermée)
+
+    Returns:
+        Nouveau catalogue, désormais partagé par toutes les requêtes
+    """
+    global _catalog, _catalog_loads
+
+    loads_seen = _catalog_loads
+    with _catalog_lock:
+        if _catalog_loads != loads_seen and _catalog is not None:
+            return _catalog
+        if db is not None:
+            catalog = BiomarkerCatalog.from_session(db)
+        else:
+            session = SessionLocal()
+            try:
+                catalog = BiomarkerCatalog.from_session(session)
+            finally:
+                session.close()
+
+        # Un catalogue vide (base pas encore initialisée) n'est pas mémorisé :
+        # le prochain appel retentera le chargement.
+        if len(catalog) > 0:
+            _catalog = catalog
+            _catalog_loads += 1
+        print(f"[CATALOG] Catalogue chargé: {len(catalog)} biomarqueurs (version {catalog.version})")
+        return catalog
+
+
+def get_biomarker_catalog() -> BiomarkerCatalog:
+    """
+    Obtenir le catalogue partagé, en le chargeant au premier appel
+
+    Returns:
+        Catalogue des biomarqueurs de référence
+    """
+    catalog = _catalog
+    if catalog is not None:
+        return catalog
+    with _catalog_lock:
+        # Un autre thread a pu charger le catalogue pendant l'attente du verrou
+        if _catalog is not None:
+            return _catalog
+        return refresh_biomarker_catalog()
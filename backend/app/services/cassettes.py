@@ -0,0 +1,283 @@
+"""
+Enregistrement et rejeu des échanges avec Gemini (cassettes)
+
+Pour reproduire hors ligne le comportement réel du modèle (réponses et
+latences) :
+- GEMINI_CASSETTE_MODE=record : chaque appel réussi est enregistré dans
+  GEMINI_CASSETTE_DIR (un fichier JSON par requête : empreinte, texte de la
+  réponse, latence observée, jetons consommés) ;
+- GEMINI_CASSETTE_MODE=replay : les réponses enregistrées sont servies avec
+  leur latence d'origine, multipliée par GEMINI_CASSETTE_TIME_SCALE (0 =
+  immédiat), sans réseau ni clé API. Une requête sans enregistrement échoue.
+
+L'empreinte d'une requête couvre le modèle, la version du prompt, le format
+de sortie et le contenu envoyé : un changement de prompt ou de modèle
+demande un nouvel enregistrement.
+
+Le rejeu passe par le pool d'appels, les relances et la lecture de la
+réponse, comme un appel réel. Pour un test de charge, désactiver le cache
+des extractions (EXTRACTION_CACHE_SIZE=0) afin que chaque requête atteigne
+la cassette.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.config import (
+    GEMINI_CASSETTE_DIR,
+    GEMINI_CASSETTE_MODE,
+    GEMINI_CASSETTE_TIME_SCALE,
+    GEMINI_STRUCTURED_OUTPUT,
+)
+from app.services.extraction_prompt import PROMPT_ID
+from app.services.response_parser import BiomarkerStreamParser, parse_biomarkers
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+
+class CassetteMissError(LookupError):
+    """Aucun enregistrement pour la requête rejouée"""
+
+
+def _describe_part(part: Any) -> Dict[str, Any]:
+    """Partie du contenu envoyé, résumée (jamais le document lui-même)"""
+    if isinstance(part, dict):
+        data = part.get("data", b"")
+        return {
+            "mime_type": part.get("mime_type"),
+            "bytes": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+        }
+    text = str(part).encode("utf-8")
+    return {"text_chars": len(text), "sha256": hashlib.sha256(text).hexdigest()}
+
+
+def request_fingerprint(model_name: str, contents: List[Any]) -> str:
+    """
+    Empreinte d'une requête Gemini
+
+    Args:
+        model_name: Modèle appelé
+        contents: Parties du document (texte, {"mime_type", "data"})
+
+    Returns:
+        SHA-256 hexadécimal (nom du fichier de la cassette)
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{model_name}:{PROMPT_ID}:{int(GEMINI_STRUCTURED_OUTPUT)}".encode("utf-8"))
+    for part in contents:
+        described = _describe_part(part)
+        digest.update(f":{described.get('mime_type', 'text')}:{described['sha256']}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class CassetteStore:
+    """Répertoire de cassettes, en enregistrement ou en rejeu"""
+
+    def __init__(self, directory: str, mode: str = "off", time_scale: float = 1.0):
+        """
+        Args:
+            directory: Répertoire des cassettes
+            mode: "off", "record" ou "replay"
+            time_scale: Facteur appliqué aux latences rejouées (0 = immédiat)
+        """
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"GEMINI_CASSETTE_MODE inconnu: {mode!r} (attendu : {', '.join(CASSETTE_MODES)})")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.time_scale = time_scale
+        self._lock = threading.Lock()
+        self._loaded: Dict[str, Dict[str, Any]] = {}
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        if mode == "record":
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _path(self, fingerprint: str) -> Path:
+        return self.directory / f"{fingerprint}.json"
+
+    def record(
+        self,
+        model_name: str,
+        generate: Callable[..., Tuple[str, Optional[int]]],
+        model: Any,
+        contents: List[Any],
+        emit: Optional[Callable[[str, float], None]] = None,
+    ) -> Tuple[str, Optional[int]]:
+        """
+        Appeler Gemini et enregistrer l'échange (exécuté dans le pool dédié)
+
+        Args:
+            model_name: Modèle appelé
+            generate: Appel synchrone (GeminiService._generate)
+            model, contents, emit: Arguments de `generate`
+
+        Returns:
+            Résultat de `generate` : (texte de la réponse, jetons consommés)
+        """
+        started_at = time.perf_counter()
+        text, tokens = generate(model, contents, emit)
+        latency_ms = round((time.perf_counter() - started_at) * 1000, 1)
+
+        fingerprint = request_fingerprint(model_name, contents)
+        cassette = {
+            "fingerprint": fingerprint,
+            "model": model_name,
+            "prompt_version": PROMPT_ID,
+            "structured_output": GEMINI_STRUCTURED_OUTPUT,
+            "streamed": emit is not None,
+            "input": [_describe_part(part) for part in contents],
+            "response_text": text,
+            "biomarkers": parse_biomarkers(text),
+            "latency_ms": latency_ms,
+            "tokens": tokens,
+            "recorded_at": time.time(),
+        }
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(cassette, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self._path(fingerprint))
+        except OSError as e:
+            # L'enregistrement ne doit jamais faire échouer l'extraction
+            print(f"[CASSETTES] ⚠️ Enregistrement impossible: {e}")
+            return text, tokens
+        with self._lock:
+            self._loaded[fingerprint] = cassette
+            self.recorded += 1
+        print(f"[CASSETTES] Enregistré {fingerprint[:12]} ({model_name}, {latency_ms} ms)")
+        return text, tokens
+
+    def load(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Cassette d'une empreinte (lue une seule fois sur disque), ou None"""
+        with self._lock:
+            cassette = self._loaded.get(fingerprint)
+        if cassette is not None:
+            return cassette
+        try:
+            with open(self._path(fingerprint), "r", encoding="utf-8") as f:
+                cassette = json.load(f)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self._loaded[fingerprint] = cassette
+        return cassette
+
+    def replay(
+        self,
+        model_name: str,
+        contents: List[Any],
+        emit: Optional[Callable[[str, float], None]] = None,
+    ) -> Tuple[str, Optional[int]]:
+        """
+        Servir la réponse enregistrée d'une requête (exécuté dans le pool dédié)
+
+        Raises:
+            CassetteMissError: Si la requête n'a pas été enregistrée
+        """
+        fingerprint = request_fingerprint(model_name, contents)
+        cassette = self.load(fingerprint)
+        if cassette is None:
+            with self._lock:
+                self.misses += 1
+            raise CassetteMissError(
+                f"Aucun enregistrement pour cette requête ({model_name}, empreinte {fingerprint[:12]})"
+            )
+        return self.play(cassette, emit)
+
+    def play(
+        self, cassette: Dict[str, Any], emit: Optional[Callable[[str, float], None]] = None
+    ) -> Tuple[str, Optional[int]]:
+        """
+        Rejouer une cassette : latence enregistrée (× time_scale), puis réponse
+
+        Les biomarqueurs sont transmis à `emit` au fil de la latence rejouée,
+        comme lors d'une réponse en streaming.
+
+        Returns:
+            (texte de la réponse, jetons consommés)
+        """
+        text = cassette["response_text"]
+        delay = cassette.get("latency_ms", 0) / 1000 * self.time_scale
+        if emit is None:
+            time.sleep(delay)
+        else:
+            # Texte livré en quelques morceaux répartis sur la latence
+            chunks = max(1, min(8, len(text) // 64))
+            size = -(-len(text) // chunks)
+            parser = BiomarkerStreamParser()
+            for start in range(0, len(text), size):
+                time.sleep(delay / chunks)
+                for name, value in parser.feed(text[start:start + size]):
+                    emit(name, value)
+            for name, value in parser.close():
+                emit(name, value)
+        with self._lock:
+            self.replayed += 1
+        return text, cassette.get("tokens")
+
+    def cassettes(self) -> Iterator[Dict[str, Any]]:
+        """Toutes les cassettes du répertoire (ordre des noms de fichier)"""
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    yield json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[CASSETTES] ⚠️ Cassette {path.name} illisible: {e}")
+
+    def recorded_model(self) -> Optional[str]:
+        """Modèle le plus présent dans les cassettes (modèle principal d'un rejeu)"""
+        models = Counter(cassette.get("model") for cassette in self.cassettes())
+        models.pop(None, None)
+        return models.most_common(1)[0][0] if models else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "directory": str(self.directory),
+                "time_scale": self.time_scale,
+                "recorded": self.recorded,
+                "replayed": self.replayed,
+                "misses": self.misses,
+            }
+
+
+# Instance singleton
+_cassette_store: Optional[CassetteStore] = None
+_cassette_store_lock = threading.Lock()
+
+
+def get_cassette_store() -> CassetteStore:
+    """
+    Obtenir l'instance singleton des cassettes (configurée via app.config)
+
+    Returns:
+        Instance de CassetteStore
+    """
+    global _cassette_store
+
+    if _cassette_store is None:
+        with _cassette_store_lock:
+            if _cassette_store is None:
+                _cassette_store = CassetteStore(
+                    GEMINI_CASSETTE_DIR,
+                    mode=GEMINI_CASSETTE_MODE,
+                    time_scale=GEMINI_CASSETTE_TIME_SCALE,
+                )
+    return _cassette_store
@@ -0,0 +1,291 @@
+"""
+Exécution non bloquante d'appels synchrones avec concurrence bornée
+
+Les SDK synchrones (ex: `GenerativeModel.generate_content`) bloquent la
+boucle d'événements d'uvicorn s'ils sont appelés directement depuis une
+route `async`. `BoundedExecutor` les exécute dans un pool de threads dédié,
+limite le nombre d'appels simultanés, met les appels excédentaires en file
+d'attente (bornée) et applique un timeout par appel.
+
+`SingleFlight` regroupe les appels concurrents portant sur la même clé :
+un seul est exécuté, les autres attendent son résultat.
+"""
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+
+class QueueFullError(Exception):
+    """La file d'attente de l'exécuteur est pleine"""
+
+
+class CallTimeoutError(Exception):
+    """Un appel (attente comprise) a dépassé son délai"""
+
+
+def percentile(samples, fraction: float) -> float:
+    """Percentile simple (plus proche rang) d'un échantillon"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class BoundedExecutor:
+    """
+    Pool de threads dédié avec limite de concurrence, file d'attente et métriques
+
+    Un emplacement de concurrence reste occupé tant que le thread n'a pas
+    réellement terminé, y compris après un timeout : la limite reflète donc
+    la charge effective sur l'API appelée.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = 4,
+        max_queue: int = 32,
+        timeout_seconds: float = 60.0,
+        samples: int = 1000,
+    ):
+        """
+        Args:
+            name: Nom de l'exécuteur (préfixe des threads, logs)
+            max_concurrency: Nombre maximal d'appels simultanés
+            max_queue: Nombre maximal d'appels en attente d'un emplacement
+            timeout_seconds: Délai par défaut d'un appel, attente comprise
+            samples: Nombre de mesures conservées pour les percentiles
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=name)
+
+        self._lock = threading.Lock()
+        self._slots = max_concurrency
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.max_waiting_seen = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self._wait_times: Deque[float] = deque(maxlen=samples)
+        self._call_times: Deque[float] = deque(maxlen=samples)
+
+    async def _acquire(self, timeout: float):
+        """Obtenir un emplacement, en attendant dans la file si nécessaire"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._slots > 0:
+                self._slots -= 1
+                return
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise QueueFullError(
+                    f"File d'attente {self.name} pleine ({self.waiting} appels en attente)"
+                )
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            self.waiting += 1
+            self.max_waiting_seen = max(self.max_waiting_seen, self.waiting)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    self.waiting -= 1
+                    waiter.cancel()
+                elif waiter.done() and not waiter.cancelled():
+                    # L'emplacement a été attribué au moment du timeout : le rendre
+                    self._release_locked()
+                else:
+                    # Attribution en cours : _grant verra l'annulation et rendra l'emplacement
+                    waiter.cancel()
+            raise
+
+    def _release_locked(self):
+        """Rendre un emplacement au premier appel en attente (verrou déjà acquis)"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            self.waiting -= 1
+            if not waiter.done():
+                waiter.get_loop().call_soon_threadsafe(self._grant, waiter)
+                return
+        self._slots += 1
+
+    def _grant(self, waiter: asyncio.Future):
+        """Attribuer l'emplacement à un appel en attente (dans sa boucle)"""
+        if waiter.done():
+            with self._lock:
+                self._release_locked()
+        else:
+            waiter.set_result(None)
+
+    def _release(self, *_):
+        with self._lock:
+            self._release_locked()
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """
+        Exécuter `fn(*args, **kwargs)` dans le pool sans bloquer la boucle d'événements
+
+        Args:
+            fn: Fonction synchrone à exécuter
+            timeout: Délai maximal (attente + exécution), par défaut `timeout_seconds`
+
+        Returns:
+            Valeur retournée par `fn`
+
+        Raises:
+            QueueFullError: Si trop d'appels sont déjà en attente
+            CallTimeoutError: Si le délai est dépassé
+        """
+        timeout = self.timeout_seconds if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        enqueued_at = time.perf_counter()
+
+        try:
+            await self._acquire(timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise CallTimeoutError(f"Délai dépassé en file d'attente {self.name} ({timeout:g}s)")
+
+        started_at = time.perf_counter()
+        with self._lock:
+            self._wait_times.append(started_at - enqueued_at)
+            self.in_flight += 1
+
+        future = self._executor.submit(partial(fn, *args, **kwargs))
+        # L'emplacement n'est libéré qu'à la fin réelle du thread
+        future.add_done_callback(self._release)
+        try:
+            result = await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)),
+                max(0.0, deadline - time.monotonic()),
+            )
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise CallTimeoutError(f"Délai dépassé pour l'appel {self.name} ({timeout:g}s)")
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self._call_times.append(time.perf_counter() - started_at)
+
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Métriques : profondeur de file, temps d'attente, appels en cours"""
+        with self._lock:
+            wait_times = list(self._wait_times)
+            call_times = list(self._call_times)
+            return {
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "timeout_seconds": self.timeout_seconds,
+                "in_flight": self.in_flight,
+                "queue_depth": self.waiting,
+                "max_queue_depth_seen": self.max_waiting_seen,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+                "rejected": self.rejected,
+                "wait_ms_p50": round(percentile(wait_times, 0.5) * 1000, 1),
+                "wait_ms_p95": round(percentile(wait_times, 0.95) * 1000, 1),
+                "wait_ms_max": round(max(wait_times, default=0.0) * 1000, 1),
+                "call_ms_p50": round(percentile(call_times, 0.5) * 1000, 1),
+                "call_ms_p95": round(percentile(call_times, 0.95) * 1000, 1),
+            }
+
+
+class SingleFlight:
+    """
+    Regroupement des appels concurrents portant sur la même clé
+
+    Le premier appel pour une clé lance le travail ; les appels suivants,
+    tant que le premier n'est pas terminé, attendent le même résultat (ou la
+    même exception). Le travail s'exécute dans sa propre tâche : l'annulation
+    d'un appelant (client déconnecté) ne l'interrompt pas pour les autres.
+    Les appelants peuvent se trouver dans des boucles d'événements différentes.
+    """
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Nom du regroupement (logs)
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, concurrent.futures.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Exécuter `fn()` ou rejoindre l'exécution en cours pour `key`
+
+        Args:
+            key: Clé de regroupement (ex: empreinte SHA-256 du contenu)
+            fn: Fabrique de la coroutine à exécuter
+
+        Returns:
+            Tuple (résultat, True si l'appel a rejoint une exécution en cours)
+        """
+        with self._lock:
+            shared = self._in_flight.get(key)
+            joined = shared is not None
+            if joined:
+                self.coalesced += 1
+            else:
+                shared = concurrent.futures.Future()
+                self._in_flight[key] = shared
+                self.leaders += 1
+
+        if joined:
+            print(f"[SINGLE_FLIGHT] {self.name}: appel regroupé avec l'exécution en cours")
+        else:
+            task = asyncio.ensure_future(fn())
+            task.add_done_callback(partial(self._settle, key, shared))
+
+        result = await asyncio.shield(asyncio.wrap_future(shared))
+        return result, joined
+
+    def _settle(self, key: Hashable, shared: concurrent.futures.Future, task: asyncio.Future):
+        """Publier l'issue du travail et libérer la clé"""
+        with self._lock:
+            if self._in_flight.get(key) is shared:
+                del self._in_flight[key]
+        if task.cancelled():
+            shared.cancel()
+        elif task.exception() is not None:
+            shared.set_exception(task.exception())
+        else:
+            shared.set_result(task.result())
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs : exécutions lancées, appels regroupés, clés en cours"""
+        with self._lock:
+            return {
+                "in_flight": len(self._in_flight),
+                "executions": self.leaders,
+                "coalesced": self.coalesced,
+            }
@@ -0,0 +1,309 @@
+"""
+Cache des extractions de biomarqueurs, indexé par le contenu du PDF
+
+La clé combine le SHA-256 des octets du PDF, le nom du modèle et la version
+du prompt : un même PDF ré-uploadé ne déclenche pas de nouvel appel Gemini,
+mais un changement de modèle ou de prompt invalide naturellement le cache.
+
+Deux niveaux :
+- mémoire : LRU borné en nombre d'entrées ;
+- disque (optionnel) : un fichier JSON par entrée, borné en taille totale,
+  les plus anciens fichiers étant évincés en premier.
+Les deux niveaux appliquent la même durée de vie (TTL).
+
+Depuis la boucle d'événements, utiliser `aget` / `aset` : les lectures et
+écritures sur disque sont faites dans un thread. L'occupation du disque est
+suivie à chaque écriture ; le répertoire n'est parcouru pour l'éviction que
+toutes les DISK_EVICTION_INTERVAL écritures, ou dès que la taille maximale
+est dépassée.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import (
+    EXTRACTION_CACHE_DIR,
+    EXTRACTION_CACHE_MAX_DISK_MB,
+    EXTRACTION_CACHE_SIZE,
+    EXTRACTION_CACHE_TTL,
+)
+
+# Écritures sur disque entre deux parcours du répertoire (entrées expirées, taille)
+DISK_EVICTION_INTERVAL = 32
+
+
+def make_cache_key(
+    pdf_sha256: str, model_name: str, prompt_version: str, input_mode: str = "pdf"
+) -> str:
+    """
+    Construire la clé de cache d'une extraction
+
+    Args:
+        pdf_sha256: Empreinte SHA-256 (hexadécimale) des octets du PDF
+        model_name: Nom du modèle utilisé pour l'extraction
+        prompt_version: Version du prompt d'extraction
+        input_mode: Contenu envoyé au modèle ("pdf" ou "text")
+
+    Returns:
+        Clé hexadécimale utilisable comme nom de fichier
+    """
+    raw = f"{pdf_sha256}:{model_name}:{prompt_version}:{input_mode}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """Cache à deux niveaux (mémoire LRU + disque optionnel) des extractions"""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: int = 7 * 24 * 3600,
+        directory: Optional[str] = None,
+        max_disk_bytes: int = 100 * 1024 * 1024,
+    ):
+        """
+        Args:
+            max_entries: Nombre maximal d'entrées en mémoire
+            ttl_seconds: Durée de vie d'une entrée (mémoire et disque)
+            directory: Répertoire du cache disque (si None, pas de niveau disque)
+            max_disk_bytes: Taille maximale du cache disque
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self.directory = Path(directory) if directory else None
+
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Occupation du disque, mise à jour à chaque écriture (parcours complet à l'éviction)
+        self._disk_count = 0
+        self._disk_bytes = 0
+        self._writes_since_eviction = 0
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._enforce_disk_limit()
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return time.time() - stored_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[Dict[str, float]]:
+        """
+        Récupérer une extraction en cache
+
+        Args:
+            key: Clé construite par `make_cache_key`
+
+        Returns:
+            Copie du dictionnaire de biomarqueurs, ou None si absent/expiré
+        """
+        cached = self._get_memory(key)
+        if cached is not None:
+            return cached
+        return self._promote(key, self._read_disk(key))
+
+    async def aget(self, key: str) -> Optional[Dict[str, float]]:
+        """Comme `get`, depuis la boucle d'événements (lecture disque dans un thread)"""
+        cached = self._get_memory(key)
+        if cached is not None:
+            return cached
+        disk_entry = await asyncio.to_thread(self._read_disk, key) if self.directory is not None else None
+        return self._promote(key, disk_entry)
+
+    def _get_memory(self, key: str) -> Optional[Dict[str, float]]:
+        """Entrée du niveau mémoire (None si absente ou expirée, sans compter d'échec)"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, biomarkers = entry
+                if not self._is_expired(stored_at):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return dict(biomarkers)
+                del self._memory[key]
+        return None
+
+    def _promote(
+        self, key: str, disk_entry: Optional[Tuple[float, Dict[str, float]]]
+    ) -> Optional[Dict[str, float]]:
+        """Résultat de la lecture disque : échec, ou succès promu en mémoire"""
+        with self._lock:
+            if disk_entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            # Promotion dans le niveau mémoire
+            self._store_memory(key, *disk_entry)
+            return dict(disk_entry[1])
+
+    def set(self, key: str, biomarkers: Dict[str, float], metadata: Optional[Dict[str, Any]] = None):
+        """
+        Enregistrer une extraction
+
+        Args:
+            key: Clé construite par `make_cache_key`
+            biomarkers: Dictionnaire {nom_biomarqueur: valeur}
+            metadata: Informations complémentaires écrites sur disque (modèle, prompt...)
+        """
+        stored_at = time.time()
+        with self._lock:
+            self._store_memory(key, stored_at, dict(biomarkers))
+        self._write_disk(key, stored_at, biomarkers, metadata or {})
+
+    async def aset(self, key: str, biomarkers: Dict[str, float], metadata: Optional[Dict[str, Any]] = None):
+        """Comme `set`, depuis la boucle d'événements (écriture disque dans un thread)"""
+        stored_at = time.time()
+        with self._lock:
+            self._store_memory(key, stored_at, dict(biomarkers))
+        if self.directory is not None:
+            await asyncio.to_thread(self._write_disk, key, stored_at, biomarkers, metadata or {})
+
+    def _store_memory(self, key: str, stored_at: float, biomarkers: Dict[str, float]):
+        """Insérer dans le LRU mémoire (verrou déjà acquis)"""
+        self._memory[key] = (stored_at, biomarkers)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, Dict[str, float]]]:
+        """Lire une entrée du cache disque, en supprimant les entrées expirées"""
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            stored_at = float(payload["stored_at"])
+            if self._is_expired(stored_at):
+                path.unlink(missing_ok=True)
+                return None
+            return stored_at, {k: float(v) for k, v in payload["biomarkers"].items()}
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"[EXTRACTION_CACHE] ⚠️ Entrée illisible {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def _write_disk(self, key: str, stored_at: float, biomarkers: Dict[str, float], metadata: Dict[str, Any]):
+        """Écrire une entrée sur disque (écriture atomique), puis évincer si nécessaire"""
+        if self.directory is None:
+            return
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": stored_at, "biomarkers": biomarkers, **metadata}, f)
+                size = f.tell()
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"[EXTRACTION_CACHE] ⚠️ Écriture impossible de {path.name}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+        with self._lock:
+            self._disk_count += 1
+            self._disk_bytes += size
+            self._writes_since_eviction += 1
+            evict = (
+                self._writes_since_eviction >= DISK_EVICTION_INTERVAL
+                or self._disk_bytes > self.max_disk_bytes
+            )
+        if evict:
+            self._enforce_disk_limit()
+
+    def _disk_entries(self):
+        """Lister les fichiers du cache disque (chemin, taille, date de modification)"""
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _enforce_disk_limit(self):
+        """Supprimer les entrées expirées puis les plus anciennes au-delà de la taille max"""
+        entries = self._disk_entries()
+        now = time.time()
+        kept = []
+        for path, size, mtime in entries:
+            if now - mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+            else:
+                kept.append((path, size, mtime))
+
+        total = sum(size for _, size, _ in kept)
+        count = len(kept)
+        evicted = 0
+        for path, size, _ in sorted(kept, key=lambda e: e[2]):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            count -= 1
+            evicted += 1
+        with self._lock:
+            self.evictions += evicted
+            self._disk_count = count
+            self._disk_bytes = total
+            self._writes_since_eviction = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs du cache (succès par niveau, échecs, occupation)"""
+        with self._lock:
+            stats = {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
+            if self.directory is not None:
+                # Occupation suivie (exacte après chaque parcours du répertoire)
+                stats["disk_entries"] = self._disk_count
+                stats["disk_bytes"] = self._disk_bytes
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+
+# Instance singleton du cache
+_extraction_cache: Optional[ExtractionCache] = None
+_extraction_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """
+    Obtenir l'instance singleton du cache d'extraction (configurée via app.config)
+
+    Returns:
+        Instance de ExtractionCache
+    """
+    global _extraction_cache
+
+    if _extraction_cache is None:
+        with _extraction_cache_lock:
+            if _extraction_cache is None:
+                _extraction_cache = ExtractionCache(
+                    max_entries=EXTRACTION_CACHE_SIZE,
+                    ttl_seconds=EXTRACTION_CACHE_TTL,
+                    directory=EXTRACTION_CACHE_DIR,
+                    max_disk_bytes=EXTRACTION_CACHE_MAX_DISK_MB * 1024 * 1024,
+                )
+    return _extraction_cache
@@ -0,0 +1,292 @@
+"""
+Prompt d'extraction des biomarqueurs : artefact constant et versionné
+
+Le prompt est construit une seule fois, à l'import. Son identifiant
+(`PROMPT_ID` : version déclarée + empreinte du texte) entre dans la clé du
+cache des extractions et accompagne chaque résultat : toute modification du
+texte invalide automatiquement les extractions obtenues avec l'ancien.
+
+Le prompt est transmis comme instruction système du modèle. Sur demande
+(GEMINI_CONTEXT_CACHE), il peut aussi être enregistré une fois comme contexte
+en cache côté Gemini (`CachedContent`) : les requêtes y font alors référence
+au lieu de renvoyer les instructions. Un contexte en cache exige un minimum
+de jetons ; la taille du prompt est vérifiée une seule fois au démarrage et,
+en dessous du minimum, l'instruction système est utilisée seule (aucun appel
+à l'API des contextes).
+"""
+import hashlib
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import (
+    EXTRACTION_BACKEND,
+    GEMINI_CONTEXT_CACHE,
+    GEMINI_CONTEXT_CACHE_MIN_TOKENS,
+    GEMINI_CONTEXT_CACHE_TTL,
+)
+
+# Version déclarée du prompt, à incrémenter à chaque modification de EXTRACTION_PROMPT
+PROMPT_VERSION = "v3"
+
+EXTRACTION_PROMPT = """Tu es un assistant médical spécialisé dans l'analyse de bilans sanguins.
+
+**TÂCHE :** Extrais UNIQUEMENT les biomarqueurs et leurs valeurs numériques de ce bilan sanguin PDF.
+
+**FORMAT DE SORTIE :**
+Retourne un JSON valide avec cette structure EXACTE (pas de texte avant ou après) :
+{
+  "biomarkers": [
+    {"name": "hemoglobine", "value": 13.2},
+    {"name": "cholesterol_total", "value": 2.3},
+    {"name": "vitamine_d", "value": 18},
+    {"name": "glucose", "value": 0.95}
+  ]
+}
+
+**RÈGLES IMPORTANTES :**
+1. Utilise les noms de biomarqueurs en minuscules, avec underscores pour les espaces
+2. Extrais UNIQUEMENT les valeurs numériques (pas les unités)
+3. Si plusieurs valeurs pour un biomarqueur, prends la plus récente
+4. Ignore les valeurs de référence (min/max)
+5. Convertis les virgules en points pour les décimales
+6. Ne retourne QUE le JSON, aucun texte explicatif
+
+**NOMS STANDARDS À UTILISER :**
+- Hémoglobine → hemoglobine
+- Cholestérol total → cholesterol_total
+- Cholestérol HDL → cholesterol_hdl
+- Cholestérol LDL → cholesterol_ldl
+- Triglycérides → triglycerides
+- Glucose → glucose
+- Vitamine D → vitamine_d
+- Fer sérique → fer_serique
+- Ferritine → ferritine
+- TSH → tsh
+- Créatinine → creatinine
+- Urée → uree
+- ASAT/SGOT → asat
+- ALAT/SGPT → alat
+- Gamma GT → gamma_gt
+- Leucocytes → leucocytes
+- Plaquettes → plaquettes
+
+Retourne maintenant le JSON des biomarqueurs extraits :"""
+
+# Identifiant enregistré avec les extractions : une modification oubliée de
+# PROMPT_VERSION change quand même l'identifiant
+PROMPT_ID = f"{PROMPT_VERSION}-{hashlib.sha256(EXTRACTION_PROMPT.encode('utf-8')).hexdigest()[:8]}"
+
+# Marge avant expiration à partir de laquelle le contexte en cache est renouvelé (s)
+RENEW_MARGIN = 300
+
+# Nom d'affichage des contextes en cache (retrouvés par les autres processus)
+DISPLAY_NAME_PREFIX = "gula-extraction"
+
+
+class PromptContextCache:
+    """
+    Contextes en cache côté Gemini contenant le prompt d'extraction, par modèle
+
+    Rien n'est enregistré tant que `check_eligibility()` (appelé une fois au
+    démarrage) n'a pas confirmé que le prompt atteint le minimum de jetons.
+    L'enregistrement (appel réseau) se fait ensuite dans un thread
+    d'arrière-plan : `model_for()` ne bloque jamais et renvoie None tant
+    qu'aucun contexte n'est disponible.
+    """
+
+    def __init__(
+        self,
+        genai,
+        enabled: bool = True,
+        ttl_seconds: int = 3600,
+        min_tokens: int = 4096,
+        disabled_reason: str = "désactivé",
+    ):
+        """
+        Args:
+            genai: Module google.generativeai déjà configuré
+            enabled: Enregistrer le prompt comme contexte en cache
+            ttl_seconds: Durée de vie d'un contexte côté Gemini
+            min_tokens: Minimum de jetons d'un contexte en cache
+            disabled_reason: Raison affichée dans les statistiques si enabled est faux
+        """
+        self.genai = genai
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.prompt_tokens: Optional[int] = None  # renseigné par check_eligibility()
+        self.disabled_reason: Optional[str] = None if enabled else disabled_reason
+        self._lock = threading.Lock()
+        # modèle -> (GenerativeModel lié au contexte, expiration en epoch)
+        self._models: Dict[str, Tuple[Any, float]] = {}
+        self._pending: Dict[str, threading.Thread] = {}
+        self._unsupported: Dict[str, str] = {}  # modèle -> raison du refus
+        self.registrations = 0
+        self.reused = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def display_name(self) -> str:
+        return f"{DISPLAY_NAME_PREFIX}-{PROMPT_ID}"
+
+    def check_eligibility(self, model) -> bool:
+        """
+        Compter une fois les jetons du prompt et désactiver le cache s'il est trop court
+
+        Args:
+            model: GenerativeModel servant au comptage (count_tokens)
+
+        Returns:
+            True si les contextes en cache peuvent être enregistrés
+        """
+        with self._lock:
+            if not self.enabled or self.prompt_tokens is not None:
+                return self.enabled
+        try:
+            tokens = model.count_tokens(EXTRACTION_PROMPT).total_tokens
+        except Exception as e:
+            return self._disable(f"comptage des jetons impossible ({type(e).__name__}: {e})")
+        if tokens < self.min_tokens:
+            return self._disable(f"prompt de {tokens} jetons, minimum {self.min_tokens}")
+        with self._lock:
+            self.prompt_tokens = tokens
+        print(f"[PROMPT_CACHE] ✅ Prompt {PROMPT_ID} éligible ({tokens} jetons)")
+        return True
+
+    def _disable(self, reason: str) -> bool:
+        """Instruction système seule jusqu'au prochain démarrage"""
+        with self._lock:
+            self.enabled = False
+            self.disabled_reason = reason
+        print(f"[PROMPT_CACHE] Contexte en cache désactivé : {reason}")
+        return False
+
+    def model_for(self, model_name: str) -> Optional[Any]:
+        """
+        Modèle faisant référence au contexte en cache (None si indisponible)
+
+        Lance l'enregistrement en arrière-plan si le contexte est absent ou
+        proche de son expiration. Sans vérification préalable de la taille du
+        prompt (check_eligibility), ne fait rien.
+        """
+        if not self.enabled or self.prompt_tokens is None:
+            return None
+        now = time.time()
+        with self._lock:
+            if model_name in self._unsupported:
+                self.misses += 1
+                return None
+            cached = self._models.get(model_name)
+            if cached is None or cached[1] - now < RENEW_MARGIN:
+                self._start_registration_locked(model_name)
+            if cached is not None and cached[1] > now:
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+            return None
+
+    def _start_registration_locked(self, model_name: str):
+        """Un seul enregistrement à la fois par modèle (verrou acquis)"""
+        thread = self._pending.get(model_name)
+        if thread is not None and thread.is_alive():
+            return
+        thread = threading.Thread(
+            target=self._register, args=(model_name,), name="gula-prompt-cache", daemon=True
+        )
+        self._pending[model_name] = thread
+        thread.start()
+
+    def _register(self, model_name: str):
+        """Retrouver un contexte valide créé par un autre processus, sinon en créer un"""
+        from google.generativeai import caching
+
+        qualified = model_name if model_name.startswith("models/") else f"models/{model_name}"
+        try:
+            content = None
+            reused = False
+            for existing in caching.CachedContent.list():
+                if (
+                    existing.display_name == self.display_name
+                    and existing.model == qualified
+                    and existing.expire_time.timestamp() - time.time() > RENEW_MARGIN
+                ):
+                    content, reused = existing, True
+                    break
+            if content is None:
+                content = caching.CachedContent.create(
+                    model=qualified,
+                    display_name=self.display_name,
+                    system_instruction=EXTRACTION_PROMPT,
+                    ttl=timedelta(seconds=self.ttl_seconds),
+                )
+            model = self.genai.GenerativeModel.from_cached_content(content)
+        except Exception as e:
+            # Typiquement : prompt sous le minimum de jetons mis en cache par ce modèle
+            print(f"[PROMPT_CACHE] ⚠️ Contexte en cache indisponible pour {model_name}: {e}")
+            with self._lock:
+                self._unsupported[model_name] = f"{type(e).__name__}: {e}"
+            return
+
+        with self._lock:
+            self._models[model_name] = (model, content.expire_time.timestamp())
+            if reused:
+                self.reused += 1
+            else:
+                self.registrations += 1
+        print(f"[PROMPT_CACHE] ✅ Prompt {PROMPT_ID} en cache pour {model_name} ({content.name})")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "prompt_id": PROMPT_ID,
+                "prompt_tokens": self.prompt_tokens,
+                "min_tokens": self.min_tokens,
+                "disabled_reason": self.disabled_reason,
+                "models": sorted(self._models),
+                "unsupported": dict(self._unsupported),
+                "registrations": self.registrations,
+                "reused": self.reused,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Instance singleton
+_prompt_context_cache: Optional[PromptContextCache] = None
+_prompt_context_cache_lock = threading.Lock()
+
+
+def get_prompt_context_cache() -> PromptContextCache:
+    """
+    Obtenir l'instance singleton des contextes en cache (configurée via app.config)
+
+    Returns:
+        Instance de PromptContextCache
+    """
+    global _prompt_context_cache
+
+    if _prompt_context_cache is None:
+        with _prompt_context_cache_lock:
+            if _prompt_context_cache is None:
+                genai, reason = None, "désactivé (GEMINI_CONTEXT_CACHE)"
+                if EXTRACTION_BACKEND != "gemini":
+                    # Moteur hors ligne (voir extractors) : google.generativeai n'est pas importé
+                    reason = f"moteur d'extraction {EXTRACTION_BACKEND}"
+                elif GEMINI_CONTEXT_CACHE:
+                    try:
+                        import google.generativeai as genai
+                    except ImportError:
+                        reason = "module google.generativeai absent"
+
+                _prompt_context_cache = PromptContextCache(
+                    genai,
+                    enabled=genai is not None,
+                    ttl_seconds=GEMINI_CONTEXT_CACHE_TTL,
+                    min_tokens=GEMINI_CONTEXT_CACHE_MIN_TOKENS,
+                    disabled_reason=reason,
+                )
+    return _prompt_context_cache
@@ -0,0 +1,596 @@
+"""
+Moteurs d'extraction des biomarqueurs (repli de la chaîne d'extraction)
+
+Quand la lecture locale de la couche texte ne suffit pas, la chaîne
+d'extraction confie le document au moteur choisi par EXTRACTION_BACKEND :
+- "gemini" (par défaut) : GeminiService ;
+- "local" : le parseur de la couche texte, sans seuil de couverture (aucun
+  appel réseau ; PDF scannés et photos non pris en charge) ;
+- "stub" : réponses fixes par empreinte du document, avec une latence et un
+  taux d'erreur configurables, pour tester en charge toute la chaîne de
+  requête hors ligne, sans clé API.
+
+Quel que soit le moteur, la chaîne d'extraction passe par ExtractionClient :
+cache des extractions, relances / duplicatas / disjoncteur, pool d'appels
+borné et répartition des clés API. Le moteur ne fournit que l'appel lui-même
+(`generate`, une tentative) : les moteurs hors ligne remplacent uniquement
+l'appel réseau à Gemini. Seule exception : les réponses du moteur "stub" ne
+passent pas par le cache des extractions, pour que chaque requête d'un test
+de charge subisse la latence et les erreurs simulées.
+
+Le module google.generativeai n'est importé que si le moteur Gemini est créé.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple
+
+from fastapi import HTTPException
+
+from app.config import (
+    EXTRACTION_BACKEND,
+    STUB_ERROR_RATE,
+    STUB_FIXTURES_FILE,
+    STUB_LATENCY,
+    STUB_SEED,
+)
+from app.services.biomarker_catalog import get_biomarker_catalog
+from app.services.concurrency import CallTimeoutError, QueueFullError
+from app.services.extraction_cache import get_extraction_cache, make_cache_key
+from app.services.extraction_prompt import EXTRACTION_PROMPT
+from app.services.gemini_service import (
+    BiomarkerCallback,
+    ExtractionRequest,
+    NoBiomarkersError,
+    get_gemini_executor,
+    get_gemini_resilience,
+    get_gemini_service,
+    init_gemini_service,
+)
+from app.services.key_pool import KeyLease, QuotaExhaustedError, estimate_tokens, get_api_key_pool
+from app.services.resilience import CircuitOpenError, is_retryable_error
+from app.services.text_extractor import LocalTextExtractor
+
+EXTRACTION_BACKENDS = ("gemini", "local", "stub")
+
+# Réponse du moteur "stub" pour un document absent des fixtures
+DEFAULT_STUB_BIOMARKERS = {
+    "hemoglobine": 14.2,
+    "glucose": 0.95,
+    "cholesterol_total": 1.85,
+    "ferritine": 85.0,
+}
+
+
+# Callback de streaming appelé depuis le pool d'appels (nom normalisé, valeur)
+Emitter = Callable[[str, float], None]
+
+
+class ExtractionBackend(Protocol):
+    """Appel à un moteur d'extraction (GeminiService est l'implémentation de référence)"""
+
+    source: str  # source des résultats (ExtractionResult.source)
+    model_name: str
+    prompt_version: Optional[str]
+
+    def generate(
+        self,
+        request: ExtractionRequest,
+        model_name: str,
+        lease: KeyLease,
+        emit: Optional[Emitter] = None,
+    ) -> Tuple[Dict[str, float], Optional[int]]:
+        """Une tentative, bloquante (pool d'appels) : (biomarqueurs, jetons consommés)"""
+        ...
+
+
+class BiomarkerExtractor(Protocol):
+    """Extraction d'un document par le moteur configuré (ExtractionClient)"""
+
+    source: str  # source des résultats (ExtractionResult.source)
+    model_name: str
+    prompt_version: Optional[str]
+
+    async def extract_biomarkers_from_pdf(
+        self,
+        pdf_bytes: bytes,
+        text: Optional[str] = None,
+        pdf_sha256: Optional[str] = None,
+        on_biomarker: Optional[BiomarkerCallback] = None,
+        model_name: Optional[str] = None,
+    ) -> Dict[str, float]:
+        ...
+
+    async def extract_biomarkers_from_images(
+        self,
+        images: List[bytes],
+        digest: Optional[str] = None,
+        on_biomarker: Optional[BiomarkerCallback] = None,
+        model_name: Optional[str] = None,
+    ) -> Dict[str, float]:
+        ...
+
+
+def _no_biomarkers(source: str) -> HTTPException:
+    """Erreur d'un document sans biomarqueur lisible (fichier ignoré dans un bilan multi-fichiers)"""
+    error = HTTPException(
+        status_code=400,
+        detail="Aucun biomarqueur n'a pu être extrait du PDF. "
+               "Assurez-vous que le PDF contient un bilan sanguin valide."
+    )
+    error.__cause__ = NoBiomarkersError(f"Aucun biomarqueur trouvé ({source})")
+    return error
+
+
+def _extraction_error(error: Exception) -> HTTPException:
+    """Réponse HTTP d'une extraction en échec (après relances)"""
+    if isinstance(error, QueueFullError):
+        return HTTPException(
+            status_code=503,
+            detail="Service d'extraction saturé, veuillez réessayer dans quelques instants."
+        )
+    if isinstance(error, QuotaExhaustedError):
+        return HTTPException(
+            status_code=503,
+            detail="Quota Gemini atteint, veuillez réessayer dans quelques instants.",
+            headers={"Retry-After": str(max(1, round(error.retry_after)))}
+        )
+    if isinstance(error, CallTimeoutError):
+        return HTTPException(
+            status_code=504,
+            detail="L'extraction avec Gemini a pris trop de temps, veuillez réessayer."
+        )
+    if isinstance(error, CircuitOpenError) or is_retryable_error(error):
+        # Disjoncteur ouvert, ou 429 / 5xx persistants malgré les relances
+        return HTTPException(
+            status_code=503,
+            detail="Gemini est momentanément indisponible, veuillez réessayer dans quelques instants."
+        )
+    return HTTPException(
+        status_code=500,
+        detail=f"Erreur lors de l'extraction avec Gemini : {str(error)}"
+    )
+
+
+class ExtractionClient:
+    """
+    Extraction d'un document par un moteur, avec les couches communes à tous
+
+    Cache des extractions (sauf moteur stub), puis appel résilient (relances, duplicata au p95,
+    budget global, disjoncteur) : chaque tentative prend la clé API la moins
+    chargée du pool et s'exécute dans le pool d'appels borné. Toutes ces
+    couches sont des singletons partagés : le client ne porte aucun état.
+    """
+
+    def __init__(self, backend: ExtractionBackend):
+        """
+        Args:
+            backend: Moteur d'extraction (GeminiService, LocalParserExtractor ou StubExtractor)
+        """
+        self.backend = backend
+
+    @property
+    def source(self) -> str:
+        return self.backend.source
+
+    @property
+    def model_name(self) -> str:
+        return self.backend.model_name
+
+    @property
+    def prompt_version(self) -> Optional[str]:
+        return self.backend.prompt_version
+
+    async def extract_biomarkers_from_pdf(
+        self,
+        pdf_bytes: bytes,
+        text: Optional[str] = None,
+        pdf_sha256: Optional[str] = None,
+        on_biomarker: Optional[BiomarkerCallback] = None,
+        model_name: Optional[str] = None,
+    ) -> Dict[str, float]:
+        """
+        Extraire les biomarqueurs et leurs valeurs d'un PDF de bilan sanguin
+
+        Args:
+            pdf_bytes: Contenu du PDF en bytes
+            text: Couche texte du PDF (pages de résultats). Si fournie, seul ce
+                  texte est envoyé au moteur à la place du PDF complet.
+            pdf_sha256: Empreinte du PDF si déjà calculée (évite de la recalculer)
+            on_biomarker: Si fourni, la réponse est lue en streaming et chaque
+                          biomarqueur est transmis dès sa réception
+            model_name: Modèle à utiliser (si None, le modèle principal)
+
+        Returns:
+            Dictionnaire {nom_biomarqueur: valeur}
+
+        Raises:
+            HTTPException: En cas d'erreur lors de l'extraction
+        """
+        input_mode = "text" if text is not None else "pdf"
+        print(f"[EXTRACTORS] Extraction {self.source} d'un PDF (mode {input_mode}, {len(pdf_bytes)} bytes)")
+        if text is not None:
+            # Texte seul : pas de logos, d'en-têtes scannés ni de pages annexes
+            contents: List[Any] = [f"Contenu texte du bilan sanguin :\n\n{text}"]
+        else:
+            contents = [{"mime_type": "application/pdf", "data": pdf_bytes}]
+        request = ExtractionRequest(
+            digest=pdf_sha256 or hashlib.sha256(pdf_bytes).hexdigest(),
+            input_mode=input_mode,
+            contents=contents,
+            pdf_bytes=pdf_bytes,
+        )
+        return await self._extract(request, on_biomarker, model_name)
+
+    async def extract_biomarkers_from_images(
+        self,
+        images: List[bytes],
+        digest: Optional[str] = None,
+        on_biomarker: Optional[BiomarkerCallback] = None,
+        model_name: Optional[str] = None,
+    ) -> Dict[str, float]:
+        """
+        Extraire les biomarqueurs des photos d'un bilan (une par page), en un seul appel
+
+        Args:
+            images: Photos JPEG déjà préparées (réduites, recadrées), dans l'ordre des pages
+            digest: Empreinte de l'ensemble des photos (clé du cache), calculée si None
+            on_biomarker: Voir `extract_biomarkers_from_pdf`
+            model_name: Modèle à utiliser (si None, le modèle principal)
+
+        Returns:
+            Dictionnaire {nom_biomarqueur: valeur}
+
+        Raises:
+            HTTPException: En cas d'erreur lors de l'extraction
+        """
+        print(f"[EXTRACTORS] Extraction {self.source} de {len(images)} photo(s) ({sum(map(len, images))} bytes)")
+        contents: List[Any] = [f"Photos du bilan sanguin ({len(images)} page(s), dans l'ordre) :"]
+        contents.extend({"mime_type": "image/jpeg", "data": image} for image in images)
+        if digest is None:
+            digest = hashlib.sha256(b"".join(hashlib.sha256(image).digest() for image in images)).hexdigest()
+        request = ExtractionRequest(digest=digest, input_mode="image", contents=contents)
+        return await self._extract(request, on_biomarker, model_name)
+
+    async def _extract(
+        self,
+        request: ExtractionRequest,
+        on_biomarker: Optional[BiomarkerCallback],
+        model_name: Optional[str],
+    ) -> Dict[str, float]:
+        """Extraction d'un document (cache, appel résilient)"""
+        model_name = model_name or self.model_name
+
+        # Un document déjà extrait avec le même modèle et le même prompt est servi depuis le cache.
+        # Jamais pour le moteur stub : chaque requête d'un test de charge doit subir la latence
+        # et le taux d'erreur simulés, même pour un document déjà vu.
+        cache = get_extraction_cache() if self.source != "stub" else None
+        cache_key = make_cache_key(request.digest, model_name, self.prompt_version, request.input_mode)
+        cached = await cache.aget(cache_key) if cache is not None else None
+        if cached is not None:
+            print(f"[EXTRACTORS] ✅ Extraction servie depuis le cache ({len(cached)} biomarqueurs)")
+            if on_biomarker is not None:
+                for name, value in cached.items():
+                    on_biomarker(name, value)
+            return cached
+
+        emit = _loop_emitter(on_biomarker) if on_biomarker is not None else None
+        tokens = estimate_tokens(EXTRACTION_PROMPT, request.contents)
+        try:
+            biomarkers = await get_gemini_resilience().call(
+                lambda remaining: self._call(request, model_name, emit, tokens, remaining),
+                key=model_name,
+            )
+        except HTTPException:
+            # Réponse du moteur lui-même (ex: moteur hors ligne sans biomarqueur)
+            raise
+        except Exception as e:
+            print(f"[EXTRACTORS] ❌ {type(e).__name__}: {e}")
+            raise _extraction_error(e) from e
+
+        if cache is None:
+            return biomarkers
+        await cache.aset(cache_key, biomarkers, {
+            "model": model_name,
+            "prompt_version": self.prompt_version,
+            "input_mode": request.input_mode,
+        })
+        return biomarkers
+
+    async def _call(
+        self,
+        request: ExtractionRequest,
+        model_name: str,
+        emit: Optional[Emitter],
+        tokens: int,
+        remaining: float,
+    ) -> Dict[str, float]:
+        """
+        Une tentative sur la clé la moins chargée du pool, dans le pool d'appels
+
+        Args:
+            request: Document à extraire
+            model_name: Modèle à utiliser
+            emit: Callback de streaming (voir `_loop_emitter`)
+            tokens: Jetons estimés de l'appel (quota de la clé)
+            remaining: Temps restant sur le budget de l'extraction (s)
+        """
+        executor = get_gemini_executor()
+        pool = get_api_key_pool()
+        lease = await pool.acquire(model_name, tokens, timeout=remaining)
+        try:
+            biomarkers, used_tokens = await executor.run(
+                self.backend.generate, request, model_name, lease, emit,
+                timeout=min(executor.timeout_seconds, remaining)
+            )
+        except BaseException as e:
+            pool.release(lease, error=e)
+            raise
+        pool.release(lease, tokens=used_tokens)
+        return biomarkers
+
+
+def _loop_emitter(on_biomarker: BiomarkerCallback) -> Emitter:
+    """
+    Adapter le callback pour les threads du pool : appel dans la boucle
+    d'événements, doublons (relances, duplicata) ignorés
+    """
+    loop = asyncio.get_running_loop()
+    seen: Dict[str, float] = {}
+
+    def deliver(name: str, value: float):
+        if seen.get(name) == value:
+            return
+        seen[name] = value
+        on_biomarker(name, value)
+
+    def emit(name: str, value: float):
+        loop.call_soon_threadsafe(deliver, name, value)
+
+    return emit
+
+
+class LocalParserExtractor:
+    """Parseur de la couche texte utilisé comme moteur de repli (hors ligne)"""
+
+    source = "local"
+    model_name = "text-layer"
+    prompt_version = None
+
+    def generate(
+        self,
+        request: ExtractionRequest,
+        model_name: str,
+        lease: KeyLease,
+        emit: Optional[Emitter] = None,
+    ) -> Tuple[Dict[str, float], Optional[int]]:
+        """Tous les biomarqueurs reconnus dans la couche texte, quelle que soit la couverture"""
+        if request.pdf_bytes is None:
+            raise HTTPException(
+                status_code=400,
+                detail="L'analyse des photos nécessite le moteur Gemini (EXTRACTION_BACKEND=gemini)."
+            )
+        local = LocalTextExtractor(get_biomarker_catalog()).extract(request.pdf_bytes)
+        if not local.biomarkers:
+            raise _no_biomarkers(self.source)
+        return local.biomarkers, None
+
+
+@dataclass(frozen=True)
+class LatencyDistribution:
+    """
+    Latence simulée d'un appel, en millisecondes
+
+    Formes acceptées par `parse` :
+    - "fixed:800" ;
+    - "uniform:200,1500" (bornes) ;
+    - "lognormal:1500,0.4" (médiane, écart-type du logarithme) : queue de
+      réponses lentes proche de celle observée avec Gemini.
+    """
+    kind: str
+    params: Tuple[float, ...]
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        kind, _, raw = spec.strip().lower().partition(":")
+        try:
+            params = tuple(float(p) for p in raw.split(",") if p.strip())
+        except ValueError:
+            params = ()
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2}.get(kind)
+        if expected is None or len(params) != expected or any(p < 0 for p in params):
+            raise ValueError(
+                f"Latence simulée invalide: {spec!r} "
+                "(attendu fixed:MS, uniform:MIN,MAX ou lognormal:MEDIANE,SIGMA)"
+            )
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random) -> float:
+        """Tirer une latence (s)"""
+        if self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(*self.params)
+        else:
+            median, sigma = self.params
+            ms = rng.lognormvariate(math.log(max(median, 1e-3)), sigma)
+        return ms / 1000
+
+
+def load_stub_fixtures(path: Optional[str]) -> Tuple[Dict[str, Dict[str, float]], Dict[str, float]]:
+    """
+    Lire les fixtures du moteur "stub"
+
+    Args:
+        path: Fichier JSON {sha256 du document: {biomarqueur: valeur}} ; la
+              clé "*" donne la réponse des documents absents (None : aucune fixture)
+
+    Returns:
+        (réponses par empreinte, réponse par défaut)
+    """
+    if not path:
+        return {}, dict(DEFAULT_STUB_BIOMARKERS)
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    fixtures = {
+        digest: {name: float(value) for name, value in biomarkers.items()}
+        for digest, biomarkers in raw.items()
+    }
+    default = fixtures.pop("*", dict(DEFAULT_STUB_BIOMARKERS))
+    print(f"[EXTRACTORS] {len(fixtures)} fixture(s) chargée(s) depuis {path}")
+    return fixtures, default
+
+
+class StubUnavailableError(Exception):
+    """Indisponibilité simulée du moteur stub (code HTTP dans `code`, comme google.api_core)"""
+
+    code = 503
+
+
+class StubExtractor:
+    """Moteur simulé : réponses fixes, latence et erreurs injectées, aucun réseau"""
+
+    source = "stub"
+    model_name = "stub"
+    prompt_version = None
+
+    def __init__(
+        self,
+        fixtures: Dict[str, Dict[str, float]],
+        default: Optional[Dict[str, float]] = None,
+        latency: Optional[LatencyDistribution] = None,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            fixtures: Biomarqueurs renvoyés par empreinte (SHA-256) du document
+            default: Réponse des documents absents des fixtures (None : aucun biomarqueur)
+            latency: Latence simulée (None : réponse immédiate)
+            error_rate: Part des tentatives en échec (503, comme Gemini indisponible,
+                        donc relancées comme un appel réel)
+            seed: Graine du tirage (tests reproductibles)
+        """
+        self.fixtures = fixtures
+        self.default = default
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def generate(
+        self,
+        request: ExtractionRequest,
+        model_name: str,
+        lease: KeyLease,
+        emit: Optional[Emitter] = None,
+    ) -> Tuple[Dict[str, float], Optional[int]]:
+        """Réponse simulée d'un document : latence tirée, erreur éventuelle, puis fixtures"""
+        with self._lock:
+            self.calls += 1
+            delay = self.latency.sample(self._random) if self.latency is not None else 0.0
+            failure = self._random.random() < self.error_rate
+            if failure:
+                self.errors += 1
+        time.sleep(delay)
+        if failure:
+            # Comme une erreur 503 de Gemini : relancée par la couche de résilience
+            raise StubUnavailableError("Erreur 503 simulée (moteur stub)")
+
+        biomarkers = self.fixtures.get(request.digest, self.default)
+        if not biomarkers:
+            raise _no_biomarkers(self.source)
+        if emit is not None:
+            for name, value in biomarkers.items():
+                emit(name, value)
+        return dict(biomarkers), None
+
+    def stats(self) -> Dict[str, Any]:
+        """Appels simulés et erreurs injectées"""
+        with self._lock:
+            return {
+                "fixtures": len(self.fixtures),
+                "latency": f"{self.latency.kind}:{','.join(f'{p:g}' for p in self.latency.params)}" if self.latency else None,
+                "error_rate": self.error_rate,
+                "calls": self.calls,
+                "errors": self.errors,
+            }
+
+
+# Instance singleton des moteurs hors Gemini
+_extractor: Optional[ExtractionBackend] = None
+_extractor_lock = threading.Lock()
+
+
+def get_biomarker_extractor() -> BiomarkerExtractor:
+    """
+    Obtenir l'extraction par le moteur configuré (EXTRACTION_BACKEND)
+
+    Returns:
+        ExtractionClient autour de GeminiService, LocalParserExtractor ou StubExtractor
+
+    Raises:
+        ValueError: Si EXTRACTION_BACKEND est inconnu ou la latence simulée invalide
+    """
+    return ExtractionClient(get_extraction_backend())
+
+
+def get_extraction_backend() -> ExtractionBackend:
+    """
+    Obtenir le moteur configuré (EXTRACTION_BACKEND), sans les couches communes
+
+    Returns:
+        GeminiService, LocalParserExtractor ou StubExtractor
+    """
+    global _extractor
+
+    if EXTRACTION_BACKEND == "gemini":
+        return get_gemini_service()
+
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                if EXTRACTION_BACKEND == "local":
+                    _extractor = LocalParserExtractor()
+                elif EXTRACTION_BACKEND == "stub":
+                    fixtures, default = load_stub_fixtures(STUB_FIXTURES_FILE)
+                    _extractor = StubExtractor(
+                        fixtures,
+                        default=default,
+                        latency=LatencyDistribution.parse(STUB_LATENCY),
+                        error_rate=STUB_ERROR_RATE,
+                        seed=STUB_SEED,
+                    )
+                else:
+                    raise ValueError(
+                        f"EXTRACTION_BACKEND inconnu: {EXTRACTION_BACKEND!r} "
+                        f"(attendu : {', '.join(EXTRACTION_BACKENDS)})"
+                    )
+                print(f"[EXTRACTORS] Moteur d'extraction: {EXTRACTION_BACKEND}")
+    return _extractor
+
+
+def get_extractor_stats() -> Dict[str, Any]:
+    """Moteur d'extraction configuré (et compteurs du moteur simulé)"""
+    stats: Dict[str, Any] = {"backend": EXTRACTION_BACKEND}
+    if isinstance(_extractor, StubExtractor):
+        stats["stub"] = _extractor.stats()
+    return stats
+
+
+def init_biomarker_extractor():
+    """Initialiser le moteur d'extraction au démarrage (API ou worker)"""
+    if EXTRACTION_BACKEND == "gemini":
+        init_gemini_service()
+        return
+    try:
+        get_extraction_backend()
+    except (ValueError, OSError) as e:
+        print(f"[EXTRACTORS] ⚠️ Moteur d'extraction non initialisé au démarrage: {e}")
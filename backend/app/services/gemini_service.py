@@ -1,37 +1,106 @@
 """
 Service pour l'extraction de données de bilans sanguins via Gemini API
 """
-import json
-from typing import Dict, Any, Optional
-from fastapi import HTTPException
-from app.config import GEMINI_API_KEY
-
-# Vérifier que google-generativeai est installé
-print("[GEMINI_SERVICE] Vérification du module google.generativeai...")
-try:
-    import google.generativeai as genai
-    print(f"[GEMINI_SERVICE] ✅ Module google.generativeai importé (version: {genai.__version__ if hasattr(genai, '__version__') else 'inconnue'})")
-except ImportError as e:
-    print(f"[GEMINI_SERVICE] ❌ ERREUR: Module google.generativeai non trouvé!")
-    print(f"[GEMINI_SERVICE] Exécutez: pip install google-generativeai")
-    raise
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from app.config import (
+    GEMINI_API_KEY,
+    GEMINI_API_KEYS,
+    GEMINI_BREAKER_FAILURES,
+    GEMINI_BREAKER_RESET_SECONDS,
+    GEMINI_DEADLINE_SECONDS,
+    GEMINI_HEDGE_INITIAL_DELAY,
+    GEMINI_HEDGE_MIN_DELAY,
+    GEMINI_HEDGE_PERCENTILE,
+    GEMINI_MAX_CONCURRENCY,
+    GEMINI_MAX_QUEUE,
+    GEMINI_MODEL,
+    GEMINI_RETRY_BACKOFF,
+    GEMINI_RETRY_BACKOFF_MAX,
+    GEMINI_RETRY_MAX_ATTEMPTS,
+    GEMINI_STRUCTURED_OUTPUT,
+    GEMINI_TIMEOUT_SECONDS,
+)
+from app.services.cassettes import get_cassette_store
+from app.services.concurrency import BoundedExecutor
+from app.services.resilience import CircuitBreaker, ResilientCaller
+from app.services.extraction_prompt import EXTRACTION_PROMPT, PROMPT_ID, get_prompt_context_cache
+from app.services.key_pool import KeyLease, key_fingerprint
+from app.services.model_selection import DEFAULT_MODEL, initial_model, refresh_model_in_background
+from app.services.name_resolver import get_name_resolver
+from app.services.response_parser import (
+    BIOMARKERS_RESPONSE_SCHEMA,
+    BiomarkerStreamParser,
+    parse_biomarkers,
+)
+
+# Module google.generativeai, importé à la création du service : le reste de
+# l'application (moteurs "local" et "stub", pool d'appels) fonctionne sans
+genai = None
+
+
+def _import_genai():
+    """Importer google.generativeai (une seule fois)"""
+    global genai
+    if genai is None:
+        print("[GEMINI_SERVICE] Vérification du module google.generativeai...")
+        try:
+            import google.generativeai as module
+        except ImportError:
+            print("[GEMINI_SERVICE] ❌ ERREUR: Module google.generativeai non trouvé!")
+            print("[GEMINI_SERVICE] Exécutez: pip install google-generativeai")
+            raise
+        print(f"[GEMINI_SERVICE] ✅ Module google.generativeai importé (version: {getattr(module, '__version__', 'inconnue')})")
+        genai = module
+    return genai
+
+
+class NoBiomarkersError(ValueError):
+    """La réponse de Gemini ne contient aucun biomarqueur lisible"""
+
+
+# Callback appelé (dans la boucle d'événements) pour chaque biomarqueur reçu en streaming
+BiomarkerCallback = Callable[[str, float], None]
+
+
+@dataclass(frozen=True)
+class ExtractionRequest:
+    """Document à extraire, tel qu'envoyé au moteur d'extraction"""
+    digest: str  # empreinte du document (clé du cache, fixtures du moteur simulé)
+    input_mode: str  # "text", "pdf" ou "image"
+    contents: List[Any]  # contenu envoyé à Gemini (texte, PDF ou photos)
+    pdf_bytes: Optional[bytes] = None  # PDF d'origine (None pour des photos)
 
 
 class GeminiService:
     """Service pour interagir avec l'API Gemini de Google"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    # Moteur d'extraction (voir extractors.BiomarkerExtractor)
+    source = "gemini"
+    prompt_version = PROMPT_ID
+
+    def __init__(self, api_key: Optional[str] = None, model_name: Optional[str] = None):
         """
-        Initialiser le service Gemini
+        Initialiser le service Gemini (aucun appel réseau)
         
         Args:
             api_key: Clé API Gemini (si None, utilise la configuration)
+            model_name: Modèle à utiliser (si None, modèle mémorisé ou par défaut)
         """
         print(f"[GEMINI_SERVICE] Initialisation...")
         print(f"[GEMINI_SERVICE] api_key fourni? {bool(api_key)}")
         print(f"[GEMINI_SERVICE] GEMINI_API_KEY depuis config? {bool(GEMINI_API_KEY)}")
         
-        self.api_key = api_key or GEMINI_API_KEY
+        self.api_key = api_key or GEMINI_API_KEY or (GEMINI_API_KEYS[0] if GEMINI_API_KEYS else None)
+
+        if get_cassette_store().replaying:
+            # Rejeu des cassettes : ni clé, ni module google.generativeai, ni réseau
+            self.model = None
+            self.model_name = model_name or GEMINI_MODEL or get_cassette_store().recorded_model() or DEFAULT_MODEL
+            self.model_resolved = True
+            print(f"[GEMINI_SERVICE] ✅ Rejeu des cassettes (modèle {self.model_name})")
+            return
         
         if not self.api_key:
             print("[GEMINI_SERVICE] ❌ Aucune clé API trouvée!")
@@ -45,161 +114,180 @@ class GeminiService:
         # Configurer Gemini
         try:
             print("[GEMINI_SERVICE] Configuration de Gemini...")
-            genai.configure(api_key=self.api_key)
+            _import_genai().configure(api_key=self.api_key)
             print("[GEMINI_SERVICE] ✅ Gemini configuré")
         except Exception as e:
             print(f"[GEMINI_SERVICE] ❌ Erreur lors de la configuration: {e}")
             raise
         
-        # Sélection dynamique du modèle disponible
-        self.model_name = self._select_available_model()
+        # Modèle mémorisé au lancement précédent : pas de listing ici
+        resolved = True
+        if model_name is None:
+            model_name, resolved = initial_model(self.api_key)
+        self.set_model(model_name)
+        self.model_resolved = resolved
+
+    def set_model(self, model_name: str):
+        """
+        Changer de modèle (appelé quand le listing en arrière-plan a abouti)
+
+        Args:
+            model_name: Nom du modèle Gemini
+        """
+        if get_cassette_store().replaying:
+            self.model_name = model_name
+            return
         try:
-            print(f"[GEMINI_SERVICE] Création du modèle: {self.model_name}...")
-            self.model = genai.GenerativeModel(self.model_name)
+            print(f"[GEMINI_SERVICE] Création du modèle: {model_name}...")
+            # Prompt d'extraction en instruction système : préparé une fois par modèle
+            model = genai.GenerativeModel(model_name, system_instruction=EXTRACTION_PROMPT)
             print("[GEMINI_SERVICE] ✅ Modèle créé avec succès")
         except Exception as e:
-            print(f"[GEMINI_SERVICE] ❌ Erreur lors de la création du modèle {self.model_name}: {e}")
+            print(f"[GEMINI_SERVICE] ❌ Erreur lors de la création du modèle {model_name}: {e}")
             raise
+        self.model = model
+        self.model_name = model_name
+        self.model_resolved = True
+
+    def get_model(self, model_name: str, lease: Optional[KeyLease] = None):
+        """
+        Modèle Gemini du nom donné (modèle principal ou modèle de routage)
+
+        Les modèles autres que le principal, et ceux des clés secondaires du
+        pool (KeyBoundModel, client dédié à la clé), sont créés une seule
+        fois, avec le prompt d'extraction en instruction système.
+
+        Args:
+            model_name: Nom du modèle
+            lease: Clé réservée pour l'appel (si None ou clé principale, client par défaut)
+        """
+        primary = lease is None or lease.primary
+        if primary and model_name == self.model_name:
+            return self.model
+        key = (model_name, None if primary else lease.api_key)
+        with _models_lock:
+            model = _models.get(key)
+            if model is None:
+                suffix = "" if primary else f" (clé {key_fingerprint(lease.api_key)})"
+                print(f"[GEMINI_SERVICE] Création du modèle: {model_name}{suffix}")
+                if primary:
+                    model = genai.GenerativeModel(model_name, system_instruction=EXTRACTION_PROMPT)
+                else:
+                    model = KeyBoundModel(model_name, _generative_client(lease.api_key))
+                _models[key] = model
+        return model
     
-    async def extract_biomarkers_from_pdf(self, pdf_bytes: bytes) -> Dict[str, float]:
+    def generate(
+        self,
+        request: ExtractionRequest,
+        model_name: str,
+        lease: KeyLease,
+        emit: Optional[Callable[[str, float], None]] = None,
+    ) -> Tuple[Dict[str, float], Optional[int]]:
         """
-        Extraire les biomarqueurs et leurs valeurs d'un PDF de bilan sanguin
+        Un appel à Gemini avec la clé réservée (exécuté dans le pool d'appels)
+
+        Cache, relances, pool d'appels et répartition des clés sont assurés
+        par l'appelant (extractors.ExtractionClient).
         
         Args:
-            pdf_bytes: Contenu du PDF en bytes
+            request: Document à extraire (contenu à envoyer)
+            model_name: Modèle à utiliser
+            lease: Clé API réservée pour l'appel
+            emit: Si fourni, la réponse est lue en streaming et chaque
+                  biomarqueur complet lui est transmis (nom normalisé)
             
         Returns:
-            Dictionnaire {nom_biomarqueur: valeur}
+            (biomarqueurs, jetons consommés si Gemini les indique)
             
         Raises:
-            HTTPException: En cas d'erreur lors de l'extraction
+            NoBiomarkersError: Si la réponse ne contient aucun biomarqueur lisible
         """
-        print(f"[GEMINI_SERVICE] extract_biomarkers_from_pdf appelé")
-        print(f"[GEMINI_SERVICE] Taille du PDF: {len(pdf_bytes)} bytes")
+        if emit is not None:
+            emit = self._normalizing(emit)
+        print(f"[GEMINI_SERVICE] 📤 Envoi à l'API Gemini (modèle {model_name}, prompt {PROMPT_ID})...")
+        cassettes = get_cassette_store()
+        if cassettes.replaying:
+            # Réponse enregistrée, avec sa latence d'origine
+            text, used_tokens = cassettes.replay(model_name, request.contents, emit)
+        else:
+            # Le prompt n'est pas renvoyé : contexte en cache côté Gemini s'il est
+            # disponible (enregistré avec la clé principale), sinon instruction système
+            model = get_prompt_context_cache().model_for(model_name) if lease.primary else None
+            model = model or self.get_model(model_name, lease)
+            if cassettes.recording:
+                text, used_tokens = cassettes.record(model_name, self._generate, model, request.contents, emit)
+            else:
+                text, used_tokens = self._generate(model, request.contents, emit)
+        print("[GEMINI_SERVICE] ✅ Réponse reçue de Gemini")
+        print(f"[GEMINI_SERVICE] Réponse brute: {text[:200]}...")
         
-        try:
-            # Créer le prompt pour Gemini
-            print("[GEMINI_SERVICE] Création du prompt...")
-            prompt = self._create_extraction_prompt()
-            print(f"[GEMINI_SERVICE] Prompt créé (longueur: {len(prompt)} chars)")
-            
-            # Préparer le fichier PDF pour Gemini
-            print("[GEMINI_SERVICE] Préparation du fichier PDF...")
-            pdf_file = {
-                "mime_type": "application/pdf",
-                "data": pdf_bytes
-            }
-            print("[GEMINI_SERVICE] ✅ Fichier PDF préparé")
-            
-            # Envoyer à Gemini
-            print("[GEMINI_SERVICE] 📤 Envoi à l'API Gemini...")
-            response = self.model.generate_content([prompt, pdf_file])
-            print("[GEMINI_SERVICE] ✅ Réponse reçue de Gemini")
-            print(f"[GEMINI_SERVICE] Réponse brute: {response.text[:200]}...")
-            
-            # Parser la réponse
-            print("[GEMINI_SERVICE] Parsing de la réponse...")
-            biomarkers = self._parse_gemini_response(response.text)
-            print(f"[GEMINI_SERVICE] ✅ {len(biomarkers)} biomarqueurs extraits: {list(biomarkers.keys())}")
-            
-            return biomarkers
-            
-        except Exception as e:
-            print(f"[GEMINI_SERVICE] ❌ ERREUR: {type(e).__name__}: {str(e)}")
-            import traceback
-            print(f"[GEMINI_SERVICE] Traceback complet:")
-            traceback.print_exc()
-            raise HTTPException(
-                status_code=500,
-                detail=f"Erreur lors de l'extraction avec Gemini : {str(e)}"
-            )
-
-    def _select_available_model(self) -> str:
-        """Sélectionner un modèle disponible sur l'API, avec priorité aux plus récents.
-        Ordre de préférence: gemini-2.5-flash → gemini-2.0-flash → gemini-1.5-flash-8b → gemini-1.5-flash.
-        """
-        print("[GEMINI_SERVICE] Listing des modèles disponibles...")
-        preferred = [
-            "gemini-2.5-flash",
-            "gemini-2.0-flash",
-            "gemini-1.5-flash-8b",
-            "gemini-1.5-flash",
-        ]
-        try:
-            models = list(genai.list_models())
-            names = [m.name.split('/')[-1] if hasattr(m, 'name') else str(m) for m in models]
-            print(f"[GEMINI_SERVICE] Modèles retournés ({len(names)}): {names}")
-            for candidate in preferred:
-                if candidate in names:
-                    print(f"[GEMINI_SERVICE] ✅ Modèle sélectionné: {candidate}")
-                    return candidate
-            # Fallback: prendre le premier modèle qui supporte generateContent
-            for m in models:
-                caps = getattr(m, 'supported_generation_methods', []) or []
-                if 'generateContent' in caps or 'generate_content' in caps:
-                    chosen = m.name.split('/')[-1]
-                    print(f"[GEMINI_SERVICE] ⚠️ Fallback sur: {chosen}")
-                    return chosen
-        except Exception as e:
-            print(f"[GEMINI_SERVICE] ⚠️ Impossible de lister les modèles: {e}")
-        # Dernier recours
-        print("[GEMINI_SERVICE] ⚠️ Aucun listing, fallback par défaut: gemini-2.0-flash")
-        return "gemini-2.0-flash"
+        biomarkers = self._parse_gemini_response(text)
+        print(f"[GEMINI_SERVICE] ✅ {len(biomarkers)} biomarqueurs extraits: {list(biomarkers.keys())}")
+        return biomarkers, used_tokens
     
-    def _create_extraction_prompt(self) -> str:
+    def _generation_config(self) -> Optional[Dict[str, Any]]:
+        """Sortie JSON contrainte par le schéma (GEMINI_STRUCTURED_OUTPUT)"""
+        if not GEMINI_STRUCTURED_OUTPUT:
+            return None
+        return {
+            "response_mime_type": "application/json",
+            "response_schema": BIOMARKERS_RESPONSE_SCHEMA,
+        }
+
+    def _generate(
+        self, model, contents, emit: Optional[Callable[[str, float], None]] = None
+    ) -> Tuple[str, Optional[int]]:
         """
-        Créer le prompt optimisé pour l'extraction de biomarqueurs
+        Appel synchrone à Gemini (exécuté dans le pool dédié)
         
+        Args:
+            model: Modèle Gemini
+            contents: Document (le prompt est l'instruction système du modèle)
+            emit: Si fourni, la réponse est lue en streaming et chaque
+                  biomarqueur complet lui est transmis
+
         Returns:
-            Prompt formaté pour Gemini
+            (texte complet de la réponse, jetons consommés si Gemini les indique)
         """
-        return """
-Tu es un assistant médical spécialisé dans l'analyse de bilans sanguins.
-
-**TÂCHE :** Extrais UNIQUEMENT les biomarqueurs et leurs valeurs numériques de ce bilan sanguin PDF.
-
-**FORMAT DE SORTIE :**
-Retourne un JSON valide avec cette structure EXACTE (pas de texte avant ou après) :
-{
-  "hemoglobine": 13.2,
-  "cholesterol_total": 2.3,
-  "vitamine_d": 18,
-  "glucose": 0.95
-}
-
-**RÈGLES IMPORTANTES :**
-1. Utilise les noms de biomarqueurs en minuscules, avec underscores pour les espaces
-2. Extrais UNIQUEMENT les valeurs numériques (pas les unités)
-3. Si plusieurs valeurs pour un biomarqueur, prends la plus récente
-4. Ignore les valeurs de référence (min/max)
-5. Convertis les virgules en points pour les décimales
-6. Ne retourne QUE le JSON, aucun texte explicatif
-
-**NOMS STANDARDS À UTILISER :**
-- Hémoglobine → hemoglobine
-- Cholestérol total → cholesterol_total
-- Cholestérol HDL → cholesterol_hdl
-- Cholestérol LDL → cholesterol_ldl
-- Triglycérides → triglycerides
-- Glucose → glucose
-- Vitamine D → vitamine_d
-- Fer sérique → fer_serique
-- Ferritine → ferritine
-- TSH → tsh
-- Créatinine → creatinine
-- Urée → uree
-- ASAT/SGOT → asat
-- ALAT/SGPT → alat
-- Gamma GT → gamma_gt
-- Leucocytes → leucocytes
-- Plaquettes → plaquettes
-
-Retourne maintenant le JSON des biomarqueurs extraits :
-"""
+        config = self._generation_config()
+        if emit is None:
+            response = model.generate_content(contents, generation_config=config)
+            return response.text, _total_tokens(response)
+
+        # Un lecteur par appel : un duplicata (hedging) a sa propre réponse
+        parser = BiomarkerStreamParser()
+        chunks = []
+        used_tokens = None
+        for chunk in model.generate_content(contents, generation_config=config, stream=True):
+            chunks.append(chunk.text)
+            used_tokens = _total_tokens(chunk) or used_tokens
+            for name, value in parser.feed(chunk.text):
+                emit(name, value)
+        for name, value in parser.close():
+            emit(name, value)
+        return "".join(chunks), used_tokens
+
+    def _normalizing(self, emit: Callable[[str, float], None]) -> Callable[[str, float], None]:
+        """Transmettre les biomarqueurs lus en streaming sous leur nom normalisé"""
+        def normalized(raw_name: str, value: float):
+            emit(self._normalize_name(raw_name), value)
+
+        return normalized
+
+    def _normalize_name(self, key: str) -> str:
+        """Nom canonique du catalogue (synonymes, accents), sinon simple normalisation"""
+        resolution = get_name_resolver().resolve(key)
+        if resolution is not None:
+            return resolution.canonical
+        return key.lower().strip().replace(" ", "_")
     
     def _parse_gemini_response(self, response_text: str) -> Dict[str, float]:
         """
-        Parser la réponse de Gemini pour extraire le JSON
+        Parser la réponse de Gemini
+
+        Le texte autour du JSON (balises markdown, phrases) est ignoré et un
+        JSON tronqué conserve les biomarqueurs complets qui le précèdent.
         
         Args:
             response_text: Réponse brute de Gemini
@@ -208,111 +296,183 @@ Retourne maintenant le JSON des biomarqueurs extraits :
             Dictionnaire des biomarqueurs
             
         Raises:
-            ValueError: Si le JSON est invalide
-        """
-        try:
-            # Nettoyer la réponse (enlever les markdown code blocks si présents)
-            cleaned_text = response_text.strip()
-            
-            # Enlever les ```json et ``` si présents
-            if cleaned_text.startswith("```json"):
-                cleaned_text = cleaned_text[7:]
-            elif cleaned_text.startswith("```"):
-                cleaned_text = cleaned_text[3:]
-            
-            if cleaned_text.endswith("```"):
-                cleaned_text = cleaned_text[:-3]
-            
-            cleaned_text = cleaned_text.strip()
-            
-            # Parser le JSON
-            biomarkers = json.loads(cleaned_text)
-            
-            # Valider que c'est un dictionnaire
-            if not isinstance(biomarkers, dict):
-                raise ValueError("La réponse n'est pas un objet JSON valide")
-            
-            # Convertir toutes les valeurs en float
-            parsed_biomarkers = {}
-            for key, value in biomarkers.items():
-                try:
-                    # Normaliser le nom (minuscules, underscores)
-                    normalized_key = key.lower().strip().replace(" ", "_")
-                    
-                    # Convertir la valeur en float
-                    parsed_biomarkers[normalized_key] = float(value)
-                except (ValueError, TypeError):
-                    # Ignorer les valeurs non numériques
-                    continue
-            
-            if not parsed_biomarkers:
-                raise ValueError("Aucun biomarqueur valide trouvé dans la réponse")
-            
-            return parsed_biomarkers
-            
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Impossible de parser le JSON de Gemini : {str(e)}")
-    
-    async def validate_pdf(self, pdf_bytes: bytes, max_size_mb: int = 10) -> bool:
+            NoBiomarkersError: Si aucun biomarqueur n'est lisible
         """
-        Valider qu'un PDF est acceptable pour traitement
+        parsed_biomarkers = {}
+        for key, value in parse_biomarkers(response_text).items():
+            parsed_biomarkers[self._normalize_name(key)] = value
         
+        if not parsed_biomarkers:
+            raise NoBiomarkersError("Aucun biomarqueur valide trouvé dans la réponse")
+
+        return parsed_biomarkers
+
+
+def _total_tokens(response) -> Optional[int]:
+    """Jetons consommés d'après usage_metadata (absent selon les versions / réponses)"""
+    usage = getattr(response, "usage_metadata", None)
+    return getattr(usage, "total_token_count", None) or None
+
+
+def _generative_client(api_key: str):
+    """Client de l'API Gemini propre à une clé (genai.configure ne gère qu'une clé)"""
+    from google.ai import generativelanguage as glm
+    return glm.GenerativeServiceClient(client_options={"api_key": api_key})
+
+
+class KeyBoundModel:
+    """
+    Modèle Gemini appelé avec le client d'une clé secondaire du pool
+
+    genai.configure() fixe une seule clé pour tout le processus et
+    GenerativeModel utilise toujours ce client par défaut : les clés
+    secondaires passent par leur propre GenerativeServiceClient, avec les
+    mêmes requêtes et réponses que GenerativeModel.generate_content.
+    """
+
+    def __init__(self, model_name: str, client):
+        """
         Args:
-            pdf_bytes: Contenu du PDF
-            max_size_mb: Taille maximale en MB
-            
-        Returns:
-            True si valide
-            
-        Raises:
-            HTTPException: Si le PDF n'est pas valide
+            model_name: Nom du modèle
+            client: GenerativeServiceClient authentifié avec la clé
         """
-        # Vérifier la taille
-        size_mb = len(pdf_bytes) / (1024 * 1024)
-        if size_mb > max_size_mb:
-            raise HTTPException(
-                status_code=400,
-                detail=f"PDF trop volumineux ({size_mb:.1f} MB). Maximum : {max_size_mb} MB"
-            )
-        
-        # Vérifier que ce n'est pas vide
-        if len(pdf_bytes) == 0:
-            raise HTTPException(
-                status_code=400,
-                detail="Le fichier PDF est vide"
-            )
-        
-        return True
+        from google.generativeai.types import content_types
+
+        self.model_name = model_name if "/" in model_name else f"models/{model_name}"
+        self.client = client
+        self.system_instruction = content_types.to_content(EXTRACTION_PROMPT)
+
+    def generate_content(self, contents, generation_config=None, stream: bool = False):
+        """Même signature (sous-ensemble) et même réponse que GenerativeModel.generate_content"""
+        from google.generativeai import protos
+        from google.generativeai.types import content_types, generation_types
+
+        request = protos.GenerateContentRequest(
+            model=self.model_name,
+            contents=content_types.to_contents(contents),
+            generation_config=generation_types.to_generation_config_dict(generation_config),
+            system_instruction=self.system_instruction,
+        )
+        if request.contents and not request.contents[-1].role:
+            request.contents[-1].role = "user"
+        if stream:
+            with generation_types.rewrite_stream_error():
+                iterator = self.client.stream_generate_content(request)
+            return generation_types.GenerateContentResponse.from_iterator(iterator)
+        return generation_types.GenerateContentResponse.from_response(self.client.generate_content(request))
 
 
 # Instance singleton du service
 _gemini_service: Optional[GeminiService] = None
+_gemini_service_lock = threading.Lock()
+
+# Modèles autres que le modèle principal (routage, clés secondaires), par (nom, clé)
+_models: Dict[Tuple[str, Optional[str]], Any] = {}
+_models_lock = threading.Lock()
+
+# Pool dédié aux appels Gemini (partagé par toutes les instances du service)
+_gemini_executor: Optional[BoundedExecutor] = None
+
+# Relances, duplicata et disjoncteur des appels Gemini (partagés eux aussi)
+_gemini_resilience: Optional[ResilientCaller] = None
+
+
+def get_gemini_executor() -> BoundedExecutor:
+    """
+    Obtenir le pool d'exécution des appels Gemini
+
+    Returns:
+        BoundedExecutor configuré via app.config
+    """
+    global _gemini_executor
+
+    if _gemini_executor is None:
+        _gemini_executor = BoundedExecutor(
+            "gemini",
+            max_concurrency=GEMINI_MAX_CONCURRENCY,
+            max_queue=GEMINI_MAX_QUEUE,
+            timeout_seconds=GEMINI_TIMEOUT_SECONDS,
+        )
+    return _gemini_executor
+
+
+def get_gemini_resilience() -> ResilientCaller:
+    """
+    Obtenir la couche de résilience des appels Gemini
+
+    Returns:
+        ResilientCaller configuré via app.config
+    """
+    global _gemini_resilience
+
+    if _gemini_resilience is None:
+        _gemini_resilience = ResilientCaller(
+            "gemini",
+            max_attempts=GEMINI_RETRY_MAX_ATTEMPTS,
+            backoff_seconds=GEMINI_RETRY_BACKOFF,
+            backoff_max_seconds=GEMINI_RETRY_BACKOFF_MAX,
+            deadline_seconds=GEMINI_DEADLINE_SECONDS,
+            hedge_percentile=GEMINI_HEDGE_PERCENTILE,
+            hedge_min_delay=GEMINI_HEDGE_MIN_DELAY,
+            hedge_initial_delay=GEMINI_HEDGE_INITIAL_DELAY,
+            breaker=CircuitBreaker(
+                "gemini",
+                failure_threshold=GEMINI_BREAKER_FAILURES,
+                reset_seconds=GEMINI_BREAKER_RESET_SECONDS,
+            ),
+        )
+    return _gemini_resilience
 
 
 def get_gemini_service() -> GeminiService:
     """
     Obtenir l'instance singleton du service Gemini
     
+    Créée une seule fois, même en cas d'appels simultanés. Si le modèle
+    mémorisé est absent ou expiré, le listing des modèles est lancé en
+    arrière-plan : l'appel ne bloque jamais dessus.
+
     Returns:
         Instance du GeminiService
     """
     global _gemini_service
     
-    print("[GET_GEMINI_SERVICE] Appel de get_gemini_service()")
-    print(f"[GET_GEMINI_SERVICE] Service déjà initialisé? {_gemini_service is not None}")
-    
     if _gemini_service is None:
-        print("[GET_GEMINI_SERVICE] Création d'une nouvelle instance...")
-        try:
-            _gemini_service = GeminiService()
-            print("[GET_GEMINI_SERVICE] ✅ Instance créée avec succès")
-        except Exception as e:
-            print(f"[GET_GEMINI_SERVICE] ❌ Erreur lors de la création: {e}")
-            import traceback
-            traceback.print_exc()
-            raise
-    else:
-        print("[GET_GEMINI_SERVICE] Réutilisation de l'instance existante")
+        with _gemini_service_lock:
+            if _gemini_service is None:
+                print("[GET_GEMINI_SERVICE] Création d'une nouvelle instance...")
+                try:
+                    service = GeminiService()
+                    print("[GET_GEMINI_SERVICE] ✅ Instance créée avec succès")
+                except Exception as e:
+                    print(f"[GET_GEMINI_SERVICE] ❌ Erreur lors de la création: {e}")
+                    import traceback
+                    traceback.print_exc()
+                    raise
+                if not service.model_resolved:
+                    refresh_model_in_background(genai, service.api_key, service.set_model)
+                _gemini_service = service
     
     return _gemini_service
 
+
+def init_gemini_service():
+    """
+    Initialiser le service Gemini au démarrage (API ou worker)
+
+    Une clé absente ou invalide n'empêche pas le démarrage : seules les
+    extractions Gemini échoueront.
+    """
+    try:
+        service = get_gemini_service()
+    except Exception as e:
+        print(f"[GEMINI_SERVICE] ⚠️ Service Gemini non initialisé au démarrage: {e}")
+        return
+    if get_cassette_store().replaying:
+        return
+    # Contexte en cache seulement si le prompt atteint le minimum de jetons
+    # (vérifié ici, une fois) ; enregistrement en arrière-plan
+    prompt_cache = get_prompt_context_cache()
+    if prompt_cache.enabled and service.model is not None and prompt_cache.check_eligibility(service.model):
+        prompt_cache.model_for(service.model_name)
+
@@ -0,0 +1,256 @@
+"""
+Rejeu des réponses pour les requêtes portant un en-tête `Idempotency-Key`
+
+Un client qui relance une requête après un timeout (réseau mobile instable)
+ne doit pas relancer l'extraction Gemini ni le rendu reportlab :
+- la première réponse terminée est conservée et rejouée pour les
+  répétitions de la même clé avec le même contenu ;
+- une répétition arrivant pendant le traitement attend la réponse en cours ;
+- la même clé avec un contenu différent est refusée (422).
+
+Les réponses 2xx et 4xx sont conservées (un PDF invalide le restera) ; une
+erreur 5xx libère la clé pour que la relance soit réellement exécutée. Le
+stockage est borné en nombre d'entrées, en taille cumulée et en durée.
+"""
+import asyncio
+import concurrent.futures
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Response
+
+from app.config import IDEMPOTENCY_MAX_ENTRIES, IDEMPOTENCY_MAX_MB, IDEMPOTENCY_TTL
+
+# Longueur maximale acceptée pour une clé
+MAX_KEY_LENGTH = 255
+
+# En-tête ajouté aux réponses rejouées
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+@dataclass
+class StoredResponse:
+    """Réponse conservée pour rejeu"""
+    status_code: int
+    body: bytes
+    media_type: str
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_http_exception(cls, error: HTTPException) -> "StoredResponse":
+        return cls(
+            status_code=error.status_code,
+            body=json.dumps({"detail": error.detail}).encode("utf-8"),
+            media_type="application/json",
+            headers=dict(error.headers or {}),
+        )
+
+    def to_response(self, replayed: bool) -> Response:
+        headers = dict(self.headers)
+        headers[REPLAYED_HEADER] = "true" if replayed else "false"
+        return Response(
+            content=self.body,
+            status_code=self.status_code,
+            media_type=self.media_type,
+            headers=headers,
+        )
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    created_at: float
+    future: Optional[concurrent.futures.Future] = None  # traitement en cours
+    response: Optional[StoredResponse] = None  # réponse terminée
+
+
+class IdempotencyStore:
+    """Stockage borné (LRU + TTL + taille) des réponses par clé d'idempotence"""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: int = 24 * 3600, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            max_entries: Nombre maximal de clés conservées
+            ttl_seconds: Durée de conservation d'une réponse
+            max_bytes: Taille cumulée maximale des réponses conservées
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._tasks = set()  # références des traitements en cours
+
+        self.executed = 0
+        self.replayed = 0
+        self.waited = 0
+        self.conflicts = 0
+        self.evictions = 0
+
+    async def run(
+        self,
+        scope: str,
+        key: str,
+        fingerprint: str,
+        produce: Callable[[], Awaitable[StoredResponse]],
+    ) -> Response:
+        """
+        Exécuter `produce` une seule fois par (scope, clé), puis rejouer sa réponse
+
+        Args:
+            scope: Endpoint concerné (les clés de deux endpoints sont indépendantes)
+            key: Valeur de l'en-tête Idempotency-Key
+            fingerprint: Empreinte du contenu de la requête
+            produce: Fabrique de la réponse (exécutée par la première requête)
+
+        Returns:
+            Réponse HTTP (en-tête Idempotent-Replayed à "true" si rejouée)
+
+        Raises:
+            HTTPException: 400 si la clé est invalide, 422 si elle a déjà servi
+                           pour un contenu différent, ou erreur 5xx de `produce`
+        """
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=400,
+                detail=f"En-tête Idempotency-Key invalide (1 à {MAX_KEY_LENGTH} caractères)"
+            )
+
+        entry_key = (scope, key)
+        with self._lock:
+            self._evict_locked()
+            entry = self._entries.get(entry_key)
+            if entry is not None:
+                if entry.fingerprint != fingerprint:
+                    self.conflicts += 1
+                    raise HTTPException(
+                        status_code=422,
+                        detail="Cette Idempotency-Key a déjà été utilisée pour une requête différente"
+                    )
+                if entry.response is not None:
+                    self._entries.move_to_end(entry_key)
+                    self.replayed += 1
+                    return entry.response.to_response(replayed=True)
+                pending = entry.future
+                self.waited += 1
+            else:
+                pending = None
+                entry = _Entry(fingerprint=fingerprint, created_at=time.time(),
+                               future=concurrent.futures.Future())
+                self._entries[entry_key] = entry
+                self.executed += 1
+
+        if pending is not None:
+            print(f"[IDEMPOTENCY] {scope}: clé en cours de traitement, attente de la réponse")
+            stored = await asyncio.shield(asyncio.wrap_future(pending))
+            return stored.to_response(replayed=True)
+
+        # Tâche indépendante : si le client se déconnecte, le traitement se
+        # termine quand même et sa réponse sera rejouée lors de la relance
+        future = entry.future
+        task = asyncio.ensure_future(self._execute(entry_key, entry, produce))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        stored = await asyncio.shield(asyncio.wrap_future(future))
+        return stored.to_response(replayed=False)
+
+    async def _execute(
+        self,
+        entry_key: Tuple[str, str],
+        entry: _Entry,
+        produce: Callable[[], Awaitable[StoredResponse]],
+    ):
+        """Produire la réponse, la conserver et la transmettre aux requêtes en attente"""
+        future = entry.future
+        try:
+            stored = await produce()
+        except HTTPException as e:
+            if e.status_code >= 500:
+                self._release(entry_key, entry)
+                future.set_exception(e)
+                return
+            stored = StoredResponse.from_http_exception(e)
+        except BaseException as e:
+            self._release(entry_key, entry)
+            future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        with self._lock:
+            entry.response = stored
+            entry.future = None
+            entry.created_at = time.time()
+            if self._entries.get(entry_key) is entry:
+                self._bytes += len(stored.body)
+                self._evict_locked()
+        future.set_result(stored)
+
+    def _release(self, entry_key: Tuple[str, str], entry: _Entry):
+        """Libérer une clé dont le traitement a échoué (la relance sera exécutée)"""
+        with self._lock:
+            if self._entries.get(entry_key) is entry:
+                del self._entries[entry_key]
+
+    def _evict_locked(self):
+        """Évincer les réponses expirées, puis les plus anciennes au-delà des limites (verrou acquis)"""
+        now = time.time()
+        for entry_key, entry in list(self._entries.items()):
+            if entry.response is not None and now - entry.created_at > self.ttl_seconds:
+                self._drop_locked(entry_key)
+
+        completed = [k for k, e in self._entries.items() if e.response is not None]
+        while completed and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._drop_locked(completed.pop(0))
+
+    def _drop_locked(self, entry_key: Tuple[str, str]):
+        entry = self._entries.pop(entry_key)
+        if entry.response is not None:
+            self._bytes -= len(entry.response.body)
+        self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs : requêtes exécutées, rejouées, en attente, conflits, occupation"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "in_flight": sum(1 for e in self._entries.values() if e.response is None),
+                "stored_bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "executed": self.executed,
+                "replayed": self.replayed,
+                "waited": self.waited,
+                "conflicts": self.conflicts,
+                "evictions": self.evictions,
+            }
+
+
+# Instance singleton du stockage
+_idempotency_store: Optional[IdempotencyStore] = None
+_idempotency_store_lock = threading.Lock()
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """
+    Obtenir l'instance singleton du stockage d'idempotence (configuré via app.config)
+
+    Returns:
+        Instance de IdempotencyStore
+    """
+    global _idempotency_store
+
+    if _idempotency_store is None:
+        with _idempotency_store_lock:
+            if _idempotency_store is None:
+                _idempotency_store = IdempotencyStore(
+                    max_entries=IDEMPOTENCY_MAX_ENTRIES,
+                    ttl_seconds=IDEMPOTENCY_TTL,
+                    max_bytes=IDEMPOTENCY_MAX_MB * 1024 * 1024,
+                )
+    return _idempotency_store
@@ -0,0 +1,195 @@
+"""
+Préparation des photos de bilans avant l'envoi à Gemini
+
+Une photo de téléphone (12 mégapixels, 3 à 5 Mo) est bien plus lourde que
+nécessaire pour lire un tableau de résultats. Chaque photo est :
+- décodée directement à taille réduite quand le format le permet (JPEG) ;
+- redressée selon son orientation EXIF ;
+- convertie en niveaux de gris ;
+- recadrée sur la feuille puis sur la zone imprimée (table, ombres et
+  marges écartées) ;
+- réduite (IMAGE_MAX_SIDE pixels au plus) et contrastée ;
+- réencodée en JPEG (IMAGE_JPEG_QUALITY).
+
+Le contenu envoyé à Gemini est ainsi environ dix fois plus léger.
+"""
+import io
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from PIL import Image, ImageFilter, ImageOps, ImageStat, UnidentifiedImageError
+
+from app.config import IMAGE_JPEG_QUALITY, IMAGE_MAX_SIDE
+
+# Taille de la copie utilisée pour détecter la feuille et la zone imprimée
+ANALYSIS_SIDE = 512
+
+# Plus petit côté accepté (px) : en dessous, aucun bilan n'est lisible
+MIN_IMAGE_SIDE = 32
+
+# Écart de luminosité avec le papier à partir duquel un pixel est de l'encre
+INK_CONTRAST = 25
+
+# Part minimale de l'image occupée par la feuille détectée (sinon pas de recadrage)
+MIN_PAPER_AREA = 0.2
+
+# Marge conservée autour de la zone imprimée (part de la dimension)
+CONTENT_MARGIN = 0.02
+
+
+@dataclass
+class PreparedImage:
+    """Photo prête pour l'extraction"""
+    data: bytes  # JPEG en niveaux de gris
+    width: int
+    height: int
+    original_bytes: int
+    original_width: int
+    original_height: int
+
+    mime_type = "image/jpeg"
+
+
+def _otsu_threshold(image: Image.Image) -> int:
+    """Seuil séparant au mieux les pixels clairs (papier) des pixels sombres"""
+    histogram = image.histogram()[:256]
+    total = sum(histogram)
+    weighted_total = sum(i * count for i, count in enumerate(histogram))
+    background, background_sum = 0, 0.0
+    best, threshold = -1.0, 128
+    for level, count in enumerate(histogram):
+        background += count
+        if background == 0:
+            continue
+        foreground = total - background
+        if foreground == 0:
+            break
+        background_sum += level * count
+        mean_background = background_sum / background
+        mean_foreground = (weighted_total - background_sum) / foreground
+        variance = background * foreground * (mean_background - mean_foreground) ** 2
+        if variance > best:
+            best, threshold = variance, level
+    return threshold
+
+
+def _content_box(gray: Image.Image) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Zone utile d'une photo (feuille, puis texte imprimé sur la feuille)
+
+    Args:
+        gray: Image en niveaux de gris
+
+    Returns:
+        (gauche, haut, droite, bas) en pixels de `gray`, ou None si la feuille
+        n'est pas identifiable
+    """
+    small = gray.copy()
+    small.thumbnail((ANALYSIS_SIDE, ANALYSIS_SIDE))
+    scale_x = gray.width / small.width
+    scale_y = gray.height / small.height
+    threshold = _otsu_threshold(small)
+
+    # Feuille : plus grande zone claire (les filtres effacent le texte et les reflets isolés)
+    paper = small.point(lambda p: 255 if p > threshold else 0).filter(ImageFilter.MedianFilter(5))
+    paper_box = paper.getbbox()
+    if paper_box is None:
+        return None
+    left, top, right, bottom = paper_box
+    if (right - left) * (bottom - top) < MIN_PAPER_AREA * small.width * small.height:
+        return None
+
+    # Texte imprimé : pixels nettement plus sombres que le papier, à l'intérieur
+    # de la feuille (bords et ombres exclus) ; les traits fins, éclaircis par
+    # la réduction, sont d'abord épaissis
+    inset_x = max(1, int((right - left) * CONTENT_MARGIN))
+    inset_y = max(1, int((bottom - top) * CONTENT_MARGIN))
+    inner = (left + inset_x, top + inset_y, right - inset_x, bottom - inset_y)
+    ink_box = None
+    # Feuille trop étroite pour en retirer les bords : recadrage sur la feuille seule
+    # (filtrer une image vide fait planter Pillow)
+    if inner[2] - inner[0] >= 3 and inner[3] - inner[1] >= 3:
+        sheet = small.crop(inner)
+        ink_level = ImageStat.Stat(sheet).median[0] - INK_CONTRAST
+        ink = sheet.filter(ImageFilter.MinFilter(3)).point(lambda p: 255 if p < ink_level else 0)
+        ink_box = ink.getbbox()
+    if ink_box is not None:
+        margin_x = int(small.width * CONTENT_MARGIN)
+        margin_y = int(small.height * CONTENT_MARGIN)
+        left = max(left, inner[0] + ink_box[0] - margin_x)
+        top = max(top, inner[1] + ink_box[1] - margin_y)
+        right = min(right, inner[0] + ink_box[2] + margin_x)
+        bottom = min(bottom, inner[1] + ink_box[3] + margin_y)
+
+    return (
+        int(left * scale_x),
+        int(top * scale_y),
+        min(gray.width, int(round(right * scale_x))),
+        min(gray.height, int(round(bottom * scale_y))),
+    )
+
+
+def prepare_image(data: bytes, max_side: int = IMAGE_MAX_SIDE, quality: int = IMAGE_JPEG_QUALITY) -> PreparedImage:
+    """
+    Réduire, recadrer et réencoder une photo de bilan
+
+    Args:
+        data: Contenu de la photo (JPEG, PNG ou WebP)
+        max_side: Plus grand côté de l'image produite (px)
+        quality: Qualité JPEG de l'image produite
+
+    Returns:
+        PreparedImage
+
+    Raises:
+        HTTPException: Si l'image est illisible ou trop petite
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        original_width, original_height = image.size
+        if min(original_width, original_height) < MIN_IMAGE_SIDE:
+            print(f"[IMAGE_PREPARATION] ❌ Image trop petite: {original_width}x{original_height}")
+            raise HTTPException(
+                status_code=400,
+                detail=f"Image trop petite ({original_width}x{original_height} px). "
+                       f"Minimum : {MIN_IMAGE_SIDE} px de côté."
+            )
+        # JPEG : décodage direct à une échelle réduite (1/2, 1/4, 1/8), bien plus rapide
+        image.draft("L", (max_side * 2, max_side * 2))
+        image = ImageOps.exif_transpose(image)
+        gray = image.convert("L")
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        print(f"[IMAGE_PREPARATION] ❌ Image illisible: {e}")
+        raise HTTPException(
+            status_code=400,
+            detail="Image illisible. Formats acceptés : JPEG, PNG ou WebP."
+        )
+
+    box = _content_box(gray)
+    if box is not None:
+        gray = gray.crop(box)
+    gray.thumbnail((max_side, max_side), Image.LANCZOS)
+    gray = ImageOps.autocontrast(gray, cutoff=1)
+
+    output = io.BytesIO()
+    gray.save(output, format="JPEG", quality=quality, optimize=True)
+    prepared = PreparedImage(
+        data=output.getvalue(),
+        width=gray.width,
+        height=gray.height,
+        original_bytes=len(data),
+        original_width=original_width,
+        original_height=original_height,
+    )
+    print(
+        f"[IMAGE_PREPARATION] {original_width}x{original_height} ({len(data)} bytes) -> "
+        f"{prepared.width}x{prepared.height} ({len(prepared.data)} bytes)"
+        f"{' recadrée' if box is not None else ''}"
+    )
+    return prepared
+
+
+def prepare_images(images: List[bytes]) -> List[PreparedImage]:
+    """Préparer les photos d'un bilan (une par page), dans l'ordre"""
+    return [prepare_image(data) for data in images]
@@ -0,0 +1,472 @@
+"""
+File de jobs persistante dans la base de données (table `analysis_jobs`)
+
+L'API enregistre les jobs ; des processus workers dédiés (`python -m app.worker`)
+les consomment. La réservation utilise `SELECT ... FOR UPDATE SKIP LOCKED`
+(PostgreSQL) : plusieurs workers se partagent la file sans se bloquer ni
+traiter deux fois le même job.
+
+- Délai de visibilité : un job réservé dont le worker ne donne plus signe
+  de vie au-delà de `locked_until` redevient disponible.
+- Relances : une erreur transitoire (5xx, exception inattendue) replanifie
+  le job avec un délai exponentiel ; une erreur définitive (4xx : PDF
+  invalide, aucun biomarqueur...) le termine en "failed".
+- Dead-letter : après `max_attempts` tentatives, le job passe en "dead" et
+  n'est plus repris ; il reste consultable pour diagnostic.
+"""
+import asyncio
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import (
+    JOBS_MAX_ATTEMPTS,
+    JOBS_POLL_INTERVAL,
+    JOBS_RESULT_TTL,
+    JOBS_RETRY_BACKOFF,
+    JOBS_RETRY_BACKOFF_MAX,
+    JOBS_VISIBILITY_TIMEOUT,
+)
+from app.database.connection import SessionLocal
+from app.models.jobs import AnalysisJobRecord
+from app.services.jobs import (
+    FINISHED_STATUSES,
+    JOB_DEAD,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    Job,
+    format_timestamp,
+)
+
+# Nombre de candidats lus par job à réserver
+CLAIM_OVERFETCH = 4
+
+
+def _epoch(value: Optional[datetime]) -> Optional[float]:
+    """Instant epoch d'une date UTC naïve (colonnes DateTime)"""
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+@dataclass
+class ClaimedJob:
+    """Job réservé par un worker"""
+    id: str
+    kind: str
+    payload: bytes
+    attempt: int  # numéro de tentative, sert aussi de jeton de réservation
+    max_attempts: int
+
+
+class DatabaseJobQueue:
+    """File de jobs stockée dans la table analysis_jobs"""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        visibility_timeout: int = 300,
+        max_attempts: int = 3,
+        retry_backoff: float = 5.0,
+        retry_backoff_max: float = 300.0,
+        ttl_seconds: int = 3600,
+        poll_interval: float = 1.0,
+    ):
+        """
+        Args:
+            session_factory: Fabrique de sessions SQLAlchemy
+            visibility_timeout: Durée de réservation d'un job par un worker (s)
+            max_attempts: Nombre maximal de tentatives avant dead-letter
+            retry_backoff: Délai avant la première relance (s), doublé à chaque tentative
+            retry_backoff_max: Délai maximal entre deux tentatives (s)
+            ttl_seconds: Durée de conservation d'un job terminé
+            poll_interval: Intervalle de consultation de la table (flux d'événements)
+        """
+        self.session_factory = session_factory
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self.ttl_seconds = ttl_seconds
+        self.poll_interval = poll_interval
+
+    @staticmethod
+    def _event(events: List[Dict[str, Any]], event_type: str, **payload: Any) -> List[Dict[str, Any]]:
+        """Nouvelle liste d'événements (la colonne JSON doit être réaffectée)"""
+        event = {
+            "seq": len(events) + 1,
+            "type": event_type,
+            "at": format_timestamp(time.time()),
+            **{key: value for key, value in payload.items() if value is not None},
+        }
+        return list(events) + [event]
+
+    def retry_delay(self, attempt: int) -> float:
+        """Délai avant la tentative suivante : exponentiel, plafonné, avec gigue de ±20 %"""
+        delay = min(self.retry_backoff * (2 ** (attempt - 1)), self.retry_backoff_max)
+        return delay * random.uniform(0.8, 1.2)
+
+    # ----- Côté API -----
+
+    def enqueue(self, kind: str, payload: bytes) -> Job:
+        """
+        Enregistrer un nouveau job
+
+        Args:
+            kind: Type de job (ex: "analyze_pdf")
+            payload: Contenu à traiter
+
+        Returns:
+            Job créé, à l'état "queued"
+        """
+        now = datetime.utcnow()
+        record = AnalysisJobRecord(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            status=JOB_QUEUED,
+            payload=payload,
+            attempts=0,
+            max_attempts=self.max_attempts,
+            available_at=now,
+            events=self._event([], "status", status=JOB_QUEUED),
+            created_at=now,
+            updated_at=now,
+        )
+        with self.session_factory() as db:
+            db.add(record)
+            db.commit()
+            print(f"[JOB_QUEUE] Job {record.id} enregistré ({kind}, {len(payload)} bytes)")
+            return self._to_job(record)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Récupérer un job
+
+        Args:
+            job_id: Identifiant du job
+
+        Returns:
+            Job, ou None s'il est inconnu ou expiré
+        """
+        with self.session_factory() as db:
+            record = db.get(AnalysisJobRecord, job_id)
+            if record is None or self._is_expired(record):
+                return None
+            return self._to_job(record)
+
+    async def events(self, job_id: str, heartbeat_seconds: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Suivre les événements d'un job jusqu'à sa fin (consultation périodique de la table)
+
+        Args:
+            job_id: Identifiant du job
+            heartbeat_seconds: Intervalle des battements de cœur (`None` produit)
+        """
+        last_seq = 0
+        last_activity = time.monotonic()
+        while True:
+            job = await asyncio.to_thread(self.get, job_id)
+            if job is None:
+                return
+            for event in job.events[last_seq:]:
+                last_seq = event["seq"]
+                last_activity = time.monotonic()
+                yield event
+            if job.finished:
+                return
+            if time.monotonic() - last_activity >= heartbeat_seconds:
+                last_activity = time.monotonic()
+                yield None
+            await asyncio.sleep(self.poll_interval)
+
+    def _is_expired(self, record: AnalysisJobRecord) -> bool:
+        return (
+            record.finished_at is not None
+            and datetime.utcnow() - record.finished_at > timedelta(seconds=self.ttl_seconds)
+        )
+
+    @staticmethod
+    def _to_job(record: AnalysisJobRecord) -> Job:
+        return Job(
+            id=record.id,
+            kind=record.kind,
+            created_at=_epoch(record.created_at),
+            updated_at=_epoch(record.updated_at),
+            status=record.status,
+            stage=record.stage,
+            events=list(record.events or []),
+            result=record.result,
+            error=record.error,
+            error_status=record.error_status,
+            started_at=_epoch(record.started_at),
+            finished_at=_epoch(record.finished_at),
+        )
+
+    # ----- Côté worker -----
+
+    def claim(self, worker_id: str, limit: int = 1) -> List[ClaimedJob]:
+        """
+        Réserver des jobs disponibles
+
+        Sont disponibles les jobs "queued" dont `available_at` est passé et
+        les jobs "running" dont la réservation a expiré. Un job expiré ayant
+        épuisé ses tentatives passe en dead-letter au lieu d'être repris.
+
+        Args:
+            worker_id: Identifiant du worker
+            limit: Nombre maximal de jobs à réserver
+
+        Returns:
+            Jobs réservés (éventuellement aucun)
+        """
+        now = datetime.utcnow()
+        claimed: List[ClaimedJob] = []
+        with self.session_factory() as db:
+            candidates = db.execute(
+                select(AnalysisJobRecord)
+                .where(or_(
+                    and_(AnalysisJobRecord.status == JOB_QUEUED, AnalysisJobRecord.available_at <= now),
+                    and_(AnalysisJobRecord.status == JOB_RUNNING, AnalysisJobRecord.locked_until < now),
+                ))
+                .order_by(AnalysisJobRecord.available_at)
+                # Marge pour les bases sans SKIP LOCKED, où des workers concurrents
+                # voient les mêmes candidats et perdent la mise à jour conditionnelle
+                .limit(limit * CLAIM_OVERFETCH)
+                .with_for_update(skip_locked=True)
+            ).scalars().all()
+
+            for record in candidates:
+                if len(claimed) >= limit:
+                    break
+                expired_lease = record.status == JOB_RUNNING
+                if expired_lease and record.attempts >= record.max_attempts:
+                    self._dead_letter(db, record, f"Délai de visibilité dépassé ({record.attempts} tentatives)")
+                    continue
+
+                events = record.events or []
+                if expired_lease:
+                    events = self._event(events, "status", status=JOB_QUEUED,
+                                         error=f"Réservation de {record.locked_by} expirée")
+                attempt = record.attempts + 1
+                # Mise à jour conditionnelle : sans SKIP LOCKED (SQLite), un seul worker l'emporte
+                won = db.execute(
+                    update(AnalysisJobRecord)
+                    .where(
+                        AnalysisJobRecord.id == record.id,
+                        AnalysisJobRecord.status == record.status,
+                        AnalysisJobRecord.attempts == record.attempts,
+                    )
+                    .values(
+                        status=JOB_RUNNING,
+                        attempts=attempt,
+                        locked_by=worker_id,
+                        locked_until=now + timedelta(seconds=self.visibility_timeout),
+                        started_at=now,
+                        updated_at=now,
+                        events=self._event(events, "status", status=JOB_RUNNING, attempt=attempt),
+                    )
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                if won:
+                    claimed.append(ClaimedJob(
+                        id=record.id,
+                        kind=record.kind,
+                        payload=record.payload or b"",
+                        attempt=attempt,
+                        max_attempts=record.max_attempts,
+                    ))
+            db.commit()
+        return claimed
+
+    def _locked(self, db: Session, job: ClaimedJob, worker_id: str) -> Optional[AnalysisJobRecord]:
+        """Relire un job réservé, si la réservation appartient toujours au worker"""
+        record = db.execute(
+            select(AnalysisJobRecord)
+            .where(
+                AnalysisJobRecord.id == job.id,
+                AnalysisJobRecord.status == JOB_RUNNING,
+                AnalysisJobRecord.locked_by == worker_id,
+                AnalysisJobRecord.attempts == job.attempt,
+            )
+            .with_for_update()
+        ).scalar_one_or_none()
+        if record is None:
+            print(f"[JOB_QUEUE] ⚠️ Réservation du job {job.id} perdue par {worker_id}")
+        return record
+
+    def record_stage(self, job: ClaimedJob, worker_id: str, stage: str, detail: Dict[str, Any]) -> bool:
+        """
+        Enregistrer une étape franchie et prolonger la réservation
+
+        Returns:
+            False si la réservation a été perdue (job repris par un autre worker)
+        """
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            record = self._locked(db, job, worker_id)
+            if record is None:
+                return False
+            record.stage = stage
+            record.events = self._event(record.events or [], "stage", stage=stage, detail=detail)
+            record.locked_until = now + timedelta(seconds=self.visibility_timeout)
+            record.updated_at = now
+            db.commit()
+        return True
+
+    def complete(self, job: ClaimedJob, worker_id: str, result: Any) -> bool:
+        """
+        Terminer un job avec succès
+
+        Returns:
+            False si la réservation a été perdue
+        """
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            record = self._locked(db, job, worker_id)
+            if record is None:
+                return False
+            record.status = JOB_SUCCEEDED
+            record.result = result
+            record.payload = None
+            record.locked_by = None
+            record.locked_until = None
+            record.finished_at = now
+            record.updated_at = now
+            record.events = self._event(record.events or [], "status", status=JOB_SUCCEEDED)
+            db.commit()
+        return True
+
+    def fail(self, job: ClaimedJob, worker_id: str, error: str,
+             error_status: int = 500, retryable: bool = True) -> Optional[str]:
+        """
+        Enregistrer l'échec d'une tentative
+
+        Args:
+            job: Job réservé
+            worker_id: Identifiant du worker
+            error: Message d'erreur
+            error_status: Code HTTP équivalent
+            retryable: L'erreur est-elle transitoire ?
+
+        Returns:
+            Nouveau statut ("queued", "failed" ou "dead"), ou None si la réservation a été perdue
+        """
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            record = self._locked(db, job, worker_id)
+            if record is None:
+                return None
+            record.error = error
+            record.error_status = error_status
+            record.locked_by = None
+            record.locked_until = None
+            record.updated_at = now
+
+            if not retryable:
+                record.status = JOB_FAILED
+                record.payload = None
+                record.finished_at = now
+                record.events = self._event(record.events or [], "status", status=JOB_FAILED,
+                                            error=error, error_status=error_status)
+            elif record.attempts >= record.max_attempts:
+                self._dead_letter(db, record, error)
+            else:
+                delay = self.retry_delay(record.attempts)
+                record.status = JOB_QUEUED
+                record.available_at = now + timedelta(seconds=delay)
+                record.events = self._event(record.events or [], "status", status=JOB_QUEUED,
+                                            error=error, retry_in_seconds=round(delay, 1))
+            db.commit()
+            return record.status
+
+    def _dead_letter(self, db: Session, record: AnalysisJobRecord, error: str):
+        """Passer un job en dead-letter (transaction en cours)"""
+        now = datetime.utcnow()
+        record.status = JOB_DEAD
+        record.error = error
+        record.error_status = record.error_status or 500
+        record.payload = None
+        record.locked_by = None
+        record.locked_until = None
+        record.finished_at = now
+        record.updated_at = now
+        record.events = self._event(record.events or [], "status", status=JOB_DEAD,
+                                    error=error, error_status=record.error_status)
+        print(f"[JOB_QUEUE] ☠️ Job {record.id} en dead-letter après {record.attempts} tentative(s): {error}")
+
+    def purge_expired(self) -> int:
+        """
+        Supprimer les jobs terminés depuis plus de `ttl_seconds`
+
+        Returns:
+            Nombre de jobs supprimés
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        with self.session_factory() as db:
+            deleted = db.execute(
+                delete(AnalysisJobRecord).where(
+                    AnalysisJobRecord.status.in_(FINISHED_STATUSES),
+                    AnalysisJobRecord.finished_at < cutoff,
+                )
+            ).rowcount
+            db.commit()
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        """Nombre de jobs par statut et ancienneté du plus vieux job en attente"""
+        with self.session_factory() as db:
+            counts = dict(
+                db.execute(
+                    select(AnalysisJobRecord.status, func.count())
+                    .group_by(AnalysisJobRecord.status)
+                ).all()
+            )
+            oldest = db.execute(
+                select(func.min(AnalysisJobRecord.created_at))
+                .where(AnalysisJobRecord.status == JOB_QUEUED)
+            ).scalar()
+        return {
+            "backend": "database",
+            "visibility_timeout": self.visibility_timeout,
+            "max_attempts": self.max_attempts,
+            "ttl_seconds": self.ttl_seconds,
+            **{status: counts.get(status, 0) for status in (JOB_QUEUED, JOB_RUNNING, *FINISHED_STATUSES)},
+            "oldest_queued_age_s": round((datetime.utcnow() - oldest).total_seconds(), 1) if oldest else 0.0,
+        }
+
+
+# Instance singleton de la file persistante
+_job_queue: Optional[DatabaseJobQueue] = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> DatabaseJobQueue:
+    """
+    Obtenir l'instance singleton de la file persistante (configurée via app.config)
+
+    Returns:
+        Instance de DatabaseJobQueue
+    """
+    global _job_queue
+
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = DatabaseJobQueue(
+                    visibility_timeout=JOBS_VISIBILITY_TIMEOUT,
+                    max_attempts=JOBS_MAX_ATTEMPTS,
+                    retry_backoff=JOBS_RETRY_BACKOFF,
+                    retry_backoff_max=JOBS_RETRY_BACKOFF_MAX,
+                    ttl_seconds=JOBS_RESULT_TTL,
+                    poll_interval=JOBS_POLL_INTERVAL,
+                )
+    return _job_queue
@@ -0,0 +1,425 @@
+"""
+Jobs d'analyse asynchrones
+
+La requête HTTP qui soumet un job rend la main immédiatement ; le travail
+s'exécute dans un pool de workers dédié (une boucle d'événements dans un
+thread à part, `max_workers` jobs simultanés). Chaque changement d'état est
+enregistré comme un événement numéroté, consultable par polling ou diffusé
+en direct aux abonnés (flux SSE). Les jobs terminés sont conservés pendant
+`ttl_seconds` puis évincés.
+"""
+import asyncio
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.config import (
+    JOBS_BACKEND,
+    JOBS_MAX_PENDING,
+    JOBS_MAX_RETAINED,
+    JOBS_MAX_WORKERS,
+    JOBS_RESULT_TTL,
+)
+from app.services.concurrency import percentile
+
+# Statuts d'un job
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_DEAD = "dead"  # échecs répétés (file persistante uniquement)
+
+FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_FAILED, JOB_DEAD)
+
+# Fonction de rapport d'étape passée au travail : (nom de l'étape, détails)
+StageReporter = Callable[[str, Dict[str, Any]], None]
+JobWork = Callable[[StageReporter], Awaitable[Any]]
+
+
+class JobQueueFullError(Exception):
+    """Trop de jobs sont déjà en attente ou en cours"""
+
+
+def format_timestamp(epoch: float) -> str:
+    """Horodatage ISO 8601 (UTC) d'un instant epoch"""
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat()
+
+
+@dataclass
+class Job:
+    """État d'un job d'analyse"""
+    id: str
+    kind: str
+    created_at: float
+    updated_at: float
+    status: str = JOB_QUEUED
+    stage: Optional[str] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    error_status: Optional[int] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Représentation sérialisable (API)"""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "created_at": format_timestamp(self.created_at),
+            "updated_at": format_timestamp(self.updated_at),
+            "finished_at": format_timestamp(self.finished_at) if self.finished_at else None,
+            "events": list(self.events),
+            "result": self.result,
+            "error": self.error,
+            "error_status": self.error_status,
+        }
+
+
+class JobManager:
+    """Pool de workers en arrière-plan et registre des jobs"""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_pending: int = 100,
+        ttl_seconds: int = 3600,
+        max_retained: int = 1000,
+        samples: int = 1000,
+    ):
+        """
+        Args:
+            max_workers: Nombre de jobs exécutés simultanément
+            max_pending: Nombre maximal de jobs en attente ou en cours
+            ttl_seconds: Durée de conservation d'un job terminé
+            max_retained: Nombre maximal de jobs terminés conservés
+            samples: Nombre de durées conservées pour les percentiles
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self.max_retained = max_retained
+
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._finished_order: Deque[str] = deque()
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected = 0
+        self.evicted = 0
+        self._queue_times: Deque[float] = deque(maxlen=samples)
+        self._run_times: Deque[float] = deque(maxlen=samples)
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        """Démarrer la boucle des workers (thread dédié) au premier job"""
+        with self._lock:
+            if self._loop is not None:
+                return self._loop
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                self._semaphore = asyncio.Semaphore(self.max_workers)
+                ready.set()
+                loop.run_forever()
+
+            threading.Thread(target=run, name="gula-jobs", daemon=True).start()
+            ready.wait()
+            self._loop = loop
+            print(f"[JOBS] Pool de workers démarré ({self.max_workers} workers)")
+            return loop
+
+    def submit(self, work: JobWork, kind: str = "analyze_pdf") -> Job:
+        """
+        Soumettre un job
+
+        Args:
+            work: Coroutine à exécuter, recevant une fonction de rapport d'étape ;
+                  sa valeur de retour (sérialisable) devient le résultat du job
+            kind: Type de job (informatif)
+
+        Returns:
+            Copie du job créé, prise avant son lancement (état "queued")
+
+        Raises:
+            JobQueueFullError: Si `max_pending` jobs sont déjà en attente ou en cours
+        """
+        loop = self._ensure_started()
+        self._evict_expired()
+
+        now = time.time()
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if not job.finished)
+            if pending >= self.max_pending:
+                self.rejected += 1
+                raise JobQueueFullError(f"{pending} jobs déjà en attente ou en cours")
+            job = Job(id=uuid.uuid4().hex, kind=kind, created_at=now, updated_at=now)
+            self._jobs[job.id] = job
+            self.submitted += 1
+        self._publish(job, "status", status=JOB_QUEUED)
+        # Le job peut démarrer dès sa planification : la réponse décrit l'état soumis
+        with self._lock:
+            snapshot = replace(job, events=list(job.events))
+
+        asyncio.run_coroutine_threadsafe(self._run(job, work), loop)
+        print(f"[JOBS] Job {job.id} soumis ({kind})")
+        return snapshot
+
+    async def _run(self, job: Job, work: JobWork):
+        """Exécuter un job dans la boucle des workers"""
+        try:
+            async with self._semaphore:
+                job.started_at = time.time()
+                self._publish(job, "status", status=JOB_RUNNING)
+
+                def report(stage: str, detail: Dict[str, Any]):
+                    self._publish(job, "stage", stage=stage, detail=detail)
+
+                try:
+                    result = await work(report)
+                except HTTPException as e:
+                    self._finish(job, JOB_FAILED, error=str(e.detail), error_status=e.status_code)
+                except Exception as e:
+                    print(f"[JOBS] ❌ Job {job.id} en erreur: {type(e).__name__}: {e}")
+                    self._finish(job, JOB_FAILED, error=f"Erreur inattendue : {e}", error_status=500)
+                else:
+                    self._finish(job, JOB_SUCCEEDED, result=result)
+        except BaseException as e:
+            # Annulation (arrêt de la boucle des workers...) : le job ne reste pas
+            # "running" et les abonnés reçoivent l'événement final
+            if not job.finished:
+                print(f"[JOBS] ❌ Job {job.id} interrompu: {type(e).__name__}")
+                self._finish(job, JOB_FAILED, error="Analyse interrompue, veuillez la relancer.", error_status=503)
+            raise
+
+    def _finish(self, job: Job, status: str, result: Any = None,
+                error: Optional[str] = None, error_status: Optional[int] = None):
+        """Enregistrer la fin d'un job"""
+        with self._lock:
+            job.result = result
+            job.error = error
+            job.error_status = error_status
+            job.finished_at = time.time()
+            if job.started_at is None:
+                # Interrompu avant d'avoir obtenu un worker
+                job.started_at = job.finished_at
+            self._finished_order.append(job.id)
+            self._queue_times.append(job.started_at - job.created_at)
+            self._run_times.append(job.finished_at - job.started_at)
+            if status == JOB_SUCCEEDED:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            # Résultat et événement final sont publiés ensemble
+            event = self._record_event_locked(
+                job, "status", status=status, error=error, error_status=error_status
+            )
+        self._broadcast(job.id, event)
+        print(f"[JOBS] Job {job.id} terminé: {status}")
+
+    def _publish(self, job: Job, event_type: str, **payload: Any):
+        """Enregistrer un événement et le diffuser aux abonnés"""
+        with self._lock:
+            event = self._record_event_locked(job, event_type, **payload)
+        self._broadcast(job.id, event)
+
+    def _record_event_locked(self, job: Job, event_type: str, **payload: Any) -> Dict[str, Any]:
+        """Appliquer un événement à l'état du job (verrou déjà acquis)"""
+        job.updated_at = time.time()
+        if event_type == "status":
+            job.status = payload["status"]
+        elif event_type == "stage":
+            job.stage = payload["stage"]
+        event = {
+            "seq": len(job.events) + 1,
+            "type": event_type,
+            "at": format_timestamp(job.updated_at),
+            **{key: value for key, value in payload.items() if value is not None},
+        }
+        job.events.append(event)
+        return event
+
+    def _broadcast(self, job_id: str, event: Dict[str, Any]):
+        """Transmettre un événement aux abonnés, dans leur boucle d'événements"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(job_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # Boucle de l'abonné fermée (client déconnecté)
+                pass
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Récupérer un job
+
+        Args:
+            job_id: Identifiant du job
+
+        Returns:
+            Job, ou None s'il est inconnu ou expiré
+        """
+        self._evict_expired()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    async def events(self, job_id: str, heartbeat_seconds: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Suivre les événements d'un job jusqu'à sa fin
+
+        Les événements déjà émis sont rejoués en premier. `None` est produit
+        toutes les `heartbeat_seconds` sans événement (maintien de connexion).
+
+        Args:
+            job_id: Identifiant du job
+            heartbeat_seconds: Intervalle des battements de cœur
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        subscriber = (loop, queue)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            replay = list(job.events)
+            finished = job.finished
+            if not finished:
+                self._subscribers.setdefault(job_id, []).append(subscriber)
+
+        try:
+            for event in replay:
+                yield event
+            if finished:
+                return
+            last_seq = replay[-1]["seq"] if replay else 0
+            async for event in self._follow(queue, last_seq, heartbeat_seconds):
+                yield event
+        finally:
+            self._unsubscribe(job_id, subscriber)
+
+    @staticmethod
+    async def _follow(queue: asyncio.Queue, last_seq: int, heartbeat_seconds: float) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Relayer les événements postérieurs à `last_seq` jusqu'au statut final"""
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            if event["seq"] <= last_seq:
+                continue
+            last_seq = event["seq"]
+            yield event
+            if event["type"] == "status" and event["status"] in FINISHED_STATUSES:
+                return
+
+    def _unsubscribe(self, job_id: str, subscriber):
+        """Retirer un abonné de la liste de diffusion d'un job"""
+        with self._lock:
+            subscribers = self._subscribers.get(job_id, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+
+    def _evict_expired(self):
+        """Évincer les jobs terminés expirés, puis les plus anciens au-delà de `max_retained`"""
+        now = time.time()
+        with self._lock:
+            while self._finished_order:
+                job = self._jobs.get(self._finished_order[0])
+                expired = job is None or now - job.finished_at > self.ttl_seconds
+                if not expired and len(self._finished_order) <= self.max_retained:
+                    break
+                self._finished_order.popleft()
+                if job is not None:
+                    del self._jobs[job.id]
+                    self.evicted += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs des jobs (en attente, en cours, terminés, durées)"""
+        self._evict_expired()
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            queue_times = list(self._queue_times)
+            run_times = list(self._run_times)
+            return {
+                "backend": "memory",
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "ttl_seconds": self.ttl_seconds,
+                "queued": statuses.count(JOB_QUEUED),
+                "running": statuses.count(JOB_RUNNING),
+                "retained": len(self._jobs),
+                "submitted": self.submitted,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "evicted": self.evicted,
+                "subscribers": sum(len(subs) for subs in self._subscribers.values()),
+                "queue_ms_p50": round(percentile(queue_times, 0.5) * 1000, 1),
+                "queue_ms_p95": round(percentile(queue_times, 0.95) * 1000, 1),
+                "run_ms_p50": round(percentile(run_times, 0.5) * 1000, 1),
+                "run_ms_p95": round(percentile(run_times, 0.95) * 1000, 1),
+            }
+
+
+# Instance singleton du gestionnaire de jobs
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """
+    Obtenir l'instance singleton du gestionnaire de jobs (configuré via app.config)
+
+    Returns:
+        Instance de JobManager
+    """
+    global _job_manager
+
+    if _job_manager is None:
+        with _job_manager_lock:
+            if _job_manager is None:
+                _job_manager = JobManager(
+                    max_workers=JOBS_MAX_WORKERS,
+                    max_pending=JOBS_MAX_PENDING,
+                    ttl_seconds=JOBS_RESULT_TTL,
+                    max_retained=JOBS_MAX_RETAINED,
+                )
+    return _job_manager
+
+
+def get_job_store():
+    """
+    Obtenir le stockage des jobs configuré (JOBS_BACKEND)
+
+    Les deux implémentations exposent `get`, `events` et `stats`.
+
+    Returns:
+        JobManager (mémoire) ou DatabaseJobQueue (table analysis_jobs)
+    """
+    if JOBS_BACKEND == "database":
+        # Import différé : la file persistante dépend de ce module
+        from app.services.job_queue import get_job_queue
+        return get_job_queue()
+    return get_job_manager()
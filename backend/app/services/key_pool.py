@@ -0,0 +1,306 @@
+"""
+Pool de clés API Gemini : répartition des appels et suivi des quotas
+
+Les limites de débit de Gemini s'appliquent par projet (donc par clé) et par
+modèle. Le pool suit, pour chaque couple (clé, modèle), les requêtes et les
+jetons consommés sur une fenêtre glissante d'une minute, et confie chaque
+appel au couple le moins chargé :
+- une clé qui reçoit une erreur de quota (429) est écartée temporairement,
+  plus longtemps à chaque récidive ; une clé refusée (401/403) l'est pour la
+  durée maximale ;
+- si des quotas locaux sont configurés (GEMINI_KEY_RPM, GEMINI_KEY_TPM) et
+  que toutes les clés sont pleines, l'appel attend qu'une fenêtre se libère,
+  dans la limite de son budget de temps (QuotaExhaustedError sinon) ;
+- si toutes les clés sont écartées, celle dont l'éviction finit le plus tôt
+  est utilisée : avec une seule clé, le comportement reste celui d'avant.
+
+La première clé est celle passée à `genai.configure` (client par défaut) ;
+les autres ont chacune leur propre client. Sans clé configurée (moteurs hors
+ligne, rejeu des cassettes), le pool a un seul emplacement anonyme, soumis
+aux mêmes quotas locaux.
+"""
+import asyncio
+import hashlib
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.config import (
+    GEMINI_API_KEYS,
+    GEMINI_KEY_EJECT_MAX_SECONDS,
+    GEMINI_KEY_EJECT_SECONDS,
+    GEMINI_KEY_RPM,
+    GEMINI_KEY_TPM,
+)
+
+# Fenêtre glissante des quotas (s)
+QUOTA_WINDOW = 60.0
+
+# Estimation des jetons d'une page de PDF envoyée à Gemini
+PDF_TOKENS_PER_PAGE = 258
+
+# Estimation d'une photo préparée (tuiles de 768 px d'une image de 1600 px)
+IMAGE_TOKENS = 6 * 258
+
+# Estimation de la réponse (liste JSON des biomarqueurs)
+RESPONSE_TOKENS = 500
+
+_PDF_PAGE = re.compile(rb"/Type\s*/Page\b")
+
+# Emplacement unique d'un pool sans clé (moteurs hors ligne, rejeu des cassettes)
+ANONYMOUS_KEY = ""
+
+
+class QuotaExhaustedError(Exception):
+    """Toutes les clés ont atteint leur quota local pour le temps restant"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def key_fingerprint(api_key: str) -> str:
+    """Identifiant d'une clé pour les logs et les métriques (jamais la clé elle-même)"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:8]
+
+
+def estimate_tokens(prompt: str, contents: List[Any]) -> int:
+    """
+    Jetons consommés par un appel, estimés avant l'envoi
+
+    Corrigés ensuite avec le décompte renvoyé par Gemini (usage_metadata).
+
+    Args:
+        prompt: Instructions du modèle
+        contents: Parties du document (texte, {"mime_type", "data"})
+    """
+    tokens = len(prompt) // 4 + RESPONSE_TOKENS
+    for part in contents:
+        if not isinstance(part, dict):
+            tokens += len(str(part)) // 4
+        elif part.get("mime_type") == "application/pdf":
+            tokens += max(1, len(_PDF_PAGE.findall(part.get("data", b"")))) * PDF_TOKENS_PER_PAGE
+        else:
+            tokens += IMAGE_TOKENS
+    return tokens
+
+
+@dataclass
+class KeyLease:
+    """Appel en cours sur un couple (clé, modèle)"""
+    api_key: str
+    model_name: str
+    primary: bool  # clé du client par défaut (genai.configure)
+    _entry: List[float] = field(repr=False)  # [horodatage, jetons] dans la fenêtre du couple
+
+
+class _Slot:
+    """Consommation d'un couple (clé, modèle)"""
+
+    def __init__(self):
+        self.window: Deque[List[float]] = deque()
+        self.in_flight = 0
+        self.calls = 0
+        self.quota_errors = 0
+        self.strikes = 0  # erreurs de quota consécutives
+        self.ejected_until = 0.0
+
+    def prune(self, now: float):
+        while self.window and now - self.window[0][0] >= QUOTA_WINDOW:
+            self.window.popleft()
+
+    def tokens(self) -> float:
+        return sum(entry[1] for entry in self.window)
+
+
+class ApiKeyPool:
+    """Répartition des appels Gemini entre plusieurs clés API"""
+
+    def __init__(
+        self,
+        api_keys: List[str],
+        rpm: int = 0,
+        tpm: int = 0,
+        eject_seconds: float = 60.0,
+        eject_max_seconds: float = 600.0,
+    ):
+        """
+        Args:
+            api_keys: Clés API (la première est celle du client par défaut ; aucune :
+                      un emplacement anonyme)
+            rpm: Requêtes par minute autorisées par clé et par modèle (0 = illimité)
+            tpm: Jetons par minute autorisés par clé et par modèle (0 = illimité)
+            eject_seconds: Éviction d'une clé après une erreur de quota, doublée à chaque récidive
+            eject_max_seconds: Durée maximale d'éviction
+        """
+        self.api_keys = list(dict.fromkeys(api_keys)) or [ANONYMOUS_KEY]
+        self.rpm = rpm
+        self.tpm = tpm
+        self.eject_seconds = eject_seconds
+        self.eject_max_seconds = eject_max_seconds
+        self._lock = threading.Lock()
+        self._slots: Dict[Tuple[str, str], _Slot] = {}
+        self.waits = 0
+        self.rejected = 0
+
+    def _slot(self, api_key: str, model_name: str) -> _Slot:
+        return self._slots.setdefault((api_key, model_name), _Slot())
+
+    def _load(self, slot: _Slot) -> Tuple[float, int]:
+        """Charge d'un couple : part du quota consommée, puis requêtes récentes et en cours"""
+        requests = len(slot.window) + slot.in_flight
+        fraction = requests / self.rpm if self.rpm else 0.0
+        if self.tpm:
+            fraction = max(fraction, slot.tokens() / self.tpm)
+        return fraction, requests
+
+    def _has_room(self, slot: _Slot, tokens: int) -> bool:
+        if self.rpm and len(slot.window) >= self.rpm:
+            return False
+        if self.tpm and slot.window and slot.tokens() + tokens > self.tpm:
+            return False
+        return True
+
+    def _free_in(self, slot: _Slot, now: float) -> float:
+        """Délai avant que la plus ancienne entrée ne sorte de la fenêtre"""
+        return QUOTA_WINDOW - (now - slot.window[0][0]) if slot.window else 0.0
+
+    async def acquire(self, model_name: str, tokens: int, timeout: float) -> KeyLease:
+        """
+        Réserver la clé la moins chargée pour un appel
+
+        Args:
+            model_name: Modèle appelé (les quotas Gemini sont par modèle)
+            tokens: Jetons estimés de l'appel
+            timeout: Attente maximale si toutes les clés sont pleines (s)
+
+        Returns:
+            KeyLease à rendre avec `release()`
+
+        Raises:
+            QuotaExhaustedError: Si aucune clé ne se libère à temps
+        """
+        deadline = time.monotonic() + timeout
+        waited = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                candidates = []
+                for api_key in self.api_keys:
+                    slot = self._slot(api_key, model_name)
+                    slot.prune(now)
+                    candidates.append((api_key, slot))
+
+                available = [(k, s) for k, s in candidates if s.ejected_until <= now]
+                if not available:
+                    # Toutes écartées : la moins pénalisée plutôt qu'un refus local
+                    available = [min(candidates, key=lambda c: c[1].ejected_until)]
+
+                with_room = [(k, s) for k, s in available if self._has_room(s, tokens)]
+                if with_room:
+                    api_key, slot = min(with_room, key=lambda c: self._load(c[1]))
+                    entry = [now, float(tokens)]
+                    slot.window.append(entry)
+                    slot.in_flight += 1
+                    slot.calls += 1
+                    return KeyLease(api_key, model_name, api_key == self.api_keys[0], entry)
+
+                retry_in = min(self._free_in(s, now) for _, s in available)
+                if now + retry_in > deadline:
+                    self.rejected += 1
+                    raise QuotaExhaustedError(
+                        f"Quota Gemini atteint sur {len(self.api_keys)} clé(s) pour {model_name}",
+                        retry_after=retry_in,
+                    )
+                if not waited:
+                    self.waits += 1
+                    waited = True
+            print(f"[KEY_POOL] Quotas atteints pour {model_name}, attente de {retry_in:.1f}s")
+            await asyncio.sleep(retry_in)
+
+    def release(self, lease: KeyLease, tokens: Optional[int] = None, error: Optional[BaseException] = None):
+        """
+        Rendre une clé après l'appel
+
+        Args:
+            lease: Réservation obtenue avec `acquire()`
+            tokens: Jetons réellement consommés (usage_metadata), si connus
+            error: Erreur de l'appel, le cas échéant
+        """
+        status = getattr(error, "code", None) if error is not None else None
+        with self._lock:
+            slot = self._slot(lease.api_key, lease.model_name)
+            slot.in_flight -= 1
+            if tokens is not None:
+                lease._entry[1] = float(tokens)
+            if status == 429:
+                slot.quota_errors += 1
+                slot.strikes += 1
+                eject_for = min(self.eject_max_seconds, self.eject_seconds * 2 ** (slot.strikes - 1))
+            elif status in (401, 403):
+                eject_for = self.eject_max_seconds
+            else:
+                if error is None:
+                    slot.strikes = 0
+                return
+            slot.ejected_until = time.monotonic() + eject_for
+        print(
+            f"[KEY_POOL] ⚠️ Clé {key_fingerprint(lease.api_key)} écartée {eject_for:.0f}s "
+            f"pour {lease.model_name} (erreur {status})"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Consommation et état de chaque couple (clé, modèle)"""
+        with self._lock:
+            now = time.monotonic()
+            slots = []
+            for (api_key, model_name), slot in self._slots.items():
+                slot.prune(now)
+                slots.append({
+                    "key": key_fingerprint(api_key),
+                    "model": model_name,
+                    "requests_per_minute": len(slot.window),
+                    "tokens_per_minute": int(slot.tokens()),
+                    "in_flight": slot.in_flight,
+                    "calls": slot.calls,
+                    "quota_errors": slot.quota_errors,
+                    "ejected_for_seconds": round(max(0.0, slot.ejected_until - now), 1),
+                })
+            return {
+                "keys": len(self.api_keys),
+                "rpm_limit": self.rpm,
+                "tpm_limit": self.tpm,
+                "waits": self.waits,
+                "rejected": self.rejected,
+                "slots": slots,
+            }
+
+
+# Instance singleton du pool
+_api_key_pool: Optional[ApiKeyPool] = None
+_api_key_pool_lock = threading.Lock()
+
+
+def get_api_key_pool() -> ApiKeyPool:
+    """
+    Obtenir l'instance singleton du pool de clés
+
+    Returns:
+        ApiKeyPool configuré via app.config
+    """
+    global _api_key_pool
+
+    if _api_key_pool is None:
+        with _api_key_pool_lock:
+            if _api_key_pool is None:
+                _api_key_pool = ApiKeyPool(
+                    GEMINI_API_KEYS,
+                    rpm=GEMINI_KEY_RPM,
+                    tpm=GEMINI_KEY_TPM,
+                    eject_seconds=GEMINI_KEY_EJECT_SECONDS,
+                    eject_max_seconds=GEMINI_KEY_EJECT_MAX_SECONDS,
+                )
+    return _api_key_pool
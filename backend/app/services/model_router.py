@@ -0,0 +1,217 @@
+"""
+Routage des extractions Gemini entre un modèle rapide et le modèle principal
+
+Les petits documents dont la couche texte est exploitable sont d'abord
+envoyés au modèle rapide (GEMINI_FAST_MODEL, aucun par défaut). Si
+ce premier passage échoue ou couvre trop peu des lignes de résultats
+détectées, l'extraction est reprise avec le modèle principal. Les PDF
+complets (scans) et les textes volumineux vont directement au modèle
+principal.
+
+La latence et le taux de succès de chaque modèle sont mesurés et décident
+du routage : le modèle rapide n'est utilisé que si, escalades comprises,
+il reste plus rapide en moyenne que le modèle principal (latence rapide <
+taux de succès × latence principale). Une requête éligible sur PROBE_EVERY
+prend l'autre route, pour que les mesures des deux modèles restent à jour.
+"""
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+from app.config import (
+    GEMINI_FAST_MODEL,
+    GEMINI_ROUTING_ENABLED,
+    GEMINI_ROUTING_MAX_TEXT_KB,
+    GEMINI_ROUTING_MIN_COVERAGE,
+    GEMINI_ROUTING_MIN_MARKERS,
+)
+from app.services.concurrency import percentile
+
+# Nombre de passages conservés par modèle
+ROUTING_SAMPLES = 200
+
+# Passages mesurés par modèle avant que les mesures ne décident du routage
+MIN_SAMPLES = 5
+
+# Un document éligible sur PROBE_EVERY prend la route non choisie (mesures à jour)
+PROBE_EVERY = 20
+
+
+@dataclass
+class _Outcome:
+    latency_ms: float
+    success: bool  # réponse lisible et couverture suffisante
+
+
+class _ModelStats:
+    """Derniers passages d'un modèle"""
+
+    def __init__(self):
+        self.outcomes: Deque[_Outcome] = deque(maxlen=ROUTING_SAMPLES)
+        self.calls = 0
+        self.failures = 0
+
+    def success_rate(self) -> float:
+        if not self.outcomes:
+            return 1.0
+        return sum(1 for o in self.outcomes if o.success) / len(self.outcomes)
+
+    def mean_latency(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(o.latency_ms for o in self.outcomes) / len(self.outcomes)
+
+
+class ModelRouter:
+    """Choix du modèle par document et escalade selon la couverture obtenue"""
+
+    def __init__(
+        self,
+        fast_model: Optional[str],
+        enabled: bool = True,
+        max_text_bytes: int = 16 * 1024,
+        min_markers: int = 3,
+        min_coverage: float = 0.6,
+    ):
+        """
+        Args:
+            fast_model: Modèle du premier passage (None = pas de routage)
+            enabled: Activer le routage
+            max_text_bytes: Taille maximale du texte envoyé au modèle rapide
+            min_markers: Nombre minimal de biomarqueurs d'un premier passage réussi
+            min_coverage: Part minimale des lignes de résultats détectées à extraire
+        """
+        self.fast_model = fast_model
+        self.enabled = enabled and bool(fast_model)
+        self.max_text_bytes = max_text_bytes
+        self.min_markers = min_markers
+        self.min_coverage = min_coverage
+        self._lock = threading.Lock()
+        self._models: Dict[str, _ModelStats] = {}
+        self._eligible = 0
+        self.routed_fast = 0
+        self.skipped_fast = 0
+        self.escalations = 0
+
+    def plan(self, main_model: str, input_mode: str, input_bytes: int) -> List[str]:
+        """
+        Modèles à essayer dans l'ordre pour un document
+
+        Args:
+            main_model: Modèle principal du service Gemini
+            input_mode: Contenu envoyé ("text" ou "pdf")
+            input_bytes: Taille du contenu envoyé
+
+        Returns:
+            [modèle rapide, modèle principal] ou [modèle principal]
+        """
+        if (
+            not self.enabled
+            or self.fast_model == main_model
+            or input_mode != "text"
+            or input_bytes > self.max_text_bytes
+        ):
+            return [main_model]
+
+        with self._lock:
+            self._eligible += 1
+            use_fast = self._fast_is_worth_it(main_model)
+            if self._eligible % PROBE_EVERY == 0:
+                use_fast = not use_fast
+            if use_fast:
+                self.routed_fast += 1
+            else:
+                self.skipped_fast += 1
+        return [self.fast_model, main_model] if use_fast else [main_model]
+
+    def _fast_is_worth_it(self, main_model: str) -> bool:
+        """Latence attendue du modèle rapide (escalades comprises) inférieure au modèle principal"""
+        fast = self._models.get(self.fast_model)
+        main = self._models.get(main_model)
+        if fast is None or len(fast.outcomes) < MIN_SAMPLES:
+            return True
+        if fast.success_rate() == 0:
+            return False
+        if main is None or len(main.outcomes) < MIN_SAMPLES:
+            return True
+        # rapide + (1 - succès) × principal < principal  <=>  rapide < succès × principal
+        return fast.mean_latency() < fast.success_rate() * main.mean_latency()
+
+    def is_sufficient(self, biomarkers: Dict[str, float], expected_rows: int) -> bool:
+        """
+        Le premier passage couvre-t-il assez le document ?
+
+        Args:
+            biomarkers: Biomarqueurs extraits
+            expected_rows: Lignes de résultats détectées dans la couche texte (0 si inconnu)
+        """
+        if len(biomarkers) < self.min_markers:
+            return False
+        if expected_rows and len(biomarkers) / expected_rows < self.min_coverage:
+            return False
+        return True
+
+    def record(self, model: str, latency_ms: float, success: bool, escalated: bool = False):
+        """
+        Enregistrer un passage
+
+        Args:
+            model: Modèle appelé
+            latency_ms: Durée du passage
+            success: Réponse lisible et couverture suffisante
+            escalated: Le document a été repris avec le modèle principal
+        """
+        with self._lock:
+            stats = self._models.setdefault(model, _ModelStats())
+            stats.outcomes.append(_Outcome(latency_ms, success))
+            stats.calls += 1
+            if not success:
+                stats.failures += 1
+            if escalated:
+                self.escalations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Routage effectué et mesures par modèle"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "fast_model": self.fast_model,
+                "routed_fast": self.routed_fast,
+                "skipped_fast": self.skipped_fast,
+                "escalations": self.escalations,
+                "models": {
+                    name: {
+                        "calls": stats.calls,
+                        "failures": stats.failures,
+                        "success_rate": round(stats.success_rate(), 3),
+                        "latency_ms_mean": round(stats.mean_latency(), 1),
+                        "latency_ms_p95": round(percentile([o.latency_ms for o in stats.outcomes], 0.95), 1),
+                    }
+                    for name, stats in self._models.items()
+                },
+            }
+
+
+# Instance singleton du routeur
+_model_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """
+    Obtenir l'instance singleton du routeur de modèles
+
+    Returns:
+        ModelRouter configuré via app.config
+    """
+    global _model_router
+
+    if _model_router is None:
+        _model_router = ModelRouter(
+            GEMINI_FAST_MODEL,
+            enabled=GEMINI_ROUTING_ENABLED,
+            max_text_bytes=GEMINI_ROUTING_MAX_TEXT_KB * 1024,
+            min_markers=GEMINI_ROUTING_MIN_MARKERS,
+            min_coverage=GEMINI_ROUTING_MIN_COVERAGE,
+        )
+    return _model_router
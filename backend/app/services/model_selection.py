@@ -0,0 +1,162 @@
+"""
+Choix du modèle Gemini, résolu au démarrage et mémorisé sur disque
+
+Lister les modèles disponibles coûte un aller-retour réseau : il n'est jamais
+fait pendant une requête. Au démarrage, le modèle mémorisé lors d'un
+lancement précédent (fichier GEMINI_MODEL_CACHE_FILE) est utilisé tel quel ;
+s'il est absent ou plus vieux que GEMINI_MODEL_CACHE_TTL, le service démarre
+avec le dernier modèle connu (ou le modèle par défaut) et le listing est
+fait une seule fois en arrière-plan.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from app.config import GEMINI_MODEL, GEMINI_MODEL_CACHE_FILE, GEMINI_MODEL_CACHE_TTL
+
+# Ordre de préférence des modèles
+PREFERRED_MODELS = [
+    "gemini-2.5-flash",
+    "gemini-2.0-flash",
+    "gemini-1.5-flash-8b",
+    "gemini-1.5-flash",
+]
+
+# Modèle utilisé tant qu'aucun listing n'a abouti
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+_refresh_lock = threading.Lock()
+_refresh_thread: Optional[threading.Thread] = None
+
+
+def _key_fingerprint(api_key: str) -> str:
+    """Empreinte de la clé API (les modèles accessibles dépendent de la clé)"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def read_persisted_model(api_key: str, path: Optional[str] = None, ttl_seconds: Optional[int] = None) -> Tuple[Optional[str], bool]:
+    """
+    Lire le modèle mémorisé lors d'un lancement précédent
+
+    Args:
+        api_key: Clé API utilisée (un choix fait avec une autre clé est ignoré)
+        path: Fichier de mémorisation (par défaut, GEMINI_MODEL_CACHE_FILE)
+        ttl_seconds: Durée de validité du choix (par défaut, GEMINI_MODEL_CACHE_TTL)
+
+    Returns:
+        (modèle ou None, True si le choix est encore valide)
+    """
+    path = path or GEMINI_MODEL_CACHE_FILE
+    ttl_seconds = GEMINI_MODEL_CACHE_TTL if ttl_seconds is None else ttl_seconds
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None, False
+    except (OSError, ValueError) as e:
+        print(f"[MODEL_SELECTION] ⚠️ Fichier {path} illisible: {e}")
+        return None, False
+
+    if data.get("key") != _key_fingerprint(api_key) or not data.get("model"):
+        return None, False
+    fresh = time.time() - float(data.get("resolved_at", 0)) < ttl_seconds
+    return data["model"], fresh
+
+
+def persist_model(api_key: str, model_name: str, path: Optional[str] = None):
+    """Mémoriser le modèle choisi (écriture atomique, erreurs ignorées)"""
+    path = path or GEMINI_MODEL_CACHE_FILE
+    data = {"model": model_name, "resolved_at": time.time(), "key": _key_fingerprint(api_key)}
+    try:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[MODEL_SELECTION] ⚠️ Impossible de mémoriser le modèle dans {path}: {e}")
+
+
+def list_available_model(genai) -> Optional[str]:
+    """
+    Sélectionner un modèle disponible sur l'API, avec priorité aux plus récents
+
+    Args:
+        genai: Module google.generativeai déjà configuré
+
+    Returns:
+        Nom du modèle, ou None si le listing a échoué
+    """
+    print("[MODEL_SELECTION] Listing des modèles disponibles...")
+    try:
+        models = list(genai.list_models())
+    except Exception as e:
+        print(f"[MODEL_SELECTION] ⚠️ Impossible de lister les modèles: {e}")
+        return None
+
+    names = [m.name.split('/')[-1] if hasattr(m, 'name') else str(m) for m in models]
+    print(f"[MODEL_SELECTION] Modèles retournés ({len(names)}): {names}")
+    for candidate in PREFERRED_MODELS:
+        if candidate in names:
+            print(f"[MODEL_SELECTION] ✅ Modèle sélectionné: {candidate}")
+            return candidate
+    # Fallback: prendre le premier modèle qui supporte generateContent
+    for m in models:
+        caps = getattr(m, 'supported_generation_methods', []) or []
+        if 'generateContent' in caps or 'generate_content' in caps:
+            chosen = m.name.split('/')[-1]
+            print(f"[MODEL_SELECTION] ⚠️ Fallback sur: {chosen}")
+            return chosen
+    return None
+
+
+def initial_model(api_key: str) -> Tuple[str, bool]:
+    """
+    Modèle à utiliser immédiatement, sans appel réseau
+
+    Returns:
+        (modèle, True s'il est inutile de lister les modèles)
+    """
+    if GEMINI_MODEL:
+        return GEMINI_MODEL, True
+    persisted, fresh = read_persisted_model(api_key)
+    if persisted:
+        print(f"[MODEL_SELECTION] Modèle mémorisé: {persisted}{'' if fresh else ' (expiré)'}")
+        return persisted, fresh
+    return DEFAULT_MODEL, False
+
+
+def refresh_model_in_background(genai, api_key: str, on_resolved: Callable[[str], None]) -> bool:
+    """
+    Lister les modèles en arrière-plan, mémoriser le choix puis le transmettre
+
+    Un seul listing à la fois par processus.
+
+    Args:
+        genai: Module google.generativeai déjà configuré
+        api_key: Clé API utilisée
+        on_resolved: Fonction appelée avec le modèle choisi
+
+    Returns:
+        True si un listing a été lancé, False s'il y en a déjà un en cours
+    """
+    global _refresh_thread
+
+    def resolve():
+        model_name = list_available_model(genai)
+        if model_name is None:
+            return
+        persist_model(api_key, model_name)
+        on_resolved(model_name)
+
+    with _refresh_lock:
+        if _refresh_thread is not None and _refresh_thread.is_alive():
+            return False
+        _refresh_thread = threading.Thread(target=resolve, name="gula-gemini-models", daemon=True)
+        _refresh_thread.start()
+        return True
@@ -0,0 +1,224 @@
+"""
+Index de résolution des noms de biomarqueurs
+
+Les noms reçus (saisie utilisateur, CSV, sortie de Gemini) sont rarement
+identiques aux noms canoniques du catalogue : accents, abréviations,
+tirets... L'index est précalculé une fois :
+- table exacte des noms et synonymes, sur des clés sans accents ni ponctuation ;
+- index inversé de trigrammes de caractères pour la recherche approchée,
+  avec un seuil de confiance ;
+- mémoïsation des noms bruts déjà résolus.
+"""
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.database.seed import BIOMARKER_ALIASES, BIOMARKERS_DATA
+
+# Score de similarité minimal (coefficient de Dice sur les trigrammes)
+DEFAULT_FUZZY_THRESHOLD = 0.72
+
+# En dessous de cette longueur, un mot doit correspondre exactement
+# ("b6" ≠ "b9", "vldl" ≠ "ldl") ; au-delà, une faute de frappe est tolérée
+MIN_TYPO_TOKEN_LENGTH = 5
+TOKEN_TYPO_RATIO = 0.8
+
+# Nombre de noms bruts mémorisés par index
+RESOLUTION_CACHE_SIZE = 4096
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def fold_biomarker_name(name: str) -> str:
+    """
+    Replier un nom : minuscules, sans accents, ponctuation remplacée par "_"
+
+    Exemple : "Cholestérol LDL" → "cholesterol_ldl", "LDL-c" → "ldl_c"
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_ALNUM.sub("_", without_accents.lower()).strip("_")
+
+
+def _trigrams(key: str) -> Set[str]:
+    """Trigrammes de caractères d'une clé repliée (bornée par des espaces)"""
+    padded = f" {key.replace('_', ' ')} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _tokens_match(left: str, right: str) -> bool:
+    """Deux mots correspondent s'ils sont égaux, ou proches et assez longs"""
+    if left == right:
+        return True
+    if min(len(left), len(right)) < MIN_TYPO_TOKEN_LENGTH:
+        return False
+    return SequenceMatcher(None, left, right).ratio() >= TOKEN_TYPO_RATIO
+
+
+def _tokens_compatible(query_key: str, candidate_key: str) -> bool:
+    """
+    Vérifier que chaque mot de l'un correspond à un mot de l'autre
+
+    Évite les rapprochements dangereux entre biomarqueurs voisins
+    ("Vitamine B6" → vitamine_b9, "Testostérone libre" → testosterone).
+    """
+    query_tokens = query_key.split("_")
+    candidate_tokens = candidate_key.split("_")
+    return (
+        all(any(_tokens_match(q, c) for c in candidate_tokens) for q in query_tokens)
+        and all(any(_tokens_match(c, q) for q in query_tokens) for c in candidate_tokens)
+    )
+
+
+@dataclass(frozen=True)
+class NameResolution:
+    """Résultat de la résolution d'un nom brut"""
+    canonical: str
+    method: str  # "exact", "alias" ou "fuzzy"
+    confidence: float
+
+
+class BiomarkerNameResolver:
+    """
+    Index précalculé nom brut → nom canonique de biomarqueur
+
+    Les correspondances exactes et par synonyme sont en O(1) (dictionnaire) ;
+    la recherche approchée ne compare que les clés partageant au moins un
+    trigramme avec le nom demandé, puis exige que les mots se correspondent
+    un à un (fautes de frappe tolérées sur les mots longs uniquement).
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[Tuple[str, Iterable[str]]],
+        fuzzy_threshold: float = DEFAULT_FUZZY_THRESHOLD,
+    ):
+        """
+        Args:
+            entries: Couples (nom canonique, synonymes) ; le nom canonique est
+                     toujours indexé comme correspondance exacte
+            fuzzy_threshold: Confiance minimale pour accepter une correspondance approchée
+        """
+        self.fuzzy_threshold = fuzzy_threshold
+        self._exact: Dict[str, Tuple[str, str]] = {}
+        self._keys: List[Tuple[str, str]] = []  # (clé repliée, nom canonique)
+        self._key_sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+
+        for canonical, aliases in entries:
+            self._add(canonical, canonical, "exact")
+            for alias in aliases:
+                self._add(alias, canonical, "alias")
+
+        self.resolve = lru_cache(maxsize=RESOLUTION_CACHE_SIZE)(self._resolve)
+
+    def _add(self, name: str, canonical: str, method: str):
+        """Indexer un nom (et sa variante compacte sans séparateurs)"""
+        key = fold_biomarker_name(name)
+        if not key:
+            return
+        for variant in {key, key.replace("_", "")}:
+            # Le premier enregistrement gagne : un nom canonique n'est jamais
+            # écrasé par le synonyme d'un autre biomarqueur
+            self._exact.setdefault(variant, (canonical, method))
+
+        index = len(self._keys)
+        grams = _trigrams(key)
+        self._keys.append((key, canonical))
+        self._key_sizes.append(len(grams))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(index)
+
+    @property
+    def size(self) -> int:
+        """Nombre de clés indexées"""
+        return len(self._keys)
+
+    def _resolve(self, raw_name: str) -> Optional[NameResolution]:
+        """
+        Résoudre un nom brut (mémoïsé via `resolve`)
+
+        Args:
+            raw_name: Nom tel que reçu
+
+        Returns:
+            Résolution, ou None si aucun biomarqueur ne correspond avec assez de confiance
+        """
+        key = fold_biomarker_name(raw_name)
+        if not key:
+            return None
+
+        hit = self._exact.get(key) or self._exact.get(key.replace("_", ""))
+        if hit is not None:
+            canonical, method = hit
+            return NameResolution(canonical=canonical, method=method, confidence=1.0)
+
+        return self._fuzzy(key)
+
+    def _fuzzy(self, key: str) -> Optional[NameResolution]:
+        """Recherche approchée par coefficient de Dice sur les trigrammes"""
+        grams = _trigrams(key)
+        overlaps: Counter = Counter()
+        for gram in grams:
+            overlaps.update(self._postings.get(gram, ()))
+        if not overlaps:
+            return None
+
+        scored = sorted(
+            (
+                (2.0 * shared / (len(grams) + self._key_sizes[index]), index)
+                for index, shared in overlaps.items()
+            ),
+            reverse=True,
+        )
+        for score, index in scored:
+            if score < self.fuzzy_threshold:
+                break
+            candidate_key, canonical = self._keys[index]
+            if _tokens_compatible(key, candidate_key):
+                return NameResolution(canonical=canonical, method="fuzzy", confidence=round(score, 3))
+        return None
+
+
+def build_seed_entries(canonical_names: Optional[Iterable[str]] = None) -> List[Tuple[str, List[str]]]:
+    """
+    Construire les entrées de l'index depuis le seed (noms, libellés et synonymes)
+
+    Args:
+        canonical_names: Restreindre aux biomarqueurs donnés (si None, tout le seed)
+
+    Returns:
+        Liste de couples (nom canonique, synonymes)
+    """
+    display_names = {data["name"]: data["display_name"] for data in BIOMARKERS_DATA}
+    names = list(canonical_names) if canonical_names is not None else list(display_names)
+    return [
+        (name, [display_names.get(name, name)] + BIOMARKER_ALIASES.get(name, []))
+        for name in names
+    ]
+
+
+# Index partagé construit depuis le seed (utilisé hors catalogue, ex: parsing Gemini)
+_resolver: Optional[BiomarkerNameResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_name_resolver() -> BiomarkerNameResolver:
+    """
+    Obtenir l'index de résolution construit depuis le seed
+
+    Returns:
+        Instance partagée du BiomarkerNameResolver
+    """
+    global _resolver
+
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = BiomarkerNameResolver(build_seed_entries())
+    return _resolver
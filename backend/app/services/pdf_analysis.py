@@ -0,0 +1,438 @@
+"""
+Chaîne complète d'analyse d'un bilan PDF : validation → extraction → analyse
+
+Partagée par l'endpoint synchrone `/api/analyze-pdf` et par les jobs
+asynchrones, qui suivent les étapes via le callback `on_stage`.
+`stream_pdf_analysis` alimente la variante SSE `/api/analyze-pdf/stream` :
+chaque biomarqueur est analysé dès sa lecture dans la réponse Gemini.
+`analyze_image_bytes` traite les photos d'un bilan (`/api/analyze-images`)
+et `analyze_pdf_files` les PDF d'un même bilan (`/api/analyze-pdfs`).
+"""
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import UPLOAD_MAX_MB
+from app.models.schemas import AnalyzeResponse
+from app.services.analyzer import BiomarkerAnalyzer
+from app.services.gemini_service import NoBiomarkersError
+from app.services.image_preparation import prepare_images
+from app.services.pdf_extraction import (
+    ExtractionResult,
+    get_pdf_extraction_pipeline,
+    validate_pdf_bytes,
+)
+
+# Étapes rapportées, dans l'ordre
+STAGE_VALIDATED = "validated"
+STAGE_EXTRACTED = "extracted"
+STAGE_ANALYZED = "analyzed"
+
+StageCallback = Callable[[str, Dict[str, Any]], None]
+
+
+@dataclass
+class PdfAnalysis:
+    """Résultat de l'analyse d'un PDF"""
+    response: AnalyzeResponse
+    extraction: ExtractionResult
+
+
+@dataclass
+class BilanFile:
+    """PDF d'un bilan en plusieurs fichiers"""
+    filename: Optional[str]
+    pdf_bytes: bytes
+    sha256: Optional[str] = None
+
+
+@dataclass
+class BilanAnalysis:
+    """Résultat de l'analyse d'un bilan en plusieurs PDF"""
+    response: AnalyzeResponse
+    extractions: List[Optional[ExtractionResult]]  # par fichier, None si ignoré
+    conflicts: List[str]  # biomarqueurs présents avec des valeurs différentes
+    skipped: List[str]  # fichiers sans biomarqueur exploitable
+    latency_ms: float  # extraction de l'ensemble des fichiers
+
+
+# Priorité des sources en cas de conflit : la couche texte est lue telle quelle
+SOURCE_PRIORITY = {"local": 0, "gemini": 1}
+
+
+def build_pdf_message(extracted_count: int, total_count: int, unknown_count: int, origin: str = "du PDF") -> str:
+    """
+    Construire le message de réponse d'une analyse de PDF
+
+    Args:
+        extracted_count: Nombre de biomarqueurs extraits du PDF
+        total_count: Nombre de résultats d'analyse
+        unknown_count: Nombre de biomarqueurs non reconnus
+        origin: Provenance des biomarqueurs ("du PDF", "des photos")
+
+    Returns:
+        Message descriptif
+    """
+    if unknown_count == total_count:
+        return (
+            f"{extracted_count} biomarqueur(s) extrait(s) {origin}, "
+            f"mais aucun n'est reconnu dans notre base. "
+            f"Vérifiez le format du document."
+        )
+    if unknown_count > 0:
+        return (
+            f"Analyse complétée ! {extracted_count} biomarqueur(s) extrait(s) {origin}. "
+            f"{unknown_count} non reconnu(s) dans notre base."
+        )
+    return (
+        f"Analyse complétée avec succès ! "
+        f"{extracted_count} biomarqueur(s) extrait(s) et analysé(s)."
+    )
+
+
+async def analyze_pdf_bytes(
+    pdf_bytes: bytes,
+    on_stage: Optional[StageCallback] = None,
+    sha256: Optional[str] = None,
+) -> PdfAnalysis:
+    """
+    Valider, extraire puis analyser un bilan PDF
+
+    Args:
+        pdf_bytes: Contenu du PDF
+        on_stage: Fonction appelée à la fin de chaque étape (nom, détails)
+        sha256: Empreinte du PDF si déjà calculée (lors de l'upload)
+
+    Returns:
+        PdfAnalysis (réponse d'analyse et détails de l'extraction)
+
+    Raises:
+        HTTPException: Si le PDF est invalide, vide de biomarqueurs, ou en cas d'erreur d'extraction
+    """
+    def report(stage: str, **detail: Any):
+        if on_stage is not None:
+            on_stage(stage, detail)
+
+    # Valider le PDF
+    print("[PDF_ANALYSIS] Validation du PDF...")
+    validate_pdf_bytes(pdf_bytes, max_size_mb=UPLOAD_MAX_MB)
+    print("[PDF_ANALYSIS] ✅ PDF validé")
+    report(STAGE_VALIDATED, size_bytes=len(pdf_bytes))
+
+    # Extraire les biomarqueurs (couche texte locale, Gemini en repli)
+    print("[PDF_ANALYSIS] Extraction des biomarqueurs...")
+    extraction = await get_pdf_extraction_pipeline().extract(pdf_bytes, sha256=sha256)
+    biomarkers_data = extraction.biomarkers
+    print(
+        f"[PDF_ANALYSIS] ✅ Biomarqueurs extraits ({extraction.source}, "
+        f"{extraction.latency_ms} ms): {biomarkers_data}"
+    )
+
+    # Vérifier que des données ont été extraites
+    if not biomarkers_data:
+        raise _no_biomarkers_error()
+    report(
+        STAGE_EXTRACTED,
+        source=extraction.source,
+        biomarkers=len(biomarkers_data),
+        latency_ms=extraction.latency_ms,
+    )
+
+    # Analyser les biomarqueurs extraits
+    response = _build_pdf_response(BiomarkerAnalyzer(), biomarkers_data)
+    report(STAGE_ANALYZED, summary=response.summary)
+
+    return PdfAnalysis(response=response, extraction=extraction)
+
+
+def _build_pdf_response(
+    analyzer: BiomarkerAnalyzer, biomarkers_data: Dict[str, float], origin: str = "du PDF"
+) -> AnalyzeResponse:
+    """Analyser l'ensemble des biomarqueurs extraits et construire la réponse"""
+    results, summary = analyzer.analyze(biomarkers_data)
+    message = build_pdf_message(len(biomarkers_data), len(results), summary.get("inconnu", 0), origin)
+    return AnalyzeResponse(
+        status="success",
+        message=message,
+        results=results,
+        summary=summary
+    )
+
+
+def _no_biomarkers_error() -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail="Aucun biomarqueur n'a pu être extrait du PDF. "
+               "Assurez-vous que le PDF contient un bilan sanguin valide."
+    )
+
+
+def merge_biomarkers(
+    extractions: List[Optional[ExtractionResult]],
+) -> Tuple[Dict[str, float], List[str]]:
+    """
+    Fusionner les biomarqueurs de plusieurs fichiers d'un même bilan
+
+    Règle déterministe, indépendante de l'ordre de fin des extractions : en
+    cas de valeurs différentes pour un biomarqueur, la valeur lue localement
+    dans la couche texte l'emporte sur celle de Gemini ; à source égale, le
+    premier fichier dans l'ordre d'envoi l'emporte.
+
+    Args:
+        extractions: Extraction de chaque fichier, dans l'ordre d'envoi (None si ignoré)
+
+    Returns:
+        (biomarqueurs fusionnés, noms des biomarqueurs en conflit)
+    """
+    ranked = sorted(
+        (
+            (SOURCE_PRIORITY.get(extraction.source, len(SOURCE_PRIORITY)), index, extraction)
+            for index, extraction in enumerate(extractions)
+            if extraction is not None
+        ),
+        key=lambda item: item[:2],
+    )
+    merged: Dict[str, float] = {}
+    conflicts: List[str] = []
+    for _, _, extraction in ranked:
+        for name, value in extraction.biomarkers.items():
+            if name not in merged:
+                merged[name] = value
+            elif merged[name] != value and name not in conflicts:
+                conflicts.append(name)
+    return merged, sorted(conflicts)
+
+
+async def analyze_pdf_files(files: List[BilanFile]) -> BilanAnalysis:
+    """
+    Extraire en parallèle puis analyser ensemble les PDF d'un même bilan
+
+    Les fichiers sont extraits simultanément (les appels Gemini restent
+    bornés par leur pool dédié) : la durée totale est proche de celle du
+    fichier le plus long. Un fichier sans biomarqueur exploitable (courrier,
+    page de garde) est ignoré ; toute autre erreur fait échouer l'ensemble.
+
+    Args:
+        files: PDF du bilan, dans l'ordre d'envoi
+
+    Returns:
+        BilanAnalysis (réponse d'analyse unique et détails par fichier)
+
+    Raises:
+        HTTPException: Si un PDF est invalide, si aucun fichier ne contient de
+                       biomarqueur, ou en cas d'erreur d'extraction
+    """
+    for bilan_file in files:
+        validate_pdf_bytes(bilan_file.pdf_bytes, max_size_mb=UPLOAD_MAX_MB)
+
+    started_at = time.perf_counter()
+    pipeline = get_pdf_extraction_pipeline()
+    outcomes = await asyncio.gather(
+        *(pipeline.extract(f.pdf_bytes, sha256=f.sha256) for f in files),
+        return_exceptions=True,
+    )
+    latency_ms = round((time.perf_counter() - started_at) * 1000, 1)
+
+    extractions: List[Optional[ExtractionResult]] = []
+    skipped: List[str] = []
+    for bilan_file, outcome in zip(files, outcomes):
+        if isinstance(outcome, BaseException):
+            # Gemini n'a trouvé aucun biomarqueur : fichier ignoré
+            if not isinstance(outcome.__cause__, NoBiomarkersError):
+                raise outcome
+            outcome = None
+        if outcome is None or not outcome.biomarkers:
+            print(f"[PDF_ANALYSIS] ⚠️ {bilan_file.filename}: aucun biomarqueur, fichier ignoré")
+            skipped.append(bilan_file.filename or "")
+            extractions.append(None)
+            continue
+        extractions.append(outcome)
+
+    biomarkers_data, conflicts = merge_biomarkers(extractions)
+    if not biomarkers_data:
+        raise _no_biomarkers_error()
+    slowest_ms = max(e.latency_ms for e in extractions if e is not None)
+    print(
+        f"[PDF_ANALYSIS] ✅ {len(files)} PDF extraits en {latency_ms} ms (le plus long : {slowest_ms} ms), "
+        f"{len(biomarkers_data)} biomarqueurs, conflits : {conflicts or 'aucun'}"
+    )
+
+    # Une seule analyse sur l'ensemble fusionné
+    response = _build_pdf_response(BiomarkerAnalyzer(), biomarkers_data, origin="des PDF")
+    return BilanAnalysis(
+        response=response,
+        extractions=extractions,
+        conflicts=conflicts,
+        skipped=skipped,
+        latency_ms=latency_ms,
+    )
+
+
+async def analyze_image_bytes(
+    images: List[bytes],
+    on_stage: Optional[StageCallback] = None,
+) -> PdfAnalysis:
+    """
+    Préparer, extraire puis analyser les photos d'un bilan (une par page)
+
+    Les photos sont réduites, recadrées et réencodées avant d'être envoyées
+    ensemble à Gemini, en un seul appel.
+
+    Args:
+        images: Photos reçues (JPEG, PNG ou WebP), dans l'ordre des pages
+        on_stage: Fonction appelée à la fin de chaque étape (nom, détails)
+
+    Returns:
+        PdfAnalysis (réponse d'analyse et détails de l'extraction)
+
+    Raises:
+        HTTPException: Si une image est illisible, si aucun biomarqueur n'est
+                       extrait, ou en cas d'erreur d'extraction
+    """
+    def report(stage: str, **detail: Any):
+        if on_stage is not None:
+            on_stage(stage, detail)
+
+    # Réduire et recadrer (Pillow, hors de la boucle d'événements)
+    prepared = await run_in_threadpool(prepare_images, images)
+    original_bytes = sum(image.original_bytes for image in prepared)
+    prepared_bytes = sum(len(image.data) for image in prepared)
+    print(
+        f"[PDF_ANALYSIS] ✅ {len(prepared)} photo(s) préparée(s): {original_bytes} -> {prepared_bytes} bytes"
+    )
+    report(STAGE_VALIDATED, size_bytes=original_bytes, prepared_bytes=prepared_bytes, pages=len(prepared))
+
+    # Empreinte des photos préparées : une même prise de vue renvoyée reste en cache
+    digest = hashlib.sha256(b"".join(hashlib.sha256(image.data).digest() for image in prepared)).hexdigest()
+    extraction = await get_pdf_extraction_pipeline().extract_images(
+        [image.data for image in prepared], digest
+    )
+    biomarkers_data = extraction.biomarkers
+    if not biomarkers_data:
+        raise HTTPException(
+            status_code=400,
+            detail="Aucun biomarqueur n'a pu être extrait des photos. "
+                   "Vérifiez que le bilan est net, bien éclairé et entièrement cadré."
+        )
+    report(
+        STAGE_EXTRACTED,
+        source=extraction.source,
+        biomarkers=len(biomarkers_data),
+        latency_ms=extraction.latency_ms,
+    )
+
+    response = _build_pdf_response(BiomarkerAnalyzer(), biomarkers_data, origin="des photos")
+    report(STAGE_ANALYZED, summary=response.summary)
+
+    return PdfAnalysis(response=response, extraction=extraction)
+
+
+async def stream_pdf_analysis(
+    pdf_bytes: bytes, sha256: Optional[str] = None
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Extraire et analyser un bilan PDF en publiant les résultats au fil de l'eau
+
+    Événements produits (type, contenu) :
+    - ("stage", ...) : étape franchie (validated, extracted) ;
+    - ("biomarker", BiomarkerAnalysis) : un biomarqueur analysé, dès sa
+      lecture dans la réponse Gemini (en fin d'extraction pour une extraction
+      locale ou regroupée avec un appel en cours) ;
+    - ("summary", AnalyzeResponse + extraction) : résultat complet, identique
+      à celui de `/api/analyze-pdf`.
+
+    Le PDF doit avoir été validé (validate_pdf_bytes) par l'appelant, pour que
+    ses erreurs soient renvoyées avant l'ouverture du flux.
+
+    Args:
+        pdf_bytes: Contenu du PDF
+        sha256: Empreinte du PDF si déjà calculée (lors de l'upload)
+
+    Yields:
+        Tuples (type d'événement, contenu JSON)
+
+    Raises:
+        HTTPException: Si aucun biomarqueur n'est extrait ou en cas d'erreur d'extraction
+    """
+    started_at = time.perf_counter()
+    first_result_ms: Optional[float] = None
+    analyzer = BiomarkerAnalyzer()
+    emitted: Dict[str, float] = {}
+
+    def analyze_one(name: str, value: float) -> Dict[str, Any]:
+        nonlocal first_result_ms
+        emitted[name] = value
+        if first_result_ms is None:
+            first_result_ms = round((time.perf_counter() - started_at) * 1000, 1)
+        results, _ = analyzer.analyze({name: value})
+        return results[0].model_dump()
+
+    yield "stage", {"stage": STAGE_VALIDATED, "size_bytes": len(pdf_bytes)}
+
+    # Les biomarqueurs lus dans la réponse Gemini arrivent dans la file pendant l'extraction
+    received: "asyncio.Queue[Tuple[str, float]]" = asyncio.Queue()
+    extraction_task = asyncio.ensure_future(get_pdf_extraction_pipeline().extract(
+        pdf_bytes, sha256=sha256, on_biomarker=lambda name, value: received.put_nowait((name, value))
+    ))
+    # Client déconnecté : l'extraction se termine (et alimente le cache) sans erreur non lue
+    extraction_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    getter: Optional[asyncio.Future] = None
+    try:
+        while not extraction_task.done():
+            getter = asyncio.ensure_future(received.get())
+            await asyncio.wait({getter, extraction_task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                name, value = getter.result()
+                yield "biomarker", analyze_one(name, value)
+            else:
+                getter.cancel()
+            getter = None
+    finally:
+        if getter is not None:
+            getter.cancel()
+
+    while not received.empty():
+        name, value = received.get_nowait()
+        yield "biomarker", analyze_one(name, value)
+
+    extraction = extraction_task.result()
+    biomarkers_data = extraction.biomarkers
+    if not biomarkers_data:
+        raise _no_biomarkers_error()
+
+    # Extraction locale, appel regroupé, ou valeur corrigée en fin de réponse
+    for name, value in biomarkers_data.items():
+        if emitted.get(name) != value:
+            yield "biomarker", analyze_one(name, value)
+
+    yield "stage", {
+        "stage": STAGE_EXTRACTED,
+        "source": extraction.source,
+        "biomarkers": len(biomarkers_data),
+        "latency_ms": extraction.latency_ms,
+    }
+
+    response = _build_pdf_response(analyzer, biomarkers_data)
+    print(
+        f"[PDF_ANALYSIS] ✅ Analyse en flux terminée ({extraction.source}): premier résultat "
+        f"après {first_result_ms} ms, extraction {extraction.latency_ms} ms"
+    )
+    yield "summary", {
+        **response.model_dump(),
+        "extraction": {
+            "source": extraction.source,
+            "input_mode": extraction.input_mode,
+            "latency_ms": extraction.latency_ms,
+            "coalesced": extraction.coalesced,
+            "prompt_version": extraction.prompt_version,
+            "model": extraction.model,
+            "escalated": extraction.escalated,
+            "first_result_ms": first_result_ms,
+        },
+    }
@@ -0,0 +1,436 @@
+"""
+Chaîne d'extraction des biomarqueurs d'un PDF
+
+1. Extraction locale depuis la couche texte (quelques millisecondes) ;
+2. repli sur Gemini si la couverture ou le nombre de biomarqueurs reconnus
+   est insuffisant (PDF scanné, mise en page inhabituelle...).
+
+Lors du repli, seule la couche texte des pages de résultats est envoyée à
+Gemini quand elle existe : quelques kilo-octets au lieu du PDF complet
+(logos, polices, pages annexes). Le PDF n'est envoyé que s'il n'a pas de
+couche texte exploitable (PDF scanné).
+
+Les petits textes passent d'abord par un modèle Gemini rapide, avec escalade
+vers le modèle principal si nécessaire (voir model_router).
+
+Les photos d'un bilan (déjà préparées, voir image_preparation) n'ont pas de
+couche texte : elles sont envoyées ensemble à Gemini, en un seul appel.
+
+Le moteur de repli est Gemini par défaut ; EXTRACTION_BACKEND permet de le
+remplacer (parseur local, moteur simulé) pour travailler hors ligne (voir
+extractors).
+"""
+import hashlib
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import (
+    GEMINI_INPUT_MODE,
+    GEMINI_TEXT_MIN_CHARS,
+    LOCAL_EXTRACTION_ENABLED,
+    LOCAL_EXTRACTION_MIN_COVERAGE,
+    LOCAL_EXTRACTION_MIN_MARKERS,
+)
+from app.services.biomarker_catalog import get_biomarker_catalog
+from app.services.concurrency import SingleFlight, percentile
+from app.services.extractors import BiomarkerExtractor, get_biomarker_extractor
+from app.services.gemini_service import BiomarkerCallback
+from app.services.model_router import get_model_router
+from app.services.text_extractor import LocalExtraction, LocalTextExtractor, extract_text_layer
+
+# Nombre de mesures conservées par mode d'entrée pour les percentiles
+STATS_SAMPLES = 1000
+
+
+def validate_pdf_bytes(pdf_bytes: bytes, max_size_mb: int = 10) -> bool:
+    """
+    Valider qu'un PDF est acceptable pour traitement
+
+    Args:
+        pdf_bytes: Contenu du PDF
+        max_size_mb: Taille maximale en MB
+
+    Returns:
+        True si valide
+
+    Raises:
+        HTTPException: Si le PDF n'est pas valide
+    """
+    # Vérifier la taille
+    size_mb = len(pdf_bytes) / (1024 * 1024)
+    if size_mb > max_size_mb:
+        raise HTTPException(
+            status_code=400,
+            detail=f"PDF trop volumineux ({size_mb:.1f} MB). Maximum : {max_size_mb} MB"
+        )
+
+    # Vérifier que ce n'est pas vide
+    if len(pdf_bytes) == 0:
+        raise HTTPException(
+            status_code=400,
+            detail="Le fichier PDF est vide"
+        )
+
+    return True
+
+
+@dataclass
+class ExtractionResult:
+    """Résultat d'une extraction de biomarqueurs"""
+    biomarkers: Dict[str, float]
+    source: str  # "local", "gemini" ou "stub" (moteur de repli, voir extractors)
+    latency_ms: float
+    local_coverage: Optional[float] = None
+    input_mode: str = "none"  # contenu envoyé à Gemini : "none", "text", "pdf" ou "image"
+    input_bytes: int = 0  # taille du contenu envoyé à Gemini
+    coalesced: bool = False  # résultat partagé avec une requête identique en cours
+    prompt_version: Optional[str] = None  # identifiant du prompt Gemini (PROMPT_ID)
+    model: Optional[str] = None  # modèle ayant produit le résultat
+    escalated: bool = False  # premier passage du modèle rapide insuffisant, repris par le modèle principal
+
+
+def _deferred(
+    events: List[Tuple[str, float]], on_biomarker: Optional[BiomarkerCallback]
+) -> Optional[BiomarkerCallback]:
+    """Callback retenant les biomarqueurs d'un passage tant qu'il n'est pas retenu"""
+    if on_biomarker is None:
+        return None
+    return lambda name, value: events.append((name, value))
+
+
+def _release(events: List[Tuple[str, float]], on_biomarker: Optional[BiomarkerCallback]):
+    """Transmettre les biomarqueurs retenus d'un passage accepté"""
+    for name, value in events:
+        on_biomarker(name, value)
+
+
+def build_gemini_text(local: LocalExtraction) -> str:
+    """
+    Construire le texte envoyé à Gemini depuis la couche texte
+
+    Seules les pages contenant des lignes de résultats sont conservées ;
+    si aucune n'a été détectée, toutes les pages non vides le sont.
+
+    Args:
+        local: Résultat de l'extraction locale
+
+    Returns:
+        Texte des pages retenues, précédées de leur numéro
+    """
+    indexes: List[int] = local.result_pages or [
+        i for i, page in enumerate(local.pages) if page.strip()
+    ]
+    return "\n\n".join(
+        f"--- Page {i + 1} ---\n{local.pages[i].strip()}" for i in indexes
+    )
+
+
+class PdfExtractionPipeline:
+    """Extraction locale d'abord, Gemini en repli"""
+
+    def __init__(
+        self,
+        local_enabled: bool = True,
+        min_markers: int = 3,
+        min_coverage: float = 0.8,
+        gemini_input_mode: str = "auto",
+        text_min_chars: int = 200,
+    ):
+        """
+        Args:
+            local_enabled: Tenter l'extraction locale avant Gemini
+            min_markers: Nombre minimal de biomarqueurs reconnus localement
+            min_coverage: Couverture minimale de l'extraction locale
+            gemini_input_mode: "auto" (couche texte si exploitable) ou "pdf"
+            text_min_chars: Taille minimale de la couche texte pour l'envoyer seule
+        """
+        self.local_enabled = local_enabled
+        self.min_markers = min_markers
+        self.min_coverage = min_coverage
+        self.gemini_input_mode = gemini_input_mode
+        self.text_min_chars = text_min_chars
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.gemini_fallbacks = 0
+        self._input_bytes: Dict[str, Deque[int]] = {}
+        self._latencies: Dict[str, Deque[float]] = {}
+        # Uploads identiques simultanés (double clic, relance du client) : une seule extraction
+        self._single_flight = SingleFlight("pdf_extraction")
+        self.gemini_calls_saved = 0
+
+    async def extract(
+        self,
+        pdf_bytes: bytes,
+        sha256: Optional[str] = None,
+        on_biomarker: Optional[BiomarkerCallback] = None,
+    ) -> ExtractionResult:
+        """
+        Extraire les biomarqueurs d'un PDF déjà validé
+
+        Args:
+            pdf_bytes: Contenu du PDF
+            sha256: Empreinte du PDF si déjà calculée (lors de l'upload)
+            on_biomarker: Callback recevant chaque biomarqueur dès sa lecture dans
+                          la réponse Gemini en streaming (non appelé pour une
+                          extraction locale ni pour un appel regroupé)
+
+        Returns:
+            ExtractionResult (biomarqueurs, source, latence)
+
+        Raises:
+            HTTPException: En cas d'erreur lors de l'extraction Gemini
+        """
+        key = sha256 or hashlib.sha256(pdf_bytes).hexdigest()
+        result, coalesced = await self._single_flight.run(
+            key, lambda: self._extract(pdf_bytes, key, on_biomarker)
+        )
+        if not coalesced:
+            return result
+
+        if result.source != "local":
+            with self._lock:
+                self.gemini_calls_saved += 1
+        return replace(result, coalesced=True)
+
+    async def extract_images(
+        self,
+        images: List[bytes],
+        digest: str,
+        on_biomarker: Optional[BiomarkerCallback] = None,
+    ) -> ExtractionResult:
+        """
+        Extraire les biomarqueurs des photos d'un bilan (une par page)
+
+        Args:
+            images: Photos JPEG préparées, dans l'ordre des pages
+            digest: Empreinte de l'ensemble des photos
+            on_biomarker: Voir `extract`
+
+        Returns:
+            ExtractionResult (source du moteur de repli, entrée "image")
+
+        Raises:
+            HTTPException: En cas d'erreur lors de l'extraction Gemini
+        """
+        async def run() -> ExtractionResult:
+            started_at = time.perf_counter()
+            extractor = get_biomarker_extractor()
+            model_name = extractor.model_name
+            biomarkers = await extractor.extract_biomarkers_from_images(
+                images, digest=digest, on_biomarker=on_biomarker, model_name=model_name
+            )
+            return self._record(ExtractionResult(
+                biomarkers=biomarkers,
+                source=extractor.source,
+                latency_ms=round((time.perf_counter() - started_at) * 1000, 1),
+                input_mode="image",
+                input_bytes=sum(len(image) for image in images),
+                prompt_version=extractor.prompt_version,
+                model=model_name,
+            ))
+
+        result, coalesced = await self._single_flight.run(("image", digest), run)
+        if not coalesced:
+            return result
+        with self._lock:
+            self.gemini_calls_saved += 1
+        return replace(result, coalesced=True)
+
+    async def _extract(
+        self, pdf_bytes: bytes, sha256: str, on_biomarker: Optional[BiomarkerCallback] = None
+    ) -> ExtractionResult:
+        """Extraction effective (exécutée une seule fois par PDF en cours de traitement)"""
+        started_at = time.perf_counter()
+        coverage = None
+        local: Optional[LocalExtraction] = None
+
+        if self.local_enabled:
+            extractor = LocalTextExtractor(
+                get_biomarker_catalog(),
+                min_markers=self.min_markers,
+                min_coverage=self.min_coverage,
+            )
+            local = await run_in_threadpool(extractor.extract, pdf_bytes)
+            coverage = round(local.coverage, 3)
+            print(
+                f"[PDF_EXTRACTION] Extraction locale: {len(local.biomarkers)} biomarqueurs, "
+                f"couverture {coverage} ({local.matched_rows}/{local.candidate_rows} lignes)"
+            )
+            if extractor.is_sufficient(local):
+                return self._record(ExtractionResult(
+                    biomarkers=local.biomarkers,
+                    source="local",
+                    latency_ms=round((time.perf_counter() - started_at) * 1000, 1),
+                    local_coverage=coverage,
+                ))
+
+        text = None
+        if self.gemini_input_mode != "pdf":
+            if local is None:
+                pages = await run_in_threadpool(extract_text_layer, pdf_bytes)
+                local = LocalExtraction(pages=pages)
+            if local.text_chars >= self.text_min_chars:
+                text = build_gemini_text(local)
+
+        input_mode = "text" if text is not None else "pdf"
+        input_bytes = len(text.encode("utf-8")) if text is not None else len(pdf_bytes)
+        extractor = get_biomarker_extractor()
+        print(f"[PDF_EXTRACTION] Repli sur {extractor.source} (entrée {input_mode}, {input_bytes} bytes)")
+        expected_rows = local.candidate_rows if local is not None else 0
+        biomarkers, model, escalated = await self._extract_with_gemini(
+            extractor, pdf_bytes, text, sha256, on_biomarker, input_mode, input_bytes, expected_rows
+        )
+        return self._record(ExtractionResult(
+            biomarkers=biomarkers,
+            source=extractor.source,
+            latency_ms=round((time.perf_counter() - started_at) * 1000, 1),
+            local_coverage=coverage,
+            input_mode=input_mode,
+            input_bytes=input_bytes,
+            prompt_version=extractor.prompt_version,
+            model=model,
+            escalated=escalated,
+        ))
+
+    async def _extract_with_gemini(
+        self,
+        extractor: BiomarkerExtractor,
+        pdf_bytes: bytes,
+        text: Optional[str],
+        sha256: str,
+        on_biomarker: Optional[BiomarkerCallback],
+        input_mode: str,
+        input_bytes: int,
+        expected_rows: int,
+    ) -> Tuple[Dict[str, float], str, bool]:
+        """
+        Extraction Gemini routée : modèle rapide d'abord pour les petits textes,
+        modèle principal si le premier passage échoue ou couvre trop peu
+
+        Les biomarqueurs lus pendant un passage qui peut encore être escaladé
+        ne sont transmis à `on_biomarker` qu'une fois ce passage retenu : un
+        résultat écarté n'est jamais diffusé.
+
+        Returns:
+            (biomarqueurs, modèle retenu, True si escalade)
+        """
+        if extractor.source != "gemini":
+            # Moteur hors ligne : un seul passage, pas de routage
+            biomarkers = await extractor.extract_biomarkers_from_pdf(
+                pdf_bytes, text=text, pdf_sha256=sha256, on_biomarker=on_biomarker
+            )
+            return biomarkers, extractor.model_name, False
+
+        router = get_model_router()
+        plan = router.plan(extractor.model_name, input_mode, input_bytes)
+        first_pass: Dict[str, float] = {}
+        first_pass_events: List[Tuple[str, float]] = []
+
+        for index, model_name in enumerate(plan):
+            is_last = index == len(plan) - 1
+            events: List[Tuple[str, float]] = []
+            started_at = time.perf_counter()
+            try:
+                biomarkers = await extractor.extract_biomarkers_from_pdf(
+                    pdf_bytes, text=text, pdf_sha256=sha256,
+                    on_biomarker=on_biomarker if is_last else _deferred(events, on_biomarker),
+                    model_name=model_name,
+                )
+            except HTTPException as e:
+                latency_ms = (time.perf_counter() - started_at) * 1000
+                # Délai épuisé : pas de temps pour un second passage
+                escalate = not is_last and e.status_code in (500, 503)
+                router.record(model_name, latency_ms, success=False, escalated=escalate)
+                if not escalate:
+                    if first_pass:
+                        # Le modèle principal a échoué : le premier passage vaut mieux que rien
+                        _release(first_pass_events, on_biomarker)
+                        return first_pass, plan[0], True
+                    raise
+                print(f"[PDF_EXTRACTION] ⚠️ {model_name} en échec ({e.status_code}), escalade vers {plan[-1]}")
+                continue
+
+            latency_ms = (time.perf_counter() - started_at) * 1000
+            sufficient = router.is_sufficient(biomarkers, expected_rows)
+            escalate = not is_last and not sufficient
+            router.record(model_name, latency_ms, success=sufficient or is_last, escalated=escalate)
+            if not escalate:
+                _release(events, on_biomarker)
+                return biomarkers, model_name, index > 0
+            print(
+                f"[PDF_EXTRACTION] ⚠️ {model_name}: {len(biomarkers)} biomarqueurs pour "
+                f"{expected_rows} lignes détectées, escalade vers {plan[-1]}"
+            )
+            first_pass, first_pass_events = biomarkers, events
+
+    def _record(self, result: ExtractionResult) -> ExtractionResult:
+        """Comptabiliser une extraction (source, taille d'entrée, latence)"""
+        with self._lock:
+            if result.source == "local":
+                self.local_hits += 1
+            else:
+                self.gemini_fallbacks += 1
+            self._input_bytes.setdefault(result.input_mode, deque(maxlen=STATS_SAMPLES)).append(result.input_bytes)
+            self._latencies.setdefault(result.input_mode, deque(maxlen=STATS_SAMPLES)).append(result.latency_ms)
+        print(
+            f"[PDF_EXTRACTION] Extraction {result.source} (entrée {result.input_mode}, "
+            f"{result.input_bytes} bytes) en {result.latency_ms} ms"
+        )
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Répartition des extractions entre chemin local et Gemini, requêtes regroupées"""
+        single_flight = self._single_flight.stats()
+        with self._lock:
+            total = self.local_hits + self.gemini_fallbacks
+            by_input = {
+                mode: {
+                    "count": len(sizes),
+                    "input_bytes_avg": round(sum(sizes) / len(sizes)),
+                    "input_bytes_max": max(sizes),
+                    "latency_ms_p50": percentile(self._latencies[mode], 0.5),
+                    "latency_ms_p95": percentile(self._latencies[mode], 0.95),
+                }
+                for mode, sizes in self._input_bytes.items()
+            }
+            return {
+                "local_enabled": self.local_enabled,
+                "gemini_input_mode": self.gemini_input_mode,
+                "local_hits": self.local_hits,
+                "gemini_fallbacks": self.gemini_fallbacks,
+                "local_hit_rate": round(self.local_hits / total, 3) if total else 0.0,
+                "in_flight": single_flight["in_flight"],
+                "coalesced_requests": single_flight["coalesced"],
+                "gemini_calls_saved": self.gemini_calls_saved,
+                "by_input": by_input,
+            }
+
+
+# Instance singleton de la chaîne d'extraction
+_pipeline: Optional[PdfExtractionPipeline] = None
+
+
+def get_pdf_extraction_pipeline() -> PdfExtractionPipeline:
+    """
+    Obtenir l'instance singleton de la chaîne d'extraction
+
+    Returns:
+        PdfExtractionPipeline configurée via app.config
+    """
+    global _pipeline
+
+    if _pipeline is None:
+        _pipeline = PdfExtractionPipeline(
+            local_enabled=LOCAL_EXTRACTION_ENABLED,
+            min_markers=LOCAL_EXTRACTION_MIN_MARKERS,
+            min_coverage=LOCAL_EXTRACTION_MIN_COVERAGE,
+            gemini_input_mode=GEMINI_INPUT_MODE,
+            text_min_chars=GEMINI_TEXT_MIN_CHARS,
+        )
+    return _pipeline
@@ -0,0 +1,357 @@
+"""
+Résilience des appels à un service amont (Gemini) : relances, requêtes
+dupliquées, budget de temps global et disjoncteur
+
+- Les erreurs transitoires (429, 5xx, délai dépassé) sont relancées avec un
+  délai exponentiel et une gigue aléatoire.
+- Si un appel n'a pas répondu après le p95 des latences observées (pour la
+  même clé, ex: le même modèle), un second appel identique est lancé ; la
+  première réponse l'emporte.
+- L'ensemble (tentatives, attentes, duplicatas) respecte un budget global.
+- Après plusieurs échecs consécutifs, le disjoncteur s'ouvre : les appels
+  échouent immédiatement pendant quelques secondes, puis un appel d'essai
+  décide de sa fermeture.
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from app.services.concurrency import CallTimeoutError, QueueFullError, percentile
+
+# Codes HTTP amont considérés comme transitoires
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Nombre de latences observées avant de calculer le délai de duplication
+HEDGE_MIN_SAMPLES = 20
+
+# États du disjoncteur
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Le disjoncteur est ouvert : le service amont est considéré dégradé"""
+
+
+class DeadlineExceededError(CallTimeoutError):
+    """Le budget de temps global est épuisé"""
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """
+    Une nouvelle tentative a-t-elle une chance d'aboutir ?
+
+    Args:
+        error: Exception levée par l'appel
+
+    Returns:
+        True pour un délai dépassé ou une erreur amont 429/5xx
+        (exceptions google.api_core, qui exposent le code HTTP dans `code`)
+    """
+    if isinstance(error, DeadlineExceededError):
+        return False
+    if isinstance(error, CallTimeoutError):
+        return True
+    code = getattr(error, "code", None)
+    return isinstance(code, int) and code in RETRYABLE_STATUS_CODES
+
+
+class CircuitBreaker:
+    """Disjoncteur : ouvert après N échecs consécutifs, un appel d'essai après le délai de repos"""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        """
+        Args:
+            name: Nom du service protégé (logs)
+            failure_threshold: Échecs consécutifs avant ouverture (0 = désactivé)
+            reset_seconds: Durée d'ouverture avant l'appel d'essai
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self.state = BREAKER_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened = 0
+        self.rejected = 0
+
+    def before_call(self):
+        """
+        Autoriser un appel
+
+        Raises:
+            CircuitOpenError: Si le disjoncteur est ouvert (ou si l'appel d'essai est déjà en cours)
+        """
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            if self.state == BREAKER_OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self.state = BREAKER_HALF_OPEN
+                self._probing = False
+            if self.state == BREAKER_CLOSED:
+                return
+            if self.state == BREAKER_HALF_OPEN and not self._probing:
+                self._probing = True
+                print(f"[RESILIENCE] {self.name}: disjoncteur semi-ouvert, appel d'essai")
+                return
+            self.rejected += 1
+            retry_in = max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(f"Disjoncteur {self.name} ouvert (nouvel essai dans {retry_in:.0f}s)")
+
+    def record_success(self):
+        """Le service amont a répondu : refermer le disjoncteur"""
+        with self._lock:
+            if self.state != BREAKER_CLOSED:
+                print(f"[RESILIENCE] {self.name}: ✅ disjoncteur refermé")
+            self.state = BREAKER_CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        """Échec transitoire : ouvrir le disjoncteur au-delà du seuil (ou si l'essai échoue)"""
+        with self._lock:
+            self._failures += 1
+            if self.state == BREAKER_HALF_OPEN or (
+                self.state == BREAKER_CLOSED and 0 < self.failure_threshold <= self._failures
+            ):
+                self.state = BREAKER_OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+                self.opened += 1
+                print(f"[RESILIENCE] {self.name}: ⚠️ disjoncteur ouvert ({self._failures} échecs consécutifs)")
+
+    def release(self):
+        """Appel terminé sans verdict sur le service amont (ex: file locale pleine)"""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self._failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+class ResilientCaller:
+    """Relances avec gigue, duplication au p95, budget global et disjoncteur autour d'un appel"""
+
+    def __init__(
+        self,
+        name: str,
+        max_attempts: int = 3,
+        backoff_seconds: float = 0.5,
+        backoff_max_seconds: float = 8.0,
+        deadline_seconds: float = 55.0,
+        hedge_percentile: float = 0.95,
+        hedge_min_delay: float = 2.0,
+        hedge_initial_delay: float = 20.0,
+        breaker: Optional[CircuitBreaker] = None,
+        samples: int = 1000,
+    ):
+        """
+        Args:
+            name: Nom du service appelé (logs)
+            max_attempts: Nombre maximal de tentatives (duplicatas non compris)
+            backoff_seconds: Délai avant la 1re relance, doublé ensuite
+            backoff_max_seconds: Plafond du délai entre deux tentatives
+            deadline_seconds: Budget de temps de l'ensemble des tentatives
+            hedge_percentile: Percentile des latences après lequel un duplicata
+                              est lancé (0 = pas de duplicata)
+            hedge_min_delay: Délai minimal avant duplicata
+            hedge_initial_delay: Délai avant duplicata tant que les mesures sont insuffisantes
+            breaker: Disjoncteur partagé (un nouveau par défaut)
+            samples: Nombre de latences conservées par clé
+        """
+        self.name = name
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.deadline_seconds = deadline_seconds
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_initial_delay = hedge_initial_delay
+        self.breaker = breaker or CircuitBreaker(name)
+
+        self.samples = samples
+
+        self._lock = threading.Lock()
+        # clé d'appel (ex: modèle) -> latences des réponses réussies
+        self._latencies: Dict[str, Deque[float]] = {}
+        self.calls = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.deadline_exceeded = 0
+        self.failures = 0
+
+    def retry_delay(self, attempt: int) -> float:
+        """Délai avant la tentative suivante : exponentiel, plafonné, avec gigue de ±20 %"""
+        delay = min(self.backoff_seconds * (2 ** (attempt - 1)), self.backoff_max_seconds)
+        return delay * random.uniform(0.8, 1.2)
+
+    def hedge_delay(self, key: str = "") -> Optional[float]:
+        """Attente avant duplicata : p95 des latences observées pour la clé (None = désactivé)"""
+        if self.hedge_percentile <= 0:
+            return None
+        with self._lock:
+            latencies = self._latencies.get(key)
+            if latencies is None or len(latencies) < HEDGE_MIN_SAMPLES:
+                return self.hedge_initial_delay
+            return max(self.hedge_min_delay, percentile(latencies, self.hedge_percentile))
+
+    async def call(self, fn: Callable[[float], Awaitable[Any]], key: str = "") -> Any:
+        """
+        Exécuter `fn(timeout)` avec relances, duplication et budget global
+
+        Args:
+            fn: Fabrique de l'appel ; reçoit le temps restant sur le budget (s)
+            key: Clé des mesures de latence (ex: modèle appelé) ; des appels
+                 de clés différentes n'ont pas le même délai de duplication
+
+        Returns:
+            Résultat du premier appel réussi
+
+        Raises:
+            CircuitOpenError: Si le disjoncteur est ouvert
+            DeadlineExceededError: Si le budget est épuisé
+            Exception: Dernière erreur de l'appel (non transitoire, ou tentatives épuisées)
+        """
+        deadline = time.monotonic() + self.deadline_seconds
+        with self._lock:
+            self.calls += 1
+
+        attempt = 0
+        while True:
+            attempt += 1
+            self.breaker.before_call()
+            try:
+                result = await self._attempt(fn, deadline, key)
+            except QueueFullError:
+                # Surcharge locale : rien à conclure sur le service amont
+                self.breaker.release()
+                raise
+            except Exception as e:
+                if not is_retryable_error(e):
+                    # Réponse du service amont (ex: requête invalide) : il est disponible
+                    self.breaker.record_success()
+                    with self._lock:
+                        self.failures += 1
+                    raise
+                self.breaker.record_failure()
+
+                remaining = deadline - time.monotonic()
+                delay = self.retry_delay(attempt)
+                if attempt >= self.max_attempts or delay >= remaining:
+                    with self._lock:
+                        self.failures += 1
+                        if remaining <= 0:
+                            self.deadline_exceeded += 1
+                    if remaining <= 0:
+                        raise DeadlineExceededError(
+                            f"Budget de {self.deadline_seconds:g}s épuisé pour {self.name} "
+                            f"après {attempt} tentative(s)"
+                        ) from e
+                    raise
+                print(
+                    f"[RESILIENCE] {self.name}: tentative {attempt} en échec "
+                    f"({type(e).__name__}), relance dans {delay:.2f}s"
+                )
+                with self._lock:
+                    self.retries += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Appel annulé (client parti, SingleFlight, duplicata perdant...) :
+                # l'appel d'essai éventuel est rendu, sinon le disjoncteur resterait ouvert
+                self.breaker.release()
+                raise
+
+            self.breaker.record_success()
+            return result
+
+    async def _attempt(self, fn: Callable[[float], Awaitable[Any]], deadline: float, key: str) -> Any:
+        """Une tentative : l'appel, plus un duplicata s'il tarde au-delà du p95"""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceededError(f"Budget de {self.deadline_seconds:g}s épuisé pour {self.name}")
+
+        primary = asyncio.ensure_future(self._timed(fn, remaining, key))
+        delay = self.hedge_delay(key)
+        if delay is None or delay >= remaining:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        print(f"[RESILIENCE] {self.name}: pas de réponse après {delay:.2f}s, envoi d'un duplicata")
+        with self._lock:
+            self.hedges += 1
+        hedge = asyncio.ensure_future(self._timed(fn, deadline - time.monotonic(), key))
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            with self._lock:
+                                self.hedge_wins += 1
+                        return task.result()
+                    # Un duplicata refusé (file pleine) ne masque pas l'appel principal
+                    if error is None or not isinstance(task.exception(), QueueFullError):
+                        error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _timed(self, fn: Callable[[float], Awaitable[Any]], timeout: float, key: str) -> Any:
+        """Appel mesuré et borné ; seules les latences des réponses réussies alimentent le p95"""
+        started_at = time.monotonic()
+        try:
+            result = await asyncio.wait_for(fn(timeout), timeout)
+        except asyncio.TimeoutError:
+            raise CallTimeoutError(f"Délai dépassé pour l'appel {self.name} ({timeout:.2f}s)")
+        with self._lock:
+            latencies = self._latencies.setdefault(key, deque(maxlen=self.samples))
+            latencies.append(time.monotonic() - started_at)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs : relances, duplicatas (et gagnés), budgets épuisés, disjoncteur"""
+        with self._lock:
+            keys = sorted(self._latencies)
+        by_key = {key: self.hedge_delay(key) for key in keys}
+        with self._lock:
+            latencies = [latency for samples in self._latencies.values() for latency in samples]
+            return {
+                "calls": self.calls,
+                "retries": self.retries,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "failures": self.failures,
+                "deadline_exceeded": self.deadline_exceeded,
+                "deadline_seconds": self.deadline_seconds,
+                "latency_ms_p50": round(percentile(latencies, 0.5) * 1000, 1),
+                "latency_ms_p95": round(percentile(latencies, 0.95) * 1000, 1),
+                "by_key": {
+                    key: {
+                        "samples": len(self._latencies[key]),
+                        "latency_ms_p95": round(percentile(self._latencies[key], 0.95) * 1000, 1),
+                        "hedge_delay_s": round(delay, 3) if delay is not None else None,
+                    }
+                    for key, delay in by_key.items()
+                },
+                "breaker": self.breaker.stats(),
+            }
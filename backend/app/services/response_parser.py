@@ -0,0 +1,251 @@
+"""
+Analyse incrémentale et tolérante des réponses JSON de Gemini
+
+Le texte peut arriver morceau par morceau (réponse en streaming) : chaque
+biomarqueur est émis dès que sa valeur est complète, sans attendre la fin
+du document. Le texte hors JSON (balises markdown, phrases d'introduction
+ou de conclusion) est ignoré, et un JSON tronqué ou mal terminé ne fait
+pas perdre les biomarqueurs déjà lus.
+
+Deux formes sont reconnues :
+- la forme structurée demandée à Gemini :
+  {"biomarkers": [{"name": "hemoglobine", "value": 13.2}, ...]}
+- la forme historique à plat : {"hemoglobine": 13.2, ...}
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+# Schéma de sortie imposé à Gemini (response_schema)
+BIOMARKERS_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "biomarkers": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "value": {"type": "number"},
+                },
+                "required": ["name", "value"],
+            },
+        },
+    },
+    "required": ["biomarkers"],
+}
+
+# Clés d'un élément de la forme structurée (jamais des noms de biomarqueurs)
+_ITEM_KEYS = {"name", "value", "unit", "biomarkers"}
+
+# Caractères d'une valeur scalaire JSON (nombre, true, false, null)
+_SCALAR_CHARS = set("+-0123456789.eEtruefalsn")
+
+# Échappements d'un caractère dans une chaîne JSON (\" \\ \/ et les autres : le caractère lui-même)
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+_HEX_DIGITS = set("0123456789abcdefABCDEF")
+
+
+def to_number(value: Any) -> Optional[float]:
+    """Valeur numérique (virgule décimale acceptée), sinon None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip().replace(",", "."))
+        except ValueError:
+            return None
+    return None
+
+
+class _Container:
+    """Objet ou tableau JSON en cours de lecture"""
+
+    __slots__ = ("kind", "key", "expecting_key", "fields")
+
+    def __init__(self, kind: str):
+        self.kind = kind  # "{" ou "["
+        self.key: Optional[str] = None
+        self.expecting_key = kind == "{"
+        self.fields: Dict[str, Any] = {}
+
+
+class BiomarkerStreamParser:
+    """
+    Lecteur JSON incrémental : `feed()` renvoie les biomarqueurs complétés par le morceau reçu
+
+    Exemple :
+        parser = BiomarkerStreamParser()
+        for chunk in response:
+            for name, value in parser.feed(chunk.text):
+                ...
+        biomarkers = parser.results
+    """
+
+    def __init__(self):
+        self.results: Dict[str, float] = {}
+        self._stack: List[_Container] = []
+        self._in_string = False
+        self._escape = False
+        self._unicode: Optional[str] = None  # chiffres hexadécimaux d'un \uXXXX en cours
+        self._string: List[str] = []
+        self._scalar: List[str] = []
+        self._emitted: List[Tuple[str, float]] = []
+
+    def feed(self, text: str) -> List[Tuple[str, float]]:
+        """
+        Lire un morceau de réponse
+
+        Args:
+            text: Texte reçu (fragment quelconque)
+
+        Returns:
+            Liste des (nom, valeur) complétés par ce morceau, dans l'ordre
+        """
+        self._emitted = []
+        for char in text:
+            self._consume(char)
+        return self._emitted
+
+    def close(self) -> List[Tuple[str, float]]:
+        """Terminer la lecture (une valeur scalaire en fin de texte est prise en compte)"""
+        self._emitted = []
+        self._end_scalar()
+        return self._emitted
+
+    def _consume(self, char: str):
+        if self._in_string:
+            self._consume_string(char)
+            return
+
+        if not self._stack:
+            # Hors JSON : seul le début d'un objet ou d'un tableau compte
+            if char in "{[":
+                self._stack.append(_Container(char))
+            return
+
+        if char in _SCALAR_CHARS:
+            self._scalar.append(char)
+            return
+        self._end_scalar()
+
+        if char == '"':
+            self._in_string = True
+            self._string = []
+        elif char in "{[":
+            self._stack.append(_Container(char))
+        elif char in "}]":
+            self._close(char)
+        elif char in ":,":
+            self._separator(char)
+
+    def _consume_string(self, char: str):
+        """Caractère à l'intérieur d'une chaîne (échappements compris)"""
+        if self._unicode is not None:
+            self._consume_unicode(char)
+        elif self._escape:
+            self._escape = False
+            if char == "u":
+                self._unicode = ""
+            else:
+                self._string.append(_ESCAPES.get(char, char))
+        elif char == "\\":
+            self._escape = True
+        elif char == '"':
+            self._in_string = False
+            self._on_value(_join_utf16("".join(self._string)), is_string=True)
+        else:
+            self._string.append(char)
+
+    def _consume_unicode(self, char: str):
+        """Chiffre d'un échappement \\uXXXX (mal formé : conservé tel quel)"""
+        if char not in _HEX_DIGITS:
+            self._string.append("u" + self._unicode)
+            self._unicode = None
+            self._consume_string(char)
+            return
+        self._unicode += char
+        if len(self._unicode) == 4:
+            self._string.append(chr(int(self._unicode, 16)))
+            self._unicode = None
+
+    def _separator(self, char: str):
+        """`:` passe de la clé à la valeur, `,` attend la clé suivante"""
+        top = self._stack[-1]
+        if top.kind != "{":
+            return
+        top.expecting_key = char == ","
+        if char == ",":
+            top.key = None
+
+    def _end_scalar(self):
+        """Fin d'une valeur non chaîne (nombre, true, null...)"""
+        if not self._scalar:
+            return
+        token = "".join(self._scalar)
+        self._scalar = []
+        if self._stack:
+            self._on_value(token, is_string=False)
+
+    def _on_value(self, value: str, is_string: bool):
+        top = self._stack[-1]
+        if top.kind != "{":
+            return
+        if top.expecting_key:
+            if is_string:
+                top.key = value
+            return
+        if top.key is None:
+            return
+        top.fields[top.key] = value
+        # Forme à plat : paire "nom": valeur directement dans l'objet racine
+        if len(self._stack) == 1 and top.key.lower() not in _ITEM_KEYS:
+            self._emit(top.key, value)
+        top.key = None
+
+    def _close(self, char: str):
+        expected = "{" if char == "}" else "["
+        if self._stack[-1].kind != expected:
+            # JSON mal formé : ignorer le caractère plutôt que tout perdre
+            return
+        closed = self._stack.pop()
+        if closed.kind != "{" or not self._stack or "value" not in closed.fields:
+            return
+        parent = self._stack[-1]
+        if "name" in closed.fields:
+            # Forme structurée : élément {"name": ..., "value": ...}
+            self._emit(closed.fields["name"], closed.fields["value"])
+        elif len(self._stack) == 1 and parent.kind == "{" and parent.key and parent.key.lower() not in _ITEM_KEYS:
+            # Variante à plat : "nom": {"value": ..., "unit": ...}
+            self._emit(parent.key, closed.fields["value"])
+
+    def _emit(self, name: str, raw_value: str):
+        value = to_number(raw_value)
+        name = name.strip()
+        if value is None or not name:
+            return
+        self.results[name] = value
+        self._emitted.append((name, value))
+
+
+def _join_utf16(text: str) -> str:
+    """Recomposer les paires de substitution UTF-16 (\\ud83e\\udde0 → 🧠), remplacer celles isolées"""
+    if not any("\ud800" <= c <= "\udfff" for c in text):
+        return text
+    return text.encode("utf-16", "surrogatepass").decode("utf-16", "replace")
+
+
+def parse_biomarkers(text: str) -> Dict[str, float]:
+    """
+    Lire une réponse complète
+
+    Args:
+        text: Réponse brute de Gemini
+
+    Returns:
+        Dictionnaire {nom tel que fourni par Gemini: valeur} (vide si rien n'est lisible)
+    """
+    parser = BiomarkerStreamParser()
+    parser.feed(text)
+    parser.close()
+    return parser.results
@@ -0,0 +1,248 @@
+"""
+Extraction locale des biomarqueurs depuis la couche texte d'un PDF
+
+La plupart des comptes rendus de laboratoire sont générés numériquement et
+contiennent une couche texte exploitable. Ce module lit cette couche avec
+PyPDF2 et reconnaît les lignes de résultats du type :
+
+    Hémoglobine ........ 14,5 g/dL (13,0 - 17,0)
+
+Le libellé est résolu contre le catalogue, l'unité doit correspondre à celle
+du catalogue et la valeur doit être plausible. Un résultat borné ("< 5",
+"> 90") n'est pas une mesure : la ligne compte comme non reconnue. La couverture (lignes de
+résultats reconnues / lignes de résultats détectées) permet de décider si
+l'extraction locale suffit ou s'il faut se replier sur Gemini.
+"""
+import io
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from PyPDF2 import PdfReader
+
+from app.services.biomarker_catalog import BiomarkerCatalog, BiomarkerReference
+
+# Nombre (avec virgule ou point décimal, éventuels séparateurs de milliers)
+_NUMBER = r"\d{1,3}(?:[   ]\d{3})+(?:[.,]\d+)?|\d+(?:[.,]\d+)?"
+
+# Ligne de résultat : libellé, valeur, unité, puis reste (référence, antériorités...)
+_RESULT_ROW = re.compile(
+    r"^(?P<label>.*?[A-Za-zÀ-ÿ].*?)[\s.:…*]+"
+    r"(?P<comparator>[<>≤≥]=?\s*)?"
+    r"(?P<value>" + _NUMBER + r")\s*"
+    r"(?P<unit>(?:[a-zA-Zµμ%][\w%µμ^.³]*|10\^?\d+)?/[a-zA-Zµμ][\w.³^]*|%|fL|fl)"
+    r"(?P<rest>.*)$"
+)
+
+# Unités équivalentes, ramenées à une forme canonique (minuscules, micro = u)
+_UNIT_EQUIVALENTS = {
+    "10^9/l": "g/l_cells",
+    "109/l": "g/l_cells",
+    "giga/l": "g/l_cells",
+    "10^12/l": "t/l",
+    "1012/l": "t/l",
+    "tera/l": "t/l",
+    "u/l": "ui/l",
+    "iu/l": "ui/l",
+    "miu/l": "mui/l",
+    "uui/ml": "mui/l",
+    "uiu/ml": "mui/l",
+    "ug/l": "ng/ml",
+    "ng/l": "pg/ml",
+    "fl": "fl",
+}
+
+# Biomarqueurs comptés en cellules : "G/L" y signifie 10^9/L et non grammes/L
+_CELL_COUNT_BIOMARKERS = {"leucocytes", "plaquettes"}
+
+# Facteur au-delà duquel une valeur est jugée invraisemblable pour la plage de référence
+PLAUSIBILITY_FACTOR = 20.0
+
+
+def _canonical_unit(unit: str, biomarker_name: Optional[str] = None) -> str:
+    """Forme canonique d'une unité pour comparaison"""
+    folded = unit.strip().lower().replace("μ", "u").replace("µ", "u").replace(" ", "")
+    if folded == "g/l" and biomarker_name in _CELL_COUNT_BIOMARKERS:
+        return "g/l_cells"
+    return _UNIT_EQUIVALENTS.get(folded, folded)
+
+
+def _parse_number(raw: str) -> float:
+    """Convertir un nombre au format français ("1 234,5") en float"""
+    return float(re.sub(r"[   ]", "", raw).replace(",", "."))
+
+
+# Écart vertical maximal (en points) entre fragments d'une même ligne
+LINE_Y_TOLERANCE = 2.0
+
+
+def _page_text(page) -> str:
+    """
+    Reconstituer le texte d'une page ligne par ligne
+
+    Les cellules d'un tableau de résultats sont souvent des objets texte
+    distincts, que `extract_text` restitue sur des lignes séparées. Les
+    fragments sont donc regroupés par ordonnée puis triés par abscisse.
+    """
+    fragments = []
+
+    def visitor(text, cm, tm, font_dict, font_size):
+        if not text or not text.strip():
+            return
+        x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+        y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+        for offset, part in enumerate(text.splitlines()):
+            if part.strip():
+                fragments.append((y - offset * LINE_Y_TOLERANCE * 2, x, part.strip()))
+
+    plain = page.extract_text(visitor_text=visitor) or ""
+    if not fragments:
+        return plain
+
+    lines: List[List[Tuple[float, str]]] = []
+    line_y: Optional[float] = None
+    for y, x, part in sorted(fragments, key=lambda f: (-f[0], f[1])):
+        if line_y is None or abs(line_y - y) > LINE_Y_TOLERANCE:
+            lines.append([])
+            line_y = y
+        lines[-1].append((x, part))
+    return "\n".join("  ".join(part for _, part in sorted(line)) for line in lines)
+
+
+def extract_text_layer(pdf_bytes: bytes) -> List[str]:
+    """
+    Extraire le texte de chaque page d'un PDF
+
+    Args:
+        pdf_bytes: Contenu du PDF
+
+    Returns:
+        Texte de chaque page (liste vide si le PDF est illisible)
+    """
+    try:
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        return [_page_text(page) for page in reader.pages]
+    except Exception as e:
+        print(f"[TEXT_EXTRACTOR] ⚠️ Couche texte illisible: {type(e).__name__}: {e}")
+        return []
+
+
+@dataclass
+class LocalExtraction:
+    """Résultat de l'extraction locale d'un PDF"""
+    biomarkers: Dict[str, float] = field(default_factory=dict)
+    pages: List[str] = field(default_factory=list)
+    candidate_rows: int = 0  # lignes ressemblant à un résultat (libellé + valeur + unité)
+    matched_rows: int = 0  # lignes reconnues (biomarqueur connu, unité et valeur cohérentes)
+    result_pages: List[int] = field(default_factory=list)  # index des pages contenant des résultats
+
+    @property
+    def text_chars(self) -> int:
+        """Nombre de caractères de la couche texte"""
+        return sum(len(page.strip()) for page in self.pages)
+
+    @property
+    def coverage(self) -> float:
+        """Part des lignes de résultats détectées qui ont été reconnues"""
+        return self.matched_rows / self.candidate_rows if self.candidate_rows else 0.0
+
+
+class LocalTextExtractor:
+    """Parseur des lignes de résultats de la couche texte, résolues contre le catalogue"""
+
+    def __init__(self, catalog: BiomarkerCatalog, min_markers: int = 3, min_coverage: float = 0.8):
+        """
+        Args:
+            catalog: Catalogue de référence (noms, unités, plages)
+            min_markers: Nombre minimal de biomarqueurs reconnus pour se passer de Gemini
+            min_coverage: Couverture minimale pour se passer de Gemini
+        """
+        self.catalog = catalog
+        self.min_markers = min_markers
+        self.min_coverage = min_coverage
+
+    def extract(self, pdf_bytes: bytes) -> LocalExtraction:
+        """
+        Extraire les biomarqueurs de la couche texte d'un PDF
+
+        Args:
+            pdf_bytes: Contenu du PDF
+
+        Returns:
+            LocalExtraction (biomarqueurs, couverture, pages de résultats)
+        """
+        return self.parse_pages(extract_text_layer(pdf_bytes))
+
+    def parse_pages(self, pages: List[str]) -> LocalExtraction:
+        """
+        Reconnaître les lignes de résultats d'un texte découpé en pages
+
+        Args:
+            pages: Texte de chaque page
+
+        Returns:
+            LocalExtraction
+        """
+        extraction = LocalExtraction(pages=pages)
+        for page_index, text in enumerate(pages):
+            page_has_results = False
+            for line in text.splitlines():
+                row = self._parse_row(line)
+                if row is None:
+                    continue
+                extraction.candidate_rows += 1
+                page_has_results = True
+
+                label, value, unit, comparator = row
+                if comparator:
+                    # Seuil de détection, pas une valeur mesurée : laissé au repli
+                    continue
+                reference = self._match(label, value, unit)
+                if reference is None:
+                    continue
+                extraction.matched_rows += 1
+                # Première occurrence = résultat du jour (les antériorités suivent)
+                extraction.biomarkers.setdefault(reference.name, value)
+
+            if page_has_results:
+                extraction.result_pages.append(page_index)
+        return extraction
+
+    def is_sufficient(self, extraction: LocalExtraction) -> bool:
+        """Indiquer si l'extraction locale est assez fiable pour éviter Gemini"""
+        return (
+            len(extraction.biomarkers) >= self.min_markers
+            and extraction.coverage >= self.min_coverage
+        )
+
+    @staticmethod
+    def _parse_row(line: str) -> Optional[Tuple[str, float, str, str]]:
+        """
+        Découper une ligne en (libellé, valeur, unité, comparateur), ou None si
+        ce n'est pas un résultat (comparateur vide pour une valeur mesurée)
+        """
+        match = _RESULT_ROW.match(line.strip())
+        if match is None:
+            return None
+        label = match.group("label").strip(" .:…*\t")
+        if not label:
+            return None
+        try:
+            value = _parse_number(match.group("value"))
+        except ValueError:
+            return None
+        comparator = (match.group("comparator") or "").strip()
+        return label, value, match.group("unit"), comparator
+
+    def _match(self, label: str, value: float, unit: str) -> Optional[BiomarkerReference]:
+        """Résoudre le libellé et vérifier la cohérence de l'unité et de la valeur"""
+        reference = self.catalog.lookup(label)
+        if reference is None:
+            return None
+        if _canonical_unit(unit, reference.name) != _canonical_unit(reference.unit, reference.name):
+            return None
+        upper = max(reference.max_value, 0.0) * PLAUSIBILITY_FACTOR
+        lower = reference.min_value / PLAUSIBILITY_FACTOR
+        if value > upper or value < lower:
+            return None
+        return reference
@@ -0,0 +1,466 @@
+"""
+Réception en flux des fichiers uploadés (multipart/form-data) : PDF, photos
+
+Le corps de la requête est lu morceau par morceau au fil de son arrivée,
+au lieu d'être entièrement mis en mémoire avant toute vérification :
+- un Content-Length annonçant un fichier trop gros est refusé (413) avant
+  lecture ;
+- la signature (`%PDF-`, JPEG, PNG, WebP) est vérifiée dès le premier
+  morceau du fichier ;
+- la lecture s'arrête (413) dès que la taille maximale est dépassée ;
+- le SHA-256 est calculé pendant la même passe ;
+- au-delà d'un seuil, le contenu est écrit sur disque (SpooledTemporaryFile).
+
+Le fichier reçu n'est relu qu'au moment où son contenu est nécessaire
+(`read_uploads`, dans le pool de threads) : une réponse rejouée
+(Idempotency-Key) ne le relit jamais et un job en attente ne conserve que
+son fichier temporaire.
+"""
+import hashlib
+from dataclasses import dataclass, field
+from tempfile import SpooledTemporaryFile
+from typing import Any, Callable, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from multipart.multipart import MultipartParser, parse_options_header
+
+from app.config import (
+    BILAN_MAX_FILES,
+    IMAGE_MAX_FILES,
+    IMAGE_UPLOAD_MAX_MB,
+    UPLOAD_MAX_MB,
+    UPLOAD_SPOOL_THRESHOLD_KB,
+)
+
+# Signatures de début de fichier
+PDF_MAGIC = b"%PDF-"
+JPEG_MAGIC = b"\xff\xd8\xff"
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+# Octets lus avant de vérifier la signature (RIFF....WEBP pour le WebP)
+SIGNATURE_BYTES = 12
+
+# Types d'images acceptés (HEIC : à convertir en JPEG côté client)
+IMAGE_CONTENT_TYPES = ("image/jpeg", "image/png", "image/webp")
+
+# Marge accordée à l'enveloppe multipart (délimiteurs, en-têtes, autres champs)
+MULTIPART_OVERHEAD = 64 * 1024
+
+# Schéma OpenAPI du corps (la route lit la requête elle-même, FastAPI ne peut pas le déduire)
+PDF_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+# Plusieurs fichiers dans le champ `files` (photos, PDF d'un même bilan)
+FILES_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["files"],
+                    "properties": {
+                        "files": {"type": "array", "items": {"type": "string", "format": "binary"}},
+                    },
+                }
+            }
+        },
+    }
+}
+
+
+@dataclass
+class UploadedFile:
+    """Fichier reçu : contenu (en mémoire ou sur disque), taille et empreinte"""
+    filename: Optional[str]
+    content_type: Optional[str]
+    size: int
+    sha256: str
+    file: SpooledTemporaryFile
+
+    def read(self) -> bytes:
+        """Contenu complet du fichier"""
+        self.file.seek(0)
+        return self.file.read()
+
+    def close(self):
+        self.file.close()
+
+
+# PDF reçu (même structure que les autres fichiers)
+PdfUpload = UploadedFile
+
+
+@dataclass
+class _Part:
+    name: Optional[str] = None
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+    headers: List[Tuple[bytes, bytes]] = field(default_factory=list)
+
+
+@dataclass
+class _Incoming:
+    """Fichier en cours de réception"""
+    part: _Part
+    sink: SpooledTemporaryFile
+    digest: Any
+    size: int = 0
+    head: bytes = b""  # premiers octets, jusqu'à la vérification de la signature
+    checked: bool = False
+
+
+@dataclass
+class _FileKind:
+    """Type de fichier attendu : types MIME et signature acceptés, messages d'erreur"""
+    content_types: Tuple[str, ...]
+    signature_ok: Callable[[bytes], bool]
+    wrong_type: str
+    empty: str
+    too_large: str
+
+
+def _is_pdf(head: bytes) -> bool:
+    return head.startswith(PDF_MAGIC)
+
+
+def _is_image(head: bytes) -> bool:
+    return head.startswith(JPEG_MAGIC) or head.startswith(PNG_MAGIC) or (
+        head[:4] == b"RIFF" and head[8:12] == b"WEBP"
+    )
+
+
+PDF_KIND = _FileKind(
+    content_types=("application/pdf",),
+    signature_ok=_is_pdf,
+    wrong_type="Le fichier doit être un PDF",
+    empty="PDF vide",
+    too_large="PDF trop volumineux",
+)
+
+IMAGE_KIND = _FileKind(
+    content_types=IMAGE_CONTENT_TYPES,
+    signature_ok=_is_image,
+    wrong_type="Les fichiers doivent être des images JPEG, PNG ou WebP (convertir les photos HEIC en JPEG)",
+    empty="Image vide",
+    too_large="Image trop volumineuse",
+)
+
+
+def _too_large(kind: _FileKind, max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"{kind.too_large}. Maximum : {max_bytes / (1024 * 1024):g} MB"
+    )
+
+
+def _wrong_type(kind: _FileKind) -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=kind.wrong_type
+    )
+
+
+async def receive_pdf_upload(
+    request: Request,
+    field_name: str = "file",
+    max_bytes: int = UPLOAD_MAX_MB * 1024 * 1024,
+    spool_threshold: int = UPLOAD_SPOOL_THRESHOLD_KB * 1024,
+) -> UploadedFile:
+    """
+    Lire en flux le fichier PDF d'une requête multipart/form-data
+
+    Args:
+        request: Requête entrante (corps non encore lu)
+        field_name: Nom du champ contenant le fichier
+        max_bytes: Taille maximale du fichier
+        spool_threshold: Taille au-delà de laquelle le contenu est écrit sur disque
+
+    Returns:
+        UploadedFile (à fermer par l'appelant)
+
+    Raises:
+        HTTPException: 413 si le fichier est trop volumineux, 400 si ce n'est
+                       pas un PDF ou si la requête est mal formée, 422 si le
+                       champ est absent
+    """
+    uploads = await _receive_files(request, field_name, PDF_KIND, max_bytes, 1, spool_threshold)
+    return uploads[0]
+
+
+async def receive_pdf_uploads(
+    request: Request,
+    field_name: str = "files",
+    max_bytes: int = UPLOAD_MAX_MB * 1024 * 1024,
+    max_files: int = BILAN_MAX_FILES,
+    spool_threshold: int = UPLOAD_SPOOL_THRESHOLD_KB * 1024,
+) -> List[UploadedFile]:
+    """
+    Lire en flux les PDF d'un même bilan (ex: hématologie et biochimie séparées)
+
+    Args:
+        request: Requête entrante (corps non encore lu)
+        field_name: Nom du champ (répété pour chaque PDF)
+        max_bytes: Taille maximale de chaque PDF
+        max_files: Nombre maximal de PDF
+        spool_threshold: Taille au-delà de laquelle un PDF est écrit sur disque
+
+    Returns:
+        Liste des UploadedFile dans l'ordre d'envoi (à fermer par l'appelant)
+
+    Raises:
+        HTTPException: Comme `receive_pdf_upload`, et 400 s'il y a trop de fichiers
+    """
+    return await _receive_files(request, field_name, PDF_KIND, max_bytes, max_files, spool_threshold)
+
+
+async def receive_image_uploads(
+    request: Request,
+    field_name: str = "files",
+    max_bytes: int = IMAGE_UPLOAD_MAX_MB * 1024 * 1024,
+    max_files: int = IMAGE_MAX_FILES,
+    spool_threshold: int = UPLOAD_SPOOL_THRESHOLD_KB * 1024,
+) -> List[UploadedFile]:
+    """
+    Lire en flux les photos d'un bilan (une par page) d'une requête multipart/form-data
+
+    Args:
+        request: Requête entrante (corps non encore lu)
+        field_name: Nom du champ (répété pour chaque page)
+        max_bytes: Taille maximale de chaque image
+        max_files: Nombre maximal d'images
+        spool_threshold: Taille au-delà de laquelle une image est écrite sur disque
+
+    Returns:
+        Liste des UploadedFile dans l'ordre d'envoi (à fermer par l'appelant)
+
+    Raises:
+        HTTPException: 413 si une image est trop volumineuse, 400 si un fichier
+                       n'est pas une image supportée, s'il y en a trop ou si la
+                       requête est mal formée, 422 si le champ est absent
+    """
+    return await _receive_files(request, field_name, IMAGE_KIND, max_bytes, max_files, spool_threshold)
+
+
+async def read_uploads(uploads: List[UploadedFile]) -> List[bytes]:
+    """
+    Lire le contenu des fichiers reçus puis les fermer
+
+    La lecture a lieu dans le pool de threads (fichier éventuellement sur disque).
+
+    Args:
+        uploads: Fichiers reçus
+
+    Returns:
+        Contenu de chaque fichier, dans le même ordre
+    """
+    try:
+        return await run_in_threadpool(lambda: [upload.read() for upload in uploads])
+    finally:
+        for upload in uploads:
+            upload.close()
+
+
+def _multipart_boundary(request: Request) -> bytes:
+    """Délimiteur des parties d'une requête multipart/form-data (400 sinon)"""
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(
+            status_code=400,
+            detail="Requête multipart/form-data attendue"
+        )
+    return boundary
+
+
+class _MultipartReceiver:
+    """Analyse d'un corps multipart au fil de sa réception, fichiers du champ attendu vérifiés à la volée"""
+
+    def __init__(
+        self,
+        boundary: bytes,
+        field_name: str,
+        kind: _FileKind,
+        max_bytes: int,
+        max_files: int,
+        spool_threshold: int,
+    ):
+        self.field_name = field_name
+        self.kind = kind
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.spool_threshold = spool_threshold
+        self.max_body = max_bytes * max_files + MULTIPART_OVERHEAD
+        self.received = 0
+        self.files: List[_Incoming] = []
+        self._parts: List[_Part] = []
+        self._data_chunks: List[Tuple[_Part, bytes]] = []
+        self._header = {"name": b"", "value": b""}
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+        })
+
+    def _on_part_begin(self):
+        self._parts.append(_Part())
+
+    def _on_header_field(self, data, start, end):
+        self._header["name"] += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header["value"] += data[start:end]
+
+    def _on_header_end(self):
+        self._parts[-1].headers.append((self._header["name"].lower(), self._header["value"]))
+        self._header["name"] = self._header["value"] = b""
+
+    def _on_headers_finished(self):
+        part = self._parts[-1]
+        for name, value in part.headers:
+            if name == b"content-disposition":
+                _, disposition = parse_options_header(value)
+                part.name = disposition.get(b"name", b"").decode("utf-8", "replace")
+                if b"filename" in disposition:
+                    part.filename = disposition[b"filename"].decode("utf-8", "replace")
+            elif name == b"content-type":
+                part.content_type = value.decode("latin-1")
+
+    def _on_part_data(self, data, start, end):
+        self._data_chunks.append((self._parts[-1], data[start:end]))
+
+    async def feed(self, chunk: bytes):
+        """Analyser un morceau du corps et traiter les données de fichier qu'il contient"""
+        self.received += len(chunk)
+        if self.received > self.max_body:
+            raise _too_large(self.kind, self.max_bytes)
+        try:
+            self._parser.write(chunk)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Corps multipart invalide : {e}")
+
+        for part, data in self._data_chunks:
+            if part.name == self.field_name and part.filename is not None:
+                await self._accept(self._incoming(part), data)
+        self._data_chunks.clear()
+
+    def _incoming(self, part: _Part) -> _Incoming:
+        """Fichier en cours de réception pour cette partie (vérifications à l'ouverture)"""
+        if self.files and self.files[-1].part is part:
+            return self.files[-1]
+        if len(self.files) >= self.max_files:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Trop de fichiers. Maximum : {self.max_files}"
+            )
+        if part.content_type not in self.kind.content_types:
+            print(f"[UPLOAD] ❌ Mauvais type de fichier: {part.content_type}")
+            raise _wrong_type(self.kind)
+        incoming = _Incoming(part, SpooledTemporaryFile(max_size=self.spool_threshold), hashlib.sha256())
+        self.files.append(incoming)
+        return incoming
+
+    def _check_signature(self, incoming: _Incoming):
+        incoming.checked = True
+        if not self.kind.signature_ok(incoming.head):
+            print(f"[UPLOAD] ❌ Signature absente ({incoming.part.filename}): {incoming.head[:8]!r}")
+            raise _wrong_type(self.kind)
+
+    async def _accept(self, incoming: _Incoming, data: bytes):
+        """Vérifier puis conserver un morceau de fichier"""
+        if not incoming.checked:
+            incoming.head += data[:SIGNATURE_BYTES - len(incoming.head)]
+            if len(incoming.head) >= SIGNATURE_BYTES:
+                self._check_signature(incoming)
+
+        incoming.size += len(data)
+        if incoming.size > self.max_bytes:
+            print(f"[UPLOAD] ❌ Fichier trop volumineux (> {self.max_bytes} bytes), lecture interrompue")
+            raise _too_large(self.kind, self.max_bytes)
+        incoming.digest.update(data)
+        if self._on_disk(incoming):
+            # Passage sur disque (copie du contenu déjà reçu) et écritures suivantes hors de la boucle
+            await run_in_threadpool(incoming.sink.write, data)
+        else:
+            incoming.sink.write(data)
+
+    def _on_disk(self, incoming: _Incoming) -> bool:
+        """Le fichier dépasse le seuil : SpooledTemporaryFile l'écrit sur disque"""
+        return incoming.size > self.spool_threshold
+
+    def finish(self) -> List[UploadedFile]:
+        """Terminer l'analyse du corps et renvoyer les fichiers reçus"""
+        self._parser.finalize()
+        if not self.files:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Champ '{self.field_name}' manquant : un fichier est attendu"
+            )
+        for incoming in self.files:
+            if not incoming.size:
+                raise HTTPException(status_code=400, detail=self.kind.empty)
+            if not incoming.checked:
+                self._check_signature(incoming)
+
+        uploads = []
+        for incoming in self.files:
+            print(
+                f"[UPLOAD] ✅ {incoming.part.filename}: {incoming.size} bytes"
+                f"{' (sur disque)' if self._on_disk(incoming) else ''}"
+            )
+            uploads.append(UploadedFile(
+                filename=incoming.part.filename,
+                content_type=incoming.part.content_type,
+                size=incoming.size,
+                sha256=incoming.digest.hexdigest(),
+                file=incoming.sink,
+            ))
+        return uploads
+
+    def close(self):
+        """Libérer les fichiers reçus (requête refusée)"""
+        for incoming in self.files:
+            incoming.sink.close()
+
+
+async def _receive_files(
+    request: Request,
+    field_name: str,
+    kind: _FileKind,
+    max_bytes: int,
+    max_files: int,
+    spool_threshold: int,
+) -> List[UploadedFile]:
+    """Lecture en flux des fichiers du champ `field_name` (vérifications au fil de l'eau)"""
+    boundary = _multipart_boundary(request)
+    receiver = _MultipartReceiver(boundary, field_name, kind, max_bytes, max_files, spool_threshold)
+
+    # Refus immédiat d'un corps annoncé trop gros, sans rien lire
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > receiver.max_body:
+        print(f"[UPLOAD] ❌ Content-Length trop grand: {declared} bytes")
+        raise _too_large(kind, max_bytes)
+
+    try:
+        async for chunk in request.stream():
+            await receiver.feed(chunk)
+        return receiver.finish()
+    except BaseException:
+        receiver.close()
+        raise
@@ -0,0 +1,180 @@
+"""
+Moteur vectorisé (NumPy) de classification des statuts de biomarqueurs
+
+Les plages min/max du catalogue sont stockées sous forme de tableaux, ce qui
+permet de classer en une seule passe une matrice (bilans × biomarqueurs) ou
+une liste aplatie de valeurs, au lieu d'appeler `_determine_status` valeur
+par valeur.
+"""
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.biomarker_catalog import BiomarkerCatalog
+
+# Codes de statut (int8)
+STATUS_ABSENT = -1
+STATUS_UNKNOWN = 0
+STATUS_LOW = 1
+STATUS_NORMAL = 2
+STATUS_HIGH = 3
+
+# Libellés correspondant aux codes >= 0, alignés sur BiomarkerAnalyzer
+STATUS_LABELS = ("inconnu", "bas", "normal", "haut")
+
+
+class VectorizedStatusEngine:
+    """
+    Classifier en masse des valeurs de biomarqueurs (bas / normal / haut / inconnu)
+
+    Les colonnes de l'engine suivent l'ordre de `names`. La sémantique est
+    strictement celle de `BiomarkerAnalyzer._determine_status` : une valeur
+    est "bas" si < min, "haut" si > max, "normal" sinon (bornes incluses).
+    """
+
+    def __init__(self, catalog: BiomarkerCatalog):
+        self.catalog = catalog
+        self.catalog_version = catalog.version
+        self.names: List[str] = catalog.names
+        self._column_by_name: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.min_values = np.array([catalog.get(n).min_value for n in self.names], dtype=np.float64)
+        self.max_values = np.array([catalog.get(n).max_value for n in self.names], dtype=np.float64)
+
+    def column_of(self, raw_name: str) -> int:
+        """
+        Obtenir l'index de colonne d'un biomarqueur
+
+        Args:
+            raw_name: Nom brut du biomarqueur
+
+        Returns:
+            Index de colonne, ou -1 si le biomarqueur est inconnu du catalogue
+        """
+        reference = self.catalog.lookup(raw_name)
+        if reference is None:
+            return -1
+        return self._column_by_name[reference.name]
+
+    def classify(self, values: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """
+        Classer une liste aplatie de valeurs
+
+        Args:
+            values: Valeurs mesurées, shape (N,)
+            columns: Index de colonne de chaque valeur (-1 = inconnu), shape (N,)
+
+        Returns:
+            Codes de statut (int8), shape (N,)
+        """
+        values = np.asarray(values, dtype=np.float64)
+        columns = np.asarray(columns, dtype=np.intp)
+        known = columns >= 0
+        safe_columns = np.where(known, columns, 0)
+
+        if len(self.names) == 0:
+            return np.full(values.shape, STATUS_UNKNOWN, dtype=np.int8)
+
+        codes = np.full(values.shape, STATUS_NORMAL, dtype=np.int8)
+        codes[values < self.min_values[safe_columns]] = STATUS_LOW
+        codes[values > self.max_values[safe_columns]] = STATUS_HIGH
+        codes[~known] = STATUS_UNKNOWN
+        return codes
+
+    def classify_matrix(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Classer une matrice (bilans × biomarqueurs) alignée sur `names`
+
+        Args:
+            values: Matrice shape (n_bilans, len(names)) ; NaN = biomarqueur absent
+
+        Returns:
+            Tuple contenant:
+            - Codes de statut (int8), shape (n_bilans, len(names)), STATUS_ABSENT si NaN
+            - Comptes par bilan, shape (n_bilans, 4), colonnes dans l'ordre de STATUS_LABELS
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 2 or values.shape[1] != len(self.names):
+            raise ValueError(
+                f"Matrice attendue de shape (n, {len(self.names)}), reçue {values.shape}"
+            )
+
+        present = ~np.isnan(values)
+        codes = np.full(values.shape, STATUS_NORMAL, dtype=np.int8)
+        codes[values < self.min_values] = STATUS_LOW
+        codes[values > self.max_values] = STATUS_HIGH
+        codes[~present] = STATUS_ABSENT
+
+        counts = np.stack(
+            [(codes == code).sum(axis=1) for code in range(len(STATUS_LABELS))],
+            axis=1,
+        )
+        return codes, counts
+
+    def count_by_row(self, codes: np.ndarray, rows: np.ndarray, n_rows: int) -> np.ndarray:
+        """
+        Compter les statuts par bilan pour une classification aplatie
+
+        Args:
+            codes: Codes de statut retournés par `classify`, shape (N,)
+            rows: Index du bilan de chaque valeur, shape (N,)
+            n_rows: Nombre total de bilans
+
+        Returns:
+            Comptes par bilan, shape (n_rows, 4), colonnes dans l'ordre de STATUS_LABELS
+        """
+        n_labels = len(STATUS_LABELS)
+        flat = np.asarray(rows, dtype=np.intp) * n_labels + np.asarray(codes, dtype=np.intp)
+        return np.bincount(flat, minlength=n_rows * n_labels).reshape(n_rows, n_labels)
+
+    def encode(self, bilans: Sequence[Dict[str, float]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Aplatir une liste de bilans en tableaux colonnes
+
+        Args:
+            bilans: Liste de dictionnaires {nom_biomarqueur: valeur}
+
+        Returns:
+            Tuple (values, columns, rows) prêt pour `classify` et `count_by_row`
+        """
+        total = sum(len(bilan) for bilan in bilans)
+        values = np.empty(total, dtype=np.float64)
+        columns = np.empty(total, dtype=np.intp)
+        rows = np.empty(total, dtype=np.intp)
+
+        position = 0
+        for row, bilan in enumerate(bilans):
+            for name, value in bilan.items():
+                values[position] = value
+                columns[position] = self.column_of(name)
+                rows[position] = row
+                position += 1
+
+        return values, columns, rows
+
+
+# Engine partagé, recompilé quand la version du catalogue change
+_engine: Optional[VectorizedStatusEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_status_engine(catalog: BiomarkerCatalog) -> VectorizedStatusEngine:
+    """
+    Obtenir l'engine vectorisé correspondant à un catalogue
+
+    Args:
+        catalog: Catalogue de référence
+
+    Returns:
+        Engine compilé pour cette version du catalogue
+    """
+    global _engine
+
+    engine = _engine
+    if engine is not None and engine.catalog is catalog:
+        return engine
+
+    with _engine_lock:
+        if _engine is None or _engine.catalog is not catalog:
+            _engine = VectorizedStatusEngine(catalog)
+        return _engine
@@ -0,0 +1,248 @@
+"""
+Worker de traitement des jobs d'analyse stockés en base (JOBS_BACKEND=database)
+
+Usage :
+    python -m app.worker [--concurrency N] [--once]
+
+Chaque processus réserve des jobs dans la table `analysis_jobs`, extrait les
+biomarqueurs (couche texte, Gemini en repli) puis les analyse. Le débit
+augmente avec le nombre de processus lancés : la réservation par
+`SELECT ... FOR UPDATE SKIP LOCKED` évite toute contention entre eux.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import time
+import uuid
+from typing import Any, Awaitable, Dict, Optional
+
+from fastapi import HTTPException
+
+from app.config import JOBS_POLL_INTERVAL
+from app.database.connection import SessionLocal, engine
+from app.database.seed import seed_biomarkers
+from app.models import Base
+from app.services.biomarker_catalog import refresh_biomarker_catalog
+from app.services.extractors import init_biomarker_extractor
+from app.services.job_queue import ClaimedJob, DatabaseJobQueue, get_job_queue
+from app.services.pdf_analysis import analyze_pdf_bytes
+
+# Intervalle de suppression des jobs terminés expirés (s)
+PURGE_INTERVAL = 60.0
+
+
+class LeaseLostError(Exception):
+    """La réservation du job a été reprise par un autre worker"""
+
+
+class StageRecorder:
+    """
+    Enregistrement des étapes d'un job en base, hors de la boucle d'événements
+
+    Appelé de façon synchrone par l'analyse (`on_stage`) : chaque écriture
+    est confiée à un thread et enchaînée à la précédente (ordre conservé),
+    sans bloquer les autres jobs du processus. Si la réservation est perdue,
+    l'analyse en cours est annulée.
+    """
+
+    def __init__(self, queue: DatabaseJobQueue, job: ClaimedJob, worker_id: str):
+        self.queue = queue
+        self.job = job
+        self.worker_id = worker_id
+        self.lease_lost = False
+        self._tail: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Future] = None
+
+    def __call__(self, stage: str, detail: Dict[str, Any]):
+        self._tail = asyncio.ensure_future(self._write(self._tail, stage, detail))
+
+    async def _write(self, previous: Optional[asyncio.Future], stage: str, detail: Dict[str, Any]):
+        if previous is not None:
+            await previous
+        if self.lease_lost:
+            return
+        try:
+            # Écriture courte en base ; prolonge aussi la réservation
+            recorded = await asyncio.to_thread(self.queue.record_stage, self.job, self.worker_id, stage, detail)
+        except Exception as e:
+            print(f"[WORKER] ⚠️ Étape {stage} du job {self.job.id} non enregistrée: {type(e).__name__}: {e}")
+            return
+        if not recorded:
+            self.lease_lost = True
+            print(f"[WORKER] ⚠️ Job {self.job.id} repris par un autre worker, traitement abandonné")
+            if self._task is not None:
+                self._task.cancel()
+
+    async def run(self, work: Awaitable[Any]) -> Any:
+        """
+        Exécuter l'analyse du job, puis attendre l'enregistrement de ses étapes
+
+        Raises:
+            LeaseLostError: Si la réservation a été perdue en cours de route
+        """
+        self._task = asyncio.ensure_future(work)
+        try:
+            result = await self._task
+        except asyncio.CancelledError:
+            # Annulation due à la perte de la réservation (et non à l'arrêt du worker)
+            if self.lease_lost and not asyncio.current_task().cancelling():
+                raise LeaseLostError(self.job.id)
+            raise
+        except Exception:
+            # Étapes enregistrées avant l'issue du job
+            await self.flush()
+            raise
+        await self.flush()
+        if self.lease_lost:
+            raise LeaseLostError(self.job.id)
+        return result
+
+    async def flush(self):
+        """Attendre l'enregistrement des étapes déjà rapportées"""
+        if self._tail is not None:
+            await self._tail
+
+
+def make_worker_id() -> str:
+    """Identifiant unique du processus worker (hôte, pid, suffixe aléatoire)"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+async def process_job(queue: DatabaseJobQueue, job: ClaimedJob, worker_id: str) -> Optional[str]:
+    """
+    Traiter un job réservé et enregistrer son issue
+
+    Args:
+        queue: File persistante
+        job: Job réservé
+        worker_id: Identifiant du worker
+
+    Returns:
+        Statut final du job, ou None si la réservation a été perdue
+    """
+    print(f"[WORKER] Job {job.id} (tentative {job.attempt}/{job.max_attempts})")
+
+    if job.kind != "analyze_pdf":
+        return await asyncio.to_thread(
+            queue.fail, job, worker_id, f"Type de job inconnu : {job.kind}", 400, False
+        )
+
+    stages = StageRecorder(queue, job, worker_id)
+    try:
+        analysis = await stages.run(analyze_pdf_bytes(job.payload, on_stage=stages))
+    except LeaseLostError:
+        # L'autre worker terminera le job : rien à enregistrer
+        return None
+    except HTTPException as e:
+        # 4xx : PDF invalide, aucun biomarqueur... inutile de réessayer
+        retryable = e.status_code >= 500
+        return await asyncio.to_thread(
+            queue.fail, job, worker_id, str(e.detail), e.status_code, retryable
+        )
+    except Exception as e:
+        print(f"[WORKER] ❌ Job {job.id} en erreur: {type(e).__name__}: {e}")
+        return await asyncio.to_thread(
+            queue.fail, job, worker_id, f"Erreur inattendue : {e}", 500, True
+        )
+
+    completed = await asyncio.to_thread(
+        queue.complete, job, worker_id, analysis.response.model_dump()
+    )
+    return "succeeded" if completed else None
+
+
+async def run_worker(
+    concurrency: int = 1,
+    poll_interval: float = 1.0,
+    once: bool = False,
+    stop: Optional[asyncio.Event] = None,
+    queue: Optional[DatabaseJobQueue] = None,
+) -> int:
+    """
+    Boucle principale : réserver, traiter, recommencer
+
+    Args:
+        concurrency: Nombre de jobs traités simultanément par ce processus
+        poll_interval: Attente quand la file est vide (s)
+        once: S'arrêter dès que la file est vide
+        stop: Événement d'arrêt (les jobs en cours sont terminés)
+        queue: File à consommer (par défaut, la file configurée)
+
+    Returns:
+        Nombre de jobs traités
+    """
+    queue = queue or get_job_queue()
+    stop = stop or asyncio.Event()
+    worker_id = make_worker_id()
+    processed = 0
+    last_purge = 0.0
+    print(f"[WORKER] Démarrage de {worker_id} ({concurrency} job(s) simultané(s))")
+
+    async def slot():
+        nonlocal processed, last_purge
+        while not stop.is_set():
+            if time.monotonic() - last_purge > PURGE_INTERVAL:
+                last_purge = time.monotonic()
+                purged = await asyncio.to_thread(queue.purge_expired)
+                if purged:
+                    print(f"[WORKER] {purged} job(s) expiré(s) supprimé(s)")
+
+            claimed = await asyncio.to_thread(queue.claim, worker_id, 1)
+            if not claimed:
+                if once:
+                    return
+                try:
+                    await asyncio.wait_for(stop.wait(), poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            for job in claimed:
+                await process_job(queue, job, worker_id)
+                processed += 1
+
+    await asyncio.gather(*(slot() for _ in range(concurrency)))
+    print(f"[WORKER] Arrêt de {worker_id} ({processed} job(s) traité(s))")
+    return processed
+
+
+def init_worker():
+    """Créer les tables et charger le catalogue (l'API peut ne pas avoir encore démarré)"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed_biomarkers(db)
+        refresh_biomarker_catalog(db)
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Worker des jobs d'analyse Gula")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Jobs traités simultanément par ce processus")
+    parser.add_argument("--poll-interval", type=float, default=JOBS_POLL_INTERVAL,
+                        help="Attente quand la file est vide (s)")
+    parser.add_argument("--once", action="store_true",
+                        help="S'arrêter quand la file est vide")
+    args = parser.parse_args(argv)
+
+    init_worker()
+    init_biomarker_extractor()
+
+    async def run():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError:
+                pass
+        await run_worker(args.concurrency, args.poll_interval, args.once, stop)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Scripts de benchmark du backend (à lancer depuis backend/ : python -m benchmarks.<nom>)
+"""
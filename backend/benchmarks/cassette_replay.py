@@ -0,0 +1,111 @@
+"""
+Rejeu des cassettes Gemini : non-régression de la lecture des réponses et
+test de charge du pool d'appels avec les latences enregistrées
+
+1. Chaque réponse enregistrée est relue avec le parseur actuel
+   (GeminiService._parse_gemini_response) et comparée aux biomarqueurs lus
+   lors de l'enregistrement ; toute différence est une régression.
+2. Les cassettes sont rejouées `--rounds` fois dans le pool d'appels Gemini
+   (GEMINI_MAX_CONCURRENCY appels simultanés), avec leurs latences
+   multipliées par `--scale`.
+
+Enregistrer d'abord des cassettes avec GEMINI_CASSETTE_MODE=record (voir
+app/services/cassettes.py).
+
+Usage (depuis backend/) :
+    python -m benchmarks.cassette_replay [--dir cassettes] [--scale 1.0] [--rounds 3]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+os.environ.setdefault("GEMINI_CASSETTE_MODE", "replay")
+
+
+def _check_parsing(store) -> int:
+    """Relire chaque réponse enregistrée ; renvoie le nombre de régressions"""
+    from app.services.gemini_service import GeminiService, NoBiomarkersError
+    from app.services.response_parser import parse_biomarkers
+
+    service = object.__new__(GeminiService)
+    regressions = 0
+    count = 0
+    for cassette in store.cassettes():
+        count += 1
+        name = cassette["fingerprint"][:12]
+        raw = parse_biomarkers(cassette["response_text"])
+        expected = cassette.get("biomarkers", {})
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                parsed = service._parse_gemini_response(cassette["response_text"])
+        except NoBiomarkersError:
+            parsed = {}
+        if raw != expected or (expected and not parsed):
+            regressions += 1
+            missing = sorted(set(expected) - set(raw))
+            changed = sorted(k for k in expected if k in raw and raw[k] != expected[k])
+            print(f"  ❌ {name} ({cassette.get('model')}) : manquants {missing}, modifiés {changed}, lus {len(parsed)}")
+    print(f"Lecture des réponses : {count} cassette(s), {regressions} régression(s)")
+    return regressions
+
+
+async def _replay(store, rounds: int) -> dict:
+    """Rejouer toutes les cassettes `rounds` fois dans le pool d'appels"""
+    from app.services.concurrency import percentile
+    from app.services.gemini_service import get_gemini_executor
+
+    cassettes = list(store.cassettes())
+    executor = get_gemini_executor()
+    latencies = []
+
+    async def one(cassette):
+        started_at = time.perf_counter()
+        await executor.run(store.play, cassette)
+        latencies.append((time.perf_counter() - started_at) * 1000)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(one(c) for _ in range(rounds) for c in cassettes))
+    elapsed = time.perf_counter() - started_at
+    recorded = [c.get("latency_ms", 0) for c in cassettes]
+    return {
+        "calls": len(latencies),
+        "elapsed_s": elapsed,
+        "recorded_p50": percentile(recorded, 0.5),
+        "recorded_p95": percentile(recorded, 0.95),
+        "replayed_p50": percentile(latencies, 0.5),
+        "replayed_p95": percentile(latencies, 0.95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=None, help="Répertoire des cassettes (par défaut GEMINI_CASSETTE_DIR)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Facteur appliqué aux latences enregistrées")
+    parser.add_argument("--rounds", type=int, default=1, help="Rejeux de chaque cassette")
+    parser.add_argument("--skip-replay", action="store_true", help="Vérifier seulement la lecture des réponses")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        from app.config import GEMINI_CASSETTE_DIR, GEMINI_MAX_CONCURRENCY
+        from app.services.cassettes import CassetteStore
+    store = CassetteStore(args.dir or GEMINI_CASSETTE_DIR, mode="replay", time_scale=args.scale)
+
+    regressions = _check_parsing(store)
+    if not args.skip_replay:
+        result = asyncio.run(_replay(store, args.rounds))
+        print(
+            f"Rejeu : {result['calls']} appel(s) en {result['elapsed_s']:.2f}s "
+            f"({GEMINI_MAX_CONCURRENCY} simultanés, latences × {args.scale}, attente du pool comprise)"
+        )
+        print(f"{'':>12} | {'p50 ms':>7} | {'p95 ms':>7}")
+        print(f"{'enregistré':>12} | {result['recorded_p50']:>7.0f} | {result['recorded_p95']:>7.0f}")
+        print(f"{'rejoué':>12} | {result['replayed_p50']:>7.0f} | {result['replayed_p95']:>7.0f}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Benchmark : précision et latence des moteurs d'extraction sur un corpus de
+bilans annotés
+
+Chaque bilan du corpus est un fichier de vérité terrain (`nom.json` ou
+`nom.csv`, au format de test-data/) accompagné de son PDF (`nom.pdf`). Un
+bilan sans PDF est rendu en compte rendu de laboratoire (couche texte,
+rendu déterministe) à partir de sa vérité terrain.
+
+Chaque document passe `--repeat` fois par chaque moteur (voir
+app/services/extractors.py) :
+- gemini : rejeu des cassettes enregistrées (GEMINI_CASSETTE_DIR), ou
+  enregistrement avec `--gemini record` (appels réels, clé API requise) ;
+- local : parseur de la couche texte ;
+- stub : réponses simulées égales à la vérité terrain (coût de la chaîne
+  seule ; latence et erreurs selon STUB_LATENCY / STUB_ERROR_RATE).
+
+Pour chaque moteur et chaque document : latences (p50, p95), octets envoyés
+au modèle, jetons, précision et rappel des biomarqueurs extraits (une
+valeur différente de plus de `--tolerance` compte comme une erreur). Le
+résultat est écrit en JSON (clés triées) pour être comparé entre deux
+versions du prompt ou du modèle.
+
+Usage (depuis backend/) :
+    python -m benchmarks.extraction_corpus [--corpus ../test-data] [--repeat 3]
+        [--extractors gemini local stub] [--gemini replay|record] [--output extraction_corpus.json]
+"""
+import argparse
+import asyncio
+import contextlib
+import csv
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_CORPUS = BACKEND_DIR.parent / "test-data"
+EXTRACTORS = ("gemini", "local", "stub")
+
+
+def load_ground_truth(path: Path) -> Dict[str, float]:
+    """Biomarqueurs attendus d'un fichier JSON ({nom: valeur}) ou CSV (biomarqueur,valeur)"""
+    if path.suffix == ".csv":
+        with open(path, "r", encoding="utf-8") as f:
+            rows = [(row.get("biomarqueur"), row.get("valeur")) for row in csv.DictReader(f)]
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            rows = list(json.load(f).items())
+    truth = {}
+    for name, value in rows:
+        try:
+            truth[name.strip()] = float(value)
+        except (AttributeError, TypeError, ValueError):
+            continue  # "comment" et autres champs non numériques
+    return truth
+
+
+def render_bilan_pdf(truth: Dict[str, float], catalog) -> bytes:
+    """
+    Compte rendu de laboratoire (couche texte) d'une vérité terrain
+
+    Libellés, unités et plages de référence du catalogue ; rendu invariant
+    (mêmes octets à chaque exécution, donc mêmes empreintes et cassettes).
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    def fr(value: float) -> str:
+        return f"{value:g}".replace(".", ",")
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4, invariant=1)
+    y = 800
+    for header in (
+        "LABORATOIRE D'ANALYSES MÉDICALES - 12 rue de la Paix 75002 Paris",
+        "Dossier n° 000000  Prélevé le 01/01/2024 à 08:00",
+        "Examen  Résultat  Unité  Valeurs de référence",
+    ):
+        pdf.drawString(40, y, header)
+        y -= 18
+    for name, value in truth.items():
+        reference = catalog.get(name)
+        label = reference.display_name if reference else name
+        unit = reference.unit if reference else ""
+        pdf.drawString(40, y, label)
+        pdf.drawString(260, y, fr(value))
+        pdf.drawString(330, y, unit)
+        if reference is not None:
+            pdf.drawString(410, y, f"({fr(reference.min_value)} - {fr(reference.max_value)})")
+        y -= 16
+        if y < 60:
+            pdf.showPage()
+            y = 800
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def load_corpus(corpus_dir: Path, render_dir: Path, catalog) -> List[Dict[str, Any]]:
+    """Documents du corpus : nom, PDF (fourni ou rendu) et vérité terrain"""
+    documents = []
+    for truth_path in sorted(corpus_dir.glob("*.json")) + sorted(corpus_dir.glob("*.csv")):
+        truth = load_ground_truth(truth_path)
+        if not truth:
+            continue
+        pdf_path = truth_path.with_suffix(".pdf")
+        rendered = not pdf_path.exists()
+        if rendered:
+            render_dir.mkdir(parents=True, exist_ok=True)
+            pdf_path = render_dir / f"{truth_path.stem}.pdf"
+            pdf_path.write_bytes(render_bilan_pdf(truth, catalog))
+        documents.append({
+            "name": truth_path.stem,
+            "pdf": pdf_path.read_bytes(),
+            "truth": truth,
+            "rendered": rendered,
+        })
+    return sorted(documents, key=lambda d: d["name"])
+
+
+def score(extracted: Dict[str, float], truth: Dict[str, float], tolerance: float) -> Dict[str, Any]:
+    """Précision / rappel d'une extraction (nom et valeur corrects)"""
+    correct = [
+        name for name, value in extracted.items()
+        if name in truth and math.isclose(value, truth[name], rel_tol=tolerance, abs_tol=1e-9)
+    ]
+    return {
+        "correct": len(correct),
+        "extracted": len(extracted),
+        "expected": len(truth),
+        "missing": sorted(set(truth) - set(extracted)),
+        "unexpected": sorted(set(extracted) - set(truth)),
+        "wrong_values": {
+            name: [extracted[name], truth[name]]
+            for name in sorted(set(extracted) & set(truth)) if name not in correct
+        },
+    }
+
+
+def _ratio(numerator: int, denominator: int) -> Optional[float]:
+    return round(numerator / denominator, 4) if denominator else None
+
+
+def _document_payload(kind: str, extractor, pdf_bytes: bytes) -> Dict[str, Any]:
+    """Contenu envoyé au modèle et son coût (octets, tokens) pour un document"""
+    from app.config import GEMINI_INPUT_MODE, GEMINI_TEXT_MIN_CHARS
+    from app.services.biomarker_catalog import get_biomarker_catalog
+    from app.services.cassettes import get_cassette_store, request_fingerprint
+    from app.services.extraction_prompt import EXTRACTION_PROMPT
+    from app.services.key_pool import estimate_tokens
+    from app.services.pdf_extraction import build_gemini_text
+    from app.services.text_extractor import LocalTextExtractor
+
+    # Même règle que PdfExtractionPipeline._extract
+    text = None
+    if GEMINI_INPUT_MODE != "pdf":
+        local = LocalTextExtractor(get_biomarker_catalog()).extract(pdf_bytes)
+        if local.text_chars >= GEMINI_TEXT_MIN_CHARS:
+            text = build_gemini_text(local)
+    if text is not None:
+        contents: List[Any] = [f"Contenu texte du bilan sanguin :\n\n{text}"]
+        payload_bytes = len(text.encode("utf-8"))
+    else:
+        contents = [{"mime_type": "application/pdf", "data": pdf_bytes}]
+        payload_bytes = len(pdf_bytes)
+    if kind == "local":
+        return {"text": text, "payload_bytes": 0, "tokens": 0, "tokens_estimated": False}
+
+    tokens, tokens_estimated = estimate_tokens(EXTRACTION_PROMPT, contents), True
+    if kind == "gemini":
+        cassette = get_cassette_store().load(request_fingerprint(extractor.model_name, contents))
+        if cassette is not None and cassette.get("tokens"):
+            tokens, tokens_estimated = cassette["tokens"], False
+    return {"text": text, "payload_bytes": payload_bytes, "tokens": tokens, "tokens_estimated": tokens_estimated}
+
+
+async def _timed_runs(extractor, pdf_bytes: bytes, text: Optional[str], repeat: int):
+    """Extraire `repeat` fois ; renvoie (biomarqueurs, latences en ms, erreur)"""
+    latencies: List[float] = []
+    extracted: Optional[Dict[str, float]] = None
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                extracted = await extractor.extract_biomarkers_from_pdf(pdf_bytes, text=text)
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e)
+            return None, latencies, f"{type(e).__name__}: {detail}"
+        latencies.append((time.perf_counter() - started_at) * 1000)
+    return extracted, latencies, None
+
+
+async def _run_extractor(kind: str, extractor, documents: List[Dict[str, Any]], args) -> Dict[str, Any]:
+    """Passer chaque document `repeat` fois par un moteur"""
+    from app.services.concurrency import percentile
+
+    results: Dict[str, Any] = {}
+    all_latencies: List[float] = []
+    totals = {"correct": 0, "extracted": 0, "expected": 0, "errors": 0, "payload_bytes": 0, "tokens": 0}
+
+    for document in documents:
+        payload = _document_payload(kind, extractor, document["pdf"])
+        payload_bytes, tokens = payload["payload_bytes"], payload["tokens"]
+        extracted, latencies, error = await _timed_runs(extractor, document["pdf"], payload["text"], args.repeat)
+
+        entry: Dict[str, Any] = {
+            "payload_bytes": payload_bytes,
+            "tokens": tokens,
+            "tokens_estimated": payload["tokens_estimated"],
+            "rendered_pdf": document["rendered"],
+            "error": error,
+        }
+        if error is not None or extracted is None:
+            totals["errors"] += 1
+            totals["expected"] += len(document["truth"])
+        else:
+            scored = score(extracted, document["truth"], args.tolerance)
+            for key in ("correct", "extracted", "expected"):
+                totals[key] += scored[key]
+            entry.update(scored)
+            entry["precision"] = _ratio(scored["correct"], scored["extracted"])
+            entry["recall"] = _ratio(scored["correct"], scored["expected"])
+            entry["latency_ms_p50"] = round(percentile(latencies, 0.5), 1)
+            entry["latency_ms_p95"] = round(percentile(latencies, 0.95), 1)
+            all_latencies.extend(latencies)
+            totals["payload_bytes"] += payload_bytes
+            totals["tokens"] += tokens
+        results[document["name"]] = entry
+
+    return {
+        "summary": {
+            "documents": len(documents),
+            "errors": totals["errors"],
+            # Un document en erreur compte pour ses biomarqueurs attendus (rappel)
+            "precision": _ratio(totals["correct"], totals["extracted"]),
+            "recall": _ratio(totals["correct"], totals["expected"]),
+            "latency_ms_p50": round(percentile(all_latencies, 0.5), 1),
+            "latency_ms_p95": round(percentile(all_latencies, 0.95), 1),
+            "latency_ms_p99": round(percentile(all_latencies, 0.99), 1),
+            "payload_bytes": totals["payload_bytes"],
+            "tokens": totals["tokens"],
+        },
+        "documents": results,
+    }
+
+
+def _build_extractor(kind: str, documents: List[Dict[str, Any]]):
+    """Moteur d'extraction du benchmark"""
+    import hashlib
+
+    from app.config import STUB_ERROR_RATE, STUB_LATENCY
+    from app.services.extractors import ExtractionClient, LatencyDistribution, LocalParserExtractor, StubExtractor
+    from app.services.gemini_service import get_gemini_service
+
+    # Même chaîne d'appel pour tous les moteurs (relances, pool d'appels, clés)
+    if kind == "gemini":
+        return ExtractionClient(get_gemini_service())
+    if kind == "local":
+        return ExtractionClient(LocalParserExtractor())
+    fixtures = {hashlib.sha256(d["pdf"]).hexdigest(): d["truth"] for d in documents}
+    return ExtractionClient(StubExtractor(
+        fixtures,
+        latency=LatencyDistribution.parse(STUB_LATENCY),
+        error_rate=STUB_ERROR_RATE,
+        seed=42,
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS), help="Répertoire des bilans annotés")
+    parser.add_argument("--render-dir", default=os.path.join(tempfile.gettempdir(), "gula_corpus"),
+                        help="Répertoire des PDF rendus depuis la vérité terrain")
+    parser.add_argument("--extractors", nargs="+", choices=EXTRACTORS, default=list(EXTRACTORS))
+    parser.add_argument("--gemini", choices=("replay", "record"), default="replay",
+                        help="Cassettes rejouées, ou appels réels enregistrés")
+    parser.add_argument("--repeat", type=int, default=3, help="Passages par document et par moteur")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="Écart relatif toléré sur une valeur")
+    parser.add_argument("--output", default="extraction_corpus.json")
+    args = parser.parse_args()
+
+    # Chaque passage doit atteindre le moteur : ni cache d'extraction, ni routage
+    os.environ["GEMINI_CASSETTE_MODE"] = args.gemini
+    os.environ["EXTRACTION_CACHE_SIZE"] = "0"
+    os.environ["EXTRACTION_CACHE_DIR"] = ""
+    os.environ["GEMINI_CONTEXT_CACHE"] = "false"
+    os.environ.setdefault("STUB_LATENCY", "fixed:0")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        from app.database.seed import BIOMARKERS_DATA
+        from app.services import biomarker_catalog
+        from app.services.extraction_prompt import PROMPT_ID
+
+        # Catalogue du seed : pas de base de données nécessaire
+        catalog = biomarker_catalog.BiomarkerCatalog.from_records(BIOMARKERS_DATA)
+        biomarker_catalog._catalog = catalog
+    documents = load_corpus(Path(args.corpus), Path(args.render_dir), catalog)
+    if not documents:
+        sys.exit(f"Aucun bilan annoté dans {args.corpus}")
+
+    report: Dict[str, Any] = {
+        "corpus": os.path.relpath(args.corpus, BACKEND_DIR),
+        "documents": len(documents),
+        "prompt_version": PROMPT_ID,
+        "repeat": args.repeat,
+        "tolerance": args.tolerance,
+        "extractors": {},
+    }
+    print(f"{len(documents)} bilan(s), {args.repeat} passage(s) par moteur, prompt {PROMPT_ID}")
+    print(
+        f"{'moteur':>8} | {'précision':>9} | {'rappel':>6} | {'erreurs':>7} | {'p50 ms':>7} | "
+        f"{'p95 ms':>7} | {'octets':>8} | {'jetons':>7}"
+    )
+    print("-" * 82)
+    for kind in args.extractors:
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                extractor = _build_extractor(kind, documents)
+            except Exception as e:
+                extractor, error = None, f"{type(e).__name__}: {e}"
+        if extractor is None:
+            print(f"{kind:>8} | indisponible ({error})")
+            report["extractors"][kind] = {"error": error}
+            continue
+        result = asyncio.run(_run_extractor(kind, extractor, documents, args))
+        result["model"] = extractor.model_name
+        report["extractors"][kind] = result
+        summary = result["summary"]
+        print(
+            f"{kind:>8} | {summary['precision'] if summary['precision'] is not None else '-':>9} | "
+            f"{summary['recall'] if summary['recall'] is not None else '-':>6} | {summary['errors']:>7} | "
+            f"{summary['latency_ms_p50']:>7.1f} | {summary['latency_ms_p95']:>7.1f} | "
+            f"{summary['payload_bytes']:>8} | {summary['tokens']:>7}"
+        )
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Résultats écrits dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark : latence et taux d'erreur des extractions Gemini avec et sans la
+couche de résilience (relances, duplicata au p95, budget, disjoncteur)
+
+Gemini est remplacé par un substitut local qui injecte une latence (avec une
+queue de réponses très lentes) et des erreurs transitoires 429/503, levées
+avec les exceptions de google.api_core comme le ferait le SDK.
+
+Usage (depuis backend/) :
+    python -m benchmarks.gemini_resilience [--requests 200] [--slow-rate 0.05] [--error-rate 0.05]
+"""
+import argparse
+import asyncio
+import os
+import random
+import threading
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("GEMINI_CONTEXT_CACHE", "false")
+
+# Réponse constante du substitut
+STAND_IN_RESPONSE = '{"hemoglobine": 14.2, "glucose": 0.95}'
+
+
+class _Response:
+    text = STAND_IN_RESPONSE
+
+
+class _StandInModel:
+    """Substitut de GenerativeModel : latence et erreurs injectées"""
+
+    def __init__(self, latency: float, slow_latency: float, slow_rate: float, error_rate: float, seed: int):
+        self.latency = latency
+        self.slow_latency = slow_latency
+        self.slow_rate = slow_rate
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_content(self, parts, **kwargs):
+        from google.api_core import exceptions
+
+        with self._lock:
+            slow = self._random.random() < self.slow_rate
+            failure = self._random.random() < self.error_rate
+            transient = self._random.choice([exceptions.ResourceExhausted, exceptions.ServiceUnavailable])
+        time.sleep(self.slow_latency if slow else self.latency * self._random.uniform(0.8, 1.2))
+        if failure:
+            raise transient("erreur injectée")
+        return _Response()
+
+
+async def _run(args, resilient: bool) -> dict:
+    """Lancer `--requests` extractions (PDF distincts, sans cache) et mesurer"""
+    from fastapi import HTTPException
+
+    from app.services import gemini_service
+    from app.services.concurrency import percentile
+    from app.services.extractors import ExtractionClient
+    from app.services.resilience import CircuitBreaker, ResilientCaller
+
+    service = object.__new__(gemini_service.GeminiService)
+    service.model = _StandInModel(args.latency, args.slow_latency, args.slow_rate, args.error_rate, args.seed)
+    service.model_name = "stand-in"
+    service.model_resolved = True
+    gemini_service._gemini_service = service
+    gemini_service._gemini_executor = None
+    gemini_service._gemini_resilience = ResilientCaller(
+        "gemini",
+        max_attempts=3 if resilient else 1,
+        backoff_seconds=args.latency,
+        backoff_max_seconds=args.latency * 8,
+        deadline_seconds=args.deadline,
+        hedge_percentile=0.95 if resilient else 0,
+        hedge_min_delay=args.latency * 1.5,
+        hedge_initial_delay=args.latency * 3,
+        breaker=CircuitBreaker("gemini", failure_threshold=0),
+    )
+
+    client = ExtractionClient(service)
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(index: int):
+        nonlocal errors
+        async with semaphore:
+            started_at = time.perf_counter()
+            try:
+                await client.extract_biomarkers_from_pdf(f"%PDF-1.4 benchmark {resilient} {index}".encode())
+            except HTTPException:
+                errors += 1
+            latencies.append(time.perf_counter() - started_at)
+
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    # Appels abandonnés (duplicatas perdants) encore en cours dans le pool, au plus
+    # --slow-latency : leurs logs s'afficheraient sinon au milieu du tableau
+    await asyncio.sleep(args.slow_latency)
+    stats = gemini_service.get_gemini_resilience().stats()
+    return {
+        "p50": percentile(latencies, 0.5) * 1000,
+        "p95": percentile(latencies, 0.95) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "errors": errors,
+        "retries": stats["retries"],
+        "hedges": stats["hedges"],
+        "hedge_wins": stats["hedge_wins"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4, help="Extractions simultanées")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latence normale du substitut (s)")
+    parser.add_argument("--slow-latency", type=float, default=1.0, help="Latence des réponses lentes (s)")
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--deadline", type=float, default=5.0, help="Budget global par extraction (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    import contextlib
+    import io
+
+    print(f"{args.requests} extractions | lentes {args.slow_rate:.0%} ({args.slow_latency}s) | erreurs {args.error_rate:.0%}")
+    print(f"{'résilience':>10} | {'p50 ms':>7} | {'p95 ms':>7} | {'p99 ms':>7} | {'erreurs':>7} | {'relances':>8} | {'duplicatas':>10}")
+    print("-" * 75)
+    for resilient in (False, True):
+        # Les logs par appel du service masqueraient le tableau
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = asyncio.run(_run(args, resilient))
+        print(
+            f"{'oui' if resilient else 'non':>10} | {result['p50']:>7.0f} | {result['p95']:>7.0f} | "
+            f"{result['p99']:>7.0f} | {result['errors']:>7} | {result['retries']:>8} | "
+            f"{result['hedges']:>4} ({result['hedge_wins']} gagnés)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark : débit de la file de jobs persistante selon le nombre de workers
+
+L'appel à Gemini est remplacé par un substitut local qui attend `--latency`
+secondes (cache des extractions désactivé : chaque job atteint le
+substitut) : le débit mesuré est celui de la file (réservation, écritures
+d'étapes) et doit croître linéairement avec le nombre de processus workers.
+
+Usage (depuis backend/, DATABASE_URL pointant vers PostgreSQL) :
+    python -m benchmarks.job_queue [--workers 1 2 4] [--jobs 40] [--latency 0.2]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import time
+
+# Tous les jobs ont le même contenu : sans cela, seul le premier atteindrait le substitut
+os.environ["EXTRACTION_CACHE_SIZE"] = "0"
+os.environ["EXTRACTION_CACHE_DIR"] = ""
+
+# Contenu factice : pas de couche texte, l'extraction passe donc par le substitut Gemini
+PAYLOAD = b"%PDF-1.4 benchmark"
+STAND_IN_BIOMARKERS = {"hemoglobine": 14.2, "glucose": 0.95, "ferritine": 80.0}
+
+
+class _StandInGemini:
+    """Substitut de l'appel à Gemini (GeminiService.generate) : latence fixe, réponse constante"""
+
+    source = "gemini"
+    model_name = "stand-in"
+    prompt_version = "benchmark"
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def generate(self, request, model_name, lease, emit=None):
+        time.sleep(self.latency)
+        return dict(STAND_IN_BIOMARKERS), None
+
+
+def _worker_process(latency: float, concurrency: int, start):
+    """Processus worker : installe le substitut, attend le signal de départ, vide la file"""
+    from app.services import gemini_service
+    from app.worker import run_worker
+
+    gemini_service._gemini_service = _StandInGemini(latency)
+    # Départ commun une fois tous les processus initialisés
+    start.wait()
+    asyncio.run(run_worker(concurrency=concurrency, poll_interval=0.05, once=True))
+
+
+def _run(n_workers: int, n_jobs: int, latency: float, concurrency: int, job_ids: list) -> float:
+    """Enregistrer `n_jobs` jobs puis mesurer le temps de traitement par `n_workers` processus"""
+    from app.services.job_queue import get_job_queue
+
+    queue = get_job_queue()
+    for _ in range(n_jobs):
+        job_ids.append(queue.enqueue("analyze_pdf", PAYLOAD).id)
+
+    context = multiprocessing.get_context("spawn")
+    start = context.Barrier(n_workers + 1)
+    processes = [
+        context.Process(target=_worker_process, args=(latency, concurrency, start))
+        for _ in range(n_workers)
+    ]
+    for process in processes:
+        process.start()
+    # Le chronomètre démarre quand tous les processus ont importé l'application
+    start.wait()
+    started_at = time.perf_counter()
+    for process in processes:
+        process.join()
+    return time.perf_counter() - started_at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--jobs", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.2, help="Latence du substitut Gemini (s)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Jobs simultanés par worker")
+    args = parser.parse_args()
+
+    from sqlalchemy import delete
+
+    from app.database.connection import SessionLocal, engine
+    from app.models.jobs import AnalysisJobRecord
+    from app.worker import init_worker
+
+    init_worker()
+
+    print(f"Base: {engine.url.get_backend_name()} | {args.jobs} jobs | latence substitut {args.latency}s")
+    print(f"{'workers':>8} | {'durée (s)':>10} | {'jobs/s':>8} | {'gain':>6}")
+    print("-" * 42)
+
+    baseline = None
+    job_ids = []
+    for n_workers in args.workers:
+        elapsed = _run(n_workers, args.jobs, args.latency, args.concurrency, job_ids)
+        throughput = args.jobs / elapsed
+        baseline = baseline or throughput
+        print(f"{n_workers:>8} | {elapsed:>10.2f} | {throughput:>8.1f} | {throughput / baseline:>5.2f}x")
+
+    # Supprimer les jobs créés par le benchmark
+    with SessionLocal() as db:
+        db.execute(delete(AnalysisJobRecord).where(AnalysisJobRecord.id.in_(job_ids)))
+        db.commit()
+
+
+if __name__ == "__main__":
+    main()
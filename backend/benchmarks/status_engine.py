@@ -0,0 +1,81 @@
+"""
+Benchmark : classification scalaire (BiomarkerAnalyzer) vs moteur vectorisé NumPy
+
+Usage (depuis backend/) :
+    python -m benchmarks.status_engine [--sizes 10000 1000000] [--repeat 3]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.database.seed import BIOMARKERS_DATA
+from app.services.analyzer import BiomarkerAnalyzer
+from app.services.biomarker_catalog import BiomarkerCatalog
+from app.services.vectorized_analyzer import STATUS_LABELS, VectorizedStatusEngine
+
+
+def _generate_values(engine: VectorizedStatusEngine, size: int, seed: int = 42):
+    """Générer des valeurs aléatoires réparties autour des plages normales"""
+    rng = np.random.default_rng(seed)
+    columns = rng.integers(0, len(engine.names), size=size)
+    low = engine.min_values[columns]
+    high = engine.max_values[columns]
+    span = high - low
+    values = rng.uniform(low - 0.5 * span, high + 0.5 * span)
+    return values, columns
+
+
+def _bench_scalar(engine: VectorizedStatusEngine, values: np.ndarray, columns: np.ndarray) -> float:
+    """Boucle Python sur _determine_status, comme dans BiomarkerAnalyzer.analyze"""
+    min_values = engine.min_values.tolist()
+    max_values = engine.max_values.tolist()
+    values_list = values.tolist()
+    columns_list = columns.tolist()
+    start = time.perf_counter()
+    for value, column in zip(values_list, columns_list):
+        BiomarkerAnalyzer._determine_status(value, min_values[column], max_values[column])
+    return time.perf_counter() - start
+
+
+def _bench_vectorized(engine: VectorizedStatusEngine, values: np.ndarray, columns: np.ndarray) -> float:
+    """Classification en une passe vectorisée"""
+    start = time.perf_counter()
+    engine.classify(values, columns)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = VectorizedStatusEngine(BiomarkerCatalog.from_records(BIOMARKERS_DATA))
+
+    print(f"Catalogue: {len(engine.names)} biomarqueurs (version {engine.catalog_version})")
+    print(f"{'valeurs':>10} | {'scalaire (val/s)':>18} | {'vectorisé (val/s)':>18} | {'gain':>7}")
+    print("-" * 64)
+
+    for size in args.sizes:
+        values, columns = _generate_values(engine, size)
+
+        # Vérifier que les deux chemins donnent exactement les mêmes statuts
+        codes = engine.classify(values, columns)
+        expected = [
+            BiomarkerAnalyzer._determine_status(v, engine.min_values[c], engine.max_values[c])
+            for v, c in zip(values[:1000].tolist(), columns[:1000].tolist())
+        ]
+        assert [STATUS_LABELS[c] for c in codes[:1000]] == expected
+
+        scalar = min(_bench_scalar(engine, values, columns) for _ in range(args.repeat))
+        vectorized = min(_bench_vectorized(engine, values, columns) for _ in range(args.repeat))
+
+        print(
+            f"{size:>10,} | {size / scalar:>18,.0f} | {size / vectorized:>18,.0f} | "
+            f"{scalar / vectorized:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Configuration commune des tests
+
+Les tests tournent hors ligne : base SQLite temporaire, aucun appel à
+Gemini (les services sont remplacés par des doubles dans chaque test).
+"""
+import os
+import tempfile
+
+import pytest
+
+# Avant tout import de `app` (la configuration est lue à l'import)
+_tmp_dir = tempfile.mkdtemp(prefix="gula_tests_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp_dir, 'gula.db')}")
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+os.environ.setdefault("GEMINI_MODEL", "gemini-test")
+os.environ.setdefault("GEMINI_MODEL_CACHE_FILE", os.path.join(_tmp_dir, "model.json"))
+os.environ.setdefault("GEMINI_CONTEXT_CACHE", "false")
+os.environ.setdefault("GEMINI_ROUTING_ENABLED", "false")
+os.environ.setdefault("EXTRACTION_CACHE_DIR", "")
+
+
+@pytest.fixture(scope="session")
+def app():
+    """Application FastAPI (tables créées et catalogue chargé à l'import)"""
+    from app.main import app as fastapi_app
+    return fastapi_app
+
+
+@pytest.fixture
+def client(app):
+    """Client HTTP de test (sans les hooks de démarrage : aucun appel à Gemini)"""
+    from fastapi.testclient import TestClient
+    yield TestClient(app)
+    app.dependency_overrides.clear()
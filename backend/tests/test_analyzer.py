@@ -0,0 +1,70 @@
+"""
+Tests de l'analyse par lot (parité avec l'analyse bilan par bilan)
+"""
+import json
+
+import pytest
+
+from app.api import routes
+from app.database.seed import BIOMARKERS_DATA
+from app.services.analyzer import BiomarkerAnalyzer
+from app.services.biomarker_catalog import BiomarkerCatalog
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return BiomarkerAnalyzer(BiomarkerCatalog.from_records(BIOMARKERS_DATA))
+
+
+def _boundary_bilans():
+    """Un bilan par position autour des bornes de chaque biomarqueur du seed"""
+    bilans = []
+    for offset in (-0.01, 0.0, 0.01):
+        bilans.append({r["display_name"]: r["min_value"] + offset for r in BIOMARKERS_DATA})
+        bilans.append({r["name"]: r["max_value"] + offset for r in BIOMARKERS_DATA})
+    return bilans
+
+
+def _dump(outputs):
+    # json.dumps compare aussi les NaN (NaN != NaN en Python)
+    return json.dumps([([a.model_dump() for a in analyses], summary) for analyses, summary in outputs])
+
+
+@pytest.mark.parametrize("bilans", [
+    pytest.param(_boundary_bilans(), id="bornes"),
+    pytest.param([{"biomarqueur_inexistant": 4.2, "hemoglobine": 12.0, "xyz": -1.0}], id="inconnus"),
+    pytest.param([{"hemoglobine": float("nan"), "glucose": 0.9}], id="nan"),
+    pytest.param([{}, {"glucose": 2.0}, {}], id="bilans-vides"),
+    pytest.param([], id="lot-vide"),
+])
+def test_analyze_batch_matches_successive_analyze(analyzer, bilans):
+    expected = [analyzer.analyze(bilan) for bilan in bilans]
+
+    assert _dump(analyzer.analyze_batch(bilans)) == _dump(expected)
+
+
+def test_batch_endpoint_reports_item_errors_without_failing_the_batch(client):
+    response = client.post("/api/analyze/batch", json={"items": [
+        {"id": "ok", "biomarkers": {"hemoglobine": 12.0, "inconnu_x": 1.0}},
+        {"id": "texte", "biomarkers": {"hemoglobine": "beaucoup"}},
+        {"id": "vide", "biomarkers": {}},
+    ]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["status"], body["succeeded"], body["failed"]) == ("partial", 1, 2)
+    assert [r["id"] for r in body["results"]] == ["ok", "texte", "vide"]
+    ok, texte, vide = body["results"]
+    assert ok["status"] == "success"
+    assert ok["result"]["summary"] == {"normal": 0, "bas": 1, "haut": 0, "inconnu": 1}
+    assert texte["status"] == "error" and "validation" in texte["error"]
+    assert vide["status"] == "error" and vide["result"] is None
+
+
+def test_batch_endpoint_enforces_max_items(client, monkeypatch):
+    monkeypatch.setattr(routes, "BATCH_MAX_ITEMS", 2)
+    items = [{"id": str(i), "biomarkers": {"glucose": 1.0}} for i in range(3)]
+
+    assert client.post("/api/analyze/batch", json={"items": items}).status_code == 413
+    assert client.post("/api/analyze/batch", json={"items": items[:2]}).status_code == 200
+    assert client.post("/api/analyze/batch", json={"items": []}).status_code == 400
@@ -0,0 +1,57 @@
+"""
+Tests du catalogue des biomarqueurs et de son rechargement
+"""
+import threading
+import time
+from types import SimpleNamespace
+
+from app.api.custom_auth_routes import get_current_user_dep
+from app.database.seed import BIOMARKERS_DATA
+from app.services import biomarker_catalog
+from app.services.biomarker_catalog import BiomarkerCatalog, refresh_biomarker_catalog
+
+
+def _as_user(app, is_superuser):
+    user = SimpleNamespace(id=1, is_active=True, is_superuser=is_superuser)
+    app.dependency_overrides[get_current_user_dep] = lambda: user
+
+
+def test_refresh_requires_authentication(client):
+    response = client.post("/api/biomarkers/refresh")
+    assert response.status_code == 401
+
+
+def test_refresh_is_reserved_to_admins(app, client):
+    _as_user(app, is_superuser=False)
+    response = client.post("/api/biomarkers/refresh")
+    assert response.status_code == 403
+
+
+def test_refresh_by_admin_reloads_catalog(app, client):
+    _as_user(app, is_superuser=True)
+    response = client.post("/api/biomarkers/refresh")
+    assert response.status_code == 200
+    assert response.json()["count"] == len(BIOMARKERS_DATA)
+
+
+def test_concurrent_refreshes_share_one_load(monkeypatch):
+    loads = []
+    started = threading.Event()
+
+    def slow_load(db):
+        loads.append(db)
+        started.set()
+        time.sleep(0.2)
+        return BiomarkerCatalog.from_records(BIOMARKERS_DATA)
+
+    monkeypatch.setattr(biomarker_catalog.BiomarkerCatalog, "from_session", staticmethod(slow_load))
+    first = threading.Thread(target=refresh_biomarker_catalog, args=("db",))
+    first.start()
+    started.wait()
+    waiting = [threading.Thread(target=refresh_biomarker_catalog, args=("db",)) for _ in range(4)]
+    for thread in waiting:
+        thread.start()
+    for thread in [first, *waiting]:
+        thread.join()
+
+    assert len(loads) == 1
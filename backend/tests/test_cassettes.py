@@ -0,0 +1,75 @@
+"""
+Tests du rejeu des cassettes Gemini (non-régression de la lecture des réponses)
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from app.services.cassettes import CassetteMissError, CassetteStore
+from app.services.response_parser import parse_biomarkers
+
+CASSETTE_DIR = Path(__file__).parent / "cassettes"
+CASSETTES = [
+    pytest.param(json.loads(path.read_text(encoding="utf-8")), id=path.stem)
+    for path in sorted(CASSETTE_DIR.glob("*.json"))
+]
+
+
+@pytest.fixture
+def store():
+    return CassetteStore(str(CASSETTE_DIR), mode="replay", time_scale=0)
+
+
+def _streamed(store, cassette):
+    emitted = []
+    result = store.play(cassette, emit=lambda name, value: emitted.append((name, value)))
+    return result, emitted
+
+
+def test_fixture_cassettes_are_read(store):
+    assert len(CASSETTES) == len(list(store.cassettes())) >= 3
+
+
+@pytest.mark.parametrize("cassette", CASSETTES)
+def test_recorded_response_is_parsed_as_when_recorded(cassette):
+    assert cassette["biomarkers"]
+    assert parse_biomarkers(cassette["response_text"]) == cassette["biomarkers"]
+
+
+@pytest.mark.parametrize("cassette", CASSETTES)
+def test_replay_serves_the_recorded_response(store, cassette):
+    assert store.play(cassette) == (cassette["response_text"], cassette["tokens"])
+
+
+@pytest.mark.parametrize("cassette", CASSETTES)
+def test_streamed_replay_emits_each_biomarker_once_in_order(store, cassette):
+    result, emitted = _streamed(store, cassette)
+
+    assert result == (cassette["response_text"], cassette["tokens"])
+    assert emitted == list(cassette["biomarkers"].items())
+    assert store.stats()["replayed"] == 1
+
+
+def test_recorded_request_is_replayed_and_unknown_request_misses(tmp_path):
+    cassette = json.loads((CASSETTE_DIR / "structured_escapes.json").read_text(encoding="utf-8"))
+    contents = ["Contenu texte du bilan sanguin :\n\nHémoglobine 13,2 g/dL", {
+        "mime_type": "application/pdf", "data": b"%PDF-1.4 bilan",
+    }]
+
+    recorder = CassetteStore(str(tmp_path), mode="record")
+    recorded = recorder.record(
+        "gemini-test", lambda model, parts, emit: (cassette["response_text"], 42), None, contents,
+    )
+    replayer = CassetteStore(str(tmp_path), mode="replay", time_scale=0)
+    emitted = []
+    replayed = replayer.replay("gemini-test", contents, lambda name, value: emitted.append(name))
+
+    assert recorded == replayed == (cassette["response_text"], 42)
+    assert emitted == list(cassette["biomarkers"])
+    # La cassette résume le document sans le contenir
+    (path,) = tmp_path.glob("*.json")
+    assert b"%PDF" not in path.read_bytes()
+    with pytest.raises(CassetteMissError):
+        replayer.replay("gemini-test", contents[:1])
+    assert replayer.stats()["misses"] == 1
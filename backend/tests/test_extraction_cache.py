@@ -0,0 +1,67 @@
+"""
+Tests du cache des extractions (niveaux mémoire et disque)
+"""
+import asyncio
+import threading
+
+from app.services import extraction_cache
+from app.services.extraction_cache import ExtractionCache, make_cache_key
+
+BIOMARKERS = {"glucose": 0.95, "hemoglobine": 14.2}
+
+
+def test_disk_tier_is_read_and_written_off_the_event_loop(tmp_path, monkeypatch):
+    cache = ExtractionCache(directory=str(tmp_path))
+    loop_thread = threading.get_ident()
+    disk_threads = []
+    for name in ("_read_disk", "_write_disk"):
+        original = getattr(cache, name)
+
+        def spy(*args, _original=original):
+            disk_threads.append(threading.get_ident())
+            return _original(*args)
+
+        monkeypatch.setattr(cache, name, spy)
+
+    key = make_cache_key("sha", "model", "v1")
+    asyncio.run(cache.aset(key, BIOMARKERS))
+    assert asyncio.run(ExtractionCache(directory=str(tmp_path)).aget(key)) == BIOMARKERS
+    assert asyncio.run(cache.aget("absente")) is None
+
+    assert disk_threads and loop_thread not in disk_threads
+
+
+def test_disk_entry_is_promoted_to_memory(tmp_path):
+    key = make_cache_key("sha", "model", "v1")
+    ExtractionCache(directory=str(tmp_path)).set(key, BIOMARKERS)
+
+    cache = ExtractionCache(directory=str(tmp_path))
+    assert cache.get(key) == BIOMARKERS
+    assert cache.get(key) == BIOMARKERS
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 0)
+
+
+def test_directory_is_scanned_only_every_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction_cache, "DISK_EVICTION_INTERVAL", 4)
+    cache = ExtractionCache(directory=str(tmp_path))
+    scans = []
+    original = cache._disk_entries
+    monkeypatch.setattr(cache, "_disk_entries", lambda: scans.append(1) or original())
+
+    for i in range(9):
+        cache.set(make_cache_key(f"sha{i}", "model", "v1"), BIOMARKERS)
+
+    assert len(scans) == 2
+    assert cache.stats()["disk_entries"] == 9
+
+
+def test_disk_size_limit_evicts_oldest_entries(tmp_path):
+    cache = ExtractionCache(directory=str(tmp_path), max_disk_bytes=200)
+    for i in range(10):
+        cache.set(make_cache_key(f"sha{i}", "model", "v1"), BIOMARKERS)
+
+    stats = cache.stats()
+    assert stats["disk_bytes"] <= 200
+    assert stats["evictions"] > 0
+    assert stats["disk_entries"] == len(list(tmp_path.glob("*.json")))
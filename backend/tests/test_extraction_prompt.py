@@ -0,0 +1,70 @@
+"""
+Tests des contextes en cache du prompt d'extraction
+"""
+import threading
+from types import SimpleNamespace
+
+from app.services.extraction_prompt import PromptContextCache
+
+
+class FakeModel:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.counted = 0
+
+    def count_tokens(self, contents):
+        self.counted += 1
+        return SimpleNamespace(total_tokens=self.tokens)
+
+
+class FailingGenai:
+    """Tout appel à l'API des contextes fait échouer le test"""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"genai.{name} ne devrait pas être utilisé")
+
+
+def test_short_prompt_disables_the_cache_without_calling_the_api():
+    cache = PromptContextCache(FailingGenai(), enabled=True, min_tokens=4096)
+    model = FakeModel(tokens=600)
+    threads = threading.active_count()
+
+    assert cache.check_eligibility(model) is False
+    assert cache.check_eligibility(model) is False
+    assert cache.model_for("gemini-test") is None
+
+    assert model.counted == 1
+    assert threading.active_count() == threads
+    stats = cache.stats()
+    assert stats["enabled"] is False
+    assert "600" in stats["disabled_reason"]
+
+
+def test_nothing_is_registered_before_the_startup_check():
+    cache = PromptContextCache(FailingGenai(), enabled=True)
+    threads = threading.active_count()
+
+    assert cache.model_for("gemini-test") is None
+    assert threading.active_count() == threads
+
+
+def test_token_count_failure_keeps_the_system_instruction_only():
+    class Unreachable:
+        def count_tokens(self, contents):
+            raise ConnectionError("réseau indisponible")
+
+    cache = PromptContextCache(FailingGenai(), enabled=True)
+
+    assert cache.check_eligibility(Unreachable()) is False
+    assert cache.model_for("gemini-test") is None
+    assert "ConnectionError" in cache.stats()["disabled_reason"]
+
+
+def test_long_enough_prompt_is_eligible(monkeypatch):
+    cache = PromptContextCache(FailingGenai(), enabled=True, min_tokens=100)
+    monkeypatch.setattr(cache, "_start_registration_locked", lambda model_name: None)
+
+    assert cache.check_eligibility(FakeModel(tokens=5000)) is True
+    assert cache.stats()["prompt_tokens"] == 5000
+    assert cache.model_for("gemini-test") is None
+    assert cache.stats()["misses"] == 1
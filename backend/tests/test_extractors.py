@@ -0,0 +1,102 @@
+"""
+Tests des couches communes aux moteurs d'extraction (cache, relances, pool d'appels, clés)
+"""
+import asyncio
+import sys
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import extraction_cache, extraction_prompt, extractors, gemini_service, key_pool
+from app.services.concurrency import BoundedExecutor
+from app.services.extraction_cache import ExtractionCache
+from app.services.extractors import ExtractionClient, StubExtractor
+from app.services.key_pool import ApiKeyPool
+from app.services.resilience import CircuitBreaker, ResilientCaller
+
+PDF = b"%PDF-1.4 bilan de test"
+BIOMARKERS = {"glucose": 0.95, "hemoglobine": 14.2}
+
+
+@pytest.fixture
+def layers(monkeypatch):
+    """Couches partagées neuves pour chaque test"""
+    executor = BoundedExecutor("test", max_concurrency=2, max_queue=4, timeout_seconds=5)
+    pool = ApiKeyPool([])
+    monkeypatch.setattr(gemini_service, "_gemini_executor", executor)
+    monkeypatch.setattr(gemini_service, "_gemini_resilience", ResilientCaller(
+        "test", backoff_seconds=0.01, hedge_percentile=0, breaker=CircuitBreaker("test", failure_threshold=0)
+    ))
+    monkeypatch.setattr(key_pool, "_api_key_pool", pool)
+    monkeypatch.setattr(extraction_cache, "_extraction_cache", ExtractionCache(max_entries=16))
+    return executor, pool
+
+
+def test_stub_goes_through_the_call_pool_and_the_key_pool_but_not_the_cache(layers):
+    executor, pool = layers
+    stub = StubExtractor({}, default=BIOMARKERS)
+    client = ExtractionClient(stub)
+    streamed = []
+
+    async def run():
+        first = await client.extract_biomarkers_from_pdf(PDF, on_biomarker=lambda n, v: streamed.append(n))
+        await asyncio.sleep(0)  # biomarqueurs transmis via la boucle d'événements
+        second = await client.extract_biomarkers_from_pdf(PDF)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == second == BIOMARKERS
+    assert sorted(streamed) == sorted(BIOMARKERS)
+    # Document déjà vu : le moteur simulé est rappelé (latence et erreurs injectées à chaque requête)
+    assert stub.calls == 2
+    assert executor.stats()["completed"] == 2
+    assert pool.stats()["slots"][0]["calls"] == 2
+    assert extraction_cache.get_extraction_cache().stats()["memory_entries"] == 0
+
+
+def test_other_backends_are_served_from_the_cache(layers):
+    class RecordedBackend(StubExtractor):
+        source = "gemini"
+
+    backend = RecordedBackend({}, default=BIOMARKERS)
+    client = ExtractionClient(backend)
+
+    async def run():
+        return [await client.extract_biomarkers_from_pdf(PDF) for _ in range(2)]
+
+    assert asyncio.run(run()) == [BIOMARKERS, BIOMARKERS]
+    assert backend.calls == 1
+
+
+def test_stub_failures_are_retried_then_mapped_like_gemini_errors(layers):
+    stub = StubExtractor({}, default=BIOMARKERS, error_rate=1.0, seed=1)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(ExtractionClient(stub).extract_biomarkers_from_pdf(PDF))
+
+    assert error.value.status_code == 503
+    assert stub.calls == gemini_service.get_gemini_resilience().max_attempts
+    assert gemini_service.get_gemini_resilience().stats()["retries"] == stub.calls - 1
+
+
+def test_offline_backend_never_imports_the_gemini_sdk(monkeypatch):
+    monkeypatch.setattr(extraction_prompt, "EXTRACTION_BACKEND", "stub")
+    monkeypatch.setattr(extraction_prompt, "GEMINI_CONTEXT_CACHE", True)
+    monkeypatch.setattr(extraction_prompt, "_prompt_context_cache", None)
+    # Un import de google.generativeai lèverait ImportError
+    monkeypatch.setitem(sys.modules, "google.generativeai", None)
+
+    stats = extraction_prompt.get_prompt_context_cache().stats()
+
+    assert stats["enabled"] is False
+    assert stats["disabled_reason"] == "moteur d'extraction stub"
+
+
+def test_local_backend_rejects_photos_without_calling_the_parser(layers):
+    client = ExtractionClient(extractors.LocalParserExtractor())
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(client.extract_biomarkers_from_images([b"\xff\xd8photo"]))
+
+    assert error.value.status_code == 400
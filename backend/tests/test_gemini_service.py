@@ -0,0 +1,55 @@
+"""
+Tests des appels Gemini avec les clés secondaires du pool
+"""
+from google.generativeai import protos
+
+from app.services.extraction_prompt import EXTRACTION_PROMPT
+from app.services.gemini_service import KeyBoundModel
+
+ANSWER = '{"biomarkers": [{"name": "glucose", "value": 0.95}]}'
+
+
+def _response(text):
+    return protos.GenerateContentResponse(candidates=[
+        protos.Candidate(content=protos.Content(role="model", parts=[protos.Part(text=text)]))
+    ])
+
+
+class FakeClient:
+    """GenerativeServiceClient simulé : mémorise les requêtes reçues"""
+
+    def __init__(self):
+        self.requests = []
+
+    def generate_content(self, request):
+        self.requests.append(request)
+        return _response(ANSWER)
+
+    def stream_generate_content(self, request):
+        self.requests.append(request)
+        return iter([_response(ANSWER[:20]), _response(ANSWER[20:])])
+
+
+def test_secondary_key_uses_its_own_client_with_the_extraction_prompt():
+    client = FakeClient()
+    model = KeyBoundModel("gemini-test", client)
+
+    response = model.generate_content(["Glucose 0,95 g/L"], generation_config={"temperature": 0})
+
+    assert response.text == ANSWER
+    request = client.requests[0]
+    assert request.model == "models/gemini-test"
+    assert request.system_instruction.parts[0].text == EXTRACTION_PROMPT
+    assert request.contents[-1].role == "user"
+    assert request.generation_config.temperature == 0
+
+
+def test_secondary_key_streams_through_its_own_client():
+    client = FakeClient()
+
+    chunks = [chunk.text for chunk in KeyBoundModel("models/gemini-test", client).generate_content(
+        ["Glucose 0,95 g/L"], stream=True
+    )]
+
+    assert "".join(chunks) == ANSWER
+    assert client.requests[0].model == "models/gemini-test"
@@ -0,0 +1,96 @@
+"""
+Tests du rejeu des réponses par Idempotency-Key
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.idempotency import REPLAYED_HEADER, IdempotencyStore, StoredResponse
+
+
+def _producer(calls, status_code=200, body=b'{"ok": true}', delay=0.0):
+    async def produce():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if status_code >= 400:
+            raise HTTPException(status_code=status_code, detail="erreur")
+        return StoredResponse(status_code=status_code, body=body, media_type="application/json")
+    return produce
+
+
+def test_repeated_key_replays_the_first_response():
+    store, calls = IdempotencyStore(), []
+
+    async def run():
+        first = await store.run("analyze-pdf", "k1", "sha-a", _producer(calls))
+        second = await store.run("analyze-pdf", "k1", "sha-a", _producer(calls))
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert first.body == second.body
+    assert (first.headers[REPLAYED_HEADER], second.headers[REPLAYED_HEADER]) == ("false", "true")
+
+
+def test_same_key_with_different_content_is_a_conflict():
+    store, calls = IdempotencyStore(), []
+
+    async def run():
+        await store.run("analyze-pdf", "k1", "sha-a", _producer(calls))
+        await store.run("analyze-pdf", "k1", "sha-b", _producer(calls))
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(run())
+
+    assert error.value.status_code == 422
+    assert len(calls) == 1
+    assert store.stats()["conflicts"] == 1
+
+
+def test_concurrent_repeat_waits_for_the_response_in_progress():
+    store, calls = IdempotencyStore(), []
+
+    async def run():
+        return await asyncio.gather(*(
+            store.run("analyze-pdf", "k1", "sha-a", _producer(calls, delay=0.05)) for _ in range(3)
+        ))
+
+    responses = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert sorted(r.headers[REPLAYED_HEADER] for r in responses) == ["false", "true", "true"]
+
+
+def test_client_errors_are_kept_and_server_errors_release_the_key():
+    store, calls = IdempotencyStore(), []
+
+    async def run():
+        rejected = await store.run("analyze-pdf", "bad", "sha-a", _producer(calls, status_code=400))
+        replayed = await store.run("analyze-pdf", "bad", "sha-a", _producer(calls))
+        with pytest.raises(HTTPException):
+            await store.run("analyze-pdf", "flaky", "sha-a", _producer(calls, status_code=503))
+        retried = await store.run("analyze-pdf", "flaky", "sha-a", _producer(calls))
+        return rejected, replayed, retried
+
+    rejected, replayed, retried = asyncio.run(run())
+
+    assert rejected.status_code == replayed.status_code == 400
+    assert retried.status_code == 200
+    assert len(calls) == 3
+
+
+def test_scopes_and_invalid_keys():
+    store, calls = IdempotencyStore(), []
+
+    async def run():
+        await store.run("analyze-pdf", "k1", "sha-a", _producer(calls))
+        await store.run("export-pdf", "k1", "sha-b", _producer(calls))
+        await store.run("analyze-pdf", "x" * 256, "sha-a", _producer(calls))
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(run())
+
+    assert error.value.status_code == 400
+    assert len(calls) == 2
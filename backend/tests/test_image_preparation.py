@@ -0,0 +1,97 @@
+"""
+Tests de la préparation des photos de bilans (réduction, redressement, recadrage)
+"""
+import io
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image, ImageDraw
+
+from app.services.image_preparation import MIN_IMAGE_SIDE, prepare_image
+
+
+def _encode(image, fmt="PNG", **params):
+    output = io.BytesIO()
+    image.save(output, format=fmt, **params)
+    return output.getvalue()
+
+
+def _sheet_on_table(width=1200, height=900):
+    """Feuille imprimée posée sur une table sombre"""
+    photo = Image.new("RGB", (width, height), (60, 50, 40))
+    draw = ImageDraw.Draw(photo)
+    sheet = (width // 4, height // 6, width * 3 // 4, height * 5 // 6)
+    draw.rectangle(sheet, fill=(245, 245, 240))
+    for y in range(sheet[1] + 40, sheet[3] - 40, 30):
+        draw.rectangle((sheet[0] + 40, y, sheet[2] - 40, y + 8), fill=(20, 20, 20))
+    return photo
+
+
+def _prepared_image(prepared):
+    image = Image.open(io.BytesIO(prepared.data))
+    assert image.format == "JPEG" and image.mode == "L"
+    assert image.size == (prepared.width, prepared.height)
+    return image
+
+
+@pytest.mark.parametrize("size", [(1, 1), (2, 2), (MIN_IMAGE_SIDE - 1, 400), (400, 5)])
+def test_tiny_images_are_refused(size):
+    with pytest.raises(HTTPException) as error:
+        prepare_image(_encode(Image.new("L", size, 255)))
+
+    assert error.value.status_code == 400
+    assert "trop petite" in error.value.detail
+
+
+@pytest.mark.parametrize("size", [
+    (MIN_IMAGE_SIDE, MIN_IMAGE_SIDE),
+    (MIN_IMAGE_SIDE + 1, 40),
+    (MIN_IMAGE_SIDE, 5000),
+    (5000, MIN_IMAGE_SIDE),
+])
+def test_smallest_accepted_images_are_prepared(size):
+    photo = Image.new("L", size, 255)
+    ImageDraw.Draw(photo).rectangle((size[0] // 3, size[1] // 3, size[0] // 2, size[1] // 2), fill=0)
+
+    prepared = prepare_image(_encode(photo))
+
+    _prepared_image(prepared)
+    assert (prepared.original_width, prepared.original_height) == size
+
+
+@pytest.mark.parametrize("color", [255, 0, 128])
+def test_blank_photo_is_kept_whole(color):
+    prepared = prepare_image(_encode(Image.new("L", (800, 600), color)), max_side=400)
+
+    _prepared_image(prepared)
+    assert (prepared.width, prepared.height) == (400, 300)
+
+
+def test_sheet_is_cropped_reduced_and_lighter():
+    data = _encode(_sheet_on_table(), fmt="JPEG", quality=95)
+
+    prepared = prepare_image(data, max_side=400)
+
+    _prepared_image(prepared)
+    assert max(prepared.width, prepared.height) <= 400
+    # Table écartée : la feuille occupe la moitié de la largeur
+    assert prepared.width / prepared.height < 1200 / 900
+    assert len(prepared.data) < len(data)
+
+
+def test_exif_orientation_is_applied():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotation de 90° à l'affichage
+    data = _encode(_sheet_on_table(1200, 600), fmt="JPEG", exif=exif.tobytes())
+
+    prepared = prepare_image(data)
+
+    assert (prepared.original_width, prepared.original_height) == (1200, 600)
+    assert prepared.height > prepared.width
+
+
+def test_unreadable_image_is_refused():
+    with pytest.raises(HTTPException) as error:
+        prepare_image(b"\x89PNG\r\n\x1a\n" + b"\x00" * 100)
+
+    assert error.value.status_code == 400
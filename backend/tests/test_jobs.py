@@ -0,0 +1,93 @@
+"""
+Tests des jobs d'analyse en mémoire
+"""
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.jobs import JOB_FAILED, JOB_QUEUED, JOB_SUCCEEDED, JobManager, JobQueueFullError
+
+
+def _wait_finished(manager, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} non terminé")
+
+
+def _collect_events(manager, job_id):
+    async def collect():
+        return [event async for event in manager.events(job_id, heartbeat_seconds=5)]
+    return asyncio.run(collect())
+
+
+def test_job_reports_stages_and_result():
+    manager = JobManager(max_workers=1)
+
+    async def work(report):
+        report("extracted", {"count": 2})
+        return {"ok": True}
+
+    job = manager.submit(work)
+    finished = _wait_finished(manager, job.id)
+
+    assert finished.status == JOB_SUCCEEDED
+    assert finished.result == {"ok": True}
+    assert [e.get("status") or e.get("stage") for e in finished.events] == [
+        "queued", "running", "extracted", "succeeded"
+    ]
+
+
+def test_submit_describes_the_job_before_it_starts():
+    manager = JobManager(max_workers=1)
+
+    async def work(report):
+        return None
+
+    for _ in range(20):
+        job = manager.submit(work)
+        assert job.status == JOB_QUEUED
+        assert len(job.events) == 1
+
+
+def test_http_error_fails_the_job():
+    manager = JobManager(max_workers=1)
+
+    async def work(report):
+        raise HTTPException(status_code=400, detail="PDF illisible")
+
+    finished = _wait_finished(manager, manager.submit(work).id)
+
+    assert (finished.status, finished.error, finished.error_status) == (JOB_FAILED, "PDF illisible", 400)
+
+
+def test_cancelled_job_is_failed_and_ends_its_event_stream():
+    manager = JobManager(max_workers=1)
+
+    async def work(report):
+        report("validated", {})
+        raise asyncio.CancelledError()
+
+    job = manager.submit(work)
+    finished = _wait_finished(manager, job.id)
+
+    assert finished.status == JOB_FAILED
+    assert finished.error_status == 503
+    events = _collect_events(manager, job.id)
+    assert events[-1]["type"] == "status" and events[-1]["status"] == JOB_FAILED
+
+
+def test_pending_limit_rejects_new_jobs():
+    manager = JobManager(max_workers=1, max_pending=1)
+
+    async def work(report):
+        await asyncio.sleep(0.5)
+
+    manager.submit(work)
+    with pytest.raises(JobQueueFullError):
+        manager.submit(work)
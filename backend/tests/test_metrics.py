@@ -0,0 +1,28 @@
+"""
+Tests de l'accès aux compteurs internes (/api/metrics)
+"""
+from types import SimpleNamespace
+
+from app.api.custom_auth_routes import get_current_user_dep
+
+
+def _as_user(app, is_superuser):
+    user = SimpleNamespace(id=1, is_active=True, is_superuser=is_superuser)
+    app.dependency_overrides[get_current_user_dep] = lambda: user
+
+
+def test_metrics_require_authentication(client):
+    assert client.get("/api/metrics").status_code == 401
+
+
+def test_metrics_are_reserved_to_admins(app, client):
+    _as_user(app, is_superuser=False)
+    assert client.get("/api/metrics").status_code == 403
+
+
+def test_admin_reads_metrics(app, client):
+    _as_user(app, is_superuser=True)
+    response = client.get("/api/metrics")
+
+    assert response.status_code == 200
+    assert {"gemini_keys", "jobs", "gemini_cassettes"} <= set(response.json())
@@ -0,0 +1,95 @@
+"""
+Tests de la résolution des noms de biomarqueurs (synonymes, accents, recherche approchée)
+"""
+import pytest
+
+from app.services.name_resolver import (
+    DEFAULT_FUZZY_THRESHOLD,
+    BiomarkerNameResolver,
+    build_seed_entries,
+    fold_biomarker_name,
+    get_name_resolver,
+)
+
+
+@pytest.mark.parametrize("raw, canonical, method", [
+    # Accents, casse et ponctuation
+    ("Hémoglobine", "hemoglobine", "exact"),
+    ("HEMOGLOBINE", "hemoglobine", "exact"),
+    ("Créatinine", "creatinine", "exact"),
+    ("Triglycérides", "triglycerides", "exact"),
+    ("Cholestérol LDL", "cholesterol_ldl", "exact"),
+    ("Gamma GT", "gamma_gt", "exact"),
+    ("Vitamine B 12", "vitamine_b12", "exact"),
+    # Synonymes de laboratoire
+    ("Hemoglobin", "hemoglobine", "alias"),
+    ("LDL-c", "cholesterol_ldl", "alias"),
+    ("GGT", "gamma_gt", "alias"),
+    ("TGO", "transaminases_asat", "alias"),
+    ("Glycémie", "glucose", "alias"),
+    ("25-OH vitamine D", "vitamine_d", "alias"),
+    ("Protéine C réactive", "crp", "alias"),
+    ("Testostérone totale", "testosterone", "alias"),
+    # Fautes de frappe sur des mots longs
+    ("Hémoglobne", "hemoglobine", "fuzzy"),
+    ("Ferritinne", "ferritine", "fuzzy"),
+    ("Potasium", "potassium", "fuzzy"),
+    ("Hématocrit", "hematocrite", "fuzzy"),
+    ("Phosphatase alcaline", "phosphatases_alcalines", "fuzzy"),
+])
+def test_accepted_names(raw, canonical, method):
+    resolution = get_name_resolver().resolve(raw)
+
+    assert resolution is not None
+    assert (resolution.canonical, resolution.method) == (canonical, method)
+    if method == "fuzzy":
+        assert DEFAULT_FUZZY_THRESHOLD <= resolution.confidence < 1.0
+
+
+@pytest.mark.parametrize("raw", [
+    # Biomarqueurs voisins absents du catalogue : jamais rattachés à un autre
+    "Vitamine B6",
+    "Testostérone libre",
+    "Cholesterol VLDL",
+    "VLDL",
+    "Sodium urinaire",
+    "Calcium ionisé",
+    "Bilirubine conjuguée",
+    "GPT",
+    "xyz",
+    "",
+    "---",
+])
+def test_near_misses_are_rejected(raw):
+    assert get_name_resolver().resolve(raw) is None
+
+
+@pytest.mark.parametrize("raw", ["Vitamine B6", "Testostérone libre", "Cholesterol VLDL"])
+def test_token_guard_rejects_neighbours_whatever_the_threshold(raw):
+    resolver = BiomarkerNameResolver(build_seed_entries(), fuzzy_threshold=0.0)
+
+    assert resolver.resolve(raw) is None
+
+
+def test_threshold_rejects_low_confidence_typos():
+    strict = BiomarkerNameResolver(build_seed_entries(), fuzzy_threshold=0.9)
+
+    assert strict.resolve("Hémoglobne") is None
+    assert strict.resolve("Hémoglobine").canonical == "hemoglobine"
+
+
+def test_canonical_name_wins_over_another_biomarker_alias():
+    resolver = BiomarkerNameResolver([("fer", ["ferritine"]), ("ferritine", [])])
+
+    assert resolver.resolve("ferritine").canonical == "fer"
+    assert resolver.resolve("fer").canonical == "fer"
+
+
+@pytest.mark.parametrize("raw, key", [
+    ("Cholestérol LDL", "cholesterol_ldl"),
+    ("LDL-c", "ldl_c"),
+    ("  25(OH)D ", "25_oh_d"),
+    ("Érythrocytes", "erythrocytes"),
+])
+def test_fold_biomarker_name(raw, key):
+    assert fold_biomarker_name(raw) == key
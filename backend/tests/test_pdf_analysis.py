@@ -0,0 +1,115 @@
+"""
+Tests de l'analyse d'un bilan réparti sur plusieurs PDF (fusion et fichiers ignorés)
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import pdf_analysis
+from app.services.extractors import _no_biomarkers
+from app.services.pdf_analysis import BilanFile, analyze_pdf_files, merge_biomarkers
+from app.services.pdf_extraction import ExtractionResult
+
+PDF = b"%PDF-1.4\n"
+
+# Le catalogue des biomarqueurs est lu en base
+pytestmark = pytest.mark.usefixtures("app")
+
+
+def _result(source, **biomarkers):
+    return ExtractionResult(biomarkers=biomarkers, source=source, latency_ms=1.0)
+
+
+class FilePipeline:
+    """Chaîne d'extraction simulée : résultat et durée propres à chaque fichier"""
+
+    def __init__(self, outcomes, delays):
+        self.outcomes = outcomes
+        self.delays = delays
+        self.finished = []
+
+    async def extract(self, pdf_bytes, sha256=None, on_biomarker=None):
+        await asyncio.sleep(self.delays[sha256])
+        self.finished.append(sha256)
+        outcome = self.outcomes[sha256]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def _analyze(monkeypatch, outcomes, delays):
+    pipeline = FilePipeline(outcomes, delays)
+    monkeypatch.setattr(pdf_analysis, "get_pdf_extraction_pipeline", lambda: pipeline)
+    files = [BilanFile(filename=f"{name}.pdf", pdf_bytes=PDF, sha256=name) for name in outcomes]
+    return asyncio.run(analyze_pdf_files(files)), pipeline.finished
+
+
+def test_local_value_wins_then_first_file():
+    merged, conflicts = merge_biomarkers([
+        _result("gemini", glucose=1.0, fer=80.0),
+        None,
+        _result("gemini", glucose=1.1, tsh=2.0),
+        _result("local", glucose=0.9, fer=80.0),
+        _result("local", glucose=0.8, hemoglobine=14.0),
+    ])
+
+    assert merged == {"glucose": 0.9, "fer": 80.0, "tsh": 2.0, "hemoglobine": 14.0}
+    assert conflicts == ["glucose"]
+
+
+@pytest.mark.parametrize("delays", [
+    {"a": 0.0, "b": 0.02, "c": 0.04},
+    {"a": 0.04, "b": 0.02, "c": 0.0},
+    {"a": 0.02, "b": 0.0, "c": 0.04},
+])
+def test_merge_does_not_depend_on_completion_order(monkeypatch, delays):
+    outcomes = {
+        "a": _result("gemini", glucose=1.0, tsh=2.0),
+        "b": _result("gemini", glucose=1.2, fer=80.0),
+        "c": _result("local", tsh=2.5, hemoglobine=14.0),
+    }
+
+    analysis, finished = _analyze(monkeypatch, outcomes, delays)
+
+    assert finished == sorted(delays, key=delays.get)
+    values = {r.biomarker: r.value for r in analysis.response.results}
+    assert values == {"Glycémie (Glucose)": 1.0, "TSH (Hormone Thyroïdienne)": 2.5,
+                      "Fer Sérique": 80.0, "Hémoglobine": 14.0}
+    assert analysis.conflicts == ["glucose", "tsh"]
+    assert [e.source if e else None for e in analysis.extractions] == ["gemini", "gemini", "local"]
+
+
+def test_files_without_biomarkers_are_skipped(monkeypatch):
+    outcomes = {
+        "courrier": _no_biomarkers("gemini"),
+        "bilan": _result("local", glucose=0.9),
+        "garde": _result("local"),
+    }
+
+    analysis, _ = _analyze(monkeypatch, outcomes, dict.fromkeys(outcomes, 0.0))
+
+    assert analysis.skipped == ["courrier.pdf", "garde.pdf"]
+    assert [e is not None for e in analysis.extractions] == [False, True, False]
+    assert analysis.response.summary["normal"] == 1
+
+
+def test_bilan_without_any_biomarker_is_refused(monkeypatch):
+    outcomes = {"a": _no_biomarkers("gemini"), "b": _result("local")}
+
+    with pytest.raises(HTTPException) as error:
+        _analyze(monkeypatch, outcomes, dict.fromkeys(outcomes, 0.0))
+
+    assert error.value.status_code == 400
+
+
+def test_other_extraction_errors_fail_the_bilan(monkeypatch):
+    outcomes = {
+        "a": _result("local", glucose=0.9),
+        "b": HTTPException(status_code=503, detail="Gemini indisponible"),
+    }
+
+    with pytest.raises(HTTPException) as error:
+        _analyze(monkeypatch, outcomes, dict.fromkeys(outcomes, 0.0))
+
+    assert error.value.status_code == 503
@@ -0,0 +1,72 @@
+"""
+Tests du routage des extractions entre modèle rapide et modèle principal
+"""
+import asyncio
+
+from fastapi import HTTPException
+
+from app.services import pdf_extraction
+from app.services.model_router import ModelRouter
+from app.services.pdf_extraction import PdfExtractionPipeline
+
+FAST = {"glucose": 0.95}
+MAIN = {"glucose": 0.95, "hemoglobine": 14.2, "ferritine": 80.0}
+
+
+class RoutedExtractor:
+    """Moteur Gemini simulé : chaque modèle diffuse puis renvoie ses biomarqueurs"""
+
+    source = "gemini"
+    model_name = "principal"
+    prompt_version = "test"
+
+    def __init__(self, results):
+        self.results = results
+
+    async def extract_biomarkers_from_pdf(self, pdf_bytes, text=None, pdf_sha256=None,
+                                          on_biomarker=None, model_name=None):
+        result = self.results[model_name]
+        if isinstance(result, Exception):
+            raise result
+        for name, value in result.items():
+            if on_biomarker is not None:
+                on_biomarker(name, value)
+        return dict(result)
+
+
+def _extract(monkeypatch, results, expected_rows):
+    router = ModelRouter("rapide", min_markers=3, min_coverage=0.6)
+    monkeypatch.setattr(pdf_extraction, "get_model_router", lambda: router)
+    streamed = []
+    biomarkers, model, escalated = asyncio.run(PdfExtractionPipeline()._extract_with_gemini(
+        RoutedExtractor(results), b"%PDF", "texte", "sha", lambda name, value: streamed.append(name),
+        "text", 100, expected_rows,
+    ))
+    return biomarkers, model, escalated, streamed
+
+
+def test_escalated_fast_pass_is_never_streamed(monkeypatch):
+    biomarkers, model, escalated, streamed = _extract(
+        monkeypatch, {"rapide": FAST, "principal": MAIN}, expected_rows=3
+    )
+
+    assert (biomarkers, model, escalated) == (MAIN, "principal", True)
+    assert streamed == list(MAIN)
+
+
+def test_accepted_fast_pass_is_streamed_once_accepted(monkeypatch):
+    biomarkers, model, escalated, streamed = _extract(
+        monkeypatch, {"rapide": MAIN, "principal": {}}, expected_rows=3
+    )
+
+    assert (biomarkers, model, escalated) == (MAIN, "rapide", False)
+    assert streamed == list(MAIN)
+
+
+def test_fast_pass_is_streamed_when_the_main_model_fails(monkeypatch):
+    biomarkers, model, escalated, streamed = _extract(
+        monkeypatch, {"rapide": FAST, "principal": HTTPException(status_code=504)}, expected_rows=3
+    )
+
+    assert (biomarkers, model, escalated) == (FAST, "rapide", True)
+    assert streamed == list(FAST)
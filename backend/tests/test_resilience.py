@@ -0,0 +1,133 @@
+"""
+Tests des relances, duplicatas et du disjoncteur
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.services.resilience import (
+    BREAKER_CLOSED,
+    BREAKER_OPEN,
+    HEDGE_MIN_SAMPLES,
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientCaller,
+)
+
+
+class UpstreamError(Exception):
+    """Erreur amont portant un code HTTP (comme google.api_core)"""
+
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+def _caller(breaker=None, **kwargs):
+    options = {"max_attempts": 3, "backoff_seconds": 0.01, "hedge_percentile": 0, "breaker": breaker}
+    options.update(kwargs)
+    return ResilientCaller("test", **options)
+
+
+def _failing(code, calls):
+    async def fn(timeout):
+        calls.append(1)
+        raise UpstreamError(code)
+    return fn
+
+
+async def _ok(timeout):
+    return "ok"
+
+
+def test_transient_errors_are_retried():
+    calls = []
+
+    async def flaky(timeout):
+        calls.append(1)
+        if len(calls) < 3:
+            raise UpstreamError(503)
+        return "ok"
+
+    assert asyncio.run(_caller().call(flaky)) == "ok"
+    assert len(calls) == 3
+
+
+def test_client_errors_are_not_retried():
+    calls = []
+    with pytest.raises(UpstreamError):
+        asyncio.run(_caller().call(_failing(400, calls)))
+    assert len(calls) == 1
+
+
+def test_slow_call_is_hedged():
+    calls = []
+
+    async def first_slow(timeout):
+        calls.append(1)
+        await asyncio.sleep(1.0 if len(calls) == 1 else 0.01)
+        return len(calls)
+
+    caller = _caller(hedge_percentile=0.95, hedge_initial_delay=0.05, hedge_min_delay=0.01)
+    started_at = time.monotonic()
+    assert asyncio.run(caller.call(first_slow)) == 2
+    assert time.monotonic() - started_at < 0.5
+    assert caller.stats()["hedge_wins"] == 1
+
+
+def test_breaker_opens_then_probe_closes_it():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=0.05)
+    caller = _caller(breaker, max_attempts=1)
+    calls = []
+
+    for _ in range(2):
+        with pytest.raises(UpstreamError):
+            asyncio.run(caller.call(_failing(503, calls)))
+    assert breaker.state == BREAKER_OPEN
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(caller.call(_ok))
+
+    time.sleep(0.06)
+    assert asyncio.run(caller.call(_ok)) == "ok"
+    assert breaker.state == BREAKER_CLOSED
+
+
+def test_cancelled_half_open_probe_lets_the_next_call_through():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.05)
+    caller = _caller(breaker, max_attempts=1)
+    with pytest.raises(UpstreamError):
+        asyncio.run(caller.call(_failing(503, [])))
+    time.sleep(0.06)
+
+    async def hang(timeout):
+        await asyncio.sleep(10)
+
+    async def cancel_probe():
+        probe = asyncio.ensure_future(caller.call(hang))
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        return await caller.call(_ok)
+
+    assert asyncio.run(cancel_probe()) == "ok"
+    assert breaker.state == BREAKER_CLOSED
+
+
+def test_hedge_delay_is_measured_per_key():
+    caller = _caller(hedge_percentile=0.95, hedge_initial_delay=5.0, hedge_min_delay=0.0)
+
+    async def fast(timeout):
+        return "ok"
+
+    async def run():
+        for _ in range(HEDGE_MIN_SAMPLES):
+            await caller.call(fast, key="rapide")
+
+    asyncio.run(run())
+
+    assert caller.hedge_delay("rapide") < 1.0
+    # Un modèle sans mesures garde le délai initial, sans hériter des latences du modèle rapide
+    assert caller.hedge_delay("principal") == 5.0
+    assert caller.stats()["by_key"]["rapide"]["samples"] == HEDGE_MIN_SAMPLES
@@ -0,0 +1,111 @@
+"""
+Tests de la lecture incrémentale des réponses JSON de Gemini
+"""
+import json
+
+import pytest
+
+from app.services.response_parser import BiomarkerStreamParser, parse_biomarkers
+
+STRUCTURED = (
+    '{"biomarkers": [{"name": "H\\u00e9moglobine", "value": 13.2}, '
+    '{"name": "Cr\\u00e9atinine", "value": -9.5e0}, '
+    '{"name": "LDL \\"calcul\\u00e9\\" \\/ HDL", "value": 1.25}]}'
+)
+STRUCTURED_EXPECTED = {"Hémoglobine": 13.2, "Créatinine": -9.5, 'LDL "calculé" / HDL': 1.25}
+
+
+def _feed_chunks(chunks):
+    parser = BiomarkerStreamParser()
+    emitted = []
+    for chunk in chunks:
+        emitted.extend(parser.feed(chunk))
+    emitted.extend(parser.close())
+    return parser.results, emitted
+
+
+@pytest.mark.parametrize("text, expected", [
+    pytest.param(STRUCTURED, STRUCTURED_EXPECTED, id="structuree"),
+    pytest.param('{"hemoglobine": 13.2, "glucose": 0.95}', {"hemoglobine": 13.2, "glucose": 0.95}, id="a-plat"),
+    pytest.param(
+        '{"hemoglobine": {"value": 13.2, "unit": "g/dL"}, "tsh": {"unit": "mUI/L", "value": 2}}',
+        {"hemoglobine": 13.2, "tsh": 2.0},
+        id="a-plat-value",
+    ),
+    pytest.param(
+        '{"biomarkers": [{"name": "glucose", "value": "0,95"}, {"name": "fer", "value": " 1,5 "}]}',
+        {"glucose": 0.95, "fer": 1.5},
+        id="virgule-decimale",
+    ),
+    pytest.param(
+        '{"biomarkers": [{"name": "a", "value": null}, {"name": "b", "value": "n.d."}, '
+        '{"name": "c", "value": true}, {"name": " ", "value": 1}, {"name": "d", "value": 4}]}',
+        {"d": 4.0},
+        id="valeurs-non-numeriques",
+    ),
+])
+def test_shapes(text, expected):
+    json.loads(text)  # JSON valide
+
+    assert parse_biomarkers(text) == expected
+
+
+@pytest.mark.parametrize("escaped, decoded", [
+    ("H\\u00e9moglobine", "Hémoglobine"),
+    ("Cr\\u00C9atinine", "CrÉatinine"),
+    ("\\ud83e\\udde0 cerveau", "\U0001f9e0 cerveau"),
+    ("a\\/b", "a/b"),
+    ("a\\tb\\nc", "a\tb\nc"),
+    ("\\\\ \\\"", '\\ "'),
+])
+def test_string_escapes_are_decoded_like_json(escaped, decoded):
+    text = '{"biomarkers": [{"name": "%s", "value": 1}]}' % escaped
+
+    assert parse_biomarkers(text) == {decoded: 1.0}
+    assert json.loads(text)["biomarkers"][0]["name"] == decoded
+
+
+def test_malformed_escapes_are_kept():
+    assert parse_biomarkers('{"bad\\uZZ": 1, "lone\\ud800x": 2}') == {"baduZZ": 1.0, "lone�x": 2.0}
+
+
+def test_every_chunk_boundary_gives_the_same_result():
+    # Coupures au milieu des chaînes, des nombres et des échappements (é, 🧠)
+    text = STRUCTURED[:-2] + ', {"name": "\\ud83e\\udde0", "value": 0.5}]}'
+    expected = {**STRUCTURED_EXPECTED, "\U0001f9e0": 0.5}
+
+    for cut in range(1, len(text)):
+        assert _feed_chunks([text[:cut], text[cut:]])[0] == expected, cut
+    results, emitted = _feed_chunks(list(text))
+    assert results == expected
+    assert [name for name, _ in emitted] == list(expected)
+
+
+def test_value_is_emitted_once_complete():
+    parser = BiomarkerStreamParser()
+
+    assert parser.feed('{"biomarkers": [{"name": "glucose", "value": 0.9') == []
+    assert parser.feed('5}, {"name": "fer"') == [("glucose", 0.95)]
+    assert parser.feed(', "value": 80}]}') == [("fer", 80.0)]
+
+
+@pytest.mark.parametrize("text", [
+    '```json\n{"glucose": 0.95}\n```',
+    'Voici les résultats extraits :\n```json\n{"biomarkers": [{"name": "glucose", "value": 0.95}]}\n```\nBonne journée !',
+    'Résultats (valeurs en g/L) : {"glucose": 0.95} [fin]',
+])
+def test_markdown_fences_and_prose_are_ignored(text):
+    assert parse_biomarkers(text) == {"glucose": 0.95}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"biomarkers": [{"name": "glucose", "value": 0.95}, {"name": "fer", "val', {"glucose": 0.95}),
+    ('{"biomarkers": [{"name": "glucose", "value": 0.95}, {"name": "fer", "value": 8', {"glucose": 0.95}),
+    ('{"glucose": 0.95, "fer": 80', {"glucose": 0.95, "fer": 80.0}),
+    ('{"glucose": 0.95, "fer": "8', {"glucose": 0.95}),
+    ('{"glucose": 0.95 ], "fer": 80}', {"glucose": 0.95, "fer": 80.0}),
+    ('', {}),
+    ('Aucun biomarqueur lisible.', {}),
+])
+def test_truncated_or_malformed_json_keeps_what_was_read(text, expected):
+    assert parse_biomarkers(text) == expected
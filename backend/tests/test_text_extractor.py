@@ -0,0 +1,49 @@
+"""
+Tests de l'extraction locale depuis la couche texte
+"""
+import pytest
+
+from app.database.seed import BIOMARKERS_DATA
+from app.services.biomarker_catalog import BiomarkerCatalog
+from app.services.text_extractor import LocalTextExtractor
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return LocalTextExtractor(BiomarkerCatalog.from_records(BIOMARKERS_DATA))
+
+
+def test_result_rows_are_recognized(extractor):
+    extraction = extractor.parse_pages([
+        "LABORATOIRE BIOLAB - Dossier n° 123456\n"
+        "Hémoglobine ........ 14,5 g/dL (13,0 - 17,0)\n"
+        "Glycémie 0,95 g/L (0,70 - 1,10)\n"
+        "Créatinine 9 mg/L (7 - 13)\n"
+    ])
+
+    assert extraction.biomarkers == {"hemoglobine": 14.5, "glucose": 0.95, "creatinine": 9.0}
+    assert extraction.coverage == 1.0
+    assert extraction.result_pages == [0]
+    assert extractor.is_sufficient(extraction)
+
+
+@pytest.mark.parametrize("comparator", ["<", ">", "≤", "≥", "<="])
+def test_bounded_result_is_not_reported_as_measured(extractor, comparator):
+    extraction = extractor.parse_pages([
+        "Hémoglobine 14,5 g/dL (13,0 - 17,0)\n"
+        f"Vitamine D {comparator} 10 ng/mL (30 - 100)\n"
+        "Glycémie 0,95 g/L (0,70 - 1,10)\n"
+        "Créatinine 9 mg/L (7 - 13)\n"
+    ])
+
+    assert "vitamine_d" not in extraction.biomarkers
+    assert (extraction.candidate_rows, extraction.matched_rows) == (4, 3)
+    # La ligne non reconnue abaisse la couverture : le document part au repli
+    assert not extractor.is_sufficient(extraction)
+
+
+def test_unit_mismatch_is_not_matched(extractor):
+    extraction = extractor.parse_pages(["Hémoglobine 14,5 mmol/L\n"])
+
+    assert extraction.biomarkers == {}
+    assert (extraction.candidate_rows, extraction.matched_rows) == (1, 0)
@@ -0,0 +1,157 @@
+"""
+Tests de la réception en flux des fichiers uploadés
+"""
+import hashlib
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.services.upload import receive_image_uploads, receive_pdf_uploads
+
+MAX_BYTES = 4096
+PDF = b"%PDF-1.4\n" + b"x" * 1000
+
+
+@pytest.fixture(scope="module")
+def upload_client():
+    app = FastAPI()
+
+    @app.post("/pdfs")
+    async def pdfs(request: Request):
+        uploads = await receive_pdf_uploads(request, max_bytes=MAX_BYTES, max_files=2, spool_threshold=256)
+        try:
+            return [
+                {"filename": u.filename, "size": u.size, "sha256": u.sha256,
+                 "intact": hashlib.sha256(u.read()).hexdigest() == u.sha256}
+                for u in uploads
+            ]
+        finally:
+            for upload in uploads:
+                upload.close()
+
+    @app.post("/images")
+    async def images(request: Request):
+        uploads = await receive_image_uploads(request, max_bytes=MAX_BYTES)
+        return [u.size for u in uploads]
+
+    return TestClient(app)
+
+
+def test_pdf_is_received_hashed_and_spooled_intact(upload_client):
+    response = upload_client.post("/pdfs", files=[
+        ("files", ("a.pdf", PDF, "application/pdf")),
+        ("files", ("b.pdf", PDF[:100], "application/pdf")),
+    ])
+
+    assert response.status_code == 200
+    first, second = response.json()
+    assert (first["size"], first["sha256"]) == (len(PDF), hashlib.sha256(PDF).hexdigest())
+    # Le premier dépasse le seuil : écrit sur disque, contenu inchangé
+    assert first["intact"] and second["intact"]
+
+
+def test_declared_oversized_body_is_refused_before_reading(upload_client):
+    response = upload_client.post(
+        "/pdfs",
+        files={"files": ("a.pdf", PDF, "application/pdf")},
+        headers={"Content-Length": str(10 * 1024 * 1024)},
+    )
+    assert response.status_code == 413
+
+
+def test_oversized_file_is_refused_while_streaming(upload_client):
+    big = b"%PDF-1.4\n" + b"x" * (MAX_BYTES + 1)
+    response = upload_client.post("/pdfs", files={"files": ("big.pdf", big, "application/pdf")})
+
+    assert response.status_code == 413
+    assert "PDF trop volumineux" in response.json()["detail"]
+
+
+def test_pdf_without_signature_is_refused(upload_client):
+    response = upload_client.post("/pdfs", files={"files": ("fake.pdf", b"<html>not a pdf</html>", "application/pdf")})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Le fichier doit être un PDF"
+
+
+def test_short_file_signature_is_checked_at_the_end(upload_client):
+    response = upload_client.post("/pdfs", files={"files": ("short.pdf", b"%PDX", "application/pdf")})
+    assert response.status_code == 400
+
+
+def test_wrong_content_type_is_refused(upload_client):
+    response = upload_client.post("/pdfs", files={"files": ("a.txt", PDF, "text/plain")})
+    assert response.status_code == 400
+
+
+def test_missing_field_and_too_many_files(upload_client):
+    assert upload_client.post("/pdfs", files={"other": ("a.pdf", PDF, "application/pdf")}).status_code == 422
+    response = upload_client.post("/pdfs", files=[("files", (f"{i}.pdf", PDF, "application/pdf")) for i in range(3)])
+    assert response.status_code == 400
+
+
+def test_non_multipart_request_is_refused(upload_client):
+    assert upload_client.post("/pdfs", content=PDF, headers={"Content-Type": "application/pdf"}).status_code == 400
+
+
+def test_image_signatures(upload_client):
+    png = b"\x89PNG\r\n\x1a\n" + b"\0" * 64
+    assert upload_client.post("/images", files={"files": ("p.png", png, "image/png")}).status_code == 200
+    response = upload_client.post("/images", files={"files": ("p.png", PDF, "image/png")})
+    assert response.status_code == 400
+
+
+@pytest.fixture
+def upload_reads(monkeypatch):
+    """Lectures et fermetures des fichiers reçus par les routes d'analyse"""
+    from app.api import routes
+    from app.models.schemas import AnalyzeResponse
+    from app.services.pdf_analysis import PdfAnalysis
+    from app.services.pdf_extraction import ExtractionResult
+    from app.services.upload import UploadedFile
+
+    counts = {"read": 0, "close": 0, "analyzed": []}
+    read, close = UploadedFile.read, UploadedFile.close
+
+    def counting_read(self):
+        counts["read"] += 1
+        return read(self)
+
+    def counting_close(self):
+        counts["close"] += 1
+        close(self)
+
+    async def fake_analyze(pdf_bytes, on_stage=None, sha256=None):
+        counts["analyzed"].append(pdf_bytes)
+        return PdfAnalysis(
+            response=AnalyzeResponse(status="success", message="ok", results=[], summary={}),
+            extraction=ExtractionResult(biomarkers={"glucose": 1.0}, source="stub", latency_ms=1.0),
+        )
+
+    monkeypatch.setattr(UploadedFile, "read", counting_read)
+    monkeypatch.setattr(UploadedFile, "close", counting_close)
+    monkeypatch.setattr(routes, "analyze_pdf_bytes", fake_analyze)
+    return counts
+
+
+def test_replayed_response_does_not_read_the_upload(client, upload_reads):
+    files = {"file": ("a.pdf", PDF, "application/pdf")}
+    headers = {"Idempotency-Key": "upload-replay"}
+
+    first = client.post("/api/analyze-pdf", files=files, headers=headers)
+    second = client.post("/api/analyze-pdf", files=files, headers=headers)
+
+    assert (first.status_code, second.status_code) == (200, 200)
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert upload_reads["read"] == 1
+    assert upload_reads["analyzed"] == [PDF]
+    assert upload_reads["close"] >= 2
+
+
+def test_upload_is_read_once_and_closed(client, upload_reads):
+    response = client.post("/api/analyze-pdf", files={"file": ("a.pdf", PDF, "application/pdf")})
+
+    assert response.status_code == 200
+    assert upload_reads["read"] == 1
+    assert upload_reads["close"] >= 1
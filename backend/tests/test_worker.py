@@ -0,0 +1,107 @@
+"""
+Tests du worker des jobs stockés en base
+"""
+import asyncio
+import threading
+
+from app import worker
+from app.services.job_queue import ClaimedJob
+from app.services.pdf_analysis import STAGE_EXTRACTED, STAGE_VALIDATED
+
+
+class FakeQueue:
+    """File persistante réduite aux appels du worker"""
+
+    def __init__(self, lose_lease_at=None):
+        self.lose_lease_at = lose_lease_at
+        self.stages = []
+        self.threads = set()
+        self.completed = []
+        self.failed = []
+
+    def record_stage(self, job, worker_id, stage, detail):
+        self.threads.add(threading.get_ident())
+        self.stages.append(stage)
+        return stage != self.lose_lease_at
+
+    def complete(self, job, worker_id, result):
+        self.completed.append(job.id)
+        return True
+
+    def fail(self, job, worker_id, error, status, retryable):
+        self.failed.append((job.id, status, retryable))
+        return "failed"
+
+
+class FakeAnalysis:
+    class response:
+        @staticmethod
+        def model_dump():
+            return {"status": "success"}
+
+
+def _job():
+    return ClaimedJob(id="job-1", kind="analyze_pdf", payload=b"%PDF", attempt=1, max_attempts=3)
+
+
+def _fake_analysis(progress):
+    async def analyze_pdf_bytes(pdf_bytes, on_stage=None, sha256=None):
+        on_stage(STAGE_VALIDATED, {})
+        await asyncio.sleep(0.05)
+        on_stage(STAGE_EXTRACTED, {})
+        for _ in range(10):
+            await asyncio.sleep(0.05)
+            progress.append("step")
+        return FakeAnalysis()
+    return analyze_pdf_bytes
+
+
+def test_stages_are_written_off_the_event_loop_and_in_order(monkeypatch):
+    queue = FakeQueue()
+    monkeypatch.setattr(worker, "analyze_pdf_bytes", _fake_analysis([]))
+
+    async def run():
+        return await worker.process_job(queue, _job(), "w1"), threading.get_ident()
+
+    status, loop_thread = asyncio.run(run())
+
+    assert status == "succeeded"
+    assert queue.stages == [STAGE_VALIDATED, STAGE_EXTRACTED]
+    assert loop_thread not in queue.threads
+    assert queue.completed == ["job-1"]
+
+
+def test_lost_lease_aborts_processing(monkeypatch):
+    queue = FakeQueue(lose_lease_at=STAGE_EXTRACTED)
+    progress = []
+    monkeypatch.setattr(worker, "analyze_pdf_bytes", _fake_analysis(progress))
+
+    status = asyncio.run(worker.process_job(queue, _job(), "w1"))
+
+    assert status is None
+    assert len(progress) < 10
+    assert queue.completed == [] and queue.failed == []
+
+
+def test_stage_writes_do_not_block_other_slots(monkeypatch):
+    class SlowQueue(FakeQueue):
+        def record_stage(self, job, worker_id, stage, detail):
+            import time
+            time.sleep(0.2)
+            return super().record_stage(job, worker_id, stage, detail)
+
+    queue = SlowQueue()
+    monkeypatch.setattr(worker, "analyze_pdf_bytes", _fake_analysis([]))
+    ticks = []
+
+    async def ticker():
+        for _ in range(10):
+            ticks.append(asyncio.get_running_loop().time())
+            await asyncio.sleep(0.02)
+
+    async def run():
+        await asyncio.gather(worker.process_job(queue, _job(), "w1"), ticker())
+
+    asyncio.run(run())
+
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.15